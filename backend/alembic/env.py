@@ -0,0 +1,62 @@
+"""Alembic environment.
+
+Tables are still created by Base.metadata.create_all() in the init scripts;
+migrations carry the changes create_all() cannot make to an existing
+database (new columns, indexes, backfills). Every migration therefore checks
+what is already there, so it is a no-op on a freshly created schema.
+"""
+
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+
+from app.core.config import settings
+from app.db.session import Base
+# every model must be imported so autogenerate sees the whole schema
+from app.models import (  # noqa: F401
+    assignment, classes, progress, recording, rollup, score_cache, scoring_job,
+    shadow_score, suggestion, user, word, wordlist_upload,
+)
+
+config = context.config
+config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+# SQLite cannot ALTER most things in place; batch mode rebuilds the table
+render_as_batch = settings.DATABASE_URL.startswith("sqlite")
+
+
+def run_migrations_offline():
+    context.configure(
+        url=settings.DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=render_as_batch,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    connectable = engine_from_config(
+        config.get_section(config.config_ini_section, {}),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=render_as_batch,
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,39 @@
+"""recording derived audio paths
+
+Registers the files written by the one-pass ingest (audio_ingest) on each
+recording: the canonical 16 kHz PCM and the MP3 for playback.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+COLUMNS = ("pcm_path", "mp3_path")
+
+
+def _existing_columns(table):
+    return {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade():
+    existing = _existing_columns("recordings")
+    with op.batch_alter_table("recordings") as batch:
+        for name in COLUMNS:
+            if name not in existing:
+                batch.add_column(sa.Column(name, sa.String(500), nullable=True))
+
+
+def downgrade():
+    existing = _existing_columns("recordings")
+    with op.batch_alter_table("recordings") as batch:
+        for name in COLUMNS:
+            if name in existing:
+                batch.drop_column(name)
@@ -0,0 +1,59 @@
+"""shadow_scores table
+
+shadow_scores was created by hand on the production box and written with raw
+sqlite3 inserts. The shadow pipeline now writes it through the app engine,
+so the table gets a model; this creates it where it is missing and brings a
+hand-made one up to the model (created_at, recording_id index).
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEX = "ix_shadow_scores_recording_id"
+
+
+def _inspector():
+    return sa.inspect(op.get_bind())
+
+
+def upgrade():
+    inspector = _inspector()
+    if not inspector.has_table("shadow_scores"):
+        op.create_table(
+            "shadow_scores",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("recording_id", sa.Integer(), nullable=True),
+            sa.Column("word_text", sa.Text(), nullable=True),
+            sa.Column("azure_score", sa.Float(), nullable=True),
+            sa.Column("azure_accuracy", sa.Float(), nullable=True),
+            sa.Column("final_score", sa.Float(), nullable=True),
+            sa.Column("ml_pron_score", sa.Float(), nullable=True),
+            sa.Column("ml_accuracy", sa.Float(), nullable=True),
+            sa.Column("ml_recognized", sa.Text(), nullable=True),
+            sa.Column("ml_error", sa.Text(), nullable=True),
+            sa.Column("latency_ms", sa.Integer(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+    elif "created_at" not in {c["name"] for c in inspector.get_columns("shadow_scores")}:
+        with op.batch_alter_table("shadow_scores") as batch:
+            batch.add_column(sa.Column("created_at", sa.DateTime(timezone=True), nullable=True))
+
+    if INDEX not in {i["name"] for i in _inspector().get_indexes("shadow_scores")}:
+        op.create_index(INDEX, "shadow_scores", ["recording_id"])
+
+
+def downgrade():
+    # the table predates migrations and holds calibration data: keep it
+    inspector = _inspector()
+    if inspector.has_table("shadow_scores") and \
+            INDEX in {i["name"] for i in inspector.get_indexes("shadow_scores")}:
+        op.drop_index(INDEX, table_name="shadow_scores")
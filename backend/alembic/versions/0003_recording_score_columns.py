@@ -0,0 +1,117 @@
+"""recording score columns
+
+Teacher analytics and assignment progress averaged
+json_extract(automated_scores, '$.pronunciation_score'): every scanned row
+parsed as JSON, no index, and SQLite-only syntax. The headline fields are
+now typed columns on recordings, written whenever automated_scores is set;
+this adds them and backfills existing rows from the JSON.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+COLUMNS = (
+    ("pronunciation_score", sa.Float(), True),
+    ("accuracy_score", sa.Float(), False),
+    ("scorer", sa.String(32), True),
+    ("score_failed", sa.Boolean(), True),
+    ("preflight_reason", sa.String(20), False),
+)
+BATCH = 500
+
+
+def _inspector():
+    return sa.inspect(op.get_bind())
+
+
+def _number(value):
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+def _derive(scores):
+    # frozen copy of app.models.recording.score_columns: migrations must not
+    # change meaning when the model does
+    if isinstance(scores, str):
+        try:
+            scores = json.loads(scores)
+        except ValueError:
+            scores = None
+    if not isinstance(scores, dict):
+        return {"pronunciation_score": None, "accuracy_score": None, "scorer": None,
+                "score_failed": False, "preflight_reason": None}
+    failed = bool(scores.get("error"))
+    # results from before the cascade name their scorer under "scorer" only
+    provider, preflight = scores.get("provider") or scores.get("scorer"), scores.get("preflight")
+    return {
+        "pronunciation_score": None if failed else _number(scores.get("pronunciation_score")),
+        "accuracy_score": None if failed else _number(scores.get("accuracy_score")),
+        "scorer": provider[:32] if isinstance(provider, str) else None,
+        "score_failed": failed,
+        "preflight_reason": preflight[:20] if isinstance(preflight, str) else None,
+    }
+
+
+def _backfill():
+    bind = op.get_bind()
+    recordings = sa.table(
+        "recordings", sa.column("id", sa.Integer()), sa.column("automated_scores", sa.JSON()),
+        *[sa.column(name, type_) for name, type_, _ in COLUMNS]
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(recordings.c.id, recordings.c.automated_scores)
+            .where(recordings.c.id > last_id).where(recordings.c.automated_scores.isnot(None))
+            .order_by(recordings.c.id).limit(BATCH)
+        ).all()
+        if not rows:
+            return
+        # one executemany per batch rather than one UPDATE statement per row
+        bind.execute(recordings.update().where(recordings.c.id == sa.bindparam("row_id")),
+                     [dict(_derive(scores), row_id=recording_id) for recording_id, scores in rows])
+        last_id = rows[-1][0]
+
+
+def upgrade():
+    existing = {c["name"] for c in _inspector().get_columns("recordings")}
+    with op.batch_alter_table("recordings") as batch:
+        for name, type_, _ in COLUMNS:
+            if name in existing:
+                continue
+            if name == "score_failed":
+                batch.add_column(sa.Column(name, type_, nullable=False, server_default=sa.false()))
+            else:
+                batch.add_column(sa.Column(name, type_, nullable=True))
+
+    indexes = {i["name"] for i in _inspector().get_indexes("recordings")}
+    for name, _, indexed in COLUMNS:
+        if indexed and f"ix_recordings_{name}" not in indexes:
+            op.create_index(f"ix_recordings_{name}", "recordings", [name])
+
+    # tables from before automated_scores existed have nothing to derive from
+    if "automated_scores" in existing:
+        _backfill()
+
+
+def downgrade():
+    inspector = _inspector()
+    existing = {c["name"] for c in inspector.get_columns("recordings")}
+    indexes = {i["name"] for i in inspector.get_indexes("recordings")}
+    for name, _, indexed in COLUMNS:
+        if indexed and f"ix_recordings_{name}" in indexes:
+            op.drop_index(f"ix_recordings_{name}", table_name="recordings")
+    with op.batch_alter_table("recordings") as batch:
+        for name, _, _ in COLUMNS:
+            if name in existing:
+                batch.drop_column(name)
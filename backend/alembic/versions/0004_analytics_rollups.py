@@ -0,0 +1,80 @@
+"""analytics rollup tables
+
+student_word_stats and class_day_stats hold the running totals the teacher
+dashboards read (analytics_rollup). This creates them where create_all() has
+not, and fills them from the existing recordings when they are empty: from
+then on the app keeps them current.
+
+The fill calls the app's own rebuild rather than a frozen copy: the rollups
+are derived data, and they must match what the running code would write.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+TOTALS = (
+    ("recordings", sa.Integer(), "0"),
+    ("pending", sa.Integer(), "0"),
+    ("scored", sa.Integer(), "0"),
+    ("score_sum", sa.Float(), "0"),
+)
+# what rebuild() reads; older test / hand-made schemas may lack some of it
+NEEDED = {
+    "recordings": {"student_id", "word_text", "status", "pronunciation_score", "created_at"},
+    "class_enrollment": {"class_id", "student_id"},
+}
+
+
+def _totals():
+    return [sa.Column(name, type_, nullable=False, server_default=default) for name, type_, default in TOTALS]
+
+
+def _can_fill(inspector):
+    return all(inspector.has_table(table) and cols <= {c["name"] for c in inspector.get_columns(table)}
+               for table, cols in NEEDED.items())
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("student_word_stats"):
+        op.create_table(
+            "student_word_stats",
+            sa.Column("student_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+            sa.Column("word_text", sa.String(100), primary_key=True),
+            *_totals(),
+            sa.Column("last_recorded_at", sa.DateTime(timezone=True), nullable=True),
+        )
+    if not inspector.has_table("class_day_stats"):
+        op.create_table(
+            "class_day_stats",
+            sa.Column("class_id", sa.Integer(), sa.ForeignKey("classes.id", ondelete="CASCADE"), primary_key=True),
+            sa.Column("day", sa.Date(), primary_key=True),
+            *_totals(),
+        )
+
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    empty = bind.execute(sa.text("SELECT COUNT(*) FROM student_word_stats")).scalar() == 0
+    if empty and _can_fill(inspector):
+        from app.services.analytics_rollup import analytics_rollup
+        session = Session(bind=bind)
+        summary = analytics_rollup.rebuild(session)
+        session.flush()
+        print(f"Filled analytics rollups: {summary}")
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    for table in ("class_day_stats", "student_word_stats"):
+        if inspector.has_table(table):
+            op.drop_table(table)
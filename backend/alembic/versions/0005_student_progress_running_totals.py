@@ -0,0 +1,120 @@
+"""student_progress running totals
+
+Daily progress is now written by one INSERT ... ON CONFLICT (student_id, date)
+DO UPDATE per scored take (daily_progress), which needs a unique key on
+(student_id, date) and keeps a running score_sum / scored_attempts instead of
+re-deriving the average. This adds the columns and the unique index, and on
+the way:
+
+  - merges duplicate (student_id, date) rows the old read-then-insert could
+    create when two takes were scored at once;
+  - fills score_sum / scored_attempts from average_score * total_attempts
+    (the best the stored average allows);
+  - recomputes streak_count as the run of consecutive days ending at each row.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+INDEX = "uq_student_progress_student_date"
+COLUMNS = (
+    ("score_sum", sa.Float(), "0"),
+    ("scored_attempts", sa.Integer(), "0"),
+)
+NEEDED = {"id", "student_id", "date", "words_practiced", "total_attempts", "average_score", "streak_count"}
+
+
+def _unique_keys(inspector):
+    return ({i["name"] for i in inspector.get_indexes("student_progress") if i.get("unique")}
+            | {c["name"] for c in inspector.get_unique_constraints("student_progress")})
+
+
+def _backfill(bind):
+    progress = sa.table(
+        "student_progress",
+        sa.column("id", sa.Integer()), sa.column("student_id", sa.Integer()), sa.column("date", sa.Date()),
+        sa.column("words_practiced", sa.Integer()), sa.column("total_attempts", sa.Integer()),
+        sa.column("average_score", sa.Numeric(5, 2)), sa.column("streak_count", sa.Integer()),
+        *[sa.column(name, type_) for name, type_, _ in COLUMNS],
+    )
+    rows = bind.execute(
+        sa.select(progress.c.id, progress.c.student_id, progress.c.date, progress.c.words_practiced,
+                  progress.c.total_attempts, progress.c.average_score)
+        .order_by(progress.c.student_id, progress.c.date, progress.c.id)
+    ).all()
+
+    merged = []  # [id, student_id, date, words, attempts, score_sum, scored, duplicate ids]
+    for row_id, student_id, day, words, attempts, average in rows:
+        words, attempts = words or 0, attempts or 0
+        scored = attempts if average is not None else 0
+        score_sum = float(Decimal(str(average)) * attempts) if scored else 0.0
+        if merged and merged[-1][1] == student_id and merged[-1][2] == day:
+            last = merged[-1]
+            last[3] += words
+            last[4] += attempts
+            last[5] += score_sum
+            last[6] += scored
+            last[7].append(row_id)
+        else:
+            merged.append([row_id, student_id, day, words, attempts, score_sum, scored, []])
+
+    previous = None
+    for row_id, student_id, day, words, attempts, score_sum, scored, duplicates in merged:
+        consecutive = (previous and previous[0] == student_id and words > 0
+                       and previous[1] == day - timedelta(days=1))
+        streak = previous[2] + 1 if consecutive else (1 if words > 0 else 0)
+        previous = (student_id, day, streak)
+        if duplicates:
+            bind.execute(progress.delete().where(progress.c.id.in_(duplicates)))
+        bind.execute(progress.update().where(progress.c.id == row_id).values(
+            words_practiced=words, total_attempts=attempts, score_sum=score_sum, scored_attempts=scored,
+            average_score=round(score_sum / scored, 2) if scored else None, streak_count=streak,
+        ))
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("student_progress"):
+        return  # created complete by create_all()
+    existing = {c["name"] for c in inspector.get_columns("student_progress")}
+    added = [name for name, _, _ in COLUMNS if name not in existing]
+    with op.batch_alter_table("student_progress") as batch:
+        for name, type_, default in COLUMNS:
+            if name in added:
+                batch.add_column(sa.Column(name, type_, nullable=False, server_default=default))
+
+    # only when the totals are new: afterwards they are exact, and the
+    # stored average would only approximate them
+    if added and NEEDED <= existing:
+        _backfill(bind)
+
+    if INDEX not in _unique_keys(sa.inspect(bind)):
+        op.create_index(INDEX, "student_progress", ["student_id", "date"], unique=True)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("student_progress"):
+        return
+    if INDEX in {i["name"] for i in inspector.get_indexes("student_progress")}:
+        op.drop_index(INDEX, table_name="student_progress")
+    existing = {c["name"] for c in inspector.get_columns("student_progress")}
+    with op.batch_alter_table("student_progress") as batch:
+        if INDEX in {c["name"] for c in inspector.get_unique_constraints("student_progress")}:
+            batch.drop_constraint(INDEX, type_="unique")
+        for name, _, _ in COLUMNS:
+            if name in existing:
+                batch.drop_column(name)
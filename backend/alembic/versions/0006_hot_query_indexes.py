@@ -0,0 +1,76 @@
+"""composite indexes for hot query shapes
+
+The models declared hardly any multi-column indexes, so the per-request
+filters of the dashboards and progress views were served by table scans
+(or by a single-column index plus a scan of everything it matched):
+
+    assignment_submissions (assignment_id, student_id)   progress views, dashboard counts
+    assignment_students    (assignment_id, student_id)   unique; access checks
+                           (student_id)                  the student's assignment list
+    class_enrollment       (class_id, student_id)        unique; rosters, enrollment checks
+                           (student_id)                  the student's classes, rollups
+    classes                (teacher_id)                  every teacher view's student scope
+    recordings             (student_id, created_at)      a student's takes newest first
+    assignment_words       (assignment_id, order_index)  word lists in order
+
+The two unique keys are created as unique indexes (no table rebuild on
+SQLite); duplicate pairs already in the table are removed first, keeping the
+oldest row. tests/integration/test_query_plans.py checks the plans.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+# (name, table, columns, unique)
+INDEXES = (
+    ("ix_assignment_submissions_assignment_student", "assignment_submissions", ["assignment_id", "student_id"], False),
+    ("uq_assignment_students_assignment_student", "assignment_students", ["assignment_id", "student_id"], True),
+    ("ix_assignment_students_student_id", "assignment_students", ["student_id"], False),
+    ("uq_class_enrollment_class_student", "class_enrollment", ["class_id", "student_id"], True),
+    ("ix_class_enrollment_student_id", "class_enrollment", ["student_id"], False),
+    ("ix_classes_teacher_id", "classes", ["teacher_id"], False),
+    ("ix_recordings_student_created", "recordings", ["student_id", "created_at"], False),
+    ("ix_assignment_words_assignment_order", "assignment_words", ["assignment_id", "order_index"], False),
+)
+
+
+def _existing(inspector, table):
+    return ({i["name"] for i in inspector.get_indexes(table)}
+            | {c["name"] for c in inspector.get_unique_constraints(table)})
+
+
+def _drop_duplicates(table, columns):
+    keys = ", ".join(columns)
+    op.execute(sa.text(
+        f"DELETE FROM {table} WHERE id NOT IN (SELECT keep FROM "
+        f"(SELECT MIN(id) AS keep FROM {table} GROUP BY {keys}) AS oldest)"
+    ))
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns, unique in INDEXES:
+        if not inspector.has_table(table):
+            continue  # created complete by create_all()
+        present = {c["name"] for c in inspector.get_columns(table)}
+        if not set(columns) <= present or name in _existing(inspector, table):
+            continue
+        if unique:
+            _drop_duplicates(table, columns)
+        op.create_index(name, table, columns, unique=unique)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    for name, table, _, _ in reversed(INDEXES):
+        if inspector.has_table(table) and name in {i["name"] for i in inspector.get_indexes(table)}:
+            op.drop_index(name, table_name=table)
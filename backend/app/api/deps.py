@@ -1,27 +1,64 @@
 from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
-from app.core.security import get_current_user_id
+from app.core.security import claims_match, security
 from app.models.user import User, UserRole
+from app.services.auth_cache import auth_cache
 
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    user_id: int = Depends(get_current_user_id)
-) -> User:
-    """Get current authenticated user"""
-    user = db.query(User).filter(User.id == user_id).first()
+def _unauthorized(detail: str = "无法验证凭据") -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def get_token_claims(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+    """Verified claims of the bearer token (signature checked once per token, see auth_cache)"""
+    if credentials is None or credentials.scheme.lower() != "bearer" or not credentials.credentials:
+        raise _unauthorized("未认证")
+
+    payload = auth_cache.claims(credentials.credentials)
+    if payload is None:
+        raise _unauthorized()
+    return payload
+
+
+def user_from_claims(db: Session, payload: dict) -> User:
+    """The token's user, from the cache when possible; refuses tokens that predate
+    a role or password change"""
+    try:
+        user_id = int(payload.get("sub"))
+    except (ValueError, TypeError):
+        raise _unauthorized()
 
+    user = auth_cache.user(db, user_id)
+    if user and not claims_match(payload, user):
+        # the cached row may predate a change committed elsewhere: read it
+        # once more before refusing the token
+        user = auth_cache.user(db, user_id, refresh=True)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="未找到用户"
         )
+    if not claims_match(payload, user):
+        raise _unauthorized()
 
     return user
 
 
+def get_current_user(
+    db: Session = Depends(get_db),
+    payload: dict = Depends(get_token_claims)
+) -> User:
+    """Get current authenticated user"""
+    return user_from_claims(db, payload)
+
+
 def get_current_student(current_user: User = Depends(get_current_user)) -> User:
     """Ensure current user is a student"""
     if current_user.role != UserRole.STUDENT:
@@ -40,3 +77,15 @@ def get_current_teacher(current_user: User = Depends(get_current_user)) -> User:
             detail="仅教师可访问此资源"
         )
     return current_user
+
+
+def get_student_from_token(db: Session, token: str) -> User:
+    """Authenticate a WebSocket by the token in its query string.
+
+    Browsers cannot set headers on a WebSocket handshake; raises the same
+    HTTPExceptions as the header-based dependencies.
+    """
+    payload = auth_cache.claims(token) if token else None
+    if payload is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="无法验证凭据")
+    return get_current_student(user_from_claims(db, payload))
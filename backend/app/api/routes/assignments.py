@@ -1,13 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, WebSocket, WebSocketDisconnect
+from sqlalchemy.orm import Session, selectinload, sessionmaker
 from sqlalchemy import func, and_
 from typing import List, Optional
 from datetime import datetime
 from pathlib import Path
+import asyncio
+import json
 import os
 import re
 import shutil
+import threading
 
+from app.core.config import settings as app_settings
 from app.db.session import get_db
 from app.api.deps import get_current_teacher, get_current_student, get_current_user
 from app.models.user import User
@@ -645,7 +649,7 @@ def get_assignment_progress(
         for r in db.query(
             AssignmentSubmission.student_id,
             func.count(AssignmentSubmission.id),
-            func.avg(func.nullif(func.json_extract(Recording.automated_scores, "$.pronunciation_score"), 0)),
+            func.avg(func.nullif(Recording.pronunciation_score, 0)),
             func.max(AssignmentSubmission.submitted_at)
         ).outerjoin(
             Recording, AssignmentSubmission.recording_id == Recording.id
@@ -735,72 +739,12 @@ def get_student_progress_for_teacher(
     if not assignment_student:
         raise HTTPException(status_code=404, detail="学生未被分配到此作业")
 
-    # Get all words in assignment
-    assignment_words = db.query(AssignmentWord).filter(
-        AssignmentWord.assignment_id == assignment_id
-    ).order_by(AssignmentWord.order_index).all()
-
-    # Get submissions for this student
-    submissions = db.query(AssignmentSubmission).filter(
-        AssignmentSubmission.assignment_id == assignment_id,
-        AssignmentSubmission.student_id == student_id
-    ).all()
-
-    submission_dict = {sub.word_text: sub for sub in submissions}
+    from app.services.assignment_progress import load_word_progress
 
     mode = assignment.mode or "practice"
+    word_list, continuous_summary = load_word_progress(db, assignment, student_id)
 
-    # continuous mode: every word shares one take — use its per-word breakdown
-    continuous_summary = None
-    per_word_map = {}
-    if mode == "continuous":
-        latest_sub = max((s for s in submissions if s.recording_id), key=lambda x: x.id, default=None)
-        if latest_sub and latest_sub.recording:
-            rec = latest_sub.recording
-            scores = rec.automated_scores or {}
-            per_word_map = {w.get("word"): w for w in scores.get("per_word", [])}
-            continuous_summary = {
-                "recording_id": rec.id,
-                "audio_file_path": rec.audio_file_path,
-                "pronunciation_score": scores.get("pronunciation_score"),
-                "grade": rec.teacher_grade,
-                "feedback": rec.teacher_feedback,
-                "words_read": scores.get("words_read"),
-                "words_total": scores.get("words_total"),
-                "completeness_score": scores.get("completeness_score"),
-                "fluency_score": scores.get("fluency_score"),
-                "recognized_text": scores.get("recognized_text"),
-                "scoring": scores == {} or (rec.status == RecordingStatus.PENDING and not scores),
-            }
-
-    word_list = []
-    for word in assignment_words:
-        submission = submission_dict.get(word.word_text)
-        word_info = {
-            "word_text": word.word_text,
-            "order_index": word.order_index,
-            "submitted": submission is not None,
-            "recording_id": submission.recording_id if submission else None,
-            "submitted_at": submission.submitted_at if submission else None,
-            "teacher_feedback": submission.teacher_feedback if submission else None,
-            "teacher_grade": submission.teacher_grade if submission else None
-        }
-
-        if mode == "continuous":
-            pw = per_word_map.get(word.word_text)
-            if pw:
-                word_info["score"] = pw.get("score")
-                word_info["error"] = pw.get("error")
-                word_info["offset_ms"] = pw.get("offset_ms")
-                word_info["end_ms"] = pw.get("end_ms")
-        elif submission and submission.recording_id:
-            recording = db.query(Recording).filter(Recording.id == submission.recording_id).first()
-            if recording and recording.automated_scores:
-                word_info["score"] = recording.automated_scores.get("pronunciation_score", 0)
-
-        word_list.append(word_info)
-
-    total_words = len(assignment_words)
+    total_words = len(word_list)
     completed_words = len([w for w in word_list if w["submitted"]])
 
     return {
@@ -825,16 +769,7 @@ def get_student_assignments(
     current_user: User = Depends(get_current_student)
 ):
     """Get all assignments for the current student"""
-    assignment_students = db.query(AssignmentStudent).filter(
-        AssignmentStudent.student_id == current_user.id
-    ).all()
-
-    assignments = []
-    for assignment_student in assignment_students:
-        assignment = assignment_student.assignment
-        assignments.append(build_student_assignment_response(assignment, current_user.id, db))
-
-    return assignments
+    return load_student_assignments(db, current_user.id)
 
 
 @router.get("/student/assignments/{assignment_id}", response_model=StudentAssignmentResponse)
@@ -844,16 +779,12 @@ def get_student_assignment(
     current_user: User = Depends(get_current_student)
 ):
     """Get a specific assignment for the student"""
-    assignment_student = db.query(AssignmentStudent).filter(
-        AssignmentStudent.assignment_id == assignment_id,
-        AssignmentStudent.student_id == current_user.id
-    ).first()
+    assignments = load_student_assignments(db, current_user.id, assignment_id)
 
-    if not assignment_student:
+    if not assignments:
         raise HTTPException(status_code=404, detail="未找到作业")
 
-    assignment = assignment_student.assignment
-    return build_student_assignment_response(assignment, current_user.id, db)
+    return assignments[0]
 
 
 @router.post("/student/assignments/{assignment_id}/submit-continuous")
@@ -865,7 +796,7 @@ def submit_assignment_continuous(
 ):
     """Test mode: accept the take immediately, score it in the background."""
     from app.services.shadow_service import submit_shadow
-    from app.models.recording import Recording, RecordingStatus
+    from app.models.recording import Recording
     from app.core.config import settings as app_settings
 
     assignment_student = db.query(AssignmentStudent).filter(
@@ -889,10 +820,58 @@ def submit_assignment_continuous(
         _shutil.copyfileobj(audio_file.file, buffer)
 
     # placeholder recording: student doesn't wait for scoring
+    recording = _record_continuous_take(db, assignment_student, reference_words, str(file_path))
+    recording_id = recording.id
+
+    def score_in_background():
+        from app.db.session import SessionLocal
+        from app.services.pronunciation_service import pronunciation_service
+        from app.services.audio_ingest import ingest_recording
+        from app.services.scoring_metrics import span
+        session = SessionLocal()
+        try:
+            rec = session.query(Recording).filter(Recording.id == recording_id).first()
+            if not rec:
+                return
+            # one decode for everything: canonical PCM for scoring + shadow, MP3 for playback
+            audio_path = ingest_recording(rec)
+            session.commit()
+            result = pronunciation_service.assess_continuous_reading(audio_path, reference_words)
+            rec = session.query(Recording).filter(Recording.id == recording_id).first()
+            if not rec:
+                return
+            _apply_continuous_result(rec, result)
+            with span("db_commit", mode="continuous"):
+                session.commit()
+            try:
+                submit_shadow(recording_id, " ".join(reference_words), audio_path, result if not result.get("error") else {})
+            except Exception as e:
+                print(f"Shadow submit failed (non-fatal): {e}")
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+        finally:
+            session.close()
+
+    import threading
+    threading.Thread(target=score_in_background, daemon=True, name=f"continuous-score-{recording_id}").start()
+
+    return {
+        "message": "已提交，正在后台评分",
+        "recording_id": recording_id,
+        "status": "scoring"
+    }
+
+
+def _record_continuous_take(db: Session, assignment_student: AssignmentStudent,
+                            reference_words: List[str], audio_path: str) -> Recording:
+    """Placeholder recording for a continuous take, plus one submission per word."""
+    assignment_id = assignment_student.assignment_id
+    student_id = assignment_student.student_id
     recording = Recording(
-        student_id=current_user.id,
-        word_text=f"[连读] {assignment.title}"[:100],
-        audio_file_path=str(file_path),
+        student_id=student_id,
+        word_text=f"[连读] {assignment_student.assignment.title}"[:100],
+        audio_file_path=audio_path,
         automated_scores=None,
         teacher_feedback="评分中…",
         teacher_grade=None,
@@ -907,19 +886,19 @@ def submit_assignment_continuous(
         x.word_text: (x.teacher_feedback, x.teacher_grade)
         for x in db.query(AssignmentSubmission).filter(
             AssignmentSubmission.assignment_id == assignment_id,
-            AssignmentSubmission.student_id == current_user.id
+            AssignmentSubmission.student_id == student_id
         ).all()
         if x.teacher_feedback or x.teacher_grade
     }
     db.query(AssignmentSubmission).filter(
         AssignmentSubmission.assignment_id == assignment_id,
-        AssignmentSubmission.student_id == current_user.id
+        AssignmentSubmission.student_id == student_id
     ).delete()
     for word in reference_words:
         fb = old_feedback.get(word, (None, None))
         db.add(AssignmentSubmission(
             assignment_id=assignment_id,
-            student_id=current_user.id,
+            student_id=student_id,
             word_text=word,
             recording_id=recording.id,
             teacher_feedback=fb[0],
@@ -927,61 +906,222 @@ def submit_assignment_continuous(
         ))
     assignment_student.completed_at = datetime.utcnow()
     db.commit()
-    recording_id = recording.id
+    return recording
+
+
+def _apply_continuous_result(rec: Recording, result: dict):
+    """Write a continuous-test score (or its failure) onto the recording; the caller commits."""
+    from app.services.feedback_service import FeedbackService
+
+    if result.get("error"):
+        failure = {"error": result["error"], "pronunciation_score": 0, "per_word": []}
+        rec.teacher_feedback = "自动评分失败，可以重新测试，或等老师人工评分。"
+        if result.get("preflight"):
+            failure["preflight"] = result["preflight"]
+            rec.teacher_feedback = result["error"]
+        # assigned whole (not mutated afterwards) so the typed score columns follow
+        rec.automated_scores = failure
+        rec.status = RecordingStatus.PENDING
+        return
+    overall = result.get("pronunciation_score", 0)
+    grade = FeedbackService._calculate_grade(overall)
+    missed = [w["word"] for w in result.get("per_word", []) if w.get("error") == "漏读"]
+    weak = [w["word"] for w in result.get("per_word", []) if w.get("error") != "漏读" and w.get("score", 100) < 60]
+    parts = [f"连读测试完成：{result.get('words_read', 0)}/{result.get('words_total', 0)} 个单词，总分 {overall:.0f}。"]
+    if missed:
+        parts.append(f"漏读：{'、'.join(missed[:10])}{'…' if len(missed) > 10 else ''}。")
+    if weak:
+        parts.append(f"发音需加强：{'、'.join(weak[:10])}{'…' if len(weak) > 10 else ''}。")
+    if not missed and not weak:
+        parts.append("全部单词都读到位了，很棒！")
+    rec.automated_scores = result
+    rec.teacher_feedback = " ".join(parts)
+    rec.teacher_grade = grade
+    rec.status = RecordingStatus.REVIEWED
+    rec.reviewed_at = datetime.utcnow()
+
+
+def _finish_streamed_take(recording_id: int, reference_words: List[str], stream, score: bool):
+    """After a streamed take: score it if still needed, encode the MP3, shadow-score."""
+    from app.db.session import SessionLocal
+    from app.services.audio_ingest import ingest_streamed
+    from app.services.shadow_service import submit_shadow
+    from app.services.scoring_metrics import span
 
-    def score_in_background():
-        from app.db.session import SessionLocal
-        from app.services.pronunciation_service import pronunciation_service
-        from app.services.feedback_service import FeedbackService
-        session = SessionLocal()
-        try:
-            result = pronunciation_service.assess_continuous_reading(str(file_path), reference_words)
-            rec = session.query(Recording).filter(Recording.id == recording_id).first()
-            if not rec:
-                return
-            if result.get("error"):
-                rec.automated_scores = {"error": result["error"], "pronunciation_score": 0, "per_word": []}
-                rec.teacher_feedback = "自动评分失败，可以重新测试，或等老师人工评分。"
-                rec.status = RecordingStatus.PENDING
-            else:
-                overall = result.get("pronunciation_score", 0)
-                grade = FeedbackService._calculate_grade(overall)
-                missed = [w["word"] for w in result.get("per_word", []) if w.get("error") == "漏读"]
-                weak = [w["word"] for w in result.get("per_word", []) if w.get("error") != "漏读" and w.get("score", 100) < 60]
-                parts = [f"连读测试完成：{result.get('words_read', 0)}/{result.get('words_total', 0)} 个单词，总分 {overall:.0f}。"]
-                if missed:
-                    parts.append(f"漏读：{'、'.join(missed[:10])}{'…' if len(missed) > 10 else ''}。")
-                if weak:
-                    parts.append(f"发音需加强：{'、'.join(weak[:10])}{'…' if len(weak) > 10 else ''}。")
-                if not missed and not weak:
-                    parts.append("全部单词都读到位了，很棒！")
-                rec.automated_scores = result
-                rec.teacher_feedback = " ".join(parts)
-                rec.teacher_grade = grade
-                rec.status = RecordingStatus.REVIEWED
-                rec.reviewed_at = datetime.utcnow()
+    session = SessionLocal()
+    try:
+        result = stream.finish(app_settings.CONTINUOUS_STREAM_FINISH_TIMEOUT) if score else None
+        rec = session.query(Recording).filter(Recording.id == recording_id).first()
+        if not rec:
+            return
+        if result is not None:
+            _apply_continuous_result(rec, result)
+        audio_path = ingest_streamed(rec)
+        with span("db_commit", mode="continuous"):
             session.commit()
-            try:
-                submit_shadow(recording_id, " ".join(reference_words), str(file_path), result if not result.get("error") else {})
-            except Exception as e:
-                print(f"Shadow submit failed (non-fatal): {e}")
+        if result is None:
+            result = rec.automated_scores or {}
+        try:
+            submit_shadow(recording_id, " ".join(reference_words), audio_path, result if not result.get("error") else {})
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            print(f"Shadow submit failed (non-fatal): {e}")
+    except Exception:
+        import traceback
+        traceback.print_exc()
+    finally:
+        session.close()
+
+
+def _stream_access(db: Session, token: str, assignment_id: int):
+    """(student id, assignment_student id, reference words) for a streamed take; raises HTTPException."""
+    from app.api.deps import get_student_from_token
+
+    student = get_student_from_token(db, token)
+    assignment_student = db.query(AssignmentStudent).filter(
+        AssignmentStudent.assignment_id == assignment_id,
+        AssignmentStudent.student_id == student.id
+    ).first()
+    if not assignment_student:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="未找到作业")
+    reference_words = [w.word_text for w in sorted(assignment_student.assignment.words, key=lambda x: x.order_index)]
+    if not reference_words:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="作业没有单词")
+    return student.id, assignment_student.id, reference_words
+
+
+@router.websocket("/student/assignments/{assignment_id}/stream-continuous")
+async def stream_assignment_continuous(
+    websocket: WebSocket,
+    assignment_id: int,
+    token: str = "",
+    db: Session = Depends(get_db),
+):
+    """Test mode, streamed: score the take while the student is still reading.
+
+    Protocol (JSON text frames, audio as binary frames):
+    - connect with ?token=<JWT>; the server answers {"type": "ready", ...};
+    - binary frames: 16 kHz / 16-bit / mono little-endian PCM, any size;
+    - {"type": "stop"} when the student finishes; the server answers
+      {"type": "result", ...} and closes. Closing without "stop" still
+      scores the take in the background (poll continuous-result).
+    Errors are {"type": "error", "detail": ...} followed by a close with
+    4401 / 4403 / 4404 / 4400.
+    """
+    from starlette.concurrency import run_in_threadpool
+    from app.services.continuous_stream import open_stream
+
+    await websocket.accept()
+
+    async def reject(code: int, detail: str):
+        await websocket.send_json({"type": "error", "detail": detail})
+        await websocket.close(code=code)
+
+    bind = db.get_bind()
+    try:
+        # the auth and access queries block: keep them off the loop shared by every other take
+        student_id, assignment_student_id, reference_words = await run_in_threadpool(
+            _stream_access, db, token, assignment_id
+        )
+    except HTTPException as e:
+        await reject(4400 + e.status_code % 100, e.detail)
+        return
+    finally:
+        # a take can last CONTINUOUS_STREAM_MAX_SECONDS: hand the pooled connection
+        # back now, the writes at the end use short sessions of their own
+        await run_in_threadpool(db.close)
+
+    def new_session() -> Session:
+        return sessionmaker(autocommit=False, autoflush=False, bind=bind)()
+
+    upload_dir = Path(app_settings.UPLOAD_DIR) / str(student_id)
+    upload_dir.mkdir(parents=True, exist_ok=True)
+    file_path = upload_dir / f"continuous_{assignment_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.16k.wav"
+    stream = await run_in_threadpool(open_stream, str(file_path), reference_words)
+    await websocket.send_json({"type": "ready", "sample_rate": 16000, "live": stream.live is not None,
+                               "max_seconds": app_settings.CONTINUOUS_STREAM_MAX_SECONDS})
+
+    stopped = False
+    try:
+        while not stopped:
+            try:
+                message = await asyncio.wait_for(websocket.receive(),
+                                                 timeout=app_settings.CONTINUOUS_STREAM_IDLE_TIMEOUT)
+            except asyncio.TimeoutError:
+                break
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("bytes"):
+                # the SDK push stream copies synchronously; small enough to stay on the loop
+                stream.write(message["bytes"])
+                stopped = stream.duration_seconds >= app_settings.CONTINUOUS_STREAM_MAX_SECONDS
+            elif message.get("text"):
+                try:
+                    stopped = json.loads(message["text"]).get("type") == "stop"
+                except (ValueError, AttributeError):
+                    pass
+    except WebSocketDisconnect:
+        pass
+
+    if not stream.bytes_received:
+        stream.discard()
+        if stopped:
+            await reject(4400, "未收到录音，请重新测试")
+        return
+
+    stream.close()
+
+    def record():
+        session = new_session()
+        try:
+            assignment_student = session.get(AssignmentStudent, assignment_student_id)
+            return _record_continuous_take(session, assignment_student, reference_words, str(file_path)).id
         finally:
             session.close()
+    recording_id = await run_in_threadpool(record)
+    if not stopped:
+        # connection gone (or idle): score like an upload, the student polls continuous-result
+        try:
+            await websocket.close()
+        except RuntimeError:
+            pass
+        threading.Thread(target=_finish_streamed_take, args=(recording_id, reference_words, stream, True),
+                         daemon=True, name=f"continuous-score-{recording_id}").start()
+        return
 
-    from app.services.audio_compress import compress_async
-    compress_async(str(file_path))
-
-    import threading
-    threading.Thread(target=score_in_background, daemon=True, name=f"continuous-score-{recording_id}").start()
+    result = await run_in_threadpool(stream.finish, app_settings.CONTINUOUS_STREAM_FINISH_TIMEOUT)
 
-    return {
-        "message": "已提交，正在后台评分",
-        "recording_id": recording_id,
-        "status": "scoring"
-    }
+    def store():
+        session = new_session()
+        try:
+            rec = session.query(Recording).filter(Recording.id == recording_id).first()
+            _apply_continuous_result(rec, result)
+            session.commit()
+            return rec.teacher_grade, rec.teacher_feedback
+        finally:
+            session.close()
+    grade, feedback = await run_in_threadpool(store)
+    # MP3 for playback and shadow scoring; the result does not wait for them
+    threading.Thread(target=_finish_streamed_take, args=(recording_id, reference_words, stream, False),
+                     daemon=True, name=f"continuous-post-{recording_id}").start()
+    try:
+        await websocket.send_json({
+            "type": "result",
+            "status": "failed" if result.get("error") else "done",
+            "recording_id": recording_id,
+            "message": result.get("error"),
+            "pronunciation_score": result.get("pronunciation_score"),
+            "grade": grade,
+            "feedback": feedback,
+            "per_word": result.get("per_word", []),
+            "words_read": result.get("words_read"),
+            "words_total": result.get("words_total"),
+            "completeness_score": result.get("completeness_score"),
+            "fluency_score": result.get("fluency_score"),
+            "streamed": bool(result.get("streamed")),
+        })
+        await websocket.close()
+    except (WebSocketDisconnect, RuntimeError):
+        pass
 
 
 @router.get("/student/assignments/{assignment_id}/continuous-result")
@@ -1036,7 +1176,8 @@ def get_continuous_result(
                     "per_word": _teacher_feedback_words()}
         return {"status": "scoring", "message": "评分中，请稍后刷新"}
     if scores.get("error"):
-        return {"status": "failed", "message": "自动评分没成功，但可以看老师的点评，或重新测试",
+        return {"status": "failed",
+                "message": scores["error"] if scores.get("preflight") else "自动评分没成功，但可以看老师的点评，或重新测试",
                 "per_word": _teacher_feedback_words()}
 
     fb_map = {
@@ -1167,79 +1308,16 @@ def get_student_assignment_progress(
     if not assignment_student:
         raise HTTPException(status_code=404, detail="未找到作业")
 
-    assignment = assignment_student.assignment
-
-    # Get all words in assignment
-    assignment_words = db.query(AssignmentWord).filter(
-        AssignmentWord.assignment_id == assignment_id
-    ).order_by(AssignmentWord.order_index).all()
-
-    # Get submissions
-    submissions = db.query(AssignmentSubmission).filter(
-        AssignmentSubmission.assignment_id == assignment_id,
-        AssignmentSubmission.student_id == current_user.id
-    ).all()
-
-    submission_dict = {sub.word_text: sub for sub in submissions}
+    from app.services.assignment_progress import load_word_progress
 
-    mode = assignment.mode or "practice"
-
-    # continuous mode: every word shares one take — use its per-word breakdown
-    continuous_summary = None
-    per_word_map = {}
-    if mode == "continuous":
-        latest_sub = max((s for s in submissions if s.recording_id), key=lambda x: x.id, default=None)
-        if latest_sub and latest_sub.recording:
-            rec = latest_sub.recording
-            scores = rec.automated_scores or {}
-            per_word_map = {w.get("word"): w for w in scores.get("per_word", [])}
-            continuous_summary = {
-                "recording_id": rec.id,
-                "audio_file_path": rec.audio_file_path,
-                "pronunciation_score": scores.get("pronunciation_score"),
-                "grade": rec.teacher_grade,
-                "feedback": rec.teacher_feedback,
-                "words_read": scores.get("words_read"),
-                "words_total": scores.get("words_total"),
-                "completeness_score": scores.get("completeness_score"),
-                "fluency_score": scores.get("fluency_score"),
-                "recognized_text": scores.get("recognized_text"),
-                "scoring": scores == {} or (rec.status == RecordingStatus.PENDING and not scores),
-            }
-
-    word_list = []
-    for word in assignment_words:
-        submission = submission_dict.get(word.word_text)
-        word_info = {
-            "word_text": word.word_text,
-            "order_index": word.order_index,
-            "submitted": submission is not None,
-            "recording_id": submission.recording_id if submission else None,
-            "submitted_at": submission.submitted_at if submission else None,
-            "teacher_feedback": submission.teacher_feedback if submission else None,
-            "teacher_grade": submission.teacher_grade if submission else None
-        }
+    word_list, _ = load_word_progress(db, assignment_student.assignment, current_user.id)
 
-        if mode == "continuous":
-            pw = per_word_map.get(word.word_text)
-            if pw:
-                word_info["score"] = pw.get("score")
-                word_info["error"] = pw.get("error")
-                word_info["offset_ms"] = pw.get("offset_ms")
-                word_info["end_ms"] = pw.get("end_ms")
-        elif submission and submission.recording_id:
-            recording = db.query(Recording).filter(Recording.id == submission.recording_id).first()
-            if recording and recording.automated_scores:
-                word_info["score"] = recording.automated_scores.get("pronunciation_score", 0)
-
-        word_list.append(word_info)
-
-    total_words = len(assignment_words)
+    total_words = len(word_list)
     completed_words = len([w for w in word_list if w["submitted"]])
 
     return {
         "assignment_id": assignment_id,
-        "assignment_title": assignment.title,
+        "assignment_title": assignment_student.assignment.title,
         "total_words": total_words,
         "completed_words": completed_words,
         "completion_percentage": round((completed_words / total_words * 100), 1) if total_words > 0 else 0,
@@ -1285,59 +1363,70 @@ def build_assignment_response(assignment: Assignment, db: Session) -> dict:
     }
 
 
-def build_student_assignment_response(assignment: Assignment, student_id: int, db: Session) -> dict:
-    """Build assignment response from student's perspective"""
-    # Get teacher info
-    teacher = db.query(User).filter(User.id == assignment.teacher_id).first()
-    teacher_name = teacher.username if teacher else "Unknown"
-
-    # Get word database name
-    word_database_name = None
-    if assignment.word_database_id:
-        database = db.query(WordDatabase).filter(WordDatabase.id == assignment.word_database_id).first()
-        if database:
-            word_database_name = database.name
-
-    # Get assignment student record
-    assignment_student = db.query(AssignmentStudent).filter(
-        AssignmentStudent.assignment_id == assignment.id,
+def load_student_assignments(db: Session, student_id: int, assignment_id: Optional[int] = None) -> List[dict]:
+    """Assignments from the student's perspective, in a fixed number of queries.
+
+    Building each assignment on its own cost five queries (teacher, word
+    database, AssignmentStudent row, submission count, lazy word list), so
+    the student's app open grew with every assignment. Here: the assignment
+    rows joined with teacher name and word database name, the word lists
+    eagerly in one IN query, and submission counts grouped by assignment.
+    """
+    query = db.query(AssignmentStudent, Assignment, User.username, WordDatabase.name).join(
+        Assignment, AssignmentStudent.assignment_id == Assignment.id
+    ).outerjoin(
+        User, Assignment.teacher_id == User.id
+    ).outerjoin(
+        WordDatabase, Assignment.word_database_id == WordDatabase.id
+    ).options(
+        selectinload(Assignment.words)
+    ).filter(
         AssignmentStudent.student_id == student_id
-    ).first()
-
-    # Calculate progress
-    total_words = len(assignment.words)
-    completed_words = db.query(AssignmentSubmission).filter(
-        AssignmentSubmission.assignment_id == assignment.id,
-        AssignmentSubmission.student_id == student_id
-    ).count()
-
-    completion_percentage = (completed_words / total_words * 100) if total_words > 0 else 0
-
-    # Check if overdue
-    is_overdue = False
-    if assignment.due_date and datetime.utcnow() > assignment.due_date.replace(tzinfo=None):
-        is_overdue = True
+    )
+    if assignment_id is not None:
+        query = query.filter(AssignmentStudent.assignment_id == assignment_id)
+    rows = query.order_by(AssignmentStudent.id).all()
+    if not rows:
+        return []
+
+    completed = dict(db.query(
+        AssignmentSubmission.assignment_id,
+        func.count(AssignmentSubmission.id)
+    ).filter(
+        AssignmentSubmission.student_id == student_id,
+        AssignmentSubmission.assignment_id.in_([assignment.id for _, assignment, _, _ in rows])
+    ).group_by(AssignmentSubmission.assignment_id).all())
+
+    now = datetime.utcnow()
+    result = []
+    for assignment_student, assignment, teacher_name, word_database_name in rows:
+        # Calculate progress
+        total_words = len(assignment.words)
+        completed_words = completed.get(assignment.id, 0)
+        completion_percentage = (completed_words / total_words * 100) if total_words > 0 else 0
+
+        result.append({
+            "id": assignment.id,
+            "title": assignment.title,
+            "description": assignment.description,
+            "mode": assignment.mode or "practice",
+            "teacher_name": teacher_name or "Unknown",
+            "word_database_name": word_database_name if assignment.word_database_id else None,
+            "due_date": assignment.due_date,
+            "assigned_at": assignment_student.assigned_at,
+            "completed_at": assignment_student.completed_at,
+            "words": [
+                {
+                    "id": w.id,
+                    "word_text": w.word_text,
+                    "order_index": w.order_index
+                }
+                for w in sorted(assignment.words, key=lambda x: x.order_index)
+            ],
+            "total_words": total_words,
+            "completed_words": completed_words,
+            "completion_percentage": round(completion_percentage, 1),
+            "is_overdue": bool(assignment.due_date) and now > assignment.due_date.replace(tzinfo=None)
+        })
 
-    return {
-        "id": assignment.id,
-        "title": assignment.title,
-        "description": assignment.description,
-        "mode": assignment.mode or "practice",
-        "teacher_name": teacher_name,
-        "word_database_name": word_database_name,
-        "due_date": assignment.due_date,
-        "assigned_at": assignment_student.assigned_at if assignment_student else None,
-        "completed_at": assignment_student.completed_at if assignment_student else None,
-        "words": [
-            {
-                "id": w.id,
-                "word_text": w.word_text,
-                "order_index": w.order_index
-            }
-            for w in sorted(assignment.words, key=lambda x: x.order_index)
-        ],
-        "total_words": total_words,
-        "completed_words": completed_words,
-        "completion_percentage": round(completion_percentage, 1),
-        "is_overdue": is_overdue
-    }
+    return result
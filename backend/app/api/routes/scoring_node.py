@@ -0,0 +1,38 @@
+import hmac
+from typing import Any, Optional
+
+from fastapi import APIRouter, Header, HTTPException, status
+from pydantic import BaseModel
+
+from app.services import scoring_node
+
+router = APIRouter()
+
+
+class NodeCallback(BaseModel):
+    """Result pushed by the in-country scoring node"""
+    job_id: str
+    status: str
+    result: Optional[Any] = None
+
+
+@router.post("/callback")
+def scoring_node_callback(payload: NodeCallback, x_token: Optional[str] = Header(None)):
+    """The node finished a job: wake whoever is waiting for it in this process
+
+    Only live when callbacks are configured with an explicitly set token;
+    the built-in default token is never accepted here.
+    """
+    if not scoring_node.callbacks_enabled():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not Found"
+        )
+    expected = scoring_node.configured_token()
+    if not x_token or not hmac.compare_digest(x_token.encode(), expected.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="无效的评分节点令牌"
+        )
+    waiting = scoring_node.waiters.deliver(payload.job_id, payload.model_dump())
+    return {"accepted": True, "waiting": waiting}
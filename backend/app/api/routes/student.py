@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
 from sqlalchemy.orm import Session
 from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
 from datetime import date, datetime
-from decimal import Decimal
+import asyncio
 import os
 import shutil
 from pathlib import Path
@@ -12,12 +13,10 @@ from app.db.session import get_db
 from app.api.deps import get_current_student
 from app.models.user import User
 from app.models.recording import Recording, RecordingStatus
-from app.models.word import WordAssignment
 from app.models.progress import StudentProgress
+from app.models.scoring_job import ScoringJob, ScoringJobStatus
 from app.schemas.recording import RecordingResponse, ProgressResponse
-from app.services.pronunciation_service import pronunciation_service
-from app.services.feedback_service import feedback_service
-from app.services.shadow_service import submit_shadow
+from app.services.scoring_queue import scoring_queue
 from app.core.config import settings
 
 router = APIRouter()
@@ -63,94 +62,24 @@ async def submit_recording(
             detail=f"无法保存音频文件：{str(e)}"
         )
 
-    # Assess pronunciation using Azure Speech Service
-    try:
-        assessment_result = pronunciation_service.assess_pronunciation(
-            str(file_path),
-            word_text
-        )
-        print(f"Assessment result: {assessment_result}")
-    except Exception as e:
-        import traceback
-        print(f"Error calling pronunciation service: {e}")
-        traceback.print_exc()
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"发音评估失败：{str(e)}"
-        )
-
-    # Generate automated feedback
-    try:
-        automated_feedback = feedback_service.generate_feedback(assessment_result, word_text)
-        print(f"Generated feedback: {automated_feedback}")
-    except Exception as e:
-        import traceback
-        print(f"Error generating feedback: {e}")
-        traceback.print_exc()
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"生成反馈失败：{str(e)}"
-        )
-
-    # Create recording entry with automated feedback
+    # Placeholder recording + durable scoring job; the worker pool does the
+    # slow provider round-trips so this request never holds the event loop
     try:
         recording = Recording(
             student_id=current_user.id,
             word_text=word_text.lower(),
             audio_file_path=str(file_path),
-            automated_scores=assessment_result,
-            teacher_feedback=automated_feedback['feedback_text'],
-            teacher_grade=automated_feedback['grade'],
-            status=(RecordingStatus.PENDING if assessment_result.get("error")
-                    else RecordingStatus.REVIEWED),
-            reviewed_at=(None if assessment_result.get("error") else datetime.utcnow())
+            automated_scores=None,
+            teacher_feedback="评分中…",
+            teacher_grade=None,
+            status=RecordingStatus.PENDING
         )
-
         db.add(recording)
+        db.flush()
 
-        # Update word practice count
-        word_assignment = db.query(WordAssignment).filter(
-            WordAssignment.word_text == word_text.lower()
-        ).first()
-
-        if word_assignment:
-            word_assignment.times_practiced += 1
-        else:
-            # Add word to system if not exists
-            word_assignment = WordAssignment(
-                word_text=word_text.lower(),
-                times_practiced=1
-            )
-            db.add(word_assignment)
-
-        # Update student progress for today
-        today = date.today()
-        progress = db.query(StudentProgress).filter(
-            StudentProgress.student_id == current_user.id,
-            StudentProgress.date == today
-        ).first()
-
-        if not progress:
-            progress = StudentProgress(
-                student_id=current_user.id,
-                date=today,
-                words_practiced=1,
-                total_attempts=1,
-                average_score=Decimal(str(assessment_result.get('pronunciation_score', 0))) if assessment_result else Decimal('0')
-            )
-            db.add(progress)
-        else:
-            progress.words_practiced += 1
-            progress.total_attempts += 1
-
-            # Update average score
-            if assessment_result and 'pronunciation_score' in assessment_result:
-                current_total = progress.average_score * (progress.total_attempts - 1)
-                new_score = Decimal(str(assessment_result['pronunciation_score']))
-                progress.average_score = (current_total + new_score) / progress.total_attempts
-
+        job = scoring_queue.enqueue(db, recording, word_text, str(file_path))
         db.commit()
-        db.refresh(recording)
+        recording_id, job_id = recording.id, job.id
     except Exception as e:
         import traceback
         print(f"Error saving to database: {e}")
@@ -161,27 +90,84 @@ async def submit_recording(
             detail=f"数据库错误：{str(e)}"
         )
 
-    from app.services.audio_compress import compress_async
-    compress_async(str(file_path))
-
-    # shadow-score with the self-hosted ML model (fire-and-forget)
+    # most takes score within a few seconds: wait for them without blocking
+    # the loop, otherwise answer "scoring" and let the client poll
+    waiter = scoring_queue.dispatch(job_id, db.get_bind())
     try:
-        submit_shadow(recording.id, word_text, str(file_path), assessment_result)
-    except Exception as e:
-        print(f"Shadow submit failed (non-fatal): {e}")
+        await asyncio.wait_for(asyncio.wrap_future(waiter), timeout=settings.SCORING_INLINE_WAIT)
+    except asyncio.TimeoutError:
+        return {
+            "message": "已提交，正在后台评分",
+            "recording_id": recording_id,
+            "job_id": job_id,
+            "status": "scoring"
+        }
+
+    db.expire_all()  # the worker committed through its own session
+    return _recording_result(db, recording_id)
+
+
+def _recording_result(db: Session, recording_id: int) -> dict:
+    """Submission result payload for a recording and its latest scoring job."""
+    recording = db.query(Recording).filter(Recording.id == recording_id).first()
+    job = db.query(ScoringJob).filter(
+        ScoringJob.recording_id == recording_id
+    ).order_by(ScoringJob.id.desc()).first()
+
+    if job is not None and job.status in (ScoringJobStatus.QUEUED, ScoringJobStatus.RUNNING):
+        return {
+            "message": "已提交，正在后台评分",
+            "recording_id": recording_id,
+            "job_id": job.id,
+            "status": "scoring",
+            "attempts": job.attempts
+        }
+
+    if job is not None and job.status == ScoringJobStatus.FAILED:
+        return {
+            "message": recording.teacher_feedback,
+            "recording_id": recording_id,
+            "job_id": job.id,
+            "status": "failed",
+            "automated_scores": recording.automated_scores,
+            "attempts": job.attempts
+        }
 
     return {
         "message": "录音已提交并自动评审",
-        "recording_id": recording.id,
-        "automated_scores": assessment_result,
+        "recording_id": recording_id,
+        "job_id": job.id if job else None,
+        "status": "done",
+        "automated_scores": recording.automated_scores,
         "feedback": {
-            "text": automated_feedback['feedback_text'],
-            "grade": automated_feedback['grade'],
+            "text": recording.teacher_feedback,
+            "grade": recording.teacher_grade,
             "is_automated": True
         }
     }
 
 
+@router.get("/recordings/{recording_id}/result", response_model=dict)
+def get_recording_result(
+    recording_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_student)
+):
+    """Poll the scoring result of a submitted recording"""
+    recording = db.query(Recording).filter(
+        Recording.id == recording_id,
+        Recording.student_id == current_user.id
+    ).first()
+
+    if not recording:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="未找到录音"
+        )
+
+    return _recording_result(db, recording_id)
+
+
 @router.get("/recordings", response_model=List[RecordingResponse])
 def get_my_recordings(
     status: Optional[str] = None,
@@ -236,7 +222,9 @@ def get_my_progress(
     # Calculate statistics
     total_words = sum(p.words_practiced for p in progress_records)
     total_attempts = sum(p.total_attempts for p in progress_records)
-    avg_score = sum(float(p.average_score or 0) for p in progress_records) / len(progress_records) if progress_records else 0
+    # weighted by scored takes, from the running sums (not an average of daily averages)
+    scored_attempts = sum(p.scored_attempts or 0 for p in progress_records)
+    avg_score = sum(p.score_sum or 0 for p in progress_records) / scored_attempts if scored_attempts else 0
 
     # Get recent recordings
     recent_recordings = db.query(Recording).filter(
@@ -254,19 +242,9 @@ def get_my_progress(
         for r in recent_recordings
     ]
 
-    # Calculate streak with one query: walk the distinct practice dates backwards
-    practice_dates = [
-        r[0] for r in db.query(StudentProgress.date).filter(
-            StudentProgress.student_id == current_user.id,
-            StudentProgress.words_practiced > 0
-        ).order_by(StudentProgress.date.desc()).limit(366).all()
-    ]
-    streak = 0
-    current_date = today
-    date_set = set(practice_dates)
-    while current_date in date_set:
-        streak += 1
-        current_date -= timedelta(days=1)
+    # Maintained on each day's first take; today's row carries it
+    from app.services.daily_progress import current_streak
+    streak = current_streak(db, current_user.id, today)
 
     return ProgressResponse(
         words_practiced=total_words,
@@ -312,7 +290,15 @@ def join_class(
         student_id=current_user.id
     )
     db.add(enrollment)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # a concurrent join won the (class_id, student_id) unique key
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="你已加入该班级"
+        )
 
     return {
         "message": "成功加入班级",
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy import and_, func, desc, or_
 from collections import Counter, defaultdict
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
+import base64
 import secrets
 
 from app.db.session import get_db
@@ -12,6 +13,7 @@ from app.models.user import User, UserRole
 from app.models.recording import Recording, RecordingStatus
 from app.models.classes import Class, ClassEnrollment
 from app.models.suggestion import FeatureSuggestion
+from app.models.rollup import ClassDayStats, StudentWordStats
 from app.schemas.recording import RecordingResponse, TeacherFeedbackCreate
 
 router = APIRouter()
@@ -25,27 +27,34 @@ def _teacher_student_ids(db: Session, teacher_id: int) -> list:
     return [r[0] for r in rows]
 
 
-@router.get("/submissions", response_model=List[dict])
-def get_submissions(
-    status_filter: Optional[str] = None,
-    class_id: Optional[int] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_teacher)
-):
-    """Get student submissions for review"""
+# Headline fields the feed carries, read from the typed columns derived from
+# automated_scores (never the JSON itself); everything else (fluency, per-word
+# / phoneme breakdowns, segments, traces) comes from the detail route.
+SUMMARY_COLUMNS = ("pronunciation_score", "accuracy_score", "scorer", "preflight_reason")
+FEED_PAGE_SIZE = 50
+FEED_MAX_PAGE_SIZE = 200
+ACTIVITY_DAYS = 14  # daily_activity window of /analytics
 
-    query = db.query(Recording).join(User, Recording.student_id == User.id)
 
-    # Filter by status
-    if status_filter:
-        if status_filter not in ["pending", "reviewed"]:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="状态必须为 'pending' 或 'reviewed'"
-            )
-        query = query.filter(Recording.status == status_filter)
+def _encode_cursor(created_at: datetime, recording_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{recording_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, recording_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(recording_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="无效的分页游标"
+        )
+
 
-    # Filter by class
+def _submission_scope(db: Session, current_user: User, class_id: Optional[int], student_id: Optional[int]):
+    """Student ids whose recordings this teacher may see, narrowed by the filters"""
     if class_id:
         # Verify teacher owns this class
         class_obj = db.query(Class).filter(
@@ -59,42 +68,141 @@ def get_submissions(
                 detail="未找到班级"
             )
 
-        # Get students in this class
-        student_ids = db.query(ClassEnrollment.student_id).filter(
+        # Students in this class
+        rows = db.query(ClassEnrollment.student_id).filter(
             ClassEnrollment.class_id == class_id
         ).all()
-        student_ids = [sid[0] for sid in student_ids]
-
-        query = query.filter(Recording.student_id.in_(student_ids))
+        student_ids = [r[0] for r in rows]
     else:
         # No class filter: still only show recordings from this teacher's own students
-        query = query.filter(Recording.student_id.in_(_teacher_student_ids(db, current_user.id)))
+        student_ids = _teacher_student_ids(db, current_user.id)
+
+    if student_id is not None:
+        student_ids = [sid for sid in student_ids if sid == student_id]
+    return student_ids
+
+
+@router.get("/submissions", response_model=List[dict])
+def get_submissions(
+    response: Response,
+    status_filter: Optional[str] = None,
+    class_id: Optional[int] = None,
+    student_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(FEED_PAGE_SIZE, ge=1, le=FEED_MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_teacher)
+):
+    """Get student submissions for review, newest first, one page at a time.
 
-    recordings = query.order_by(desc(Recording.created_at)).all()
+    Keyset pagination on (created_at, id): the X-Next-Cursor response header
+    carries the position after the last row and is absent on the last page.
+    Rows are a summary (headline scores, grade, status) selected in a single
+    query with the student's username; the full assessment is served by
+    GET /submissions/{recording_id}.
+    """
+
+    # Filter by status
+    if status_filter and status_filter not in ["pending", "reviewed"]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="状态必须为 'pending' 或 'reviewed'"
+        )
+
+    query = db.query(
+        Recording.id,
+        Recording.student_id,
+        User.username,
+        Recording.word_text,
+        Recording.audio_file_path,
+        Recording.teacher_feedback,
+        Recording.teacher_grade,
+        Recording.status,
+        Recording.flag_for_practice,
+        Recording.is_automated_feedback,
+        Recording.created_at,
+        Recording.reviewed_at,
+        Recording.score_failed,
+        *[getattr(Recording, key) for key in SUMMARY_COLUMNS],
+    ).join(User, Recording.student_id == User.id)
+
+    if status_filter:
+        query = query.filter(Recording.status == status_filter)
+    query = query.filter(Recording.student_id.in_(_submission_scope(db, current_user, class_id, student_id)))
+
+    if cursor:
+        after_created, after_id = _decode_cursor(cursor)
+        query = query.filter(or_(
+            Recording.created_at < after_created,
+            and_(Recording.created_at == after_created, Recording.id < after_id),
+        ))
+
+    rows = query.order_by(desc(Recording.created_at), desc(Recording.id)).limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(rows[-1].created_at, rows[-1].id)
 
-    # Format response with student info
     result = []
-    for recording in recordings:
-        student = db.query(User).filter(User.id == recording.student_id).first()
+    for row in rows:
+        summary = {key: getattr(row, key) for key in SUMMARY_COLUMNS if getattr(row, key) is not None}
+        if row.score_failed:
+            summary["score_failed"] = True
         result.append({
-            "id": recording.id,
-            "student_id": recording.student_id,
-            "student_name": student.username if student else "Unknown",
-            "word_text": recording.word_text,
-            "audio_file_path": recording.audio_file_path,
-            "automated_scores": recording.automated_scores,
-            "teacher_feedback": recording.teacher_feedback,
-            "teacher_grade": recording.teacher_grade,
-            "status": recording.status,
-            "flag_for_practice": recording.flag_for_practice,
-            "is_automated_feedback": recording.is_automated_feedback if hasattr(recording, 'is_automated_feedback') else True,
-            "created_at": recording.created_at,
-            "reviewed_at": recording.reviewed_at
+            "id": row.id,
+            "student_id": row.student_id,
+            "student_name": row.username,
+            "word_text": row.word_text,
+            "audio_file_path": row.audio_file_path,
+            # NULL until the scorer has finished with the take
+            "automated_scores": summary or None,
+            "teacher_feedback": row.teacher_feedback,
+            "teacher_grade": row.teacher_grade,
+            "status": row.status,
+            "flag_for_practice": row.flag_for_practice,
+            "is_automated_feedback": row.is_automated_feedback if row.is_automated_feedback is not None else True,
+            "created_at": row.created_at,
+            "reviewed_at": row.reviewed_at
         })
 
     return result
 
 
+@router.get("/submissions/{recording_id}", response_model=dict)
+def get_submission(
+    recording_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_teacher)
+):
+    """One submission with its full automated assessment"""
+    row = db.query(Recording, User.username).join(
+        User, Recording.student_id == User.id
+    ).filter(Recording.id == recording_id).first()
+
+    # Someone else's student looks exactly like a missing recording
+    if not row or row[0].student_id not in _teacher_student_ids(db, current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="未找到录音"
+        )
+
+    recording, username = row
+    return {
+        "id": recording.id,
+        "student_id": recording.student_id,
+        "student_name": username,
+        "word_text": recording.word_text,
+        "audio_file_path": recording.audio_file_path,
+        "automated_scores": recording.automated_scores,
+        "teacher_feedback": recording.teacher_feedback,
+        "teacher_grade": recording.teacher_grade,
+        "status": recording.status,
+        "flag_for_practice": recording.flag_for_practice,
+        "is_automated_feedback": recording.is_automated_feedback if recording.is_automated_feedback is not None else True,
+        "created_at": recording.created_at,
+        "reviewed_at": recording.reviewed_at
+    }
+
+
 @router.post("/feedback", response_model=dict)
 def submit_feedback(
     feedback: TeacherFeedbackCreate,
@@ -176,18 +284,19 @@ def get_students(
             User.role == UserRole.STUDENT
         ).all()
 
-    # One aggregate query instead of loading every recording per student
+    # Per-student totals from the (student, word) rollup, not the recordings
     student_ids_list = [s.id for s in students]
     stats = {}
     if student_ids_list:
         rows = db.query(
-            Recording.student_id,
-            func.count(Recording.id),
-            func.avg(func.nullif(func.json_extract(Recording.automated_scores, "$.pronunciation_score"), 0))
+            StudentWordStats.student_id,
+            func.sum(StudentWordStats.recordings),
+            func.sum(StudentWordStats.scored),
+            func.sum(StudentWordStats.score_sum)
         ).filter(
-            Recording.student_id.in_(student_ids_list)
-        ).group_by(Recording.student_id).all()
-        stats = {r[0]: (r[1], r[2]) for r in rows}
+            StudentWordStats.student_id.in_(student_ids_list)
+        ).group_by(StudentWordStats.student_id).all()
+        stats = {r[0]: (r[1], r[3] / r[2] if r[2] else None) for r in rows}
 
     result = []
     for student in students:
@@ -211,8 +320,6 @@ def get_analytics(
 ):
     """Get analytics and statistics"""
 
-    query = db.query(Recording)
-
     if class_id:
         # Filter by class
         class_obj = db.query(Class).filter(
@@ -230,39 +337,60 @@ def get_analytics(
             ClassEnrollment.class_id == class_id
         ).all()
         student_ids = [sid[0] for sid in student_ids]
-
-        query = query.filter(Recording.student_id.in_(student_ids))
+        class_ids = [class_id]
     else:
-        query = query.filter(Recording.student_id.in_(_teacher_student_ids(db, current_user.id)))
-
-    # aggregate everything in SQL — never load full recordings into Python
-    score_expr = func.json_extract(Recording.automated_scores, "$.pronunciation_score")
-
-    total_recordings = query.count()
-    pending_reviews = query.filter(Recording.status == RecordingStatus.PENDING).count()
-    avg_score = query.with_entities(func.avg(func.nullif(score_expr, 0))).scalar() or 0
-
-    word_rows = query.with_entities(
-        Recording.word_text,
-        func.count(Recording.id),
-        func.avg(func.nullif(score_expr, 0))
-    ).filter(Recording.word_text.isnot(None)).group_by(Recording.word_text).all()
+        student_ids = _teacher_student_ids(db, current_user.id)
+        class_ids = [c[0] for c in db.query(Class.id).filter(Class.teacher_id == current_user.id).all()]
+
+    # answered from the rollups (analytics_rollup): cost follows the roster
+    # and vocabulary, not the number of recordings ever made
+    word_rows = db.query(
+        StudentWordStats.word_text,
+        func.sum(StudentWordStats.recordings),
+        func.sum(StudentWordStats.pending),
+        func.sum(StudentWordStats.scored),
+        func.sum(StudentWordStats.score_sum)
+    ).filter(
+        StudentWordStats.student_id.in_(student_ids)
+    ).group_by(StudentWordStats.word_text).order_by(StudentWordStats.word_text).all()
+
+    total_recordings = sum(r[1] for r in word_rows)
+    pending_reviews = sum(r[2] for r in word_rows)
+    scored = sum(r[3] for r in word_rows)
+    avg_score = sum(r[4] for r in word_rows) / scored if scored else 0
 
     most_practiced_words = [
         {"word": w, "count": c}
-        for w, c, _ in sorted(word_rows, key=lambda r: -r[1])[:10]
+        for w, c, *_ in sorted(word_rows, key=lambda r: -r[1])[:10]
     ]
     challenging_words_list = [
-        {"word": w, "average_score": round(float(a), 2)}
-        for w, _, a in sorted((r for r in word_rows if r[2] is not None), key=lambda r: r[2])[:10]
+        {"word": w, "average_score": round(total / n, 2)}
+        for w, _, _, n, total in sorted((r for r in word_rows if r[3]), key=lambda r: r[4] / r[3])[:10]
     ]
 
+    # the rollups are keyed by the UTC date of created_at: count days on that clock
+    since = datetime.utcnow().date() - timedelta(days=ACTIVITY_DAYS - 1)
+    day_rows = db.query(
+        ClassDayStats.day,
+        func.sum(ClassDayStats.recordings),
+        func.sum(ClassDayStats.scored),
+        func.sum(ClassDayStats.score_sum)
+    ).filter(
+        ClassDayStats.class_id.in_(class_ids),
+        ClassDayStats.day >= since
+    ).group_by(ClassDayStats.day).order_by(ClassDayStats.day).all()
+
     return {
         "total_recordings": total_recordings,
         "pending_reviews": pending_reviews,
         "average_score": round(float(avg_score), 2) if avg_score else 0,
         "most_practiced_words": most_practiced_words,
-        "challenging_words": challenging_words_list
+        "challenging_words": challenging_words_list,
+        # per class and day; a student in two of the teacher's classes counts in both
+        "daily_activity": [
+            {"date": d.isoformat(), "recordings": c, "average_score": round(total / n, 2) if n else None}
+            for d, c, n, total in day_rows
+        ]
     }
 
 
@@ -17,6 +17,8 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days
+    AUTH_CACHE_TTL: float = 60.0  # seconds verified tokens / user rows are reused per process
+    AUTH_CACHE_MAX_ENTRIES: int = 4096
 
     # Azure Speech Service
     AZURE_SPEECH_KEY: Optional[str] = None
@@ -26,13 +28,61 @@ class Settings(BaseSettings):
     XF_APPID: Optional[str] = None
     XF_API_KEY: Optional[str] = None
     XF_API_SECRET: Optional[str] = None
+    XF_ISE_URL: str = "wss://ise-api.xfyun.cn/v2/open-ise"
+    XF_ISE_FRAME_BYTES: int = 1280  # audio bytes per websocket frame
+    XF_ISE_SEND_INTERVAL: float = 0.0  # seconds between frames; 0.04 paces at real time
+    XF_ISE_MAX_SESSIONS: int = 8  # concurrent ISE sessions per process
+    XF_ISE_SIGNATURE_TTL: float = 60.0  # seconds a signed URL is reused (xfyun allows 300 s skew)
 
     # 影子/降级 ML 模型地址
     SHADOW_ML_URL: Optional[str] = None
+    SHADOW_WORKERS: int = 2  # concurrent calls to the shadow model
+    SHADOW_QUEUE_SIZE: int = 200  # pending shadow jobs; beyond this they are dropped
+    SHADOW_SAMPLE_DEPTH: int = 50  # past this queue depth only a sample of new jobs is kept
+    SHADOW_SAMPLE_RATE: float = 0.25
+    SHADOW_BATCH_SIZE: int = 50  # shadow_scores rows per insert
+    SHADOW_FLUSH_INTERVAL: float = 2.0  # seconds a partial batch waits for more rows
 
     # 境内评分节点
     SCORING_NODE_URL: Optional[str] = None
     SCORING_NODE_TOKEN: Optional[str] = None
+    SCORING_NODE_CALLBACK_URL: Optional[str] = None  # public URL of /api/scoring-node/callback; enables push delivery
+    SCORING_NODE_LONG_POLL: float = 20.0  # seconds a long-poll may be held by the node (0 = plain polling)
+    SCORING_NODE_POLL_MIN: float = 0.2  # first backoff when the node answers pending immediately
+    SCORING_NODE_POLL_MAX: float = 3.0
+
+    # Background scoring queue
+    SCORING_WORKERS: int = 4  # concurrent scoring jobs per process
+    SCORING_MAX_ATTEMPTS: int = 3
+    SCORING_INLINE_WAIT: float = 10.0  # seconds submit waits (non-blocking) before answering "scoring"
+
+    # Scoring provider cascade
+    SCORING_WORD_BUDGET: float = 45.0  # end-to-end seconds for one word
+    SCORING_CONTINUOUS_BUDGET: float = 300.0  # end-to-end seconds for a continuous test
+    SCORING_HEDGE_PERCENTILE: float = 90.0  # start the next provider past this latency percentile
+    SCORING_HEDGE_MIN: float = 1.0  # never hedge sooner than this many seconds
+    CONTINUOUS_SEGMENT_WORDS: int = 8  # words per chunk a long take is cut into (0 = score whole)
+    CONTINUOUS_SEGMENT_MARGIN: int = 1  # neighbouring words a chunk is also scored against
+    CONTINUOUS_SEGMENT_WORKERS: int = 6  # chunks scored at once
+
+    # Continuous test streamed over the WebSocket
+    CONTINUOUS_STREAM_MAX_SECONDS: float = 600.0  # a take is stopped once this much audio arrived
+    CONTINUOUS_STREAM_FINISH_TIMEOUT: float = 30.0  # wait for the live recognizer after stop
+    CONTINUOUS_STREAM_IDLE_TIMEOUT: float = 30.0  # no frame for this long ends the take
+
+    # Scorer circuit breakers
+    SCORER_BREAKER_WINDOW: float = 120.0  # seconds of calls the error rate is computed over
+    SCORER_BREAKER_MIN_CALLS: int = 5
+    SCORER_BREAKER_ERROR_RATE: float = 0.5
+    SCORER_BREAKER_CONSECUTIVE_FAILURES: int = 3
+    SCORER_PROBE_INTERVAL: float = 15.0  # seconds between health probes of an open circuit
+
+    # Scoring result cache
+    SCORE_CACHE_ENABLED: bool = True
+    SCORE_CACHE_SIZE: int = 512  # results kept in the in-process LRU
+
+    # Scoring traces
+    SCORING_TRACE_SLOW_MS: int = 8000  # requests slower than this keep their span timeline in automated_scores
 
     # File Storage
     UPLOAD_DIR: str = "uploads"
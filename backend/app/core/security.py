@@ -2,8 +2,7 @@ from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.security import HTTPBearer
 import hashlib
 
 from app.core.config import settings
@@ -47,6 +46,31 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+def password_fingerprint(password_hash: str) -> str:
+    """Short digest of the stored hash: changes whenever the password does"""
+    return hashlib.sha256(password_hash.encode()).hexdigest()[:16]
+
+
+def token_claims(user) -> dict:
+    """Claims of a user's access token: id plus what auth checks without a DB hit"""
+    return {
+        "sub": str(user.id),
+        "role": getattr(user.role, "value", user.role),
+        "username": user.username,
+        "pwd": password_fingerprint(user.password_hash),
+    }
+
+
+def claims_match(payload: dict, user) -> bool:
+    """False when the user's role or password changed since the token was issued.
+    Tokens from before these claims existed carry neither and still match."""
+    if "role" in payload and payload["role"] != getattr(user.role, "value", user.role):
+        return False
+    if "pwd" in payload and payload["pwd"] != password_fingerprint(user.password_hash):
+        return False
+    return True
+
+
 def decode_access_token(token: str) -> Optional[dict]:
     """Decode and verify JWT token"""
     try:
@@ -54,42 +78,3 @@ def decode_access_token(token: str) -> Optional[dict]:
         return payload
     except JWTError:
         return None
-
-
-def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depends(security)) -> int:
-    """Extract user ID from JWT token"""
-    if credentials is None or credentials.scheme.lower() != "bearer" or not credentials.credentials:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="未认证",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
-    token = credentials.credentials
-    payload = decode_access_token(token)
-
-    if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="无法验证凭据",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
-    user_id_str: str = payload.get("sub")
-    if user_id_str is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="无法验证凭据",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
-    try:
-        user_id = int(user_id_str)
-    except (ValueError, TypeError):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="无法验证凭据",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
-    return user_id
@@ -9,6 +9,10 @@ from app.models.word import WordAssignment
 from app.models.recording import Recording
 from app.models.classes import Class, ClassEnrollment, Assignment
 from app.models.progress import StudentProgress
+from app.models.scoring_job import ScoringJob
+from app.models.score_cache import ScoreCacheEntry
+from app.models.shadow_score import ShadowScore
+from app.models.rollup import StudentWordStats, ClassDayStats
 
 
 def init_db():
@@ -1,10 +1,14 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 
 from app.core.config import settings
-from app.api.routes import auth, words, student, teacher, assignments
+from app.db.session import engine
+from app.api.routes import auth, words, student, teacher, assignments, scoring_node
+from app.services.scoring_queue import scoring_queue
+from app.services import analytics_rollup  # noqa: F401  keeps the dashboard rollups current
 
 # Create FastAPI app
 app = FastAPI(
@@ -20,6 +24,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # keyset cursor of the teacher submissions feed
 )
 
 # Mount static files for serving audio
@@ -33,6 +38,39 @@ app.include_router(words.router, prefix="/api", tags=["Words"])
 app.include_router(student.router, prefix="/api/student", tags=["Student"])
 app.include_router(teacher.router, prefix="/api/teacher", tags=["Teacher"])
 app.include_router(assignments.router, prefix="/api/assignments", tags=["Assignments"])
+app.include_router(scoring_node.router, prefix="/api/scoring-node", tags=["Scoring node"])
+
+
+@app.on_event("startup")
+def resume_scoring_jobs():
+    """Re-dispatch scoring jobs a previous process left queued or running"""
+    try:
+        resumed = scoring_queue.recover(engine)
+        if resumed:
+            print(f"Resumed {resumed} pending scoring job(s)")
+    except Exception as e:
+        print(f"Could not resume scoring jobs (non-fatal): {e}")
+
+
+@app.on_event("startup")
+def purge_stale_score_cache():
+    """Drop cached scoring results written under older scoring rules"""
+    from app.services.pronunciation_service import SCORING_RULES_VERSION
+    from app.services.score_cache import score_cache
+    try:
+        purged = score_cache.purge_stale(SCORING_RULES_VERSION, bind=engine)
+        if purged:
+            print(f"Purged {purged} stale score cache entries")
+    except Exception as e:
+        print(f"Could not purge score cache (non-fatal): {e}")
+
+
+@app.on_event("shutdown")
+def flush_shadow_scores():
+    """Write shadow rows still waiting in the batch before the process exits"""
+    from app.services.shadow_service import shadow_pipeline
+    if not shadow_pipeline.drain(timeout=5.0):
+        print(f"Shadow pipeline not drained at shutdown: {shadow_pipeline.stats()}")
 
 
 @app.get("/")
@@ -49,3 +87,29 @@ def root():
 def health_check():
     """Health check endpoint"""
     return {"status": "healthy"}
+
+
+@app.get("/health/scorers")
+def scorer_health_check():
+    """Circuit-breaker state, rolling error rate and latency of each scoring provider,
+    plus score cache hit rates, shadow pipeline depth/drops and pre-flight rejections"""
+    from app.services.provider_health import scorer_health, OPEN
+    from app.services.score_cache import score_cache
+    from app.services.shadow_service import shadow_pipeline
+    from app.services.audio_preflight import audio_preflight
+    providers = scorer_health.snapshot()
+    degraded = any(p["state"] == OPEN for p in providers.values())
+    return {
+        "status": "degraded" if degraded else "healthy",
+        "providers": providers,
+        "score_cache": score_cache.stats(),
+        "shadow": shadow_pipeline.stats(),
+        "preflight": audio_preflight.stats()
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """Scoring latency histograms and provider outcomes, Prometheus text format"""
+    from app.services.scoring_metrics import metrics
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Table
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Table, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -64,7 +64,10 @@ class Assignment(Base):
 class AssignmentWord(Base):
     """Words included in an assignment (20-40 words per assignment)"""
     __tablename__ = "assignment_words"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_assignment_words_assignment_order", "assignment_id", "order_index"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     assignment_id = Column(Integer, ForeignKey("assignments.id", ondelete="CASCADE"), nullable=False)
@@ -78,7 +81,11 @@ class AssignmentWord(Base):
 class AssignmentStudent(Base):
     """Which students are assigned which assignments"""
     __tablename__ = "assignment_students"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        UniqueConstraint("assignment_id", "student_id", name="uq_assignment_students_assignment_student"),
+        Index("ix_assignment_students_student_id", "student_id"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     assignment_id = Column(Integer, ForeignKey("assignments.id", ondelete="CASCADE"), nullable=False)
@@ -94,7 +101,10 @@ class AssignmentStudent(Base):
 class AssignmentSubmission(Base):
     """Track student progress on assignment words"""
     __tablename__ = "assignment_submissions"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_assignment_submissions_assignment_student", "assignment_id", "student_id"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     assignment_id = Column(Integer, ForeignKey("assignments.id", ondelete="CASCADE"), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON, Index, UniqueConstraint
 from sqlalchemy.sql import func
 
 from app.db.session import Base
@@ -9,7 +9,7 @@ class Class(Base):
     __tablename__ = "classes"
 
     id = Column(Integer, primary_key=True, index=True)
-    teacher_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    teacher_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     class_name = Column(String(100), nullable=False)
     description = Column(Text, nullable=True)
     class_code = Column(String(8), unique=True, index=True, nullable=True)
@@ -19,6 +19,10 @@ class Class(Base):
 class ClassEnrollment(Base):
     """Student enrollment in classes"""
     __tablename__ = "class_enrollment"
+    __table_args__ = (
+        UniqueConstraint("class_id", "student_id", name="uq_class_enrollment_class_student"),
+        Index("ix_class_enrollment_student_id", "student_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     class_id = Column(Integer, ForeignKey("classes.id", ondelete="CASCADE"), nullable=False)
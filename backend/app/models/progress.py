@@ -1,10 +1,20 @@
-from sqlalchemy import Column, Integer, Date, ForeignKey, Numeric
+from sqlalchemy import Column, Integer, Date, Float, ForeignKey, Numeric, UniqueConstraint
 from app.db.session import Base
 
 
 class StudentProgress(Base):
-    """Daily progress tracking for students"""
+    """Daily progress tracking for students.
+
+    One row per (student, day), written by a single upsert per scored take
+    (daily_progress). score_sum / scored_attempts is the day's average over
+    takes that got a score; average_score is kept in step for readers of the
+    old column. streak_count is the run of consecutive practice days ending
+    on this row's date.
+    """
     __tablename__ = "student_progress"
+    __table_args__ = (
+        UniqueConstraint("student_id", "date", name="uq_student_progress_student_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -12,4 +22,6 @@ class StudentProgress(Base):
     words_practiced = Column(Integer, default=0)
     average_score = Column(Numeric(5, 2), nullable=True)
     total_attempts = Column(Integer, default=0)
+    score_sum = Column(Float, nullable=False, default=0.0, server_default="0")
+    scored_attempts = Column(Integer, nullable=False, default=0, server_default="0")
     streak_count = Column(Integer, default=0)
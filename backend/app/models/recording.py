@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Text, Enum, JSON
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Text, Enum, JSON, Float, Index, false
+from sqlalchemy.orm import validates
 from sqlalchemy.sql import func
 import enum
 
@@ -13,15 +14,32 @@ class RecordingStatus(str, enum.Enum):
 class Recording(Base):
     """Student pronunciation recordings"""
     __tablename__ = "recordings"
+    __table_args__ = (
+        # a student's takes, newest first (history, progress, teacher feed)
+        Index("ix_recordings_student_created", "student_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     word_text = Column(String(100), nullable=False, index=True)
     audio_file_path = Column(String(500), nullable=False)
+    # derived once at ingest (audio_ingest): canonical 16 kHz PCM for the
+    # scorers and the MP3 the player streams; NULL until ingested
+    pcm_path = Column(String(500), nullable=True)
+    mp3_path = Column(String(500), nullable=True)
 
     # Automated assessment from Azure Speech
     automated_scores = Column(JSON, nullable=True)
 
+    # Headline fields of automated_scores as typed columns, so aggregates and
+    # filters never parse the JSON (and run the same on SQLite and Postgres).
+    # Derived whenever automated_scores is assigned; see _derive_score_columns.
+    pronunciation_score = Column(Float, nullable=True, index=True)  # NULL when unscored or failed
+    accuracy_score = Column(Float, nullable=True)
+    scorer = Column(String(32), nullable=True, index=True)  # provider that answered
+    score_failed = Column(Boolean, nullable=False, default=False, server_default=false(), index=True)
+    preflight_reason = Column(String(20), nullable=True)  # audio_preflight rejection, if any
+
     # Teacher feedback
     teacher_feedback = Column(Text, nullable=True)
     teacher_audio_feedback_url = Column(String(500), nullable=True)
@@ -35,3 +53,31 @@ class Recording(Base):
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     reviewed_at = Column(DateTime(timezone=True), nullable=True)
+
+    @validates("automated_scores")
+    def _derive_score_columns(self, key, scores):
+        for column, value in score_columns(scores).items():
+            setattr(self, column, value)
+        return scores
+
+
+def _number(value):
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+def score_columns(scores) -> dict:
+    """Typed column values for an automated_scores dict (also used by the backfill)."""
+    if not isinstance(scores, dict):
+        return {"pronunciation_score": None, "accuracy_score": None, "scorer": None,
+                "score_failed": False, "preflight_reason": None}
+    failed = bool(scores.get("error"))
+    # results from before the cascade name their scorer under "scorer" only
+    provider = scores.get("provider") or scores.get("scorer")
+    preflight = scores.get("preflight")
+    return {
+        "pronunciation_score": None if failed else _number(scores.get("pronunciation_score")),
+        "accuracy_score": None if failed else _number(scores.get("accuracy_score")),
+        "scorer": provider[:32] if isinstance(provider, str) else None,
+        "score_failed": failed,
+        "preflight_reason": preflight[:20] if isinstance(preflight, str) else None,
+    }
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, Float, ForeignKey
+
+from app.db.session import Base
+
+
+class StudentWordStats(Base):
+    """Running totals of one student's recordings of one word.
+
+    Maintained in the same transaction as the recordings themselves
+    (analytics_rollup); teacher analytics read these instead of scanning
+    recordings. score_sum / scored is the average of non-zero scores.
+    """
+    __tablename__ = "student_word_stats"
+
+    student_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    word_text = Column(String(100), primary_key=True)
+    recordings = Column(Integer, nullable=False, default=0)
+    pending = Column(Integer, nullable=False, default=0)
+    scored = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0.0)
+    last_recorded_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class ClassDayStats(Base):
+    """Running totals of a class's recordings per day (students enrolled at recording time)."""
+    __tablename__ = "class_day_stats"
+
+    class_id = Column(Integer, ForeignKey("classes.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    recordings = Column(Integer, nullable=False, default=0)
+    pending = Column(Integer, nullable=False, default=0)
+    scored = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0.0)
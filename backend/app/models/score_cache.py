@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON
+from sqlalchemy.sql import func
+
+from app.db.session import Base
+
+
+class ScoreCacheEntry(Base):
+    """Persisted scoring result, addressed by what was scored.
+
+    cache_key is the SHA-256 of (decoded PCM digest, reference text, mode,
+    scorer version); identical audio resubmitted for the same reference under
+    the same scoring rules reuses the stored result instead of calling the
+    providers again.
+    """
+    __tablename__ = "score_cache"
+
+    cache_key = Column(String(64), primary_key=True)
+    pcm_sha256 = Column(String(64), nullable=False, index=True)
+    reference_text = Column(Text, nullable=False)
+    mode = Column(String(20), nullable=False)  # word / continuous
+    scorer_version = Column(String(40), nullable=False, index=True)
+    result = Column(JSON, nullable=False)
+    hits = Column(Integer, default=0, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_hit_at = Column(DateTime(timezone=True), nullable=True)
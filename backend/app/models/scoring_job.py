@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum
+from sqlalchemy.sql import func
+import enum
+
+from app.db.session import Base
+
+
+class ScoringJobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class ScoringJob(Base):
+    """Durable queue entry for background pronunciation scoring.
+
+    One row per submission; the worker pool drains queued rows, and rows left
+    queued/running by a dead process are picked up again on startup.
+    """
+    __tablename__ = "scoring_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    recording_id = Column(Integer, ForeignKey("recordings.id", ondelete="CASCADE"), nullable=False, index=True)
+    kind = Column(String(20), default="word", nullable=False)  # word(逐词)
+    word_text = Column(String(100), nullable=False)
+    audio_file_path = Column(String(500), nullable=False)
+
+    status = Column(Enum(ScoringJobStatus), default=ScoringJobStatus.QUEUED, nullable=False, index=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=3, nullable=False)
+    last_error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, DateTime, Float, Text
+from sqlalchemy.sql import func
+
+from app.db.session import Base
+
+
+class ShadowScore(Base):
+    """Self-hosted GOP model's score logged next to the live scorer's.
+
+    Written in micro-batches by the shadow pipeline (shadow_service); never
+    read on the request path, only by offline calibration.
+    """
+    __tablename__ = "shadow_scores"
+
+    id = Column(Integer, primary_key=True, index=True)
+    recording_id = Column(Integer, nullable=True, index=True)
+    word_text = Column(Text, nullable=True)
+
+    azure_score = Column(Float, nullable=True)
+    azure_accuracy = Column(Float, nullable=True)
+    final_score = Column(Float, nullable=True)
+
+    ml_pron_score = Column(Float, nullable=True)
+    ml_accuracy = Column(Float, nullable=True)
+    ml_recognized = Column(Text, nullable=True)
+    ml_error = Column(Text, nullable=True)
+    latency_ms = Column(Integer, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -15,6 +15,7 @@ class RecordingResponse(BaseModel):
     student_id: int
     word_text: str
     audio_file_path: str
+    mp3_path: Optional[str] = None
     automated_scores: Optional[Dict[str, Any]] = None
     teacher_feedback: Optional[str] = None
     teacher_audio_feedback_url: Optional[str] = None
@@ -0,0 +1,239 @@
+"""Incremental rollups behind the teacher dashboards.
+
+GET /api/teacher/analytics used to count, average and GROUP BY word_text over
+every recording of the teacher's students on each page load, so the page got
+slower with every take ever submitted. Two rollup tables now hold running
+totals instead:
+
+    student_word_stats  (student_id, word_text) -> recordings, pending, scored, score_sum
+    class_day_stats     (class_id, day)         -> the same, per class and day
+
+They are kept current from an after_flush hook: whatever inserts, rescores,
+reviews or deletes a Recording through the ORM (the upload routes, the
+scoring worker, continuous takes, teacher feedback) has its delta upserted
+in the same transaction, so a rollback takes the rollup change with it.
+Changes made around the ORM (bulk query.delete(), raw SQL, DB-level
+cascades) are not seen; `rebuild()` recomputes both tables from the raw
+recordings:
+
+    python -m app.services.analytics_rollup rebuild
+
+class_day_stats attributes a recording to the classes its student is in
+when the recording is written; a rebuild uses current enrollments.
+"""
+
+import sys
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import case, event, func, insert, inspect, select, update
+from sqlalchemy.orm import Session
+
+from app.models.classes import ClassEnrollment
+from app.models.recording import Recording, RecordingStatus
+from app.models.rollup import ClassDayStats, StudentWordStats
+
+FIELDS = ("recordings", "pending", "scored", "score_sum")
+REBUILD_BATCH = 2000
+
+
+def _before(state, obj, attr: str):
+    """Attribute value as it was before this flush."""
+    history = state.attrs[attr].history
+    if history.has_changes():
+        return history.deleted[0] if history.deleted else None
+    return state.dict[attr] if attr in state.dict else getattr(obj, attr)
+
+
+def _is_pending(status) -> bool:
+    # NULL only on a new row before its column default: pending
+    return status is None or getattr(status, "value", status) == RecordingStatus.PENDING.value
+
+
+def _contribution(status, score) -> Tuple[int, int, int, float]:
+    scored = score is not None and score != 0  # same rule as avg(nullif(score, 0))
+    return 1, int(_is_pending(status)), int(scored), float(score) if scored else 0.0
+
+
+class AnalyticsRollup:
+    """Maintains and rebuilds the dashboard rollup tables."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flushes = 0
+        self._rows_upserted = 0
+        self._last_rebuild: Optional[dict] = None
+
+    # -- incremental ---------------------------------------------------------
+
+    def _deltas(self, session: Session):
+        """Per-(student, word) and per-(student, day) deltas of this flush.
+
+        Each touched recording takes back what it contributed before the flush
+        and adds what it contributes now; an unchanged key nets to zero.
+        """
+        words: Dict[tuple, list] = defaultdict(lambda: [0, 0, 0, 0.0, None])
+        days: Dict[tuple, list] = defaultdict(lambda: [0, 0, 0, 0.0])
+
+        def add(student_id, word_text, day, contribution, sign):
+            if student_id is None or word_text is None:
+                return
+            for totals in (words[(student_id, word_text)], days[(student_id, day)]):
+                for i, v in enumerate(contribution):
+                    totals[i] += sign * v
+
+        now = datetime.utcnow()
+        for obj in (*session.new, *session.dirty, *session.deleted):
+            if not isinstance(obj, Recording):
+                continue
+            state = inspect(obj)
+            created_at = None
+            if obj not in session.new:
+                created_at = _before(state, obj, "created_at")
+                add(_before(state, obj, "student_id"), _before(state, obj, "word_text"),
+                    (created_at or now).date(),
+                    _contribution(_before(state, obj, "status"),
+                                  _before(state, obj, "pronunciation_score")), -1)
+            if obj not in session.deleted:
+                # server-side default: not on the object yet for a new row
+                created_at = state.dict.get("created_at") or created_at or now
+                add(obj.student_id, obj.word_text, created_at.date(),
+                    _contribution(obj.status, obj.pronunciation_score), 1)
+                if obj in session.new:
+                    totals = words[(obj.student_id, obj.word_text)]
+                    totals[4] = max(totals[4], created_at) if totals[4] else created_at
+        return words, days
+
+    def _after_flush(self, session: Session, flush_context):
+        if not any(isinstance(o, Recording) for o in (*session.new, *session.dirty, *session.deleted)):
+            return
+        words, days = self._deltas(session)
+        conn = session.connection()
+        touched = 0
+        for (student_id, word_text), (*delta, last_at) in words.items():
+            if any(delta):
+                self._upsert(conn, StudentWordStats,
+                             {"student_id": student_id, "word_text": word_text}, delta, last_at)
+                touched += 1
+        day_deltas = {k: v for k, v in days.items() if any(v)}
+        if day_deltas:
+            student_ids = {student_id for student_id, _ in day_deltas}
+            classes = defaultdict(list)
+            for class_id, student_id in conn.execute(
+                select(ClassEnrollment.class_id, ClassEnrollment.student_id)
+                .where(ClassEnrollment.student_id.in_(student_ids))
+            ):
+                classes[student_id].append(class_id)
+            for (student_id, day), delta in day_deltas.items():
+                for class_id in classes.get(student_id, ()):
+                    self._upsert(conn, ClassDayStats, {"class_id": class_id, "day": day}, delta)
+                    touched += 1
+        with self._lock:
+            self._flushes += 1
+            self._rows_upserted += touched
+
+    @staticmethod
+    def _upsert(conn, model, key: dict, delta, last_at=None):
+        """Add `delta` to the row at `key`, creating it if missing, in one statement."""
+        table = model.__table__
+        values = dict(key, **dict(zip(FIELDS, delta)))
+        if model is StudentWordStats:
+            values["last_recorded_at"] = last_at
+        dialect = conn.dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            if dialect == "sqlite":
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            stmt = dialect_insert(table).values(**values)
+            changes = {f: table.c[f] + stmt.excluded[f] for f in FIELDS}
+            if model is StudentWordStats:
+                changes["last_recorded_at"] = func.coalesce(stmt.excluded.last_recorded_at,
+                                                            table.c.last_recorded_at)
+            conn.execute(stmt.on_conflict_do_update(index_elements=list(key), set_=changes))
+            return
+        # other backends: update, insert when there was nothing to update
+        changes = {f: table.c[f] + values[f] for f in FIELDS}
+        if last_at is not None:
+            changes["last_recorded_at"] = last_at
+        where = [table.c[k] == v for k, v in key.items()]
+        if conn.execute(update(table).where(*where).values(**changes)).rowcount == 0:
+            conn.execute(insert(table).values(**values))
+
+    # -- rebuild -------------------------------------------------------------
+
+    def rebuild(self, db: Session) -> dict:
+        """Recompute both rollup tables from the raw recordings; the caller commits."""
+        started = datetime.utcnow()
+        db.query(StudentWordStats).delete(synchronize_session=False)
+        db.query(ClassDayStats).delete(synchronize_session=False)
+
+        pending = func.sum(case((Recording.status == RecordingStatus.PENDING, 1), else_=0))
+        word_rows = [
+            {"student_id": r[0], "word_text": r[1], "recordings": r[2], "pending": r[3] or 0,
+             "scored": r[4], "score_sum": float(r[5] or 0), "last_recorded_at": r[6]}
+            for r in db.query(
+                Recording.student_id, Recording.word_text, func.count(Recording.id), pending,
+                func.count(func.nullif(Recording.pronunciation_score, 0)),
+                func.sum(Recording.pronunciation_score), func.max(Recording.created_at),
+            ).group_by(Recording.student_id, Recording.word_text)
+        ]
+        if word_rows:
+            db.execute(insert(StudentWordStats), word_rows)
+
+        # per day in Python: date truncation is not portable between SQLite and Postgres
+        classes = defaultdict(list)
+        for class_id, student_id in db.query(ClassEnrollment.class_id, ClassEnrollment.student_id):
+            classes[student_id].append(class_id)
+        days: Dict[tuple, list] = defaultdict(lambda: [0, 0, 0, 0.0])
+        for student_id, created_at, status, score in db.query(
+            Recording.student_id, Recording.created_at, Recording.status, Recording.pronunciation_score
+        ).yield_per(REBUILD_BATCH):
+            if created_at is None:
+                continue
+            for class_id in classes.get(student_id, ()):
+                totals = days[(class_id, created_at.date())]
+                for i, v in enumerate(_contribution(status, score)):
+                    totals[i] += v
+        day_rows = [dict(class_id=c, day=d, **dict(zip(FIELDS, totals))) for (c, d), totals in days.items()]
+        if day_rows:
+            db.execute(insert(ClassDayStats), day_rows)
+
+        summary = {"student_word_rows": len(word_rows), "class_day_rows": len(day_rows),
+                   "seconds": round((datetime.utcnow() - started).total_seconds(), 3),
+                   "finished_at": datetime.utcnow().isoformat()}
+        with self._lock:
+            self._last_rebuild = summary
+        return summary
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"flushes": self._flushes, "rows_upserted": self._rows_upserted,
+                    "last_rebuild": self._last_rebuild}
+
+
+def _keep_old_value(target, value, oldvalue, initiator):
+    return value
+
+
+# Singleton instance
+analytics_rollup = AnalyticsRollup()
+event.listen(Session, "after_flush", analytics_rollup._after_flush)
+# load the old value on assignment even when the attribute was expired, so
+# the delta can take back what the row contributed before
+for _attr in (Recording.student_id, Recording.word_text, Recording.status, Recording.pronunciation_score):
+    event.listen(_attr, "set", _keep_old_value, active_history=True, retval=True)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["rebuild"]:
+        sys.exit("usage: python -m app.services.analytics_rollup rebuild")
+    from app.db.session import SessionLocal
+    db = SessionLocal()
+    try:
+        print(f"Rebuilt analytics rollups: {analytics_rollup.rebuild(db)}")
+        db.commit()
+    finally:
+        db.close()
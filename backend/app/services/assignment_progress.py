@@ -0,0 +1,189 @@
+"""Word-by-word assignment progress in a fixed number of queries.
+
+The teacher's and the student's progress views both walked the assignment's
+words and ran a Recording query for every submitted one, then parsed the
+latest continuous take's per_word JSON again on every call: 40+ queries and
+a JSON walk per view of a 40-word assignment. Both now go through
+load_word_progress(), which issues
+
+    1. the assignment's words, in order
+    2. the student's submissions outer-joined to their recordings, as a
+       projection (typed score columns, no automated_scores JSON)
+    3. continuous mode only, on a cache miss: the latest take's JSON
+
+The parsed breakdown of a continuous take (per_word map + headline scores)
+is kept per recording id in a bounded LRU. A take's scores are written once,
+by the scorer; assigning automated_scores through the ORM (or inserting a
+recording under a reused id) still drops the entry in this process, and
+takes still being scored are never cached.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.assignment import Assignment, AssignmentSubmission, AssignmentWord
+from app.models.recording import Recording
+
+# automated_scores keys a continuous take's summary carries
+SUMMARY_KEYS = ("pronunciation_score", "words_read", "words_total", "completeness_score",
+                "fluency_score", "recognized_text")
+
+
+class BreakdownCache:
+    """Bounded LRU of parsed continuous-take breakdowns, by recording id."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    @staticmethod
+    def parse(scores: dict) -> dict:
+        return {
+            "per_word": {w.get("word"): w for w in scores.get("per_word", [])},
+            "scores": {key: scores.get(key) for key in SUMMARY_KEYS},
+        }
+
+    def get(self, recording_id: int, load: Callable[[], Optional[dict]]) -> Optional[dict]:
+        """Breakdown of the take; `load` fetches its automated_scores on a miss."""
+        with self._lock:
+            entry = self._lru.get(recording_id)
+            if entry is not None:
+                self._lru.move_to_end(recording_id)
+                self._counts["hits"] += 1
+                return entry
+            self._counts["misses"] += 1
+        scores = load()
+        if not scores:
+            return None  # still scoring: nothing to keep
+        entry = self.parse(scores)
+        with self._lock:
+            self._lru[recording_id] = entry
+            self._lru.move_to_end(recording_id)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+        return entry
+
+    def invalidate(self, recording_id: Optional[int]):
+        if recording_id is None:
+            return
+        with self._lock:
+            if self._lru.pop(recording_id, None) is not None:
+                self._counts["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._counts["hits"] + self._counts["misses"]
+            return dict(self._counts, entries=len(self._lru),
+                        hit_rate=round(self._counts["hits"] / lookups, 3) if lookups else 0.0)
+
+
+def load_word_progress(db: Session, assignment: Assignment, student_id: int) -> Tuple[List[dict], Optional[dict]]:
+    """(words with the student's progress on each, continuous take summary or None)"""
+    assignment_words = db.query(AssignmentWord.word_text, AssignmentWord.order_index).filter(
+        AssignmentWord.assignment_id == assignment.id
+    ).order_by(AssignmentWord.order_index).all()
+
+    submissions = db.query(
+        AssignmentSubmission.id,
+        AssignmentSubmission.word_text,
+        AssignmentSubmission.recording_id,
+        AssignmentSubmission.submitted_at,
+        AssignmentSubmission.teacher_feedback,
+        AssignmentSubmission.teacher_grade,
+        Recording.id.label("joined_recording_id"),
+        Recording.audio_file_path,
+        Recording.teacher_feedback.label("recording_feedback"),
+        Recording.teacher_grade.label("recording_grade"),
+        Recording.pronunciation_score,
+        Recording.automated_scores.isnot(None).label("has_scores"),
+    ).outerjoin(
+        Recording, AssignmentSubmission.recording_id == Recording.id
+    ).filter(
+        AssignmentSubmission.assignment_id == assignment.id,
+        AssignmentSubmission.student_id == student_id
+    ).order_by(AssignmentSubmission.id).all()
+
+    # latest submission per word wins
+    submission_dict = {sub.word_text: sub for sub in submissions}
+
+    mode = assignment.mode or "practice"
+
+    # continuous mode: every word shares one take — use its per-word breakdown
+    continuous_summary = None
+    per_word_map = {}
+    if mode == "continuous":
+        latest = max((s for s in submissions if s.joined_recording_id), key=lambda s: s.id, default=None)
+        if latest:
+            breakdown = None
+            if latest.has_scores:
+                breakdown = breakdown_cache.get(latest.joined_recording_id, lambda: db.query(
+                    Recording.automated_scores).filter(Recording.id == latest.joined_recording_id).scalar())
+            scores = breakdown["scores"] if breakdown else {}
+            per_word_map = breakdown["per_word"] if breakdown else {}
+            continuous_summary = {
+                "recording_id": latest.joined_recording_id,
+                "audio_file_path": latest.audio_file_path,
+                "pronunciation_score": scores.get("pronunciation_score"),
+                "grade": latest.recording_grade,
+                "feedback": latest.recording_feedback,
+                "words_read": scores.get("words_read"),
+                "words_total": scores.get("words_total"),
+                "completeness_score": scores.get("completeness_score"),
+                "fluency_score": scores.get("fluency_score"),
+                "recognized_text": scores.get("recognized_text"),
+                "scoring": breakdown is None,
+            }
+
+    word_list = []
+    for word in assignment_words:
+        submission = submission_dict.get(word.word_text)
+        word_info = {
+            "word_text": word.word_text,
+            "order_index": word.order_index,
+            "submitted": submission is not None,
+            "recording_id": submission.recording_id if submission else None,
+            "submitted_at": submission.submitted_at if submission else None,
+            "teacher_feedback": submission.teacher_feedback if submission else None,
+            "teacher_grade": submission.teacher_grade if submission else None
+        }
+
+        if mode == "continuous":
+            pw = per_word_map.get(word.word_text)
+            if pw:
+                word_info["score"] = pw.get("score")
+                word_info["error"] = pw.get("error")
+                word_info["offset_ms"] = pw.get("offset_ms")
+                word_info["end_ms"] = pw.get("end_ms")
+        elif submission and submission.has_scores:
+            # failed takes have no typed score; they showed as 0
+            word_info["score"] = submission.pronunciation_score or 0
+
+        word_list.append(word_info)
+
+    return word_list, continuous_summary
+
+
+def _scores_assigned(target, value, oldvalue, initiator):
+    breakdown_cache.invalidate(target.id)
+
+
+def _recording_inserted(session, instance):
+    # ids can come back (SQLite reuses the highest one after a delete)
+    if isinstance(instance, Recording):
+        breakdown_cache.invalidate(instance.id)
+
+
+# Singleton instance
+breakdown_cache = BreakdownCache()
+event.listen(Recording.automated_scores, "set", _scores_assigned)
+event.listen(Session, "pending_to_persistent", _recording_inserted)
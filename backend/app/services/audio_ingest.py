@@ -0,0 +1,135 @@
+"""One-pass ingest of an upload into every derived audio format.
+
+A submission used to be transcoded up to three times: the MP3 sibling the
+browser plays, the 16 kHz WAV for the shadow model, and again to MP3 before
+uploading to the scoring node — each a separate ffmpeg process re-decoding
+the same upload. Ingest runs one ffmpeg with two outputs (a single decode
+feeding both encoders) and registers the files on the Recording; scorers,
+the shadow model and the scoring node read those instead of transcoding.
+
+Derived files sit next to the upload:
+- ``<upload>.16k.wav`` — canonical 16 kHz / 16-bit / mono PCM (DecodedAudio
+  reads it without spawning anything);
+- ``<upload>.mp3`` — 24 kbps mono, the name the frontend player expects.
+
+Without ffmpeg the canonical WAV is decoded in-process and the MP3 skipped
+(the player falls back to the original upload).
+
+A take streamed over the WebSocket is written as canonical PCM from the
+start; it only needs its MP3 (``<take>.mp3``), see ingest_streamed.
+"""
+
+import os
+import shutil
+import subprocess
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from app.services.audio_preprocess import CHANNELS, SAMPLE_RATE, DecodedAudio
+
+PCM_SUFFIX = ".16k.wav"
+MP3_SUFFIX = ".mp3"
+MP3_BITRATE = "24k"
+
+
+@dataclass
+class IngestResult:
+    pcm_path: Optional[str]
+    mp3_path: Optional[str]
+
+
+def derived_paths(source_path: str) -> Tuple[str, str]:
+    """(canonical PCM path, MP3 path) for an upload."""
+    return f"{source_path}{PCM_SUFFIX}", f"{source_path}{MP3_SUFFIX}"
+
+
+def mp3_for(audio_path: Optional[str]) -> Optional[str]:
+    """The MP3 ingested alongside a canonical PCM file, when there is one."""
+    if not audio_path or not audio_path.endswith(PCM_SUFFIX):
+        return None
+    for mp3_path in (audio_path[:-len(PCM_SUFFIX)] + MP3_SUFFIX, audio_path + MP3_SUFFIX):
+        if os.path.exists(mp3_path):
+            return mp3_path
+    return None
+
+
+def _transcode(source_path: str, pcm_path: str, mp3_path: str):
+    """Single ffmpeg run, two outputs; files appear only once complete."""
+    pcm_tmp, mp3_tmp = pcm_path + ".part", mp3_path + ".part"
+    try:
+        subprocess.run(
+            ["ffmpeg", "-y", "-loglevel", "error", "-i", source_path,
+             "-map", "0:a:0", "-ac", str(CHANNELS), "-ar", str(SAMPLE_RATE),
+             "-c:a", "pcm_s16le", "-f", "wav", pcm_tmp,
+             "-map", "0:a:0", "-ac", str(CHANNELS), "-b:a", MP3_BITRATE,
+             "-f", "mp3", mp3_tmp],
+            check=True, capture_output=True, timeout=120,
+        )
+        os.replace(pcm_tmp, pcm_path)
+        os.replace(mp3_tmp, mp3_path)
+    finally:
+        for tmp in (pcm_tmp, mp3_tmp):
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+
+def _encode_mp3(pcm_path: str, mp3_path: str):
+    mp3_tmp = mp3_path + ".part"
+    try:
+        subprocess.run(
+            ["ffmpeg", "-y", "-loglevel", "error", "-i", pcm_path,
+             "-ac", str(CHANNELS), "-b:a", MP3_BITRATE, "-f", "mp3", mp3_tmp],
+            check=True, capture_output=True, timeout=120,
+        )
+        os.replace(mp3_tmp, mp3_path)
+    finally:
+        if os.path.exists(mp3_tmp):
+            os.remove(mp3_tmp)
+
+
+def ingest(source_path: str) -> IngestResult:
+    """Write the canonical PCM and the MP3 for an upload. Never raises."""
+    pcm_path, mp3_path = derived_paths(source_path)
+    if shutil.which("ffmpeg"):
+        try:
+            _transcode(source_path, pcm_path, mp3_path)
+            return IngestResult(pcm_path, mp3_path)
+        except Exception as e:
+            print(f"ffmpeg ingest failed, decoding in-process: {e}")
+    try:
+        DecodedAudio.from_file(source_path).write_wav(pcm_path)
+        return IngestResult(pcm_path, None)
+    except Exception as e:
+        print(f"Audio ingest failed (non-fatal): {e}")
+        return IngestResult(None, None)
+
+
+def ingest_recording(recording) -> str:
+    """Ingest a Recording's upload unless already done; the caller commits.
+
+    Returns the path scorers should read: the canonical PCM, or the
+    original upload when it could not be decoded.
+    """
+    if recording.pcm_path and os.path.exists(recording.pcm_path):
+        return recording.pcm_path
+    result = ingest(recording.audio_file_path)
+    recording.pcm_path = result.pcm_path
+    recording.mp3_path = result.mp3_path
+    return result.pcm_path or recording.audio_file_path
+
+
+def ingest_streamed(recording) -> str:
+    """Register a streamed take, already canonical PCM, and encode its MP3.
+
+    The caller commits. Never raises; without ffmpeg there is no MP3.
+    """
+    pcm_path = recording.audio_file_path
+    recording.pcm_path = pcm_path
+    mp3_path = pcm_path + MP3_SUFFIX
+    if shutil.which("ffmpeg"):
+        try:
+            _encode_mp3(pcm_path, mp3_path)
+            recording.mp3_path = mp3_path
+        except Exception as e:
+            print(f"MP3 encode of streamed take failed (non-fatal): {e}")
+    return pcm_path
@@ -0,0 +1,158 @@
+"""Reject hopeless takes before any paid scorer sees them.
+
+An empty, silent or cut-off recording used to run the whole cascade —
+the xfyun session, two Azure recognizers, the GOP call — only for the
+answer to be "未能识别到语音", and the student got a generic failure.
+The decoded PCM already says most of that: a few NumPy reductions over
+20 ms frames give the duration, how much of it is above the noise floor,
+and how much is clipped, in well under a millisecond per second of audio.
+
+Hopeless takes are rejected with a retry message that says what to fix
+(too short / silent / no speech / distorted). Accepted takes have long
+leading and trailing silence trimmed (keeping PAD_MS on each side), so
+providers get less audio to upload and recognize. Every rejection counts
+the provider calls it avoided; stats() is served on /health/scorers.
+"""
+
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+import numpy as np
+
+from app.services.acoustic_features import frame_rms
+from app.services.audio_preprocess import DecodedAudio
+
+FRAME_MS = 20
+HOP_MS = 10
+PAD_MS = 250  # silence kept around the speech when trimming
+FULL_SCALE = 32767.0
+SILENT_PEAK = 0.01  # peak below 1% of full scale (-40 dBFS): nothing was recorded
+SPEECH_FLOOR_DB = 12.0  # a frame is speech this far above the noise floor,
+SPEECH_PEAK_DB = 20.0  # or within this of the loud frames (a take that is all speech),
+SPEECH_MIN_RMS = 150.0  # and above this absolute level
+CLIP_LEVEL = 32000  # |sample| at or above this counts as clipped
+CLIP_RATIO = 0.02  # share of clipped samples within the speech that ruins it
+
+# per mode: (minimum duration ms, minimum speech ms)
+LIMITS = {
+    "word": (300, 120),
+    "continuous": (1500, 600),
+}
+
+MESSAGES = {
+    "too_short": "录音太短了，请按下录音后把单词完整读完再停止",
+    "silent": "没有录到声音，请检查麦克风是否打开、是否允许浏览器使用麦克风",
+    "no_speech": "没有听到读单词的声音，请靠近麦克风大声一点再读一遍",
+    "clipped": "声音太大、录音失真了，请离麦克风远一点再读一遍",
+}
+
+
+@dataclass
+class PreflightResult:
+    """Outcome of the check; `audio` is the (trimmed) audio to score when ok."""
+    ok: bool
+    audio: Optional[DecodedAudio] = None
+    reason: Optional[str] = None
+    lead_ms: int = 0  # trimmed from the start (continuous offsets are shifted back by it)
+    trimmed_ms: int = 0
+    measures: Dict[str, float] = field(default_factory=dict)
+
+    def rejection(self) -> dict:
+        """The scoring-result dict a rejected take is answered with."""
+        return {"error": MESSAGES[self.reason], "preflight": self.reason,
+                "pronunciation_score": 0, "per_word": []}
+
+
+class AudioPreflight:
+    """Cheap signal checks on decoded PCM, with counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {"checked": 0, "passed": 0, "trimmed_ms": 0, "provider_calls_avoided": 0}
+        self._rejected = {reason: 0 for reason in MESSAGES}
+
+    def check(self, audio: DecodedAudio, mode: str = "word", providers: int = 0) -> PreflightResult:
+        """Measure the take; `providers` = calls a rejection saves (cascade size)."""
+        result = self._measure(audio, mode)
+        with self._lock:
+            self._counts["checked"] += 1
+            if result.ok:
+                self._counts["passed"] += 1
+                self._counts["trimmed_ms"] += result.trimmed_ms
+            else:
+                self._rejected[result.reason] += 1
+                self._counts["provider_calls_avoided"] += providers
+        return result
+
+    @staticmethod
+    def _measure(audio: DecodedAudio, mode: str) -> PreflightResult:
+        min_ms, min_speech_ms = LIMITS.get(mode, LIMITS["word"])
+        samples = audio.samples()
+        duration_ms = audio.duration_ms
+        measures = {"duration_ms": duration_ms}
+        if duration_ms < min_ms:
+            return PreflightResult(False, reason="too_short", measures=measures)
+
+        peak = float(np.max(np.abs(samples.astype(np.int32)))) / FULL_SCALE if len(samples) else 0.0
+        measures["peak"] = round(peak, 4)
+        if peak < SILENT_PEAK:
+            return PreflightResult(False, reason="silent", measures=measures)
+
+        frame, hop = audio.sample_rate * FRAME_MS // 1000, audio.sample_rate * HOP_MS // 1000
+        energy = frame_rms(samples, frame, hop)
+        db = 20.0 * np.log10(energy + 1.0)
+        floor, loud = np.percentile(db, 10), np.percentile(db, 95)
+        threshold = min(floor + SPEECH_FLOOR_DB, loud - SPEECH_PEAK_DB)
+        speech = (db > threshold) & (energy > SPEECH_MIN_RMS)
+        speech_ms = int(np.count_nonzero(speech) * HOP_MS)
+        measures["speech_ms"] = speech_ms
+        measures["speech_ratio"] = round(speech_ms / max(1, duration_ms), 3)
+        if speech_ms < min_speech_ms:
+            return PreflightResult(False, reason="no_speech", measures=measures)
+
+        voiced = np.flatnonzero(speech)
+        first, last = int(voiced[0]) * hop, min(len(samples), int(voiced[-1]) * hop + frame)
+        clipped = np.count_nonzero(np.abs(samples[first:last].astype(np.int32)) >= CLIP_LEVEL)
+        measures["clipped_ratio"] = round(clipped / max(1, last - first), 4)
+        if measures["clipped_ratio"] > CLIP_RATIO:
+            return PreflightResult(False, reason="clipped", measures=measures)
+
+        pad = audio.sample_rate * PAD_MS // 1000
+        start, end = max(0, first - pad), min(len(samples), last + pad)
+        if start == 0 and end == len(samples):
+            return PreflightResult(True, audio=audio, measures=measures)
+        width = samples.itemsize
+        # keeps the source path: the node is still sent the MP3 ingested for
+        # it (one ffmpeg run per upload), and answers on the original clock
+        trimmed = DecodedAudio(audio.pcm[start * width:end * width], audio.sample_rate, path=audio.path)
+        lead_ms = int(start * 1000 / audio.sample_rate)
+        return PreflightResult(True, audio=trimmed, lead_ms=lead_ms,
+                               trimmed_ms=duration_ms - trimmed.duration_ms, measures=measures)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._counts, rejected=dict(self._rejected))
+
+
+# set by providers that scored the untrimmed source file (the node, sent the
+# ingested MP3): their offsets are already on the recording's clock
+SOURCE_CLOCK = "_source_clock"
+
+
+def shift_offsets(result: dict, ms: int) -> dict:
+    """Put per-word offsets of a trimmed take back on the recording's clock."""
+    if ms and not result.pop(SOURCE_CLOCK, False):
+        for word in result.get("per_word") or []:
+            for key in ("offset_ms", "end_ms"):
+                if word.get(key) is not None:
+                    word[key] += ms
+        for segment in result.get("segments") or []:
+            segment["start_ms"] += ms
+            segment["end_ms"] += ms
+    result.pop(SOURCE_CLOCK, None)
+    return result
+
+
+# Singleton instance
+audio_preflight = AudioPreflight()
@@ -0,0 +1,106 @@
+"""Decode an upload once into the PCM every scorer consumes.
+
+All scorers want the same thing — 16 kHz / 16-bit / mono PCM — so each
+submission is decoded a single time into memory and handed out from there:
+Azure recognizers get their own PushAudioInputStream (two recognizers cannot
+share one file handle), the GOP service gets an in-memory WAV, xfyun gets the
+raw frames and the stress checker a NumPy view. Nothing touches disk unless a
+consumer truly needs a path, and then it goes to tmpfs.
+"""
+
+import io
+import os
+import tempfile
+import wave
+from typing import Optional
+
+import numpy as np
+from pydub import AudioSegment
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2  # bytes, 16-bit
+CHANNELS = 1
+
+# RAM-backed scratch dir when the box has one; only path-bound consumers use it
+_TMPFS_DIR = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
+
+
+class DecodedAudio:
+    """16 kHz / 16-bit / mono PCM held in memory."""
+
+    def __init__(self, pcm: bytes, sample_rate: int = SAMPLE_RATE, path: Optional[str] = None):
+        self.pcm = pcm
+        self.sample_rate = sample_rate
+        self.path = path  # file it was decoded (or trimmed) from, if any
+        self._samples = None
+
+    @classmethod
+    def from_file(cls, audio_file_path: str) -> "DecodedAudio":
+        """Decode any upload (webm/ogg/mp3/wav...) to canonical PCM.
+
+        A WAV that is already 16 kHz mono 16-bit is read as-is without
+        spawning ffmpeg; everything else goes through pydub.
+        """
+        try:
+            with wave.open(audio_file_path, "rb") as w:
+                if (w.getframerate() == SAMPLE_RATE and w.getnchannels() == CHANNELS
+                        and w.getsampwidth() == SAMPLE_WIDTH and w.getcomptype() == "NONE"):
+                    return cls(w.readframes(w.getnframes()), path=audio_file_path)
+        except (wave.Error, EOFError):
+            pass
+
+        audio = AudioSegment.from_file(audio_file_path)
+        audio = audio.set_channels(CHANNELS).set_frame_rate(SAMPLE_RATE).set_sample_width(SAMPLE_WIDTH)
+        return cls(audio.raw_data, path=audio_file_path)
+
+    @property
+    def duration_ms(self) -> int:
+        return int(len(self.pcm) / (SAMPLE_WIDTH * self.sample_rate) * 1000)
+
+    def samples(self) -> np.ndarray:
+        """Read-only int16 view over the PCM (no copy)."""
+        if self._samples is None:
+            self._samples = np.frombuffer(self.pcm, dtype=np.int16)
+        return self._samples
+
+    def wav_bytes(self) -> bytes:
+        """The PCM wrapped in a WAV container, for HTTP uploads."""
+        buf = io.BytesIO()
+        with wave.open(buf, "wb") as w:
+            w.setnchannels(CHANNELS)
+            w.setsampwidth(SAMPLE_WIDTH)
+            w.setframerate(self.sample_rate)
+            w.writeframes(self.pcm)
+        return buf.getvalue()
+
+    def azure_audio_config(self):
+        """A fresh Azure AudioConfig fed from memory through a push stream.
+
+        Every recognizer needs its own stream; the whole buffer is written
+        up front and the stream closed so recognition ends at end of audio.
+        """
+        import azure.cognitiveservices.speech as speechsdk
+
+        stream_format = speechsdk.audio.AudioStreamFormat(
+            samples_per_second=self.sample_rate,
+            bits_per_sample=SAMPLE_WIDTH * 8,
+            channels=CHANNELS,
+        )
+        stream = speechsdk.audio.PushAudioInputStream(stream_format=stream_format)
+        stream.write(self.pcm)
+        stream.close()
+        return speechsdk.audio.AudioConfig(stream=stream)
+
+    def write_wav(self, path: str):
+        """Write the audio as a canonical WAV file (atomically replaced)."""
+        tmp = path + ".part"
+        with open(tmp, "wb") as f:
+            f.write(self.wav_bytes())
+        os.replace(tmp, path)
+
+    def write_temp_wav(self) -> str:
+        """Write the audio to a temporary WAV (tmpfs when available); caller deletes it."""
+        fd, path = tempfile.mkstemp(suffix=".wav", dir=_TMPFS_DIR)
+        with os.fdopen(fd, "wb") as f:
+            f.write(self.wav_bytes())
+        return path
@@ -0,0 +1,168 @@
+"""Authenticated-user resolution without a DB round-trip per request.
+
+Every authenticated call verified the JWT signature with python-jose and
+loaded the User row just to check its role; the continuous-result and
+scoring polls repeat that every second or two per student. Two small
+TTL-bounded LRUs now sit in front of both:
+
+    tokens  raw token -> verified claims, kept until min(TTL, exp)
+    users   user id   -> detached snapshot of the row, merged into the
+                         request's session with load=False (no SELECT)
+
+Tokens carry role, username and a fingerprint of the password hash
+(security.token_claims); the dependency compares them with the user it
+resolved, so a token issued before a role or password change is refused
+as soon as the cached row reflects the change. Any User insert, update or
+delete committed through the ORM in this process evicts that row;
+invalidate_user() does it explicitly. Other processes (and raw SQL) are
+seen once their entry expires, after AUTH_CACHE_TTL seconds at most;
+a token whose claims disagree with the cached row has the row re-read
+once before it is refused, so a token issued after a change made
+elsewhere keeps working.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.config import settings
+from app.core.security import decode_access_token
+from app.models.user import User
+
+
+class _TTLCache:
+    """OrderedDict LRU whose entries also expire."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lru = OrderedDict()
+
+    def get(self, key, now: float):
+        entry = self._lru.get(key)
+        if entry is None:
+            return None
+        value, expires = entry
+        if expires <= now:
+            del self._lru[key]
+            return None
+        self._lru.move_to_end(key)
+        return value
+
+    def put(self, key, value, expires: float):
+        self._lru[key] = (value, expires)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def pop(self, key) -> bool:
+        return self._lru.pop(key, None) is not None
+
+    def clear(self):
+        self._lru.clear()
+
+    def __len__(self):
+        return len(self._lru)
+
+
+def _snapshot(user: User) -> User:
+    """Detached copy of the row's columns, safe to merge into any session."""
+    copy = User(**{column.key: getattr(user, column.key) for column in User.__table__.columns})
+    make_transient_to_detached(copy)
+    return copy
+
+
+class AuthCache:
+    """Verified token claims and user rows, with hit-rate counters."""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self._tokens = _TTLCache(max_entries)
+        self._users = _TTLCache(max_entries)
+        self._generations = {}  # user id -> eviction count, so a fill racing an eviction is dropped
+        self._lock = threading.Lock()
+        self._counts = {"token_hits": 0, "token_misses": 0, "user_hits": 0, "user_misses": 0,
+                        "invalidations": 0}
+
+    def claims(self, token: str) -> Optional[dict]:
+        """Verified claims of `token`, None when it is invalid or expired."""
+        now = time.time()
+        with self._lock:
+            payload = self._tokens.get(token, now)
+            self._counts["token_hits" if payload is not None else "token_misses"] += 1
+        if payload is not None:
+            return payload
+        payload = decode_access_token(token)
+        if payload is None:
+            return None  # invalid tokens are not kept: nothing to gain from remembering them
+        expires = min(now + self.ttl, float(payload.get("exp", now + self.ttl)))
+        with self._lock:
+            self._tokens.put(token, payload, expires)
+        return payload
+
+    def user(self, db: Session, user_id: int, refresh: bool = False) -> Optional[User]:
+        """The user as an instance of `db`; SELECTs only on a miss, or always with `refresh`."""
+        if refresh:
+            self.invalidate_user(user_id)
+        with self._lock:
+            snapshot = self._users.get(user_id, time.time())
+            self._counts["user_hits" if snapshot is not None else "user_misses"] += 1
+            generation = self._generations.get(user_id, 0)
+        if snapshot is not None:
+            return db.merge(snapshot, load=False)
+        query = db.query(User).filter(User.id == user_id)
+        # a refresh must not be answered from the row already in the session
+        user = (query.populate_existing() if refresh else query).first()
+        if user is not None:
+            with self._lock:
+                # evicted since the SELECT: what was read may already be stale
+                if self._generations.get(user_id, 0) == generation:
+                    self._users.put(user_id, _snapshot(user), time.time() + self.ttl)
+        return user
+
+    def invalidate_user(self, user_id: Optional[int]):
+        if user_id is None:
+            return
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            if self._users.pop(user_id):
+                self._counts["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._tokens.clear()
+            self._users.clear()
+            self._generations.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = sum(self._counts[k] for k in ("token_hits", "token_misses", "user_hits", "user_misses"))
+            hits = self._counts["token_hits"] + self._counts["user_hits"]
+            return dict(self._counts, tokens=len(self._tokens), users=len(self._users),
+                        hit_rate=round(hits / lookups, 3) if lookups else 0.0)
+
+
+_PENDING = "auth_cache_user_ids"
+
+
+def _collect_users(session, flush_context):
+    # evicted at commit, not here: a request reading in between would cache
+    # the row as it still is in the database (ids left by a rollback only
+    # cost a spurious eviction at the next commit)
+    ids = {obj.id for obj in (*session.new, *session.dirty, *session.deleted) if isinstance(obj, User)}
+    if ids:
+        session.info.setdefault(_PENDING, set()).update(ids)
+
+
+def _evict_committed(session):
+    for user_id in session.info.pop(_PENDING, ()):
+        auth_cache.invalidate_user(user_id)
+
+
+# Singleton instance
+auth_cache = AuthCache(ttl=settings.AUTH_CACHE_TTL, max_entries=settings.AUTH_CACHE_MAX_ENTRIES)
+event.listen(Session, "after_flush", _collect_users)
+event.listen(Session, "after_commit", _evict_committed)
@@ -0,0 +1,246 @@
+"""Score a long continuous take as word groups cut at the student's pauses.
+
+A 40-word test used to go to a scorer as one recording: Azure runs a single
+continuous session over all of it (up to 240 s of waiting), and direct
+xfyun is skipped entirely past 20 words because long audio is unstable
+there. Recognition time grows with the audio, so the student waits for the
+whole take to be processed end to end.
+
+Here the canonical PCM is cut into chunks of about CONTINUOUS_SEGMENT_WORDS words,
+each scored on its own through the continuous cascade, all at once. Every
+chunk is short enough for any provider, and the wall time is roughly that
+of the slowest chunk.
+
+Cutting: frame energy (acoustic_features.frame_rms) against a threshold
+between the noise floor and the speech level gives speech islands; gaps
+shorter than MIN_PAUSE_MS are closed (stop consonants, "note-book") and
+blips shorter than MIN_SPEECH_MS dropped. Word lists are read word by word,
+so usually there is one island per word and the chunk for words i..j is
+exactly islands i..j. Otherwise each group boundary is placed at the pause
+whose share of the speech time is closest to the group's share of the
+expected word lengths (phoneme counts), and each chunk is also scored
+against CONTINUOUS_SEGMENT_MARGIN neighbouring words on either side in case the cut landed a
+word early or late.
+
+Merging: each reference word takes its entry from the chunk that owns it,
+or from a neighbour that heard it in its margin when the owner reports it
+omitted. Offsets are rebased onto the whole recording and the totals are
+recomputed from the merged words the way the Azure mapping computes them.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.acoustic_features import frame_rms
+from app.services.scoring_metrics import carry, span
+
+FRAME_MS = 20
+HOP_MS = 10
+MIN_PAUSE_MS = 180  # shorter silences are inside a word
+MIN_SPEECH_MS = 60  # shorter bursts are clicks / breaths
+MIN_DYNAMIC_DB = 6.0  # speech must stand this far above the noise floor
+
+
+@dataclass
+class Segment:
+    """One chunk of the recording and the reference words it is scored against."""
+    start: int  # sample offsets into the recording
+    end: int
+    core: Tuple[int, int]  # reference indices [lo, hi) this chunk owns
+    scored: Tuple[int, int]  # reference indices [lo, hi) sent to the scorer (core + margin)
+
+    def start_ms(self, sample_rate: int) -> int:
+        return int(self.start * 1000 / sample_rate)
+
+
+def speech_islands(samples: np.ndarray, sample_rate: int) -> List[Tuple[int, int]]:
+    """(start, end) sample spans of speech, separated by pauses of at least MIN_PAUSE_MS."""
+    frame, hop = sample_rate * FRAME_MS // 1000, sample_rate * HOP_MS // 1000
+    energy = frame_rms(samples, frame, hop)
+    if not len(energy):
+        return []
+    db = 20.0 * np.log10(energy + 1.0)
+    floor, peak = np.percentile(db, 10), np.percentile(db, 95)
+    if peak - floor < MIN_DYNAMIC_DB:
+        return []
+    voiced = db > floor + max(MIN_DYNAMIC_DB, 0.35 * (peak - floor))
+
+    # runs of voiced frames: rising / falling edges of the padded mask
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], voiced.astype(np.int8), [0]))))
+    runs = edges.reshape(-1, 2)  # [first voiced frame, first unvoiced frame after it)
+    min_gap, min_len = MIN_PAUSE_MS // HOP_MS, MIN_SPEECH_MS // HOP_MS
+    merged: List[List[int]] = []
+    for lo, hi in runs:
+        if merged and lo - merged[-1][1] < min_gap:
+            merged[-1][1] = hi
+        else:
+            merged.append([int(lo), int(hi)])
+    return [(lo * hop, min(len(samples), (hi - 1) * hop + frame))
+            for lo, hi in merged if hi - lo >= min_len]
+
+
+def _expected_lengths(words: List[str]) -> np.ndarray:
+    """Relative spoken length of each reference entry: phonemes, plus one per token for its gap."""
+    from app.services.scoring_alignment import tokenize, word_phonemes
+
+    lengths = []
+    for word in words:
+        tokens = tokenize(word) or [word]
+        lengths.append(sum(len((word_phonemes(t) or [()])[0]) or len(t) for t in tokens) + len(tokens))
+    return np.asarray(lengths, dtype=np.float64)
+
+
+def plan_segments(samples: np.ndarray, sample_rate: int, reference_words: List[str],
+                  words_per_segment: int, margin: int = 1) -> List[Segment]:
+    """Chunks of about words_per_segment words cut at pauses; [] when the take cannot be cut."""
+    n_words = len(reference_words)
+    n_groups = n_words // words_per_segment if words_per_segment > 0 else 0
+    if n_groups < 2:
+        return []
+    islands = speech_islands(samples, sample_rate)
+    if len(islands) < n_groups:
+        return []
+
+    # balanced groups of reference words: boundaries[g] = first word of group g
+    boundaries = [round(g * n_words / n_groups) for g in range(n_groups + 1)]
+    exact = len(islands) == n_words
+    if exact:
+        # one island per word: group g ends with island boundaries[g + 1] - 1
+        cut_after = [boundaries[g] - 1 for g in range(1, n_groups)]
+        margin = 0
+    else:
+        expected = np.cumsum(_expected_lengths(reference_words))
+        expected /= expected[-1]
+        spoken = np.cumsum([end - start for start, end in islands], dtype=np.float64)
+        spoken /= spoken[-1]
+        cut_after, prev = [], -1
+        for g in range(1, n_groups):
+            target = expected[boundaries[g] - 1]
+            # strictly after the previous cut, leaving one island per remaining group
+            lo, hi = prev + 1, len(islands) - 1 - (n_groups - g)
+            best = lo + int(np.argmin(np.abs(spoken[lo:hi + 1] - target)))
+            cut_after.append(best)
+            prev = best
+
+    cuts = [0] + [(islands[i][1] + islands[i + 1][0]) // 2 for i in cut_after] + [len(samples)]
+    return [
+        Segment(start=cuts[g], end=cuts[g + 1],
+                core=(boundaries[g], boundaries[g + 1]),
+                scored=(max(0, boundaries[g] - margin), min(n_words, boundaries[g + 1] + margin)))
+        for g in range(n_groups)
+    ]
+
+
+def _omitted(word: str) -> dict:
+    return {"word": word, "score": 0, "error": "漏读"}
+
+
+def merge_results(reference_words: List[str], segments: List[Segment], results: List[dict],
+                  sample_rate: int) -> dict:
+    """One continuous result from the chunk results, offsets on the whole recording's clock."""
+    heard = []  # per chunk: {reference index: per_word entry, rebased}
+    for seg, result in zip(segments, results):
+        base = seg.start_ms(sample_rate)
+        entries = {}
+        if not result.get("error"):
+            for idx, entry in zip(range(*seg.scored), result.get("per_word") or []):
+                entry = dict(entry, word=reference_words[idx])
+                for key in ("offset_ms", "end_ms"):
+                    if entry.get(key) is not None:
+                        entry[key] += base
+                entries[idx] = entry
+        heard.append(entries)
+
+    per_word = []
+    for k, seg in enumerate(segments):
+        for idx in range(*seg.core):
+            entry = heard[k].get(idx) or _omitted(reference_words[idx])
+            if entry.get("error") == "漏读":
+                # the cut may have put the word into a neighbour's chunk
+                for j in (k - 1, k + 1):
+                    other = heard[j].get(idx) if 0 <= j < len(segments) else None
+                    if other and other.get("error") != "漏读":
+                        entry = other
+                        break
+            per_word.append(entry)
+
+    def weighted(key):
+        pairs = [(r[key], seg.core[1] - seg.core[0]) for seg, r in zip(segments, results)
+                 if not r.get("error") and r.get(key) is not None]
+        total = sum(w for _, w in pairs)
+        return sum(v * w for v, w in pairs) / total if total else None
+
+    read_count = sum(1 for w in per_word if w["error"] != "漏读")
+    accuracy = sum(w["score"] for w in per_word) / len(per_word) if per_word else 0
+    completeness = read_count / len(reference_words) * 100 if reference_words else 0
+    fluency = weighted("fluency_score")
+    if fluency is None:
+        overall = accuracy * 0.85 + completeness * 0.15
+    else:
+        overall = accuracy * 0.7 + completeness * 0.15 + fluency * 0.15
+    token_ratio = weighted("token_match_ratio")
+    # unbiased-transcript cross-check, as in the single-session Azure mapping
+    if token_ratio is not None and reference_words and token_ratio < (read_count / len(reference_words)) * 0.6:
+        overall = min(overall, 55.0)
+
+    return {
+        "mode": "continuous",
+        "pronunciation_score": round(max(0.0, min(100.0, overall)), 1),
+        "accuracy_score": round(accuracy, 1),
+        "completeness_score": round(completeness, 1),
+        "fluency_score": round(fluency, 1) if fluency is not None else None,
+        "recognized_text": " ".join(r.get("recognized_text") or "" for r in results).strip(),
+        "independent_transcript": " ".join(r.get("independent_transcript") or "" for r in results).strip(),
+        "token_match_ratio": round(token_ratio, 2) if token_ratio is not None else None,
+        "words_read": read_count,
+        "words_total": len(reference_words),
+        "insertions": sum(r.get("insertions") or 0 for r in results),
+        "per_word": per_word,
+        "segments": [
+            {"start_ms": seg.start_ms(sample_rate), "end_ms": int(seg.end * 1000 / sample_rate),
+             "words": list(seg.core), "provider": r.get("provider"), "error": r.get("error")}
+            for seg, r in zip(segments, results)
+        ],
+    }
+
+
+def score_segmented(cascade, audio, reference_words: List[str], budget: float,
+                    words_per_segment: int, margin: int, workers: int) -> Tuple[Optional[Dict], List[dict]]:
+    """Cut, score every chunk through `cascade` concurrently, merge.
+
+    Returns (None, timings) when the take cannot be cut or any chunk got
+    no answer from any provider: the caller then scores the whole take.
+    """
+    from app.services.audio_preprocess import DecodedAudio
+
+    segments = plan_segments(audio.samples(), audio.sample_rate, reference_words, words_per_segment, margin)
+    if not segments:
+        return None, []
+    deadline = time.monotonic() + budget
+    width = audio.samples().itemsize
+
+    def score(k: int, seg: Segment):
+        chunk = DecodedAudio(audio.pcm[seg.start * width:seg.end * width], audio.sample_rate)
+        with span(f"segment.{k}", observe=False):
+            return cascade.run(chunk, reference_words[slice(*seg.scored)],
+                               max(0.0, deadline - time.monotonic()))
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(segments))),
+                            thread_name_prefix="continuous-segment") as pool:
+        futures = [pool.submit(carry(score), k, seg) for k, seg in enumerate(segments)]
+        outcomes = [f.result() for f in futures]
+
+    timings = [dict(t, segment=k) for k, (_, seg_timings) in enumerate(outcomes) for t in seg_timings]
+    results = [result for result, _ in outcomes]
+    if any(r is None for r in results):
+        return None, timings
+    if all(r.get("error") for r in results):
+        return results[0], timings
+    merged = merge_results(reference_words, segments, results, audio.sample_rate)
+    merged["provider_timings"] = timings
+    return merged, timings
+
@@ -0,0 +1,148 @@
+"""Continuous-test audio received while the student is still reading.
+
+The upload endpoint (submit-continuous) only starts work once the whole
+take has arrived: the browser encodes, uploads, then the server decodes,
+transcodes and sends the full recording to a scorer. For a two-minute
+list the student waits for all of that after they stop.
+
+Over the WebSocket the browser sends 16 kHz / 16-bit / mono PCM as it is
+captured. Each chunk is
+- appended to the take's canonical WAV on disk (header patched after every
+  write, so the file is valid whenever the connection drops), and
+- forwarded to a live Azure session (LiveContinuousSession), which
+  recognizes the take while it is being read.
+
+When the student stops only the tail is left to recognize. Without a live
+session (Azure unconfigured or its circuit open), or when it fails, the
+persisted WAV is scored through the regular continuous cascade.
+"""
+
+import os
+import threading
+import wave
+from typing import Dict, Optional
+
+from app.services.audio_preprocess import CHANNELS, SAMPLE_RATE, SAMPLE_WIDTH
+from app.services.scoring_metrics import span, traced
+
+
+class ContinuousStream:
+    """One streamed take: the WAV being written and the live recognizer, if any."""
+
+    def __init__(self, wav_path: str, reference_words: list, live=None):
+        self.wav_path = wav_path
+        self.reference_words = list(reference_words)
+        self.live = live
+        self.bytes_received = 0
+        self._carry = b""  # odd trailing byte of the last chunk (half a sample)
+        self._lock = threading.Lock()
+        self._file = open(wav_path, "wb")
+        self._wav = wave.open(self._file, "wb")
+        self._wav.setnchannels(CHANNELS)
+        self._wav.setsampwidth(SAMPLE_WIDTH)
+        self._wav.setframerate(SAMPLE_RATE)
+
+    @property
+    def duration_seconds(self) -> float:
+        return self.bytes_received / (SAMPLE_WIDTH * CHANNELS * SAMPLE_RATE)
+
+    def write(self, chunk: bytes):
+        """Persist a chunk of PCM and hand it to the live recognizer."""
+        with self._lock:
+            if self._wav is None:
+                return
+            data = self._carry + chunk
+            usable = len(data) - len(data) % (SAMPLE_WIDTH * CHANNELS)
+            data, self._carry = data[:usable], data[usable:]
+            if not data:
+                return
+            self._wav.writeframes(data)  # also rewrites the header's sizes
+            self._file.flush()
+            self.bytes_received += len(data)
+        if self.live is not None:
+            try:
+                self.live.write(data)
+            except Exception as e:
+                print(f"live recognizer write failed, scoring from file instead: {e}")
+                self._drop_live()
+
+    def close(self):
+        """End of audio: finalize the WAV (idempotent)."""
+        with self._lock:
+            if self._wav is not None:
+                self._wav.close()
+                self._file.close()
+                self._wav = None
+
+    @traced("stream")
+    def finish(self, timeout: float) -> Dict:
+        """Close the take and score it; never raises.
+
+        The live result is used when it is a real score; otherwise the
+        persisted WAV goes through the continuous cascade.
+        """
+        from app.services.pronunciation_service import pronunciation_service
+
+        self.close()
+        if not self.bytes_received:
+            self._drop_live()
+            return {"error": "未收到录音，请重新测试", "pronunciation_score": 0, "per_word": []}
+        if self.live is not None:
+            with span("preflight"):
+                rejection = self._preflight()
+            if rejection is not None:
+                self._drop_live()
+                return rejection
+            try:
+                with span("live"):
+                    result = self.live.finish(timeout)
+                if result and not result.get("error"):
+                    return result
+                print(f"live scoring gave no score, rescoring from file: {(result or {}).get('error')}")
+            except Exception as e:
+                print(f"live scoring failed, rescoring from file: {e}")
+            self.live = None
+        return pronunciation_service.assess_continuous_reading(self.wav_path, self.reference_words)
+
+    def _preflight(self) -> Optional[Dict]:
+        """Rejection for a hopeless take, so the live session is not waited on."""
+        from app.services.audio_preflight import audio_preflight
+        from app.services.audio_preprocess import DecodedAudio
+
+        try:
+            check = audio_preflight.check(DecodedAudio.from_file(self.wav_path), "continuous", providers=1)
+        except Exception as e:
+            print(f"preflight of streamed take failed (non-fatal): {e}")
+            return None
+        return None if check.ok else check.rejection()
+
+    def abort(self):
+        """The connection died mid-take and nothing will be scored from it live."""
+        self.close()
+        self._drop_live()
+
+    def _drop_live(self):
+        live, self.live = self.live, None
+        if live is not None:
+            try:
+                live.cancel()
+            except Exception as e:
+                print(f"live recognizer cancel failed: {e}")
+
+    def discard(self):
+        """Remove the partial file (take rejected before anything was recorded)."""
+        self.abort()
+        if os.path.exists(self.wav_path):
+            os.remove(self.wav_path)
+
+
+def open_stream(wav_path: str, reference_words: list) -> ContinuousStream:
+    """Start a streamed take, with a live Azure session when one can be had."""
+    from app.services.pronunciation_service import pronunciation_service
+
+    session = None
+    try:
+        session = pronunciation_service.start_live_continuous(reference_words)
+    except Exception as e:
+        print(f"live recognizer unavailable, will score from file: {e}")
+    return ContinuousStream(wav_path, reference_words, live=session)
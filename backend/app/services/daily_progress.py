@@ -0,0 +1,90 @@
+"""Per-day student progress, one atomic upsert per scored take.
+
+The scoring worker used to read today's student_progress row, recompute
+average_score in Python with Decimal and write it back. Two takes of one
+student scored at once both read the same row and one update was lost (or,
+on the first take of the day, both inserted a row). record_attempt() now
+issues a single INSERT ... ON CONFLICT (student_id, date) DO UPDATE that adds
+to running totals
+
+    words_practiced, total_attempts   +1 per take
+    score_sum, scored_attempts        + the take's score, for takes that got one
+
+and derives average_score from them inside the same statement, so the
+database serialises concurrent takes on the row itself. Backends without
+ON CONFLICT fall back to update-then-insert.
+
+streak_count is maintained rather than recomputed on read: the day's first
+take inserts the row with yesterday's streak + 1, later takes leave it alone.
+The progress page reads today's row instead of walking a year of dates.
+"""
+
+from datetime import date, timedelta
+from typing import Optional
+
+from sqlalchemy import Numeric, case, cast, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.progress import StudentProgress
+
+
+def _changes(table, incoming):
+    """SET clause adding `incoming` (excluded row or literal values) to the stored totals."""
+    score_sum = table.c.score_sum + incoming["score_sum"]
+    scored = table.c.scored_attempts + incoming["scored_attempts"]
+    return {
+        "words_practiced": table.c.words_practiced + 1,
+        "total_attempts": table.c.total_attempts + 1,
+        "score_sum": score_sum,
+        "scored_attempts": scored,
+        "average_score": case((scored > 0, func.round(cast(score_sum / scored, Numeric), 2)),
+                              else_=table.c.average_score),
+    }
+
+
+def record_attempt(db: Session, student_id: int, day: date, score: Optional[float]):
+    """Count one take on `day`; `score` is None for a take that failed scoring. The caller commits."""
+    table = StudentProgress.__table__
+    yesterday_streak = select(table.c.streak_count).where(
+        table.c.student_id == student_id, table.c.date == day - timedelta(days=1)
+    ).scalar_subquery()
+    values = {
+        "student_id": student_id,
+        "date": day,
+        "words_practiced": 1,
+        "total_attempts": 1,
+        "score_sum": score or 0.0,
+        "scored_attempts": 0 if score is None else 1,
+        "average_score": None if score is None else round(score, 2),
+        "streak_count": func.coalesce(yesterday_streak, 0) + 1,
+    }
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        stmt = dialect_insert(table).values(**values)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["student_id", "date"],
+            set_=_changes(table, {"score_sum": stmt.excluded.score_sum,
+                                  "scored_attempts": stmt.excluded.scored_attempts}),
+        ))
+        return
+    # other backends: update, insert when there was nothing to update
+    changed = db.execute(
+        update(table).where(table.c.student_id == student_id, table.c.date == day)
+        .values(**_changes(table, values))
+    ).rowcount
+    if changed == 0:
+        db.execute(insert(table).values(**values))
+
+
+def current_streak(db: Session, student_id: int, today: date) -> int:
+    """Consecutive practice days ending today (0 until today's first take)."""
+    streak = db.query(StudentProgress.streak_count).filter(
+        StudentProgress.student_id == student_id,
+        StudentProgress.date == today,
+        StudentProgress.words_practiced > 0
+    ).scalar()
+    return streak or 0
@@ -57,6 +57,14 @@ class FeedbackService:
                 "is_automated": True
             }
 
+        if assessment_result.get('preflight'):
+            # the take itself was unusable (silent, cut off...): say what to fix
+            return {
+                "feedback_text": assessment_result['error'],
+                "grade": "N/A",
+                "is_automated": True
+            }
+
         if assessment_result.get('error'):
             return {
                 "feedback_text": "自动评分暂时失败，本次录音已保留，老师会人工评分；你也可以重新录一次。",
@@ -0,0 +1,252 @@
+"""Memory-mapped CMUdict pronunciation index.
+
+cmudict.dict() builds a Python dict of ~135k words holding lists of lists
+of strings: seconds of import time and tens of MB of RSS in every uvicorn
+worker, for the handful of words a request actually looks up. The lexicon
+is instead compiled once (at deploy time, `python -m
+app.services.pron_lexicon`) into a flat file:
+
+    header | phone symbols | key offsets | key bytes | word→pron offsets
+           | pron→phone offsets | phone codes (one byte each)
+
+Keys are sorted UTF-8, so a lookup is a binary search over the key table
+of the mapped file and only materializes the pronunciations of the word
+asked for. The pages are shared by every worker through the page cache.
+A missing index (or one built from another cmudict release) is rebuilt on
+first use.
+"""
+
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from importlib import metadata
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+MAGIC = b"CMUX"
+FORMAT_VERSION = 1
+# magic, format version, byte order, cmudict version, words, prons, phones, symbols
+_HEADER = struct.Struct("<4sIc23sIIII")
+
+DEFAULT_INDEX_PATH = Path(__file__).resolve().parents[2] / "data" / "cmudict.idx"
+
+
+def _source_version() -> str:
+    try:
+        return metadata.version("cmudict")
+    except metadata.PackageNotFoundError:
+        return ""
+
+
+def _cmudict_entries() -> List[Tuple[str, List[str]]]:
+    import cmudict
+    return cmudict.entries()
+
+
+def build_index(path, entries: Optional[Iterable[Tuple[str, List[str]]]] = None,
+                source_version: Optional[str] = None) -> int:
+    """Compile (word, phones) entries (default: the installed cmudict) to `path`.
+
+    Pronunciation variants keep their source order. Written to a temp file
+    and renamed, so concurrent builders and readers never see a partial
+    index. Returns the number of words.
+    """
+    if entries is None:
+        entries = _cmudict_entries()
+        source_version = _source_version() if source_version is None else source_version
+    prons = {}
+    for word, phones in entries:
+        prons.setdefault(word.lower(), []).append(phones)
+
+    symbols = sorted({p for variants in prons.values() for phones in variants for p in phones})
+    if len(symbols) > 255:
+        raise ValueError(f"too many phone symbols for one-byte codes: {len(symbols)}")
+    code = {s: i for i, s in enumerate(symbols)}
+
+    keys = sorted(prons, key=lambda w: w.encode("utf-8"))
+    key_bytes = bytearray()
+    key_offsets = array("I", [0])
+    pron_offsets = array("I", [0])
+    phone_offsets = array("I", [0])
+    phone_codes = bytearray()
+    for word in keys:
+        key_bytes += word.encode("utf-8")
+        key_offsets.append(len(key_bytes))
+        for phones in prons[word]:
+            phone_codes += bytes(code[p] for p in phones)
+            phone_offsets.append(len(phone_codes))
+        pron_offsets.append(len(phone_offsets) - 1)
+
+    symbol_blob = " ".join(symbols).encode("ascii")
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, sys.byteorder[0].encode(),
+                          (source_version or "").encode("ascii")[:23],
+                          len(keys), len(phone_offsets) - 1, len(phone_codes), len(symbol_blob))
+    # offset tables are native-endian uint32, aligned to 4 bytes
+    head = header + symbol_blob
+    head += b"\0" * (-len(head) % 4)
+    body = key_offsets.tobytes() + pron_offsets.tobytes() + phone_offsets.tobytes()
+    key_pad = b"\0" * (-len(key_bytes) % 4)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.part")
+    with open(tmp, "wb") as f:
+        f.write(head)
+        f.write(body)
+        f.write(key_bytes)
+        f.write(key_pad)
+        f.write(phone_codes)
+    os.replace(tmp, path)
+    return len(keys)
+
+
+class PronIndex:
+    """Read-only view over one compiled index file."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mm)
+        self._tables = ()
+        try:
+            self._map()
+        except Exception:
+            self.close()
+            raise
+
+    def _map(self):
+        mm = self._mm
+        if len(mm) < _HEADER.size:
+            raise ValueError(f"{self.path} is truncated or corrupt")
+        (magic, fmt, order, version, n_words, n_prons, n_phones,
+         symbol_len) = _HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            raise ValueError(f"{self.path} is not a pronunciation index (format {FORMAT_VERSION})")
+        if order != sys.byteorder[0].encode():
+            raise ValueError(f"{self.path} was built on a machine with another byte order")
+        self.source_version = version.rstrip(b"\0").decode("ascii")
+        pos = _HEADER.size
+        self.symbols = mm[pos:pos + symbol_len].decode("ascii").split()
+        pos += symbol_len + (-(pos + symbol_len) % 4)
+
+        view = self._view
+        self._key_offsets = view[pos:pos + 4 * (n_words + 1)].cast("I")
+        pos += 4 * (n_words + 1)
+        self._pron_offsets = view[pos:pos + 4 * (n_words + 1)].cast("I")
+        pos += 4 * (n_words + 1)
+        self._phone_offsets = view[pos:pos + 4 * (n_prons + 1)].cast("I")
+        pos += 4 * (n_prons + 1)
+        self._tables = (self._key_offsets, self._pron_offsets, self._phone_offsets)
+        self._keys_at = pos
+        key_len = self._key_offsets[n_words]
+        pos += key_len + (-key_len % 4)
+        self._phones_at = pos
+        if pos + n_phones != len(mm):
+            raise ValueError(f"{self.path} is truncated or corrupt")
+        self.words = n_words
+
+    def _key(self, i: int) -> bytes:
+        return self._mm[self._keys_at + self._key_offsets[i]:self._keys_at + self._key_offsets[i + 1]]
+
+    def find(self, word: str) -> int:
+        """Position of `word` in the sorted key table, or -1 (binary search)."""
+        target = word.lower().strip().encode("utf-8")
+        lo, hi = 0, self.words
+        while lo < hi:
+            mid = (lo + hi) // 2
+            key = self._key(mid)
+            if key < target:
+                lo = mid + 1
+            elif key > target:
+                hi = mid
+            else:
+                return mid
+        return -1
+
+    def codes(self, word: str) -> Optional[List[bytes]]:
+        """Pronunciations as raw phone-code strings (indexes into `symbols`)."""
+        i = self.find(word)
+        if i < 0:
+            return None
+        at = self._phones_at
+        return [self._mm[at + self._phone_offsets[p]:at + self._phone_offsets[p + 1]]
+                for p in range(self._pron_offsets[i], self._pron_offsets[i + 1])]
+
+    def get(self, word: str, default=None):
+        """Pronunciations of `word` as lists of ARPAbet symbols, like cmudict.dict()[word]."""
+        variants = self.codes(word)
+        if variants is None:
+            return default
+        symbols = self.symbols
+        return [[symbols[c] for c in variant] for variant in variants]
+
+    def __contains__(self, word: str) -> bool:
+        return self.find(word) >= 0
+
+    def __len__(self) -> int:
+        return self.words
+
+    def close(self):
+        # the offset tables are views into the map: release them before unmapping
+        for table in self._tables:
+            table.release()
+        self._view.release()
+        self._mm.close()
+
+
+class PronLexicon:
+    """Process-wide lexicon: maps the index on first lookup, building it if needed."""
+
+    def __init__(self, path=None):
+        self.path = Path(path or os.getenv("CMU_INDEX_PATH") or DEFAULT_INDEX_PATH)
+        self._index = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _open(self) -> Optional[PronIndex]:
+        try:
+            index = PronIndex(self.path)
+            installed = _source_version()
+            if not installed or index.source_version == installed:
+                return index
+            index.close()
+            print(f"CMUdict index {self.path} is from cmudict {index.source_version}, rebuilding")
+        except FileNotFoundError:
+            print(f"CMUdict index {self.path} missing, building it")
+        except ValueError as e:
+            print(f"CMUdict index unusable ({e}), rebuilding")
+        try:
+            build_index(self.path)
+            return PronIndex(self.path)
+        except Exception as e:
+            print(f"CMUdict index unavailable (non-fatal): {e}")
+            return None
+
+    def index(self) -> Optional[PronIndex]:
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._index = self._open()
+                    self._loaded = True
+        return self._index
+
+    def get(self, word: str, default=None):
+        index = self.index()
+        return default if index is None else index.get(word, default)
+
+    def __contains__(self, word: str) -> bool:
+        index = self.index()
+        return index is not None and word in index
+
+
+# Singleton instance
+lexicon = PronLexicon()
+
+
+if __name__ == "__main__":
+    target = Path(sys.argv[1]) if len(sys.argv) > 1 else lexicon.path
+    print(f"Built {target}: {build_index(target)} words")
@@ -1,21 +1,28 @@
 from typing import Dict, Optional
 import azure.cognitiveservices.speech as speechsdk
-import os
 import re
 import json
-import wave
-import array
 import difflib
 
-try:
-    import cmudict
-    _CMU = cmudict.dict()
-except Exception:
-    _CMU = {}
-import tempfile
-from pydub import AudioSegment
+import numpy as np
 
 from app.core.config import settings
+from app.services import acoustic_features
+from app.services.audio_ingest import mp3_for
+from app.services.audio_preflight import SOURCE_CLOCK, audio_preflight, shift_offsets
+from app.services.audio_preprocess import DecodedAudio
+from app.services.continuous_segments import score_segmented
+from app.services.pron_lexicon import lexicon
+from app.services.scoring_alignment import align
+from app.services.provider_health import scorer_health
+from app.services.score_cache import score_cache
+from app.services.scoring_cascade import ScoringCascade, ScoringProvider, ScoringRequest, last_error
+from app.services.scoring_metrics import carry, span, traced
+
+# Version of the scoring rules (strict layer, continuous mapping). Bump it
+# whenever _apply_strict_scoring or the result mapping changes: cached
+# results are addressed by it and all older ones stop matching.
+SCORING_RULES_VERSION = "strict-2026.10-segmented"
 
 
 class PronunciationService:
@@ -28,6 +35,40 @@ class PronunciationService:
         else:
             self.enabled = True
 
+        from app.services import scoring_node, xf_ise_service
+        from app.services.shadow_service import gop_available, gop_probe
+
+        # provider registries, in priority order; hedge_after is the wait
+        # before the next provider is started while no latency history exists
+        self.word_cascade = ScoringCascade("word", [
+            ScoringProvider("xfyun_node", self._xfyun_node_word, scoring_node.node_available, hedge_after=8.0),
+            ScoringProvider("xfyun_direct", self._xfyun_direct_word, xf_ise_service.available, hedge_after=6.0),
+            ScoringProvider("azure", self._azure_word, lambda: self.enabled, hedge_after=8.0),
+            ScoringProvider("gop", self._gop_word, gop_available, hedge_after=10.0, fallback=True),
+        ])
+        self.continuous_cascade = ScoringCascade("continuous", [
+            ScoringProvider("xfyun_node", self._xfyun_node_continuous, scoring_node.node_available, hedge_after=60.0),
+            ScoringProvider("xfyun_direct", self._xfyun_direct_continuous, xf_ise_service.available, hedge_after=45.0),
+            ScoringProvider("azure", self._azure_continuous, lambda: self.enabled, hedge_after=90.0),
+        ])
+
+        # circuit breakers probe these while a provider is failing
+        scorer_health.register("xfyun_node", scoring_node.probe_node)
+        scorer_health.register("xfyun_direct", xf_ise_service.probe_direct)
+        scorer_health.register("azure", self._azure_probe)
+        scorer_health.register("gop", gop_probe)
+
+    @staticmethod
+    def _azure_probe() -> bool:
+        """Issue an STS token: proves key, region and service are all up."""
+        import requests
+        resp = requests.post(
+            f"https://{settings.AZURE_REGION}.api.cognitive.microsoft.com/sts/v1.0/issueToken",
+            headers={"Ocp-Apim-Subscription-Key": settings.AZURE_SPEECH_KEY or ""},
+            timeout=5,
+        )
+        return resp.status_code == 200
+
     def _convert_to_azure_format(self, audio_file_path: str) -> str:
         """
         Convert audio file to Azure-compatible format:
@@ -36,38 +77,13 @@ class PronunciationService:
         - 16-bit PCM
         - Mono channel
 
-        Returns path to converted file (temporary file)
+        Only for consumers that need a file path; the scoring paths share one
+        in-memory decode (DecodedAudio). Returns path to converted file
+        (temporary file, on tmpfs when available)
         """
         try:
-            # Load audio file
-            audio = AudioSegment.from_file(audio_file_path)
-
-            # Convert to mono
-            audio = audio.set_channels(1)
-
-            # Convert to 16kHz sample rate
-            audio = audio.set_frame_rate(16000)
-
-            # Convert to 16-bit
-            audio = audio.set_sample_width(2)  # 2 bytes = 16 bits
-
-            # Create temporary file for converted audio
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
-            temp_path = temp_file.name
-            temp_file.close()
-
-            # Export as WAV with correct format
-            audio.export(
-                temp_path,
-                format='wav',
-                parameters=['-acodec', 'pcm_s16le']  # 16-bit PCM
-            )
-
+            temp_path = DecodedAudio.from_file(audio_file_path).write_temp_wav()
             print(f"Audio converted to Azure format: {temp_path}")
-            print(f"  Sample rate: {audio.frame_rate}Hz")
-            print(f"  Channels: {audio.channels}")
-            print(f"  Sample width: {audio.sample_width} bytes")
-
             return temp_path
 
         except Exception as e:
@@ -75,9 +91,10 @@ class PronunciationService:
             # If conversion fails, return original file
             return audio_file_path
 
+    @traced("word")
     def assess_pronunciation(self, audio_file_path: str, reference_text: str) -> Optional[Dict]:
         """
-        Assess pronunciation using Azure Speech Service
+        Assess pronunciation through the provider cascade (xfyun, Azure, GOP)
 
         Args:
             audio_file_path: Path to the audio file
@@ -86,205 +103,205 @@ class PronunciationService:
         Returns:
             dict with assessment results or None if service not configured
         """
-        # 讯飞语音评测优先：国内节点、独立额度、少儿优化，不受 Azure 跨境/配额影响
-        xf_result = self._try_xfyun(audio_file_path, reference_text)
-        if xf_result is not None:
-            return xf_result
+        if not self.word_cascade.available_providers():
+            # Return mock data for development/testing
+            return self._get_mock_assessment(reference_text)
+
+        # decode once; every scorer below reads this in-memory PCM
+        try:
+            with span("decode"):
+                audio = DecodedAudio.from_file(audio_file_path)
+        except Exception as e:
+            print(f"Error decoding audio: {e}")
+            return {"error": f"无法解码音频：{e}", "pronunciation_score": 0}
+
+        # silent / truncated / distorted takes never reach a paid scorer
+        with span("preflight"):
+            preflight = audio_preflight.check(audio, "word", len(self.word_cascade.available_providers()))
+        if not preflight.ok:
+            return preflight.rejection()
+
+        # identical take for the same word already scored: replay it
+        with span("cache_lookup"):
+            cache_key = score_cache.key_for(audio.pcm, reference_text, "word", SCORING_RULES_VERSION)
+            cached = score_cache.get(cache_key)
+        audio = preflight.audio
+        if cached is not None:
+            return cached
+
+        # 讯飞优先（国内节点、独立额度、少儿优化），Azure 次之，自建 GOP 兜底；
+        # 慢的服务不再独占整个等待时间，见 scoring_cascade
+        with span("cascade"):
+            result, timings = self.word_cascade.run(audio, reference_text, settings.SCORING_WORD_BUDGET)
+        if result is not None:
+            score_cache.put(cache_key, result)
+            return result
 
         if not self.enabled:
             # Return mock data for development/testing
             return self._get_mock_assessment(reference_text)
 
-        converted_file_path = None
-        transcribe_future = None
-        try:
-            # Convert audio to Azure-compatible format
-            converted_file_path = self._convert_to_azure_format(audio_file_path)
-
-            # kick off the unbiased second-pass transcription in parallel with
-            # the pronunciation assessment call — halves Azure round-trip time.
-            # It gets its own copy of the wav: two recognizers streaming the
-            # same file handle makes the SDK cancel the session.
-            import shutil as _shutil
-            from concurrent.futures import ThreadPoolExecutor
-            transcribe_copy = converted_file_path + ".stt.wav"
-            _shutil.copyfile(converted_file_path, transcribe_copy)
-
-            def _transcribe_and_cleanup(path):
-                try:
-                    return self._plain_transcribe(path)
-                finally:
-                    try:
-                        os.remove(path)
-                    except OSError:
-                        pass
-
-            from app.services.shadow_service import gop_transcribe_sync
-            gop_copy = converted_file_path + ".gop.wav"
-            _shutil.copyfile(converted_file_path, gop_copy)
-
-            def _gop_and_cleanup(path, ref):
-                try:
-                    return gop_transcribe_sync(path, ref)
-                finally:
-                    try:
-                        os.remove(path)
-                    except OSError:
-                        pass
-
-            _executor = ThreadPoolExecutor(max_workers=2)
-            transcribe_future = _executor.submit(_transcribe_and_cleanup, transcribe_copy)
-            gop_future = _executor.submit(_gop_and_cleanup, gop_copy, reference_text)
-            _executor.shutdown(wait=False)
-
-            # Configure speech service
-            speech_config = speechsdk.SpeechConfig(
-                subscription=settings.AZURE_SPEECH_KEY,
-                region=settings.AZURE_REGION
-            )
-            speech_config.speech_recognition_language = "en-US"
+        error = last_error(timings)
+        return {
+            "error": f"语音识别失败：{error[:100]}" if error else "语音识别超时",
+            "pronunciation_score": 0,
+            "provider_timings": timings
+        }
 
-            # Configure pronunciation assessment
-            pronunciation_config = speechsdk.PronunciationAssessmentConfig(
-                reference_text=reference_text,
-                grading_system=speechsdk.PronunciationAssessmentGradingSystem.HundredMark,
-                granularity=speechsdk.PronunciationAssessmentGranularity.Phoneme,
-                enable_miscue=True
-            )
-            # prosody assessment: stress / intonation / rhythm (en-US)
-            try:
-                pronunciation_config.enable_prosody_assessment()
-            except Exception as e:
-                print(f"Prosody assessment unavailable: {e}")
+    def _azure_word(self, request: ScoringRequest) -> Optional[Dict]:
+        """Azure pronunciation assessment of a single word or phrase.
 
-            # Configure audio input with converted file
-            audio_config = speechsdk.audio.AudioConfig(filename=converted_file_path)
+        Returns the strict-scored assessment, an error dict when no speech
+        was recognized, or raises when Azure cancelled (quota / service
+        error) so the cascade moves on to the next provider.
+        """
+        audio, reference_text = request.audio, request.reference
+
+        # kick off the unbiased second-pass transcription and the GOP
+        # second opinion in parallel with the pronunciation assessment
+        # call — halves Azure round-trip time. Each recognizer reads its
+        # own push stream: two recognizers sharing one file handle makes
+        # the SDK cancel the session.
+        from concurrent.futures import ThreadPoolExecutor
+        from app.services.shadow_service import gop_transcribe_sync
+
+        def gop_second_opinion(wav: bytes):
+            with span("gop.transcribe"):
+                return gop_transcribe_sync(wav, reference_text)
+
+        _executor = ThreadPoolExecutor(max_workers=2)
+        transcribe_future = _executor.submit(carry(self._plain_transcribe), audio)
+        gop_future = None
+        if scorer_health.allow("gop"):
+            gop_future = _executor.submit(carry(gop_second_opinion), audio.wav_bytes())
+        _executor.shutdown(wait=False)
+
+        # Configure speech service
+        speech_config = speechsdk.SpeechConfig(
+            subscription=settings.AZURE_SPEECH_KEY,
+            region=settings.AZURE_REGION
+        )
+        speech_config.speech_recognition_language = "en-US"
+
+        # Configure pronunciation assessment
+        pronunciation_config = speechsdk.PronunciationAssessmentConfig(
+            reference_text=reference_text,
+            grading_system=speechsdk.PronunciationAssessmentGradingSystem.HundredMark,
+            granularity=speechsdk.PronunciationAssessmentGranularity.Phoneme,
+            enable_miscue=True
+        )
+        # prosody assessment: stress / intonation / rhythm (en-US)
+        try:
+            pronunciation_config.enable_prosody_assessment()
+        except Exception as e:
+            print(f"Prosody assessment unavailable: {e}")
 
-            # Create recognizer
-            recognizer = speechsdk.SpeechRecognizer(
-                speech_config=speech_config,
-                audio_config=audio_config
-            )
+        # Configure audio input from the in-memory PCM
+        audio_config = audio.azure_audio_config()
+
+        # Create recognizer
+        recognizer = speechsdk.SpeechRecognizer(
+            speech_config=speech_config,
+            audio_config=audio_config
+        )
 
-            # Apply pronunciation assessment
-            pronunciation_config.apply_to(recognizer)
+        # Apply pronunciation assessment
+        pronunciation_config.apply_to(recognizer)
 
-            # Perform recognition
+        # Perform recognition
+        with span("azure.pa"):
             result = recognizer.recognize_once()
 
-            # Parse results
-            if result.reason == speechsdk.ResultReason.RecognizedSpeech:
-                pronunciation_result = speechsdk.PronunciationAssessmentResult(result)
+        # Parse results
+        if result.reason == speechsdk.ResultReason.RecognizedSpeech:
+            pronunciation_result = speechsdk.PronunciationAssessmentResult(result)
 
-                # syllable-level timings from the detailed JSON (for stress analysis)
-                syllable_words = []
-                try:
-                    raw = result.properties.get(
-                        speechsdk.PropertyId.SpeechServiceResponse_JsonResult
-                    )
-                    nbest = json.loads(raw).get("NBest", [{}])[0]
-                    syllable_words = nbest.get("Words", [])
-                except Exception as e:
-                    print(f"Could not parse detailed JSON: {e}")
-
-                prosody_score = getattr(pronunciation_result, "prosody_score", None)
-                assessment = {
-                    "recognized_text": result.text,
-                    "prosody_score": prosody_score,
-                    "pronunciation_score": pronunciation_result.pronunciation_score,
-                    "accuracy_score": pronunciation_result.accuracy_score,
-                    "fluency_score": pronunciation_result.fluency_score,
-                    "completeness_score": pronunciation_result.completeness_score,
-                    "words": [
-                        {
-                            "word": word.word,
-                            "accuracy_score": word.accuracy_score,
-                            "error_type": word.error_type if hasattr(word, 'error_type') else None,
-                            "phonemes": [
-                                {
-                                    "phoneme": phoneme.phoneme,
-                                    "accuracy_score": phoneme.accuracy_score
-                                }
-                                for phoneme in word.phonemes
-                            ]
-                        }
-                        for word in pronunciation_result.words
-                    ]
-                }
-                assessment["independent_transcript"] = (
-                    transcribe_future.result(timeout=60) if transcribe_future else ""
+            # syllable-level timings from the detailed JSON (for stress analysis)
+            syllable_words = []
+            try:
+                raw = result.properties.get(
+                    speechsdk.PropertyId.SpeechServiceResponse_JsonResult
                 )
-                try:
-                    gop_heard, gop_score = gop_future.result(timeout=8)
-                except Exception:
-                    gop_heard, gop_score = None, None
-                assessment["gop_heard"] = gop_heard
-                assessment["gop_score"] = gop_score
-
-                # acoustic word-stress check for single multisyllabic words
-                if len(reference_text.split()) == 1 and syllable_words:
+                nbest = json.loads(raw).get("NBest", [{}])[0]
+                syllable_words = nbest.get("Words", [])
+            except Exception as e:
+                print(f"Could not parse detailed JSON: {e}")
+
+            prosody_score = getattr(pronunciation_result, "prosody_score", None)
+            assessment = {
+                "recognized_text": result.text,
+                "prosody_score": prosody_score,
+                "pronunciation_score": pronunciation_result.pronunciation_score,
+                "accuracy_score": pronunciation_result.accuracy_score,
+                "fluency_score": pronunciation_result.fluency_score,
+                "completeness_score": pronunciation_result.completeness_score,
+                "words": [
+                    {
+                        "word": word.word,
+                        "accuracy_score": word.accuracy_score,
+                        "error_type": word.error_type if hasattr(word, 'error_type') else None,
+                        "phonemes": [
+                            {
+                                "phoneme": phoneme.phoneme,
+                                "accuracy_score": phoneme.accuracy_score
+                            }
+                            for phoneme in word.phonemes
+                        ]
+                    }
+                    for word in pronunciation_result.words
+                ]
+            }
+            try:
+                assessment["independent_transcript"] = transcribe_future.result(
+                    timeout=max(1.0, min(60.0, request.remaining()))
+                )
+            except Exception:
+                # the assessment above stands on its own: a slow or failed
+                # cross-check must not turn it into an Azure failure
+                assessment["independent_transcript"] = None
+            try:
+                gop_heard, gop_score = gop_future.result(timeout=8) if gop_future else (None, None)
+            except Exception:
+                gop_heard, gop_score = None, None
+            assessment["gop_heard"] = gop_heard
+            assessment["gop_score"] = gop_score
+
+            # acoustic word-stress check for single multisyllabic words
+            if len(reference_text.split()) == 1 and syllable_words:
+                with span("stress_check"):
                     stress = self._check_word_stress(
-                        converted_file_path, syllable_words[0], reference_text
+                        audio.samples(), audio.sample_rate, syllable_words[0], reference_text
                     )
-                    if stress:
-                        assessment["stress_check"] = stress
+                if stress:
+                    assessment["stress_check"] = stress
 
+            with span("strict_scoring"):
                 return self._apply_strict_scoring(assessment, reference_text)
-            elif result.reason == speechsdk.ResultReason.NoMatch:
-                return {
-                    "error": "未能识别到语音",
-                    "pronunciation_score": 0
-                }
-            else:
-                # Azure cancelled (quota exceeded / service error) -> fall back
-                # to the self-hosted GOP model so scoring never fully stops
-                details = ""
-                if result.reason == speechsdk.ResultReason.Canceled:
-                    try:
-                        details = result.cancellation_details.error_details or ""
-                    except Exception:
-                        details = ""
-                fb = self._gop_fallback(converted_file_path, reference_text)
-                if fb:
-                    return fb
-                return {
-                    "error": f"语音识别失败：{result.reason} {details[:100]}",
-                    "pronunciation_score": 0
-                }
-
-        except Exception as e:
-            import traceback
-            print(f"Error in pronunciation assessment: {e}")
-            print(f"Full traceback:")
-            traceback.print_exc()
+        elif result.reason == speechsdk.ResultReason.NoMatch:
             return {
-                "error": str(e),
+                "error": "未能识别到语音",
                 "pronunciation_score": 0
             }
-        finally:
-            # make sure the parallel transcription is finished before deleting the file
-            if transcribe_future is not None and not transcribe_future.done():
+        else:
+            # Azure cancelled (quota exceeded / service error) -> let the
+            # cascade fall through to the self-hosted GOP model
+            details = ""
+            if result.reason == speechsdk.ResultReason.Canceled:
                 try:
-                    transcribe_future.result(timeout=60)
+                    details = result.cancellation_details.error_details or ""
                 except Exception:
-                    pass
-            # Clean up temporary converted file
-            if converted_file_path and converted_file_path != audio_file_path:
-                try:
-                    if os.path.exists(converted_file_path):
-                        os.remove(converted_file_path)
-                        print(f"Cleaned up temporary file: {converted_file_path}")
-                except Exception as e:
-                    print(f"Error cleaning up temporary file: {e}")
+                    details = ""
+            raise RuntimeError(f"{result.reason} {details[:100]}")
 
     @staticmethod
-    def _check_word_stress(wav_path: str, word_detail: dict, reference_word: str):
+    def _check_word_stress(samples: np.ndarray, framerate: int, word_detail: dict, reference_word: str):
         """Detect misplaced word stress acoustically.
 
         Cues per syllable, measured on the vowel nucleus only (consonants like
         /sh/ carry loud but stress-irrelevant energy): RMS loudness, pitch (F0
-        via autocorrelation), and duration with a discount on the final
-        syllable (utterance-final lengthening otherwise biases the result).
+        via FFT autocorrelation, see acoustic_features), and duration with a
+        discount on the final syllable (utterance-final lengthening otherwise
+        biases the result).
         Expected stress position comes from CMUdict; syllable/phoneme timings
         from Azure's detailed result. Returns None when unsure.
         """
@@ -296,7 +313,7 @@ class PronunciationService:
             if len(syllables) < 2:
                 return None
 
-            prons = _CMU.get(reference_word.lower().strip())
+            prons = lexicon.get(reference_word)
             if not prons:
                 return None
             valid_primary = set()
@@ -307,45 +324,9 @@ class PronunciationService:
             if not valid_primary:
                 return None
 
-            with wave.open(wav_path, "rb") as w:
-                framerate = w.getframerate()
-                samples = array.array("h", w.readframes(w.getnframes()))
-
-            def seg(start_ticks, dur_ticks):
-                a = int(start_ticks / 1e7 * framerate)
-                b = min(len(samples), int((start_ticks + dur_ticks) / 1e7 * framerate))
-                return samples[a:b]
-
-            def rms(x):
-                return (sum(v * v for v in x) / len(x)) ** 0.5 if x else 0.0
-
-            def f0(x):
-                # autocorrelation pitch estimate, 60–400 Hz; 0 when unvoiced
-                if len(x) < int(framerate / 60) * 2:
-                    return 0.0
-                mid = x[len(x) // 5: -len(x) // 5] or x  # trim edges
-                n = len(mid)
-                energy = sum(v * v for v in mid)
-                if energy == 0:
-                    return 0.0
-                best_lag, best_corr = 0, 0.0
-                lo, hi = int(framerate / 400), int(framerate / 60)
-                step = max(1, (hi - lo) // 120)
-                # stride-matched reference energy so the voicing check is fair
-                ref = sum(mid[i] * mid[i] for i in range(0, n, 4)) or 1
-                for lag in range(lo, min(hi, n - 1), step):
-                    c = 0
-                    for i in range(0, n - lag, 4):
-                        c += mid[i] * mid[i + lag]
-                    if c > best_corr:
-                        best_corr, best_lag = c, lag
-                if best_lag == 0 or best_corr < ref * 0.3:
-                    return 0.0
-                return framerate / best_lag
-
             # map each syllable to its vowel phoneme span (fallback: full syllable)
-            cues = []
-            for i, syl in enumerate(syllables):
+            spans = []
+            for syl in syllables:
                 s_start = syl.get("Offset", 0)
                 s_end = s_start + syl.get("Duration", 0)
                 vowel_span = None
@@ -357,13 +338,8 @@ class PronunciationService:
                         break
                 if vowel_span is None:
                     vowel_span = (s_start, s_end - s_start)
-                x = seg(*vowel_span)
-                if len(x) > 40:
-                    x = x[len(x) // 5: -len(x) // 5]  # middle 60% of the vowel
-                dur = vowel_span[1] / 1e7
-                if i == len(syllables) - 1:
-                    dur *= 0.6  # utterance-final lengthening discount
-                cues.append({"rms": rms(x), "f0": f0(x), "dur": dur})
+                spans.append(vowel_span)
+            cues = acoustic_features.syllable_cues(samples, framerate, spans)
 
             max_rms = max(c["rms"] for c in cues) or 1.0
             max_dur = max(c["dur"] for c in cues) or 1.0
@@ -408,7 +384,7 @@ class PronunciationService:
             print(f"Stress check failed (non-fatal): {e}")
             return None
 
-    def _plain_transcribe(self, audio_file_path: str) -> str:
+    def _plain_transcribe(self, audio: DecodedAudio) -> str:
         """Second pass: plain STT without reference text.
 
         Pronunciation assessment aligns audio to the reference, so its
@@ -422,12 +398,12 @@ class PronunciationService:
                 region=settings.AZURE_REGION
             )
             speech_config.speech_recognition_language = "en-US"
-            audio_config = speechsdk.audio.AudioConfig(filename=audio_file_path)
             recognizer = speechsdk.SpeechRecognizer(
                 speech_config=speech_config,
-                audio_config=audio_config
+                audio_config=audio.azure_audio_config()
             )
-            result = recognizer.recognize_once()
+            with span("azure.plain_stt"):
+                result = recognizer.recognize_once()
             if result.reason == speechsdk.ResultReason.RecognizedSpeech:
                 return result.text
             return ""
@@ -462,10 +438,15 @@ class PronunciationService:
         result["heard_text"] = independent_raw.strip() or result.get("recognized_text", "")
         result["azure_pronunciation_score"] = azure_score
 
-        similarity = difflib.SequenceMatcher(None, heard, reference).ratio() if heard else 0.0
+        # compare sounds, not spelling: homophones match, near-misses are graded
+        alignment = align(reference, heard)
+        similarity = alignment.similarity
         text_match = heard == reference
         result["text_match"] = text_match
         result["recognized_similarity"] = round(similarity, 2)
+        result["phoneme_distances"] = [
+            {"word": w.word, "heard": w.heard, "distance": w.distance} for w in alignment.words
+        ]
 
         words = result.get("words") or []
         error_words = [
@@ -501,9 +482,8 @@ class PronunciationService:
                     floor = (phoneme_mean * 0.8) if phoneme_mean is not None else 0.0
                     score = min(max(harsh, floor), 60.0)
             else:
-                # phrase/sentence: token-level alignment, penalize missing or extra words
-                sm = difflib.SequenceMatcher(None, ref_tokens, heard_tokens)
-                matched = sum(b.size for b in sm.get_matching_blocks())
+                # phrase/sentence: words whose phonemes were heard, penalize missing or extra words
+                matched = alignment.matched_words
                 token_ratio = matched / max(len(ref_tokens), len(heard_tokens)) if heard_tokens else 0.0
                 result["token_match_ratio"] = round(token_ratio, 2)
                 score = azure_score * (0.35 + 0.65 * token_ratio * token_ratio)
@@ -565,92 +545,89 @@ class PronunciationService:
         result["pronunciation_score"] = score
         return result
 
-    def _try_xfyun_continuous(self, reference_words, audio_file_path):
-        """连读多词评测（讯飞 read_word 多词）。返回连读结果 dict 或 None。"""
-        try:
-            from app.services import xf_ise_service
-            if not xf_ise_service.available():
-                return None
-            converted = self._convert_to_azure_format(audio_file_path)
-            try:
-                # 连读优先境内节点(能扛长音频);节点不可用再本地讯飞(仅≤20词稳)
-                r = xf_ise_service.assess_via_node(converted, reference_words)
-                if r is None and len(reference_words) <= 20:
-                    r = xf_ise_service.assess_words(converted, reference_words)
-            finally:
-                try:
-                    if converted and converted != audio_file_path and os.path.exists(converted):
-                        os.remove(converted)
-                except OSError:
-                    pass
-            if not r or not r.get("words"):
-                return None
-            # 组装成连读结果结构（对齐 assess_continuous_reading 输出）
-            heard = {w["word"].lower(): w for w in r["words"]}
-            per_word = []
-            for ref in reference_words:
-                w = heard.get(ref.lower())
-                if not w or w.get("error_type") == "Omission":
-                    per_word.append({"word": ref, "score": 0, "error": "漏读"})
-                else:
-                    sc = w.get("accuracy_score") or 0
-                    per_word.append({"word": ref, "score": sc,
-                                     "error": None if sc >= 60 else "发音错误"})
-            read = [p for p in per_word if p["error"] != "漏读"]
-            return {
-                "mode": "continuous", "scorer": "xfyun",
-                "pronunciation_score": r.get("pronunciation_score", 0),
-                "accuracy_score": r.get("accuracy_score"),
-                "completeness_score": round(len(read) / len(reference_words) * 100, 1) if reference_words else 0,
-                "fluency_score": None,
-                "recognized_text": r.get("recognized_text", ""),
-                "words_read": len(read), "words_total": len(reference_words),
-                "per_word": per_word,
-            }
-        except Exception as e:
-            print(f"xfyun continuous failed, falling back: {e}")
+    @staticmethod
+    def _xfyun_continuous_result(reference_words, r):
+        """把讯飞逐词结果组装成连读结果结构（对齐 assess_continuous_reading 输出）。"""
+        if not r or not r.get("words"):
             return None
+        heard = {w["word"].lower(): w for w in r["words"]}
+        per_word = []
+        for ref in reference_words:
+            w = heard.get(ref.lower())
+            if not w or w.get("error_type") == "Omission":
+                per_word.append({"word": ref, "score": 0, "error": "漏读"})
+            else:
+                sc = w.get("accuracy_score") or 0
+                per_word.append({"word": ref, "score": sc,
+                                 "error": None if sc >= 60 else "发音错误"})
+        read = [p for p in per_word if p["error"] != "漏读"]
+        return {
+            "mode": "continuous", "scorer": "xfyun",
+            "pronunciation_score": r.get("pronunciation_score", 0),
+            "accuracy_score": r.get("accuracy_score"),
+            "completeness_score": round(len(read) / len(reference_words) * 100, 1) if reference_words else 0,
+            "fluency_score": None,
+            "recognized_text": r.get("recognized_text", ""),
+            "words_read": len(read), "words_total": len(reference_words),
+            "per_word": per_word,
+        }
 
-    def _try_xfyun(self, audio_file_path: str, reference_text: str):
-        """讯飞评测（主）。返回评分 dict；未配置/失败/乱读被拒时返回 None 走 Azure。"""
-        try:
-            from app.services import xf_ise_service
-            if not xf_ise_service.available():
-                return None
-            converted = self._convert_to_azure_format(audio_file_path)
-            try:
-                # 优先境内评分节点（低延迟）；无节点或失败再本地直连讯飞
-                r = xf_ise_service.assess_via_node(converted, [reference_text])
-                if r is None:
-                    r = xf_ise_service.assess_word(converted, reference_text)
-            finally:
-                try:
-                    if converted and converted != audio_file_path and os.path.exists(converted):
-                        os.remove(converted)
-                except OSError:
-                    pass
-            # 乱读被判 reject（可能误判）→ 回退 Azure 复核
-            if not r or r.get("rejected"):
-                return None
-            return r
-        except Exception as e:
-            print(f"xfyun scoring failed, falling back: {e}")
-            return None
+    def _xfyun_node_continuous(self, request: ScoringRequest):
+        """连读优先境内节点（能扛长音频）。"""
+        from app.services import scoring_node
+        mp3_path = mp3_for(request.audio.path)
+        r = scoring_node.assess_via_node(request.audio.wav_bytes(), request.reference,
+                                         poll_timeout=request.remaining(), mp3_path=mp3_path)
+        if r is None:
+            raise RuntimeError("scoring node returned no result")
+        result = self._xfyun_continuous_result(request.reference, r)
+        if result is not None and mp3_path:
+            result[SOURCE_CLOCK] = True  # 节点评的是未裁剪的原始 MP3
+        return result
 
-    def _gop_fallback(self, wav_path: str, reference_text: str):
-        """Score with the self-hosted GOP model when Azure is unavailable."""
-        try:
-            from app.services.shadow_service import gop_assess_full
-            fb = gop_assess_full(wav_path, reference_text)
-            if not fb:
-                return None
-            # run the same strict layer; it degrades gracefully without prosody
-            fb = self._apply_strict_scoring(fb, reference_text)
-            fb["fallback"] = True
-            return fb
-        except Exception as e:
-            print(f"GOP fallback failed: {e}")
+    def _xfyun_direct_continuous(self, request: ScoringRequest):
+        """本地直连讯飞，仅 ≤20 词稳定。"""
+        from app.services import xf_ise_service
+        if len(request.reference) > 20:
+            return None
+        r = xf_ise_service.assess_words(request.audio.pcm, request.reference)
+        if r is None:
+            raise RuntimeError("xfyun returned no result")
+        return self._xfyun_continuous_result(request.reference, r)
+
+    def _xfyun_node_word(self, request: ScoringRequest):
+        """境内评分节点（低延迟）。乱读被判 reject（可能误判）→ 交给下一个评分服务复核。"""
+        from app.services import scoring_node
+        r = scoring_node.assess_via_node(request.audio.wav_bytes(), [request.reference],
+                                         poll_timeout=request.remaining(),
+                                         mp3_path=mp3_for(request.audio.path))
+        if r is None:
+            raise RuntimeError("scoring node returned no result")
+        if r.get("rejected"):
+            return None
+        return r
+
+    def _xfyun_direct_word(self, request: ScoringRequest):
+        """本地直连讯飞。乱读被判 reject → 交给下一个评分服务复核。"""
+        from app.services import xf_ise_service
+        r = xf_ise_service.assess_word(request.audio.pcm, request.reference)
+        if r is None:
+            raise RuntimeError("xfyun returned no result")
+        if r.get("rejected"):
             return None
+        return r
+
+    def _gop_word(self, request: ScoringRequest):
+        """Score with the self-hosted GOP model, the last resort in the cascade."""
+        from app.services.shadow_service import gop_assess_full
+        fb = gop_assess_full(request.audio.wav_bytes(), request.reference,
+                             timeout=max(1.0, min(30.0, request.remaining())))
+        if not fb:
+            raise RuntimeError("GOP returned no result")
+        # run the same strict layer; it degrades gracefully without prosody
+        fb = self._apply_strict_scoring(fb, request.reference)
+        fb["fallback"] = True
+        return fb
 
     def _get_mock_assessment(self, reference_text: str) -> Dict:
         """
@@ -700,15 +677,14 @@ class PronunciationService:
 
 # Singleton instance
 
-    def _plain_transcribe_continuous(self, audio_file_path: str) -> str:
-        """Unbiased full-file transcription using continuous recognition."""
+    def _plain_transcribe_continuous(self, audio_config) -> str:
+        """Unbiased full-recording transcription using continuous recognition."""
         try:
             speech_config = speechsdk.SpeechConfig(
                 subscription=settings.AZURE_SPEECH_KEY,
                 region=settings.AZURE_REGION
             )
             speech_config.speech_recognition_language = "en-US"
-            audio_config = speechsdk.audio.AudioConfig(filename=audio_file_path)
             recognizer = speechsdk.SpeechRecognizer(
                 speech_config=speech_config, audio_config=audio_config
             )
@@ -721,14 +697,16 @@ class PronunciationService:
             )
             recognizer.session_stopped.connect(lambda evt: done.set())
             recognizer.canceled.connect(lambda evt: done.set())
-            recognizer.start_continuous_recognition()
-            done.wait(timeout=180)
-            recognizer.stop_continuous_recognition()
+            with span("azure.plain_stt", mode="continuous"):
+                recognizer.start_continuous_recognition()
+                done.wait(timeout=180)
+                recognizer.stop_continuous_recognition()
             return " ".join(texts)
         except Exception as e:
             print(f"Continuous transcription failed (non-fatal): {e}")
             return ""
 
+    @traced("continuous")
     def assess_continuous_reading(self, audio_file_path: str, reference_words: list) -> Dict:
         """Assess one continuous recording of many words (test mode).
 
@@ -736,211 +714,331 @@ class PronunciationService:
         with miscue enabled, so omitted/inserted words are flagged. Returns an
         overall score plus a per-reference-word breakdown.
         """
-        reference_text = " ".join(reference_words)
-
-        # 讯飞优先（经境内节点，长连读也稳）；失败回退 Azure
-        xf = self._try_xfyun_continuous(reference_words, audio_file_path)
-        if xf is not None:
-            return xf
-
-        if not self.enabled:
+        if not self.continuous_cascade.available_providers():
             return {"error": "未配置语音服务", "pronunciation_score": 0, "per_word": []}
 
-        converted = None
-        transcribe_future = None
         try:
-            converted = self._convert_to_azure_format(audio_file_path)
-
-            # unbiased transcript in parallel, on its own copy of the file
-            import shutil as _shutil
-            from concurrent.futures import ThreadPoolExecutor
-            stt_copy = converted + ".stt.wav"
-            _shutil.copyfile(converted, stt_copy)
+            with span("decode"):
+                audio = DecodedAudio.from_file(audio_file_path)
+        except Exception as e:
+            print(f"Error decoding audio: {e}")
+            return {"error": f"无法解码音频：{e}", "pronunciation_score": 0, "per_word": []}
+
+        with span("preflight"):
+            preflight = audio_preflight.check(audio, "continuous", len(self.continuous_cascade.available_providers()))
+        if not preflight.ok:
+            return preflight.rejection()
+
+        with span("cache_lookup"):
+            cache_key = score_cache.key_for(audio.pcm, "\n".join(reference_words), "continuous",
+                                            SCORING_RULES_VERSION)
+            cached = score_cache.get(cache_key)
+        audio = preflight.audio  # silence trimmed
+        if cached is not None:
+            return cached
+
+        # long takes: word groups cut at pauses, scored concurrently
+        import time
+        started = time.monotonic()
+        with span("segmented"):
+            result, timings = score_segmented(
+                self.continuous_cascade, audio, reference_words, settings.SCORING_CONTINUOUS_BUDGET,
+                settings.CONTINUOUS_SEGMENT_WORDS, settings.CONTINUOUS_SEGMENT_MARGIN,
+                settings.CONTINUOUS_SEGMENT_WORKERS,
+            )
+        if result is None:
+            # 讯飞优先（经境内节点，长连读也稳）；失败或超时回退 Azure
+            with span("whole_take"):
+                result, whole_timings = self.continuous_cascade.run(
+                    audio, reference_words,
+                    max(0.0, settings.SCORING_CONTINUOUS_BUDGET - (time.monotonic() - started))
+                )
+            timings += whole_timings
+        if result is not None:
+            shift_offsets(result, preflight.lead_ms)
+            score_cache.put(cache_key, result)
+            return result
+        return {"error": last_error(timings) or "语音识别超时", "pronunciation_score": 0,
+                "per_word": [], "provider_timings": timings}
+
+    def _azure_continuous(self, request: ScoringRequest) -> Optional[Dict]:
+        """Azure continuous recognition with miscue over the whole recording.
+
+        Raises on service-side failure (quota, timeout, network) so the
+        cascade never scores an empty result as "everything omitted".
+        """
+        audio = request.audio
+        session = self._start_azure_continuous(
+            request.reference, audio.azure_audio_config(), audio.azure_audio_config()
+        )
+        return self._finish_azure_continuous(session, request.remaining)
 
-            def _stt(path):
-                try:
-                    return self._plain_transcribe_continuous(path)
-                finally:
-                    try:
-                        os.remove(path)
-                    except OSError:
-                        pass
+    def start_live_continuous(self, reference_words: list) -> Optional["LiveContinuousSession"]:
+        """Azure continuous recognition fed while the student is still reading.
 
-            _ex = ThreadPoolExecutor(max_workers=1)
-            transcribe_future = _ex.submit(_stt, stt_copy)
-            _ex.shutdown(wait=False)
+        None when Azure is not configured or its circuit is open; the caller
+        then scores the persisted take through the cascade instead.
+        """
+        if not self.enabled or not scorer_health.allow("azure"):
+            return None
+        return LiveContinuousSession(self, reference_words)
 
-            speech_config = speechsdk.SpeechConfig(
-                subscription=settings.AZURE_SPEECH_KEY,
-                region=settings.AZURE_REGION
-            )
-            speech_config.speech_recognition_language = "en-US"
-            pa_config = speechsdk.PronunciationAssessmentConfig(
-                reference_text=reference_text,
-                grading_system=speechsdk.PronunciationAssessmentGradingSystem.HundredMark,
-                granularity=speechsdk.PronunciationAssessmentGranularity.Phoneme,
-                enable_miscue=True
-            )
-            audio_config = speechsdk.audio.AudioConfig(filename=converted)
-            recognizer = speechsdk.SpeechRecognizer(
-                speech_config=speech_config, audio_config=audio_config
-            )
-            pa_config.apply_to(recognizer)
+    def _start_azure_continuous(self, reference_words: list, pa_audio_config, plain_audio_config) -> dict:
+        """Start miscue PA and the unbiased transcript, each on its own audio input.
 
-            import threading as _threading
-            azure_words = []
-            texts = []
-            fluency_parts = []
-            done = _threading.Event()
+        The inputs are push streams: filled up front for an uploaded take, or
+        written chunk by chunk while the student reads (LiveContinuousSession).
+        """
+        reference_text = " ".join(reference_words)
 
-            def on_recognized(evt):
-                if evt.result.reason != speechsdk.ResultReason.RecognizedSpeech:
-                    return
-                texts.append(evt.result.text)
+        # unbiased transcript in parallel, on its own push stream
+        from concurrent.futures import ThreadPoolExecutor
+        _ex = ThreadPoolExecutor(max_workers=1)
+        transcribe_future = _ex.submit(carry(self._plain_transcribe_continuous), plain_audio_config)
+        _ex.shutdown(wait=False)
+
+        speech_config = speechsdk.SpeechConfig(
+            subscription=settings.AZURE_SPEECH_KEY,
+            region=settings.AZURE_REGION
+        )
+        speech_config.speech_recognition_language = "en-US"
+        pa_config = speechsdk.PronunciationAssessmentConfig(
+            reference_text=reference_text,
+            grading_system=speechsdk.PronunciationAssessmentGradingSystem.HundredMark,
+            granularity=speechsdk.PronunciationAssessmentGranularity.Phoneme,
+            enable_miscue=True
+        )
+        recognizer = speechsdk.SpeechRecognizer(
+            speech_config=speech_config, audio_config=pa_audio_config
+        )
+        pa_config.apply_to(recognizer)
+
+        import threading as _threading
+        azure_words = []
+        texts = []
+        fluency_parts = []
+        done = _threading.Event()
+
+        def on_recognized(evt):
+            if evt.result.reason != speechsdk.ResultReason.RecognizedSpeech:
+                return
+            texts.append(evt.result.text)
+            try:
+                pr = speechsdk.PronunciationAssessmentResult(evt.result)
+                if pr.fluency_score is not None:
+                    fluency_parts.append(float(pr.fluency_score))
+                # word timing comes from the detailed JSON (ticks of 100ns)
+                timing = []
                 try:
-                    pr = speechsdk.PronunciationAssessmentResult(evt.result)
-                    if pr.fluency_score is not None:
-                        fluency_parts.append(float(pr.fluency_score))
-                    # word timing comes from the detailed JSON (ticks of 100ns)
+                    raw = evt.result.properties.get(
+                        speechsdk.PropertyId.SpeechServiceResponse_JsonResult
+                    )
+                    jwords = json.loads(raw).get("NBest", [{}])[0].get("Words", [])
+                    timing = [(jw.get("Offset"), jw.get("Duration")) for jw in jwords]
+                except Exception:
                     timing = []
-                    try:
-                        raw = evt.result.properties.get(
-                            speechsdk.PropertyId.SpeechServiceResponse_JsonResult
-                        )
-                        jwords = json.loads(raw).get("NBest", [{}])[0].get("Words", [])
-                        timing = [(jw.get("Offset"), jw.get("Duration")) for jw in jwords]
-                    except Exception:
-                        timing = []
-                    for i, w in enumerate(pr.words):
-                        off, dur = timing[i] if i < len(timing) else (None, None)
-                        azure_words.append({
-                            "word": w.word,
-                            "accuracy_score": w.accuracy_score,
-                            "error_type": getattr(w, "error_type", None),
-                            "offset_ms": int(off / 10000) if off is not None else None,
-                            "end_ms": int((off + dur) / 10000) if off is not None and dur is not None else None,
-                        })
-                except Exception as e:
-                    print(f"PA parse error (segment): {e}")
-
-            cancel_info = {}
-            def on_canceled(evt):
-                d = evt.cancellation_details
-                if d and d.reason == speechsdk.CancellationReason.Error:
-                    cancel_info["error"] = d.error_details or "recognition canceled"
-                done.set()
-            recognizer.recognized.connect(on_recognized)
-            recognizer.session_stopped.connect(lambda evt: done.set())
-            recognizer.canceled.connect(on_canceled)
-            recognizer.start_continuous_recognition()
-            finished = done.wait(timeout=240)
+                for i, w in enumerate(pr.words):
+                    off, dur = timing[i] if i < len(timing) else (None, None)
+                    azure_words.append({
+                        "word": w.word,
+                        "accuracy_score": w.accuracy_score,
+                        "error_type": getattr(w, "error_type", None),
+                        "offset_ms": int(off / 10000) if off is not None else None,
+                        "end_ms": int((off + dur) / 10000) if off is not None and dur is not None else None,
+                    })
+            except Exception as e:
+                print(f"PA parse error (segment): {e}")
+
+        cancel_info = {}
+        def on_canceled(evt):
+            d = evt.cancellation_details
+            if d and d.reason == speechsdk.CancellationReason.Error:
+                cancel_info["error"] = d.error_details or "recognition canceled"
+            done.set()
+        recognizer.recognized.connect(on_recognized)
+        recognizer.session_stopped.connect(lambda evt: done.set())
+        recognizer.canceled.connect(on_canceled)
+        recognizer.start_continuous_recognition()
+        return {
+            "reference_words": reference_words, "recognizer": recognizer, "done": done,
+            "cancel_info": cancel_info, "azure_words": azure_words, "texts": texts,
+            "fluency_parts": fluency_parts, "transcript": transcribe_future,
+        }
+
+    def _finish_azure_continuous(self, session: dict, remaining) -> Optional[Dict]:
+        """Wait for the end of the audio and map Azure's words onto the reference.
+
+        `remaining` returns the seconds left in the caller's budget.
+        """
+        reference_words = session["reference_words"]
+        reference_text = " ".join(reference_words)
+        azure_words, texts = session["azure_words"], session["texts"]
+        fluency_parts, cancel_info = session["fluency_parts"], session["cancel_info"]
+        recognizer = session["recognizer"]
+        with span("azure.pa", mode="continuous"):
+            finished = session["done"].wait(timeout=min(240.0, remaining()))
             recognizer.stop_continuous_recognition()
 
-            # service-side failure (quota exceeded, timeout, network) — do NOT
-            # score an empty result as "everything omitted / 0 分"
-            if cancel_info.get("error"):
-                is_quota = "quota" in cancel_info["error"].lower() or "1007" in cancel_info["error"]
-                return {"error": ("配额不足" if is_quota else "语音服务错误") + "：" + cancel_info["error"][:120],
-                        "pronunciation_score": 0, "per_word": []}
-            if not finished:
-                return {"error": "语音识别超时", "pronunciation_score": 0, "per_word": []}
-            if not azure_words:
-                return {"error": "未识别到语音，请重新录音", "pronunciation_score": 0, "per_word": []}
-
-            # map azure word results back onto the reference sequence;
-            # a reference entry may be a multi-token phrase (well done, only child)
-            def _tok(t):
-                return re.sub(r"[^a-z' ]", " ", (t or "").lower()).split()
-
-            per_word = []
-            ai = 0
-            insertions = 0
-            for ref in reference_words:
-                ref_tokens = _tok(ref) or [ref.lower()]
-                found_seq = None
-                for j in range(ai, min(ai + 5, len(azure_words))):
-                    if _tok(azure_words[j]["word"])[:1] == ref_tokens[:1]:
-                        seq = azure_words[j:j + len(ref_tokens)]
-                        seq_tokens = [t for w in seq for t in _tok(w["word"])]
-                        if seq_tokens == ref_tokens:
-                            insertions += sum(
-                                1 for k in range(ai, j)
-                                if (azure_words[k].get("error_type") or "") == "Insertion"
-                            )
-                            found_seq = seq
-                            ai = j + len(seq)
-                            break
-                if not found_seq:
-                    per_word.append({"word": ref, "score": 0, "error": "漏读"})
-                    continue
-                etypes = {(w.get("error_type") or "None") for w in found_seq}
-                accs = [float(w.get("accuracy_score") or 0) for w in found_seq]
-                mean_acc = round(sum(accs) / len(accs), 1) if accs else 0
-                seg_offset = found_seq[0].get("offset_ms")
-                seg_end = found_seq[-1].get("end_ms")
-                if etypes == {"Omission"}:
-                    per_word.append({"word": ref, "score": 0, "error": "漏读"})
-                elif "Mispronunciation" in etypes or "Omission" in etypes:
-                    per_word.append({"word": ref, "score": mean_acc, "error": "发音错误",
-                                     "offset_ms": seg_offset, "end_ms": seg_end})
-                else:
-                    per_word.append({"word": ref, "score": mean_acc, "error": None,
-                                     "offset_ms": seg_offset, "end_ms": seg_end})
+        # service-side failure (quota exceeded, timeout, network) — do NOT
+        # score an empty result as "everything omitted / 0 分"
+        if cancel_info.get("error"):
+            is_quota = "quota" in cancel_info["error"].lower() or "1007" in cancel_info["error"]
+            raise RuntimeError(("配额不足" if is_quota else "语音服务错误") + "：" + cancel_info["error"][:120])
+        if not finished:
+            raise RuntimeError("语音识别超时")
+        if not azure_words:
+            return {"error": "未识别到语音，请重新录音", "pronunciation_score": 0, "per_word": []}
+
+        # map azure word results back onto the reference sequence;
+        # a reference entry may be a multi-token phrase (well done, only child)
+        def _tok(t):
+            return re.sub(r"[^a-z' ]", " ", (t or "").lower()).split()
+
+        per_word = []
+        ai = 0
+        insertions = 0
+        for ref in reference_words:
+            ref_tokens = _tok(ref) or [ref.lower()]
+            found_seq = None
+            for j in range(ai, min(ai + 5, len(azure_words))):
+                if _tok(azure_words[j]["word"])[:1] == ref_tokens[:1]:
+                    seq = azure_words[j:j + len(ref_tokens)]
+                    seq_tokens = [t for w in seq for t in _tok(w["word"])]
+                    if seq_tokens == ref_tokens:
+                        insertions += sum(
+                            1 for k in range(ai, j)
+                            if (azure_words[k].get("error_type") or "") == "Insertion"
+                        )
+                        found_seq = seq
+                        ai = j + len(seq)
+                        break
+            if not found_seq:
+                per_word.append({"word": ref, "score": 0, "error": "漏读"})
+                continue
+            etypes = {(w.get("error_type") or "None") for w in found_seq}
+            accs = [float(w.get("accuracy_score") or 0) for w in found_seq]
+            mean_acc = round(sum(accs) / len(accs), 1) if accs else 0
+            seg_offset = found_seq[0].get("offset_ms")
+            seg_end = found_seq[-1].get("end_ms")
+            if etypes == {"Omission"}:
+                per_word.append({"word": ref, "score": 0, "error": "漏读"})
+            elif "Mispronunciation" in etypes or "Omission" in etypes:
+                per_word.append({"word": ref, "score": mean_acc, "error": "发音错误",
+                                 "offset_ms": seg_offset, "end_ms": seg_end})
+            else:
+                per_word.append({"word": ref, "score": mean_acc, "error": None,
+                                 "offset_ms": seg_offset, "end_ms": seg_end})
 
-            read_count = sum(1 for w in per_word if w["error"] != "漏读")
-            accuracy_overall = sum(w["score"] for w in per_word) / len(per_word) if per_word else 0
-            completeness = (read_count / len(reference_words) * 100) if reference_words else 0
-            fluency = sum(fluency_parts) / len(fluency_parts) if fluency_parts else 0
+        read_count = sum(1 for w in per_word if w["error"] != "漏读")
+        accuracy_overall = sum(w["score"] for w in per_word) / len(per_word) if per_word else 0
+        completeness = (read_count / len(reference_words) * 100) if reference_words else 0
+        fluency = sum(fluency_parts) / len(fluency_parts) if fluency_parts else 0
 
-            overall = accuracy_overall * 0.7 + completeness * 0.15 + fluency * 0.15
+        overall = accuracy_overall * 0.7 + completeness * 0.15 + fluency * 0.15
 
-            # unbiased transcript cross-check (same idea as single-word strict layer)
-            independent = ""
-            if transcribe_future is not None:
-                try:
-                    independent = transcribe_future.result(timeout=200)
-                except Exception:
-                    pass
-            token_ratio = None
-            if independent:
-                ref_tokens = self._normalize_text(reference_text).split()
-                heard_tokens = self._normalize_text(independent).split()
-                sm = difflib.SequenceMatcher(None, ref_tokens, heard_tokens)
-                matched = sum(b.size for b in sm.get_matching_blocks())
-                token_ratio = matched / max(len(ref_tokens), len(heard_tokens)) if heard_tokens else 0.0
-                # if the unbiased transcript heard far fewer of the words, trust it
-                if token_ratio < (read_count / len(reference_words)) * 0.6:
-                    overall = min(overall, 55.0)
+        # unbiased transcript cross-check (same idea as single-word strict layer)
+        independent = ""
+        try:
+            independent = session["transcript"].result(timeout=max(1.0, min(200.0, remaining())))
+        except Exception:
+            pass
+        token_ratio = None
+        if independent:
+            ref_tokens = self._normalize_text(reference_text).split()
+            heard_tokens = self._normalize_text(independent).split()
+            matched = align(ref_tokens, heard_tokens).matched_words
+            token_ratio = matched / max(len(ref_tokens), len(heard_tokens)) if heard_tokens else 0.0
+            # if the unbiased transcript heard far fewer of the words, trust it
+            if token_ratio < (read_count / len(reference_words)) * 0.6:
+                overall = min(overall, 55.0)
 
-            return {
-                "mode": "continuous",
-                "pronunciation_score": round(max(0.0, min(100.0, overall)), 1),
-                "accuracy_score": round(accuracy_overall, 1),
-                "completeness_score": round(completeness, 1),
-                "fluency_score": round(fluency, 1),
-                "recognized_text": " ".join(texts),
-                "independent_transcript": independent,
-                "token_match_ratio": round(token_ratio, 2) if token_ratio is not None else None,
-                "words_read": read_count,
-                "words_total": len(reference_words),
-                "insertions": insertions,
-                "per_word": per_word,
-            }
+        return {
+            "mode": "continuous",
+            "pronunciation_score": round(max(0.0, min(100.0, overall)), 1),
+            "accuracy_score": round(accuracy_overall, 1),
+            "completeness_score": round(completeness, 1),
+            "fluency_score": round(fluency, 1),
+            "recognized_text": " ".join(texts),
+            "independent_transcript": independent,
+            "token_match_ratio": round(token_ratio, 2) if token_ratio is not None else None,
+            "words_read": read_count,
+            "words_total": len(reference_words),
+            "insertions": insertions,
+            "per_word": per_word,
+        }
+
+class LiveContinuousSession:
+    """Azure continuous scoring fed while the student is still reading.
+
+    Recognition runs on push streams that are written chunk by chunk as the
+    audio arrives over the WebSocket, so by the time the student stops only
+    the tail of the take is left to recognize. finish() closes the streams
+    and waits for the last segments.
+    """
+
+    def __init__(self, service: PronunciationService, reference_words: list):
+        self.reference_words = list(reference_words)
+        self._service = service
+        pa_stream, pa_config = _live_push_stream()
+        plain_stream, plain_config = _live_push_stream()
+        self._streams = [pa_stream, plain_stream]
+        self._closed = False
+        self._session = service._start_azure_continuous(self.reference_words, pa_config, plain_config)
+
+    def write(self, pcm: bytes):
+        """Forward a chunk of 16 kHz / 16-bit / mono PCM to both recognizers."""
+        if self._closed or not pcm:
+            return
+        for stream in self._streams:
+            stream.write(pcm)
+
+    def _close_streams(self):
+        if not self._closed:
+            self._closed = True
+            for stream in self._streams:
+                stream.close()
+
+    def finish(self, timeout: float) -> Optional[Dict]:
+        """End of audio: wait up to `timeout` seconds for the result.
+
+        Raises like the cascade providers do, so the caller can fall back
+        to scoring the persisted take.
+        """
+        import time
+        self._close_streams()
+        started = time.monotonic()
+        deadline = started + timeout
+        try:
+            result = self._service._finish_azure_continuous(
+                self._session, lambda: max(0.0, deadline - time.monotonic())
+            )
         except Exception as e:
-            import traceback
-            traceback.print_exc()
-            return {"error": str(e), "pronunciation_score": 0, "per_word": []}
-        finally:
-            if transcribe_future is not None and not transcribe_future.done():
-                try:
-                    transcribe_future.result(timeout=200)
-                except Exception:
-                    pass
-            if converted and converted != audio_file_path:
-                try:
-                    if os.path.exists(converted):
-                        os.remove(converted)
-                except OSError:
-                    pass
+            scorer_health.record("azure", ok=False, latency=time.monotonic() - started, error=str(e)[:200])
+            raise
+        scorer_health.record("azure", ok=True, latency=time.monotonic() - started)
+        if result is not None:
+            result["provider"] = "azure"
+            result["streamed"] = True
+        return result
+
+    def cancel(self):
+        """The take was abandoned: stop recognizing."""
+        self._close_streams()
+        try:
+            self._session["recognizer"].stop_continuous_recognition_async()
+        except Exception as e:
+            print(f"live recognizer stop failed: {e}")
+
+
+def _live_push_stream():
+    """An open push stream (written as audio arrives) and its AudioConfig."""
+    from app.services.audio_preprocess import CHANNELS, SAMPLE_RATE, SAMPLE_WIDTH
+
+    stream_format = speechsdk.audio.AudioStreamFormat(
+        samples_per_second=SAMPLE_RATE, bits_per_sample=SAMPLE_WIDTH * 8, channels=CHANNELS,
+    )
+    stream = speechsdk.audio.PushAudioInputStream(stream_format=stream_format)
+    return stream, speechsdk.audio.AudioConfig(stream=stream)
+
 
 pronunciation_service = PronunciationService()
\ No newline at end of file
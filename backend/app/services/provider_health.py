@@ -0,0 +1,201 @@
+"""Circuit breakers and health registry for the external scorers.
+
+Every provider call the scoring cascade makes is reported here (success or
+failure, with latency). When a provider keeps failing — error rate over
+SCORER_BREAKER_ERROR_RATE across the rolling window, or a run of
+consecutive failures on a quiet box — its circuit opens and the cascade
+skips it outright instead of making each student wait out its timeout.
+
+While a circuit is open a background thread probes the provider with a
+cheap health check every SCORER_PROBE_INTERVAL seconds. A successful probe
+half-opens the circuit: live requests flow again, the first success closes
+it and the first failure re-opens it. Providers without a probe half-open
+after one probe interval.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+from app.core.config import settings
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Rolling error rate / latency and breaker state for one provider."""
+
+    def __init__(self, name: str, probe: Optional[Callable[[], bool]] = None):
+        self.name = name
+        self.probe = probe
+        self.state = CLOSED
+        self.opened_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.last_probe_at: Optional[float] = None
+        self.consecutive_failures = 0
+        self._calls = deque()  # (monotonic time, ok, latency seconds)
+        self._lock = threading.Lock()
+
+    def _trim(self, now: float):
+        horizon = now - settings.SCORER_BREAKER_WINDOW
+        while self._calls and self._calls[0][0] < horizon:
+            self._calls.popleft()
+
+    def allow(self) -> bool:
+        """May a live request go to this provider right now?"""
+        with self._lock:
+            if self.state == OPEN and self.probe is None and self.opened_at is not None:
+                if time.monotonic() - self.opened_at >= settings.SCORER_PROBE_INTERVAL:
+                    self.state = HALF_OPEN
+            return self.state != OPEN
+
+    def record(self, ok: bool, latency: float, error: Optional[str] = None):
+        now = time.monotonic()
+        with self._lock:
+            self._calls.append((now, ok, latency))
+            self._trim(now)
+            if ok:
+                self.consecutive_failures = 0
+                if self.state == HALF_OPEN:
+                    self._close()
+                return
+            self.consecutive_failures += 1
+            self.last_error = (error or "")[:200] or None
+            if self.state == HALF_OPEN:
+                self._open(now)
+            elif self.state == CLOSED and self._tripped():
+                self._open(now)
+
+    def _tripped(self) -> bool:
+        if self.consecutive_failures >= settings.SCORER_BREAKER_CONSECUTIVE_FAILURES:
+            return True
+        if len(self._calls) < settings.SCORER_BREAKER_MIN_CALLS:
+            return False
+        failures = sum(1 for _, ok, _ in self._calls if not ok)
+        return failures / len(self._calls) >= settings.SCORER_BREAKER_ERROR_RATE
+
+    def _open(self, now: float):
+        if self.state != OPEN:
+            print(f"Scorer circuit OPEN: {self.name} ({self.last_error})")
+        self.state = OPEN
+        self.opened_at = now
+
+    def _close(self):
+        print(f"Scorer circuit closed: {self.name}")
+        self.state = CLOSED
+        self.opened_at = None
+        self.consecutive_failures = 0
+        self._calls.clear()
+
+    def run_probe(self) -> Optional[bool]:
+        """Probe an open circuit; half-open it when the provider answers."""
+        if self.probe is None or self.state != OPEN:
+            return None
+        self.last_probe_at = time.monotonic()
+        try:
+            healthy = bool(self.probe())
+        except Exception as e:
+            print(f"Probe for {self.name} failed: {e}")
+            healthy = False
+        if healthy:
+            with self._lock:
+                if self.state == OPEN:
+                    self.state = HALF_OPEN
+        return healthy
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            calls = list(self._calls)
+            state = self.state
+        latencies = sorted(lat for _, ok, lat in calls if ok)
+        failures = sum(1 for _, ok, _ in calls if not ok)
+
+        def pct(p):
+            if not latencies:
+                return None
+            return int(latencies[min(len(latencies) - 1, int(p * (len(latencies) - 1)))] * 1000)
+
+        return {
+            "state": state,
+            "calls": len(calls),
+            "error_rate": round(failures / len(calls), 3) if calls else 0.0,
+            "consecutive_failures": self.consecutive_failures,
+            "latency_p50_ms": pct(0.5),
+            "latency_p95_ms": pct(0.95),
+            "open_for_s": round(now - self.opened_at, 1) if state == OPEN and self.opened_at else None,
+            "last_probe_s_ago": round(now - self.last_probe_at, 1) if self.last_probe_at else None,
+            "last_error": self.last_error,
+        }
+
+
+class HealthRegistry:
+    """Process-wide breakers, one per provider name, plus the probe thread."""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+        self._prober: Optional[threading.Thread] = None
+
+    def get(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = self._breakers[name] = CircuitBreaker(name)
+            return breaker
+
+    def register(self, name: str, probe: Optional[Callable[[], bool]] = None) -> CircuitBreaker:
+        breaker = self.get(name)
+        if probe is not None:
+            breaker.probe = probe
+        return breaker
+
+    def allow(self, name: str) -> bool:
+        return self.get(name).allow()
+
+    def record(self, name: str, ok: bool, latency: float, error: Optional[str] = None):
+        breaker = self.get(name)
+        breaker.record(ok, latency, error)
+        if breaker.state == OPEN:
+            self._ensure_prober()
+
+    def probe_open(self):
+        """One probing pass over every open circuit."""
+        with self._lock:
+            breakers = list(self._breakers.values())
+        for breaker in breakers:
+            if breaker.state == OPEN:
+                breaker.run_probe()
+
+    def _ensure_prober(self):
+        with self._lock:
+            if self._prober is not None and self._prober.is_alive():
+                return
+            self._prober = threading.Thread(target=self._probe_loop, name="scorer-prober", daemon=True)
+            self._prober.start()
+
+    def _probe_loop(self):
+        # runs only while something is open; the next trip restarts it
+        while True:
+            time.sleep(settings.SCORER_PROBE_INTERVAL)
+            try:
+                self.probe_open()
+            except Exception as e:
+                print(f"Scorer probe pass failed (non-fatal): {e}")
+            with self._lock:
+                if not any(b.state == OPEN for b in self._breakers.values()):
+                    self._prober = None
+                    return
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {name: breaker.snapshot() for name, breaker in sorted(breakers.items())}
+
+
+# Singleton instance
+scorer_health = HealthRegistry()
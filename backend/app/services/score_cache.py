@@ -0,0 +1,166 @@
+"""Content-addressed cache of scoring results.
+
+Students on flaky connections resubmit the very same take, and teachers
+re-run scoring; each time the providers (Azure PA + plain STT + GOP, or
+xfyun) would be paid again for an identical answer. Results are addressed
+by what was scored — SHA-256 of the decoded PCM, the reference text, the
+mode and the scorer version — so any of those changing is simply a miss.
+
+Two layers: a bounded in-process LRU in front of the score_cache table,
+which survives restarts and is shared between workers. Bumping the scorer
+version (SCORING_RULES_VERSION in pronunciation_service) orphans every old
+entry; purge_stale() deletes them at startup.
+"""
+
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from app.core.config import settings
+from app.models.score_cache import ScoreCacheEntry
+
+
+@dataclass(frozen=True)
+class CacheKey:
+    key: str
+    pcm_sha256: str
+    reference_text: str
+    mode: str
+    scorer_version: str
+
+
+def cacheable(result: Optional[dict]) -> bool:
+    """Only clean, real provider answers are worth replaying."""
+    return bool(result) and not result.get("error") and not result.get("_mock") \
+        and not result.get("fallback")
+
+
+class ScoreCache:
+    """Bounded LRU over the score_cache table, with hit-rate counters."""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self.bind = None  # engine for the persistent layer; app engine when None
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = {"memory_hits": 0, "db_hits": 0, "misses": 0, "stores": 0}
+
+    @staticmethod
+    def key_for(pcm: bytes, reference_text: str, mode: str, scorer_version: str) -> CacheKey:
+        pcm_sha256 = hashlib.sha256(pcm).hexdigest()
+        reference_text = reference_text.strip()
+        key = hashlib.sha256(
+            "\x1f".join([pcm_sha256, reference_text, mode, scorer_version]).encode("utf-8")
+        ).hexdigest()
+        return CacheKey(key, pcm_sha256, reference_text, mode, scorer_version)
+
+    def _session(self) -> Session:
+        if self.bind is None:
+            from app.db.session import engine
+            return Session(bind=engine)
+        return Session(bind=self.bind)
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counts[name] += 1
+
+    def _remember(self, key: str, result: dict):
+        with self._lock:
+            self._lru[key] = result
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    def get(self, cache_key: CacheKey) -> Optional[dict]:
+        """Cached result (a private copy, marked cache_hit) or None."""
+        if not settings.SCORE_CACHE_ENABLED:
+            return None
+        with self._lock:
+            result = self._lru.get(cache_key.key)
+            if result is not None:
+                self._lru.move_to_end(cache_key.key)
+                self._counts["memory_hits"] += 1
+        if result is None:
+            result = self._load(cache_key)
+            if result is None:
+                self._count("misses")
+                return None
+            self._count("db_hits")
+            self._remember(cache_key.key, result)
+        hit = copy.deepcopy(result)
+        hit["cache_hit"] = True
+        return hit
+
+    def _load(self, cache_key: CacheKey) -> Optional[dict]:
+        try:
+            with self._session() as session:
+                entry = session.get(ScoreCacheEntry, cache_key.key)
+                if entry is None:
+                    return None
+                entry.hits = (entry.hits or 0) + 1
+                entry.last_hit_at = func.now()
+                result = entry.result
+                session.commit()
+                return result
+        except Exception as e:
+            print(f"Score cache read failed (non-fatal): {e}")
+            return None
+
+    def put(self, cache_key: CacheKey, result: dict):
+        if not settings.SCORE_CACHE_ENABLED or not cacheable(result):
+            return
+        stored = copy.deepcopy(result)
+        stored.pop("cache_hit", None)
+        self._remember(cache_key.key, stored)
+        self._count("stores")
+        try:
+            with self._session() as session:
+                session.merge(ScoreCacheEntry(
+                    cache_key=cache_key.key,
+                    pcm_sha256=cache_key.pcm_sha256,
+                    reference_text=cache_key.reference_text,
+                    mode=cache_key.mode,
+                    scorer_version=cache_key.scorer_version,
+                    result=stored,
+                    hits=0,
+                ))
+                session.commit()
+        except Exception as e:
+            print(f"Score cache write failed (non-fatal): {e}")
+
+    def purge_stale(self, scorer_version: str, bind=None) -> int:
+        """Delete persisted entries written under any other scorer version."""
+        with self._lock:
+            self._lru.clear()
+        session = Session(bind=bind) if bind is not None else self._session()
+        with session:
+            deleted = session.query(ScoreCacheEntry).filter(
+                ScoreCacheEntry.scorer_version != scorer_version
+            ).delete(synchronize_session=False)
+            session.commit()
+            return deleted
+
+    def clear_memory(self):
+        with self._lock:
+            self._lru.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+            entries = len(self._lru)
+        lookups = counts["memory_hits"] + counts["db_hits"] + counts["misses"]
+        hits = counts["memory_hits"] + counts["db_hits"]
+        counts["lookups"] = lookups
+        counts["hit_rate"] = round(hits / lookups, 3) if lookups else 0.0
+        counts["memory_entries"] = entries
+        return counts
+
+
+# Singleton instance
+score_cache = ScoreCache(max_entries=settings.SCORE_CACHE_SIZE)
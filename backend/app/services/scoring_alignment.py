@@ -0,0 +1,270 @@
+"""Phoneme-level alignment of what was heard against the reference.
+
+The strict layer used to compare transcript and reference with
+difflib.SequenceMatcher on raw characters and tokens. That compares
+spelling, not sound: a homophone ("right" for "write") counts as a miss
+while a near-miss with similar letters scores high, and nothing says which
+reference word went wrong.
+
+Both strings are mapped to phoneme sequences instead, via CMUdict (the
+mmapped lexicon) behind an LRU cache, with a letter-to-sound fallback for
+words it lacks. The sequences are aligned with a weighted edit distance.
+Substituting a phoneme for its voicing twin (P/B, S/Z) or for another of
+its class (vowel for vowel) costs less than an unrelated one. The DP runs
+one numpy row at a time: the insertion chain inside a row is a running
+minimum, so there is no per-cell Python loop. The backtrace attributes
+every edit to a reference word. Each word's distance is then re-scored
+against all of its CMUdict variants, so "read" heard as "red" is exact.
+"""
+
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import List, Sequence, Tuple, Union
+
+import numpy as np
+
+from app.services.pron_lexicon import lexicon
+
+# 39 ARPAbet phonemes (CMUdict without stress markers)
+VOWELS = ("AA", "AE", "AH", "AO", "AW", "AY", "EH", "ER", "EY", "IH", "IY", "OW", "OY", "UH", "UW")
+CLASSES = (
+    VOWELS,
+    ("P", "B", "T", "D", "K", "G"),                           # stops
+    ("CH", "JH"),                                             # affricates
+    ("F", "V", "TH", "DH", "S", "Z", "SH", "ZH", "HH"),       # fricatives
+    ("M", "N", "NG"),                                         # nasals
+    ("L", "R", "W", "Y"),                                     # liquids / glides
+)
+VOICING_PAIRS = (("P", "B"), ("T", "D"), ("K", "G"), ("F", "V"), ("TH", "DH"),
+                 ("S", "Z"), ("SH", "ZH"), ("CH", "JH"))
+PHONES = tuple(p for cls in CLASSES for p in cls)
+PHONE_ID = {p: i for i, p in enumerate(PHONES)}
+
+INDEL_COST = 1.0
+VOICING_COST = 0.4
+SAME_CLASS_COST = 0.7
+# a word counts as said when its phoneme distance is at most this
+MATCH_DISTANCE = 0.34
+MAX_RUN = 3  # heard words one reference word may be compared against ("note book")
+
+
+def _substitution_costs() -> np.ndarray:
+    costs = np.ones((len(PHONES), len(PHONES)), dtype=np.float64)
+    for cls in CLASSES:
+        ids = [PHONE_ID[p] for p in cls]
+        costs[np.ix_(ids, ids)] = SAME_CLASS_COST
+    for a, b in VOICING_PAIRS:
+        costs[PHONE_ID[a], PHONE_ID[b]] = costs[PHONE_ID[b], PHONE_ID[a]] = VOICING_COST
+    np.fill_diagonal(costs, 0.0)
+    return costs
+
+
+SUB_COST = _substitution_costs()
+
+# letter-to-sound fallback for words CMUdict lacks (names, STT oddities)
+_DIGRAPHS = {
+    "tch": ("CH",), "sh": ("SH",), "ch": ("CH",), "th": ("TH",), "ph": ("F",), "wh": ("W",),
+    "ck": ("K",), "ng": ("NG",), "qu": ("K", "W"), "ee": ("IY",), "ea": ("IY",), "oo": ("UW",),
+    "ou": ("AW",), "ow": ("OW",), "ai": ("EY",), "ay": ("EY",), "oi": ("OY",), "oy": ("OY",),
+}
+_LETTERS = {
+    "a": ("AE",), "b": ("B",), "c": ("K",), "d": ("D",), "e": ("EH",), "f": ("F",), "g": ("G",),
+    "h": ("HH",), "i": ("IH",), "j": ("JH",), "k": ("K",), "l": ("L",), "m": ("M",), "n": ("N",),
+    "o": ("AA",), "p": ("P",), "q": ("K",), "r": ("R",), "s": ("S",), "t": ("T",), "u": ("AH",),
+    "v": ("V",), "w": ("W",), "x": ("K", "S"), "y": ("Y",), "z": ("Z",),
+}
+
+
+def _letter_to_sound(word: str) -> Tuple[str, ...]:
+    letters = re.sub(r"([^aeiou])\1", r"\1", re.sub(r"[^a-z]", "", word))
+    phones, i = [], 0
+    while i < len(letters):
+        for size in (3, 2, 1):
+            chunk = letters[i:i + size]
+            mapped = _DIGRAPHS.get(chunk) if size > 1 else _LETTERS.get(chunk)
+            if mapped:
+                phones.extend(mapped)
+                i += size
+                break
+        else:
+            i += 1
+    if len(phones) > 1 and letters.endswith("e") and phones[-1] == "EH":
+        phones.pop()  # silent final e
+    return tuple(phones)
+
+
+@lru_cache(maxsize=16384)
+def word_phonemes(word: str) -> Tuple[Tuple[str, ...], ...]:
+    """All pronunciations of one word, stress stripped; never empty for a real word."""
+    word = word.lower().strip()
+    variants = []
+    for pron in lexicon.get(word) or []:
+        phones = tuple(p.rstrip("012") for p in pron)
+        if phones not in variants:
+            variants.append(phones)
+    if not variants:
+        guess = _letter_to_sound(word)
+        if guess:
+            variants.append(guess)
+    return tuple(variants)
+
+
+def tokenize(text: Union[str, Sequence[str]]) -> List[str]:
+    """Lowercase word tokens; a list of reference entries may hold multi-word phrases."""
+    if not isinstance(text, str):
+        text = " ".join(text)
+    return re.sub(r"[^a-z' ]+", " ", (text or "").lower()).split()
+
+
+def edit_distance_matrix(ref: np.ndarray, hyp: np.ndarray) -> np.ndarray:
+    """Weighted Levenshtein DP over phoneme ids, computed a row at a time.
+
+    Within a row D[i, j] = min_k<=j (T[k] + (j - k) * INDEL), where T holds
+    the substitution / deletion candidates; subtracting j * INDEL turns that
+    into a running minimum (np.minimum.accumulate).
+    """
+    n, m = len(ref), len(hyp)
+    ramp = np.arange(m + 1, dtype=np.float64) * INDEL_COST
+    dp = np.empty((n + 1, m + 1), dtype=np.float64)
+    dp[0] = ramp
+    candidates = np.empty(m + 1, dtype=np.float64)
+    for i in range(1, n + 1):
+        prev = dp[i - 1]
+        candidates[0] = prev[0] + INDEL_COST
+        np.minimum(prev[:-1] + SUB_COST[ref[i - 1], hyp], prev[1:] + INDEL_COST, out=candidates[1:])
+        dp[i] = np.minimum.accumulate(candidates - ramp) + ramp
+    return dp
+
+
+def _ids(phones: Sequence[str]) -> np.ndarray:
+    return np.fromiter((PHONE_ID[p] for p in phones), dtype=np.intp, count=len(phones))
+
+
+def phoneme_distance(ref: Sequence[str], hyp: Sequence[str]) -> float:
+    """Total weighted edit cost between two phoneme sequences."""
+    return float(edit_distance_matrix(_ids(ref), _ids(hyp))[-1, -1])
+
+
+@dataclass
+class WordDistance:
+    """One reference word and what was heard where it should be."""
+    word: str
+    phonemes: Tuple[str, ...]
+    heard_phonemes: Tuple[str, ...]
+    heard: str  # heard words overlapping this word's slot
+    distance: float  # weighted edits per reference phoneme, 0 = exact, capped at 1
+
+    @property
+    def matched(self) -> bool:
+        return self.distance <= MATCH_DISTANCE
+
+
+@dataclass
+class Alignment:
+    reference_phonemes: int
+    heard_phonemes: int
+    cost: float
+    words: List[WordDistance] = field(default_factory=list)
+
+    @property
+    def similarity(self) -> float:
+        """1 - cost over the longer sequence: 1.0 = same sounds, 0.0 = nothing in common."""
+        longest = max(self.reference_phonemes, self.heard_phonemes)
+        if not longest or not self.heard_phonemes:
+            return 0.0
+        return max(0.0, 1.0 - self.cost / longest)
+
+    @property
+    def matched_words(self) -> int:
+        return sum(1 for w in self.words if w.matched)
+
+
+def _sequence(tokens):
+    """Concatenated first-variant phonemes, the owning token of each, and each token's span."""
+    phones, owner, spans = [], [], []
+    for t, token in enumerate(tokens):
+        variants = word_phonemes(token)
+        start = len(phones)
+        if variants:
+            phones.extend(variants[0])
+            owner.extend([t] * len(variants[0]))
+        spans.append((start, len(phones)))
+    return phones, owner, spans
+
+
+_EPS = 1e-9
+
+
+def _run_distance(variants, heard_tokens, lo, hi):
+    """Best variant distance against any run of up to MAX_RUN heard words in [lo, hi]."""
+    best = None
+    for a in range(lo, hi + 1):
+        for b in range(a, min(hi, a + MAX_RUN - 1) + 1):
+            run = [p for t in heard_tokens[a:b + 1] for p in (word_phonemes(t) or [()])[0]]
+            for variant in variants:
+                d = phoneme_distance(variant, run)
+                best = d if best is None else min(best, d)
+    return best
+
+
+def align(reference: Union[str, Sequence[str]], heard: Union[str, Sequence[str]]) -> Alignment:
+    """Align heard text against the reference at phoneme level, with per-word distances."""
+    ref_tokens, heard_tokens = tokenize(reference), tokenize(heard)
+    ref_phones, _, ref_spans = _sequence(ref_tokens)
+    hyp_phones, hyp_owner, _ = _sequence(heard_tokens)
+    n, m = len(ref_phones), len(hyp_phones)
+    ref_ids, hyp_ids = _ids(ref_phones), _ids(hyp_phones)
+    dp = edit_distance_matrix(ref_ids, hyp_ids)
+
+    # backtrace: every edit is charged to a reference phoneme, so costs and
+    # heard phonemes group per word; insertions inside a word go to the
+    # phoneme before them, extra words between reference words to nobody
+    word_ends = {end for _, end in ref_spans}
+    charged = np.zeros(n, dtype=np.float64)
+    heard_at = [[] for _ in range(n)]
+    i, j = n, m
+    while i > 0 or j > 0:
+        if i > 0 and j > 0:
+            step = SUB_COST[ref_ids[i - 1], hyp_ids[j - 1]]
+            if abs(dp[i, j] - dp[i - 1, j - 1] - step) < _EPS:
+                charged[i - 1] += step
+                heard_at[i - 1].append(j - 1)
+                i, j = i - 1, j - 1
+                continue
+        if i > 0 and abs(dp[i, j] - dp[i - 1, j] - INDEL_COST) < _EPS:
+            charged[i - 1] += INDEL_COST
+            i -= 1
+            continue
+        if i > 0 and i not in word_ends:
+            charged[i - 1] += INDEL_COST
+            heard_at[i - 1].append(j - 1)
+        j -= 1
+
+    words = []
+    cost = float(dp[n, m])
+    for token, (start, end) in zip(ref_tokens, ref_spans):
+        if start == end:
+            continue
+        variants = word_phonemes(token)
+        heard_idx = sorted(j for k in range(start, end) for j in heard_at[k])
+        heard_phones = tuple(hyp_phones[j] for j in heard_idx)
+        slot_cost = float(charged[start:end].sum())
+        word_cost = slot_cost
+        if slot_cost and len(variants) > 1:
+            # a homophone / alternative pronunciation is not an error
+            word_cost = min([slot_cost] + [phoneme_distance(v, heard_phones) for v in variants[1:]])
+            cost -= slot_cost - word_cost
+        heard_words = sorted({hyp_owner[j] for j in heard_idx})
+        if word_cost and heard_words:
+            # equal-cost paths may split a heard word across two reference
+            # words; judge the word against whole heard words near its slot
+            word_cost = min(word_cost, _run_distance(variants, heard_tokens, heard_words[0], heard_words[-1]))
+        words.append(WordDistance(
+            word=token,
+            phonemes=variants[0],
+            heard_phonemes=heard_phones,
+            heard=" ".join(heard_tokens[w] for w in heard_words),
+            distance=round(min(1.0, word_cost / (end - start)), 3),
+        ))
+    return Alignment(reference_phonemes=n, heard_phonemes=m, cost=max(0.0, cost), words=words)
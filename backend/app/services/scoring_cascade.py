@@ -0,0 +1,235 @@
+"""Provider cascade for pronunciation scoring.
+
+Scorers (xfyun node, xfyun direct, Azure, GOP) are registered in priority
+order and run under one end-to-end latency budget per request. Instead of
+waiting out each provider's own timeout before trying the next, the cascade
+hedges: once the running provider passes its usual latency (a percentile of
+its recent answer times) the next one is started alongside it, and whichever
+answer arrives first wins. A provider that fails or has nothing to say hands
+over immediately.
+
+Providers are plain callables taking a ScoringRequest and returning:
+- a result dict: an answer (error dicts such as "no speech" count too);
+- None, or raising: no answer, move on to the next provider.
+
+Losers are not interrupted (the SDK/HTTP calls are blocking); they finish in
+the background and their answers are dropped, but their outcome still feeds
+the provider's circuit breaker (provider_health). Providers whose circuit is
+open are skipped without being called.
+
+Each provider call is a span on the request's trace, and every run feeds
+the provider outcome / selection metrics (scoring_metrics).
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.provider_health import scorer_health
+from app.services.scoring_metrics import carry, record_cascade, span
+
+MIN_SAMPLES = 20  # answers needed before the percentile replaces the default
+
+
+class ProviderStats:
+    """Rolling answer latencies of one provider in one mode."""
+
+    def __init__(self, maxlen: int = 200):
+        self._latencies = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            if len(self._latencies) < MIN_SAMPLES:
+                return None
+            ordered = sorted(self._latencies)
+        idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[idx]
+
+
+_stats: Dict[Tuple[str, str], ProviderStats] = {}
+_stats_lock = threading.Lock()
+
+
+def provider_stats(mode: str, name: str) -> ProviderStats:
+    with _stats_lock:
+        stats = _stats.get((mode, name))
+        if stats is None:
+            stats = _stats[(mode, name)] = ProviderStats()
+        return stats
+
+
+@dataclass
+class ScoringRequest:
+    """What every provider gets: the decoded audio, the reference and the deadline."""
+    audio: object  # DecodedAudio
+    reference: object  # str for "word", list of words for "continuous"
+    mode: str = "word"
+    deadline: float = field(default_factory=lambda: time.monotonic() + 30.0)
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+
+@dataclass
+class ScoringProvider:
+    name: str
+    score: Callable[[ScoringRequest], Optional[dict]]
+    available: Callable[[], bool]
+    hedge_after: float  # seconds before hedging while the provider has no latency history
+    fallback: bool = False  # only worth running when a primary provider is configured
+
+    def hedge_delay(self, mode: str) -> float:
+        observed = provider_stats(mode, self.name).percentile(settings.SCORING_HEDGE_PERCENTILE)
+        if observed is None:
+            return self.hedge_after
+        return max(settings.SCORING_HEDGE_MIN, observed)
+
+
+class ScoringCascade:
+    """Ordered provider registry for one scoring mode."""
+
+    def __init__(self, mode: str, providers: Optional[List[ScoringProvider]] = None):
+        self.mode = mode
+        self.providers: List[ScoringProvider] = list(providers or [])
+
+    def register(self, provider: ScoringProvider):
+        self.providers.append(provider)
+
+    def available_providers(self) -> List[ScoringProvider]:
+        """Configured providers, in order; empty when only fallbacks are configured."""
+        ready = []
+        for p in self.providers:
+            try:
+                if p.available():
+                    ready.append(p)
+            except Exception as e:
+                print(f"provider {p.name} availability check failed: {e}")
+        if not any(not p.fallback for p in ready):
+            return []
+        return ready
+
+    def run(self, audio, reference, budget: float) -> Tuple[Optional[dict], List[dict]]:
+        """Score within `budget` seconds.
+
+        Returns (result, timings). result is the first answer, or None when
+        every provider passed or the budget ran out; timings has one entry
+        per provider considered: provider, outcome (ok / no_result / error /
+        abandoned / circuit_open), ms, hedged, and error when there was one.
+        """
+        request = ScoringRequest(audio=audio, reference=reference, mode=self.mode,
+                                 deadline=time.monotonic() + budget)
+        timings: List[dict] = []
+        providers = []
+        for p in self.available_providers():
+            if scorer_health.allow(p.name):
+                providers.append(p)
+            else:
+                timings.append({"provider": p.name, "outcome": "circuit_open", "ms": 0,
+                                "hedged": False, "error": "circuit open"})
+        if not providers:
+            record_cascade(self.mode, None, timings)
+            return None, timings
+
+        executor = ThreadPoolExecutor(max_workers=len(providers),
+                                      thread_name_prefix=f"cascade-{self.mode}")
+        pending = {}
+        state = {"next": 0, "hedge_at": None, "latest": None}
+
+        def launch(hedged: bool):
+            provider = providers[state["next"]]
+            state["next"] += 1
+            started = time.monotonic()
+            future = executor.submit(carry(_call), provider, request)
+            future.add_done_callback(lambda f, name=provider.name: _report_health(name, started, f))
+            pending[future] = (provider, started, hedged)
+            state["latest"] = future
+            state["hedge_at"] = started + provider.hedge_delay(self.mode)
+
+        result = None
+        try:
+            launch(hedged=False)
+            while pending:
+                now = time.monotonic()
+                if now >= request.deadline:
+                    break
+                more = state["next"] < len(providers)
+                timeout = request.deadline - now
+                if more:
+                    timeout = min(timeout, max(0.0, state["hedge_at"] - now))
+                done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+
+                if not done:
+                    if more and time.monotonic() >= state["hedge_at"]:
+                        launch(hedged=True)
+                    continue
+
+                hand_over = False
+                for future in done:
+                    provider, started, hedged = pending.pop(future)
+                    elapsed = time.monotonic() - started
+                    entry = {"provider": provider.name, "ms": int(elapsed * 1000), "hedged": hedged}
+                    try:
+                        answer = future.result()
+                    except Exception as e:
+                        print(f"{provider.name} scoring failed, falling back: {e}")
+                        answer = None
+                        entry["outcome"] = "error"
+                        entry["error"] = str(e)[:200]
+                    else:
+                        entry["outcome"] = "ok" if answer is not None else "no_result"
+                    timings.append(entry)
+                    if answer is not None and result is None:
+                        provider_stats(self.mode, provider.name).record(elapsed)
+                        result = answer
+                        result["provider"] = provider.name
+                    elif future is state["latest"]:
+                        hand_over = True
+                if result is not None:
+                    break
+                if state["next"] < len(providers) and (hand_over or not pending):
+                    launch(hedged=False)
+        finally:
+            now = time.monotonic()
+            for provider, started, hedged in pending.values():
+                timings.append({"provider": provider.name, "outcome": "abandoned",
+                                "ms": int((now - started) * 1000), "hedged": hedged})
+            executor.shutdown(wait=False)
+
+        if result is not None:
+            result["provider_timings"] = timings
+        record_cascade(self.mode, result, timings)
+        return result, timings
+
+
+def _call(provider: ScoringProvider, request: ScoringRequest):
+    # on the timeline only: provider latency has its own histogram, by outcome
+    with span(f"provider.{provider.name}", observe=False):
+        return provider.score(request)
+
+
+def _report_health(name: str, started: float, future):
+    """Feed a finished provider call (won, lost or abandoned) to its breaker.
+
+    Returning None is a healthy "nothing to say"; only raising counts as a
+    failure, so providers raise when their dependency is down.
+    """
+    error = future.exception()
+    scorer_health.record(name, ok=error is None, latency=time.monotonic() - started,
+                         error=str(error) if error else None)
+
+
+def last_error(timings: List[dict]) -> str:
+    """The most recent provider error message in a timings list, or ''."""
+    for entry in reversed(timings):
+        if entry.get("error"):
+            return entry["error"]
+    return ""
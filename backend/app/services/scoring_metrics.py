@@ -0,0 +1,283 @@
+"""Per-stage latency of scoring: spans, histograms and a Prometheus export.
+
+The only view into a slow score used to be print() lines, which cannot say
+whether the time went to decoding, the xfyun node, Azure PA, the plain STT
+pass, GOP, the stress check or the DB commit. Each of those stages now runs
+inside a span:
+
+    with span("azure.pa"):
+        result = recognizer.recognize_once()
+
+A span always feeds the `scoring_stage_seconds{mode,stage}` histogram. When
+it runs inside a traced request (assess_pronunciation /
+assess_continuous_reading are wrapped with @traced) it is also appended to
+that request's timeline. Requests slower than SCORING_TRACE_SLOW_MS return
+the timeline under "trace", so it ends up in automated_scores next to the
+score it explains.
+
+The current trace lives in a ContextVar. Worker threads do not inherit it,
+so work that is handed to a pool is wrapped with carry(fn), and its spans
+land on the same timeline.
+
+The registry is a small hand-rolled subset of the Prometheus data model
+(counters and fixed-bucket histograms with labels). It is rendered in the
+text exposition format on /metrics, so nothing new has to be installed on
+the server.
+"""
+
+import contextvars
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+# seconds; scoring stages run from sub-millisecond (pre-flight) to minutes (long continuous takes)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 45.0, 90.0, 180.0, 300.0)
+MAX_SPANS = 200  # per timeline; a 60-word take with hedging stays well below
+
+
+def _label_key(names: Tuple[str, ...], labels: Dict[str, str]) -> Tuple[str, ...]:
+    if set(labels) != set(names):
+        raise ValueError(f"expected labels {names}, got {tuple(labels)}")
+    return tuple(str(labels[n]) for n in names)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = ['{}="{}"'.format(n, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+             for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    """Monotonic count per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_key(self.labels, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(_label_key(self.labels, labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labels, key)} {value:g}" for key, value in items]
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count per label set."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], list] = {}  # key -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, **labels):
+        key = _label_key(self.labels, labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series[i] += 1
+            series[-2] += seconds
+            series[-1] += 1
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            series = self._series.get(_label_key(self.labels, labels))
+            return series[-1] if series else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        lines = []
+        for key, series in items:
+            bounds = [f"{bound:g}" for bound in self.buckets] + ["+Inf"]
+            for bound, cumulative in zip(bounds, series[:len(self.buckets)] + [series[-1]]):
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {series[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics, rendered together in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _add(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help: str, labels: Tuple[str, ...] = ()) -> Counter:
+        return self._add(Counter(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+REQUEST_SECONDS = metrics.histogram(
+    "scoring_request_seconds", "End-to-end scoring time per request", ("mode", "outcome"))
+STAGE_SECONDS = metrics.histogram(
+    "scoring_stage_seconds", "Time spent in one scoring stage", ("mode", "stage"))
+PROVIDER_SECONDS = metrics.histogram(
+    "scoring_provider_seconds", "Provider call time in the cascade", ("mode", "provider", "outcome"))
+PROVIDER_OUTCOMES = metrics.counter(
+    "scoring_provider_outcomes_total",
+    "Provider calls in the cascade by outcome (ok, no_result, error, abandoned, circuit_open)",
+    ("mode", "provider", "outcome"))
+PROVIDER_SELECTED = metrics.counter(
+    "scoring_provider_selected_total", "Requests answered by each provider (none = no answer)",
+    ("mode", "provider"))
+SLOW_REQUESTS = metrics.counter(
+    "scoring_slow_requests_total", "Requests over SCORING_TRACE_SLOW_MS whose timeline was kept", ("mode",))
+
+
+class Trace:
+    """Span timeline of one scoring request."""
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        self.started = time.monotonic()
+        self.spans: List[dict] = []
+        self._lock = threading.Lock()
+
+    def add(self, name: str, started: float, seconds: float, error: Optional[str] = None):
+        entry = {"name": name, "start_ms": int((started - self.started) * 1000), "ms": int(seconds * 1000)}
+        if error:
+            entry["error"] = error[:200]
+        with self._lock:
+            if len(self.spans) < MAX_SPANS:
+                self.spans.append(entry)
+
+    def timeline(self, total_seconds: float) -> dict:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: (s["start_ms"], -s["ms"]))
+        return {"total_ms": int(total_seconds * 1000), "spans": spans}
+
+
+_current: contextvars.ContextVar = contextvars.ContextVar("scoring_trace", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current.get()
+
+
+@contextmanager
+def span(stage: str, mode: Optional[str] = None, observe: bool = True):
+    """Time the enclosed block as `stage` of the current request.
+
+    `mode` labels the histogram when no trace is active (e.g. the DB commit
+    in the scoring worker). observe=False only adds the span to the timeline.
+    """
+    trace = _current.get()
+    started = time.monotonic()
+    error = None
+    try:
+        yield
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        seconds = time.monotonic() - started
+        if observe:
+            STAGE_SECONDS.observe(seconds, mode=mode or (trace.mode if trace else "none"), stage=stage)
+        if trace is not None:
+            trace.add(stage, started, seconds, error)
+
+
+def carry(fn: Callable) -> Callable:
+    """`fn` bound to a copy of the current context, for submitting to a thread pool."""
+    return functools.partial(contextvars.copy_context().run, fn)
+
+
+def outcome_of(result) -> str:
+    if not isinstance(result, dict):
+        return "none"
+    if result.get("preflight"):
+        return "rejected"
+    if result.get("cache_hit"):
+        return "cached"
+    if result.get("error"):
+        return "error"
+    return "ok"
+
+
+def traced(mode: str):
+    """Run the decorated scoring entry point as one traced request.
+
+    Called inside another traced request (the streamed take falling back to
+    assess_continuous_reading) it joins that request instead of starting one.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _current.get() is not None:
+                return fn(*args, **kwargs)
+            trace = Trace(mode)
+            token = _current.set(trace)
+            try:
+                result = fn(*args, **kwargs)
+            except Exception:
+                REQUEST_SECONDS.observe(time.monotonic() - trace.started, mode=mode, outcome="exception")
+                raise
+            finally:
+                _current.reset(token)
+            seconds = time.monotonic() - trace.started
+            REQUEST_SECONDS.observe(seconds, mode=mode, outcome=outcome_of(result))
+            if isinstance(result, dict) and seconds * 1000 >= settings.SCORING_TRACE_SLOW_MS:
+                SLOW_REQUESTS.inc(mode=mode)
+                # a copy: the result object may be the one held by the score cache
+                result = dict(result, trace=trace.timeline(seconds))
+            return result
+        return wrapper
+    return decorate
+
+
+def record_cascade(mode: str, result: Optional[dict], timings: List[dict]):
+    """Provider outcomes and the selected provider of one cascade run."""
+    for entry in timings:
+        outcome = entry.get("outcome", "unknown")
+        PROVIDER_OUTCOMES.inc(mode=mode, provider=entry["provider"], outcome=outcome)
+        if outcome != "circuit_open":
+            PROVIDER_SECONDS.observe(entry.get("ms", 0) / 1000.0, mode=mode,
+                                     provider=entry["provider"], outcome=outcome)
+    PROVIDER_SELECTED.inc(mode=mode, provider=(result or {}).get("provider") or "none")
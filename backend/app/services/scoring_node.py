@@ -0,0 +1,232 @@
+"""境内评分节点客户端（异步 job：上传后等结果）。
+
+旧实现每 3 秒新建一次连接轮询 /result/{job_id}：固定 sleep 让每次评分白等
+0-3 秒，跨境 TLS 握手也每次重来。现在：
+
+- 所有请求走同一个带连接池的 keep-alive requests.Session；
+- 回调：配置了 SCORING_NODE_CALLBACK_URL 和 SCORING_NODE_TOKEN（不用内置默认
+  令牌）时，提交 job 时带上 callback_url，节点算完把 {"job_id", "status",
+  "result"} POST 到后端 /api/scoring-node/callback，等待方立即被唤醒；
+- 长轮询：GET /result/{job_id}?wait=N，支持的节点挂住请求直到结果就绪；
+- 不支持长轮询的节点会立即回 pending，此时按自适应退避轮询
+  （SCORING_NODE_POLL_MIN 起，每次 ×1.5，上限 SCORING_NODE_POLL_MAX）。
+
+回调只能唤醒同一进程里的等待方（多 worker 部署时可能落到别的进程），
+所以轮询始终作为兜底同时进行。
+"""
+
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.core.config import settings
+
+BACKOFF_FACTOR = 1.5
+RESULT_TTL = 600.0  # seconds an undelivered callback result is kept
+MAX_EARLY_RESULTS = 64  # callback results kept for job ids nobody is waiting on yet
+
+
+def _node_url():
+    return getattr(settings, "SCORING_NODE_URL", None) or os.getenv("SCORING_NODE_URL")
+
+
+def configured_token():
+    """The token set in settings / env, None when only the built-in default would apply."""
+    return getattr(settings, "SCORING_NODE_TOKEN", None) or os.getenv("SCORING_NODE_TOKEN")
+
+
+def node_token():
+    return configured_token() or "sr-cn-2026-xfyun"
+
+
+def callbacks_enabled():
+    """Push delivery needs a callback URL and a token the node can prove it holds."""
+    return bool(settings.SCORING_NODE_CALLBACK_URL and configured_token())
+
+
+def node_available():
+    return bool(_node_url())
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def session() -> requests.Session:
+    """进程内共享的 keep-alive 连接池。"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max(4, settings.SCORING_WORKERS * 2))
+            s.mount("http://", adapter)
+            s.mount("https://", adapter)
+            s.headers["X-Token"] = node_token()
+            _session = s
+        return _session
+
+
+def probe_node():
+    """健康探测：节点有应答（非 5xx）即视为可用。"""
+    url = _node_url()
+    if not url:
+        return False
+    resp = session().get(url.rstrip("/") + "/", timeout=5)
+    return resp.status_code < 500
+
+
+class ResultWaiters:
+    """回调结果的投递点：等待方按 job_id 登记，回调到达即唤醒。
+
+    回调可能比 /score 的响应先到（节点算得快），所以没人等的结果也先存着，
+    登记时直接取走；超过 RESULT_TTL 没人要的丢弃，没人等的最多留
+    MAX_EARLY_RESULTS 条（先到的先丢）。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._events = {}
+        self._results = {}  # job_id -> (received monotonic time, payload)
+
+    def register(self, job_id: str) -> threading.Event:
+        with self._lock:
+            event = self._events.setdefault(job_id, threading.Event())
+            if job_id in self._results:
+                event.set()
+            return event
+
+    def deliver(self, job_id: str, payload: dict) -> bool:
+        """存下回调结果；返回是否有等待方。"""
+        now = time.monotonic()
+        with self._lock:
+            for stale in [k for k, (at, _) in self._results.items() if now - at > RESULT_TTL]:
+                del self._results[stale]
+            self._results[job_id] = (now, payload)
+            unclaimed = [k for k in self._results if k not in self._events]
+            for dropped in unclaimed[:-MAX_EARLY_RESULTS]:
+                del self._results[dropped]
+            event = self._events.get(job_id)
+            if event is not None:
+                event.set()
+            return event is not None
+
+    def take(self, job_id: str):
+        with self._lock:
+            entry = self._results.pop(job_id, None)
+            return entry[1] if entry else None
+
+    def discard(self, job_id: str):
+        with self._lock:
+            self._events.pop(job_id, None)
+            self._results.pop(job_id, None)
+
+
+waiters = ResultWaiters()
+
+
+def _outcome(payload: dict):
+    """done → 结果 dict；error → None。其余状态返回 False 表示还没完。"""
+    status = payload.get("status")
+    if status == "done":
+        return payload["result"]
+    if status == "error":
+        print(f"scoring node error: {payload.get('result')}")
+        return None
+    return False
+
+
+def await_result(base: str, job_id: str, timeout: float):
+    """等 job 结果：回调 / 长轮询 / 自适应退避轮询，先到先得。返回 dict 或 None。"""
+    deadline = time.monotonic() + timeout
+    event = waiters.register(job_id) if callbacks_enabled() else None
+    delay = settings.SCORING_NODE_POLL_MIN
+    try:
+        while True:
+            if event is not None and event.is_set():
+                payload = waiters.take(job_id)
+                if payload is not None:
+                    outcome = _outcome(payload)
+                    if outcome is not False:
+                        return outcome
+                event.clear()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                print("scoring node poll timeout")
+                return None
+
+            hold = min(settings.SCORING_NODE_LONG_POLL, remaining)
+            started = time.monotonic()
+            try:
+                pr = session().get(f"{base}/result/{job_id}",
+                                   params={"wait": int(hold)} if hold >= 1 else None,
+                                   timeout=hold + 15)
+                if pr.status_code == 200:
+                    outcome = _outcome(pr.json())
+                    if outcome is not False:
+                        return outcome
+            except requests.RequestException as e:
+                print(f"scoring node poll failed (retrying): {e}")
+            if hold >= 1 and time.monotonic() - started >= hold / 2:
+                delay = settings.SCORING_NODE_POLL_MIN  # node held the request: ask again at once
+                continue
+
+            pause = min(delay, max(0.0, deadline - time.monotonic()))
+            if event is not None:
+                event.wait(pause)
+            else:
+                time.sleep(pause)
+            delay = min(delay * BACKOFF_FACTOR, settings.SCORING_NODE_POLL_MAX)
+    finally:
+        waiters.discard(job_id)
+
+
+def _node_upload(wav_bytes, mp3_path=None):
+    """(payload, filename, content type) for the node: mp3 when possible."""
+    # 入库时已生成 mp3 就直接用，不再转码
+    if mp3_path:
+        try:
+            with open(mp3_path, "rb") as f:
+                return f.read(), "audio.mp3", "audio/mpeg"
+        except OSError:
+            pass
+    # 压成 mp3 再跨境上传(1.5MB->~150KB,避免跨境大文件卡死);ffmpeg 走管道不落盘
+    import subprocess
+    try:
+        upload = subprocess.run(
+            ["ffmpeg", "-loglevel", "error", "-f", "wav", "-i", "pipe:0",
+             "-ac", "1", "-b:a", "24k", "-f", "mp3", "pipe:1"],
+            input=wav_bytes, capture_output=True, check=True, timeout=60,
+        ).stdout
+        return upload, "audio.mp3", "audio/mpeg"
+    except Exception:
+        return wav_bytes, "audio.wav", "audio/wav"
+
+
+def assess_via_node(wav_bytes, reference_words, poll_timeout=180, mp3_path=None):
+    """转发到境内评分节点（异步 job，避免跨境长连接）。返回 dict 或 None。"""
+    url = _node_url()
+    if not url:
+        return None
+    base = url.rstrip("/")
+    upload, upload_name, upload_type = _node_upload(wav_bytes, mp3_path)
+    data = {"reference": "\n".join(reference_words)}
+    if callbacks_enabled():
+        data["callback_url"] = settings.SCORING_NODE_CALLBACK_URL.rstrip("/")
+    try:
+        resp = session().post(
+            base + "/score",
+            files={"audio_file": (upload_name, upload, upload_type)},
+            data=data,
+            timeout=30,
+        )
+        resp.raise_for_status()
+        job_id = resp.json().get("job_id")
+        if not job_id:
+            return None
+        return await_result(base, str(job_id), poll_timeout)
+    except Exception as e:
+        print(f"scoring node failed, falling back: {e}")
+        return None
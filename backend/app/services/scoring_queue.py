@@ -0,0 +1,264 @@
+"""
+Durable background scoring for single-word submissions.
+
+The submit endpoint only stores the upload plus a `scoring_jobs` row and hands
+the job id to a small fixed pool of worker threads; the slow xfyun / Azure /
+GOP round-trips happen there, so a whole class submitting at once no longer
+stalls the event loop for every other request. The table is the source of
+truth: jobs still queued or running when the process dies are re-dispatched
+on the next startup, keeping their attempt count and last error.
+"""
+
+import threading
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.models.recording import Recording, RecordingStatus
+from app.models.scoring_job import ScoringJob, ScoringJobStatus
+from app.models.word import WordAssignment
+from app.services.audio_ingest import ingest_recording
+from app.services.daily_progress import record_attempt
+from app.services.scoring_metrics import span
+
+
+# a running job older than this has lost its worker: the word budget plus
+# ingest, feedback and commit time
+RUNNING_TIMEOUT = settings.SCORING_WORD_BUDGET + 60.0
+
+
+class ScoringQueue:
+    """Bounded worker pool draining the `scoring_jobs` table."""
+
+    def __init__(self, max_workers: int):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scoring")
+        self._waiters = {}  # job id -> Future resolved when the job is done/failed
+        self._lock = threading.Lock()
+
+    # ---- producer side ----
+
+    def enqueue(self, db, recording: Recording, word_text: str, audio_file_path: str) -> ScoringJob:
+        """Add a job for `recording` to the session; the caller commits, then dispatches."""
+        job = ScoringJob(
+            recording_id=recording.id,
+            kind="word",
+            word_text=word_text,
+            audio_file_path=audio_file_path,
+            status=ScoringJobStatus.QUEUED,
+            max_attempts=settings.SCORING_MAX_ATTEMPTS,
+        )
+        db.add(job)
+        return job
+
+    def dispatch(self, job_id: int, bind) -> Future:
+        """Schedule a committed job on the pool. `bind` is the engine it lives in."""
+        with self._lock:
+            waiter = self._waiters.get(job_id)
+            if waiter is None:
+                waiter = self._waiters[job_id] = Future()
+                # cancelled by a submitter that stopped waiting: nobody else will
+                waiter.add_done_callback(lambda done: self._forget(job_id, done))
+        self._executor.submit(self._run, job_id, bind)
+        return waiter
+
+    def _forget(self, job_id: int, waiter: Future):
+        with self._lock:
+            if self._waiters.get(job_id) is waiter:
+                del self._waiters[job_id]
+
+    def recover(self, bind) -> int:
+        """Re-dispatch queued jobs and running ones that lost their worker. Returns the count."""
+        session = sessionmaker(autocommit=False, autoflush=False, bind=bind)()
+        try:
+            # a job running for longer than any scoring can take lost its worker;
+            # a younger one may still be scored by a live process, and requeueing
+            # it would score the take twice (and count the attempt twice)
+            cutoff = datetime.utcnow() - timedelta(seconds=RUNNING_TIMEOUT)
+            session.query(ScoringJob).filter(
+                ScoringJob.status == ScoringJobStatus.RUNNING,
+                or_(ScoringJob.started_at.is_(None), ScoringJob.started_at < cutoff)
+            ).update({ScoringJob.status: ScoringJobStatus.QUEUED}, synchronize_session=False)
+            session.commit()
+            job_ids = [r[0] for r in session.query(ScoringJob.id).filter(
+                ScoringJob.status == ScoringJobStatus.QUEUED
+            ).order_by(ScoringJob.id).all()]
+            oldest_left = session.query(func.min(ScoringJob.started_at)).filter(
+                ScoringJob.status == ScoringJobStatus.RUNNING
+            ).scalar()
+        finally:
+            session.close()
+        for job_id in job_ids:
+            self._executor.submit(self._run, job_id, bind)  # nobody waits on these
+        if oldest_left is not None:
+            # look again once the oldest of them is overdue
+            if oldest_left.tzinfo is not None:
+                oldest_left = oldest_left.astimezone(timezone.utc).replace(tzinfo=None)
+            delay = (oldest_left - cutoff).total_seconds() + 1.0
+            timer = threading.Timer(max(1.0, delay), self.recover, args=(bind,))
+            timer.daemon = True
+            timer.start()
+        return len(job_ids)
+
+    # ---- worker side ----
+
+    def _run(self, job_id: int, bind):
+        session = sessionmaker(autocommit=False, autoflush=False, bind=bind)()
+        final = False
+        try:
+            # atomic claim: only one worker (or process) may move queued -> running
+            claimed = session.query(ScoringJob).filter(
+                ScoringJob.id == job_id,
+                ScoringJob.status == ScoringJobStatus.QUEUED
+            ).update({
+                ScoringJob.status: ScoringJobStatus.RUNNING,
+                ScoringJob.attempts: ScoringJob.attempts + 1,
+                ScoringJob.started_at: datetime.utcnow(),
+            }, synchronize_session=False)
+            session.commit()
+            if not claimed:
+                # another worker owns the job and resolves the waiter when it is done
+                return
+
+            job = session.query(ScoringJob).filter(ScoringJob.id == job_id).first()
+            try:
+                audio_path = self._ingest(session, job)
+                assessment = self._score_word(session, job, audio_path)
+                job.status = ScoringJobStatus.DONE
+                job.last_error = None
+                job.finished_at = datetime.utcnow()
+                with span("db_commit", mode="word"):
+                    session.commit()
+                final = True
+            except Exception as e:
+                traceback.print_exc()
+                session.rollback()
+                job = session.query(ScoringJob).filter(ScoringJob.id == job_id).first()
+                job.last_error = str(e)[:500]
+                if job.attempts < job.max_attempts:
+                    job.status = ScoringJobStatus.QUEUED
+                    session.commit()
+                    self._retry_later(job_id, bind, job.attempts)
+                    return
+                self._mark_failed(session, job)
+                session.commit()
+                final = True
+                return
+
+            # shadow-score with the self-hosted ML model (fire-and-forget)
+            try:
+                from app.services.shadow_service import submit_shadow
+                submit_shadow(job.recording_id, job.word_text, audio_path, assessment)
+            except Exception as e:
+                print(f"Shadow submit failed (non-fatal): {e}")
+        except Exception as e:
+            print(f"Scoring job {job_id} crashed: {e}")
+            traceback.print_exc()
+            session.close()  # let go of its transaction before settling through a fresh one
+            final = self._settle_crashed(job_id, bind, str(e))
+        finally:
+            session.close()
+            if final:
+                with self._lock:
+                    waiter = self._waiters.pop(job_id, None)
+                if waiter is not None and not waiter.done():
+                    waiter.set_result(job_id)
+
+    def _retry_later(self, job_id: int, bind, attempts: int):
+        timer = threading.Timer(min(2 ** attempts, 30), self._executor.submit, args=(self._run, job_id, bind))
+        timer.daemon = True
+        timer.start()
+
+    def _settle_crashed(self, job_id: int, bind, error: str) -> bool:
+        """Requeue (or fail) a job whose worker crashed while it was running.
+
+        Otherwise it would stay running until recover() found it overdue.
+        Returns whether the job is final.
+        """
+        session = sessionmaker(autocommit=False, autoflush=False, bind=bind)()
+        try:
+            job = session.query(ScoringJob).filter(
+                ScoringJob.id == job_id,
+                ScoringJob.status == ScoringJobStatus.RUNNING
+            ).first()
+            if job is None:
+                return True  # crashed before claiming it: still queued for recover()
+            job.last_error = error[:500]
+            if job.attempts < job.max_attempts:
+                job.status = ScoringJobStatus.QUEUED
+                session.commit()
+                self._retry_later(job_id, bind, job.attempts)
+                return False
+            self._mark_failed(session, job)
+            session.commit()
+            return True
+        except Exception as e:
+            print(f"Could not settle crashed scoring job {job_id}: {e}")
+            return True
+        finally:
+            session.close()
+
+    @staticmethod
+    def _mark_failed(session, job: ScoringJob):
+        """Out of attempts: fail the job and leave the take for the teacher; the caller commits."""
+        job.status = ScoringJobStatus.FAILED
+        job.finished_at = datetime.utcnow()
+        rec = session.query(Recording).filter(Recording.id == job.recording_id).first()
+        if rec:
+            rec.automated_scores = {"error": job.last_error, "pronunciation_score": 0}
+            rec.teacher_feedback = "自动评分失败，可以重新录音，或等老师人工评分。"
+            rec.status = RecordingStatus.PENDING
+            # the take still counts towards the day, just without a score
+            record_attempt(session, rec.student_id, date.today(), None)
+
+    @staticmethod
+    def _ingest(session, job: ScoringJob) -> str:
+        """Derive the canonical PCM and MP3 once; committed so retries reuse them."""
+        recording = session.query(Recording).filter(Recording.id == job.recording_id).first()
+        if not recording:
+            return job.audio_file_path
+        audio_path = ingest_recording(recording)
+        session.commit()
+        return audio_path
+
+    @staticmethod
+    def _score_word(session, job: ScoringJob, audio_path: str) -> dict:
+        """Score one word take and write recording, practice count and daily progress."""
+        from app.services.pronunciation_service import pronunciation_service
+        from app.services.feedback_service import feedback_service
+
+        recording = session.query(Recording).filter(Recording.id == job.recording_id).first()
+        if not recording:
+            raise RuntimeError(f"recording {job.recording_id} no longer exists")
+
+        assessment_result = pronunciation_service.assess_pronunciation(audio_path, job.word_text)
+        automated_feedback = feedback_service.generate_feedback(assessment_result, job.word_text)
+
+        recording.automated_scores = assessment_result
+        recording.teacher_feedback = automated_feedback['feedback_text']
+        recording.teacher_grade = automated_feedback['grade']
+        recording.status = (RecordingStatus.PENDING if assessment_result.get("error")
+                            else RecordingStatus.REVIEWED)
+        recording.reviewed_at = None if assessment_result.get("error") else datetime.utcnow()
+
+        # Update word practice count
+        word_text = job.word_text.lower()
+        word_assignment = session.query(WordAssignment).filter(
+            WordAssignment.word_text == word_text
+        ).first()
+        if word_assignment:
+            word_assignment.times_practiced += 1
+        else:
+            session.add(WordAssignment(word_text=word_text, times_practiced=1))
+
+        # Update student progress for today: one upsert, safe against concurrent takes
+        record_attempt(session, recording.student_id, date.today(), recording.pronunciation_score)
+
+        return assessment_result
+
+
+# Singleton instance
+scoring_queue = ScoringQueue(max_workers=settings.SCORING_WORKERS)
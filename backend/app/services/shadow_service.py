@@ -2,43 +2,61 @@
 Shadow scoring: forward each real submission to the self-hosted
 speakright-ml model (wav2vec2 GOP) and log its score next to Azure's.
 Fire-and-forget — never affects the user-facing result.
+
+Submissions go through one long-lived pipeline rather than a thread each:
+a bounded job queue drained by SHADOW_WORKERS threads, and a single writer
+that inserts the resulting rows into shadow_scores in micro-batches through
+the app engine. During class peaks the queue sheds load instead of piling
+up threads — past SHADOW_SAMPLE_DEPTH only a SHADOW_SAMPLE_RATE sample of
+new jobs is kept, and a full queue drops them — and stats() reports depth
+and drop counts. Shadow rows are calibration data, so losing some under
+load (or pending ones on shutdown) is acceptable.
 """
 
 import os
-import time
-import sqlite3
-import shutil
-import subprocess
-import tempfile
+import queue
+import random
 import threading
+import time
 
 import requests
+from sqlalchemy import insert
 
-# at most 2 shadow jobs at once: each spawns ffmpeg + an HTTP call, and an
-# unbounded pile of them during class time can exhaust the small prod box
-_GATE = threading.BoundedSemaphore(2)
+from app.core.config import settings
+from app.models.shadow_score import ShadowScore
 
 SHADOW_ML_URL = os.getenv(
     "SHADOW_ML_URL",
     "http://159.89.193.226:8002/pronunciation-assessment/file"
 )
-DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "app.db")
 
 
-def gop_assess_full(wav_path: str, reference_text: str, timeout: float = 30.0):
+def gop_available():
+    return bool(SHADOW_ML_URL)
+
+
+def gop_probe():
+    """Cheap reachability check of the GOP box (any non-5xx answer)."""
+    from urllib.parse import urlsplit
+    parts = urlsplit(SHADOW_ML_URL)
+    resp = requests.get(f"{parts.scheme}://{parts.netloc}/", timeout=5)
+    return resp.status_code < 500
+
+
+def gop_assess_full(wav_bytes: bytes, reference_text: str, timeout: float = 30.0):
     """Full GOP assessment as a fallback scorer when Azure is unavailable.
 
-    Returns a dict shaped like the Azure pronunciation-service result (so the
-    strict-scoring layer and frontend need no changes), or None on failure.
+    Takes the 16 kHz mono WAV in memory. Returns a dict shaped like the Azure
+    pronunciation-service result (so the strict-scoring layer and frontend
+    need no changes), or None on failure.
     """
     try:
-        with open(wav_path, "rb") as f:
-            resp = requests.post(
-                SHADOW_ML_URL,
-                files={"audio_file": ("audio.wav", f, "audio/wav")},
-                data={"reference_text": reference_text},
-                timeout=timeout,
-            )
+        resp = requests.post(
+            SHADOW_ML_URL,
+            files={"audio_file": ("audio.wav", wav_bytes, "audio/wav")},
+            data={"reference_text": reference_text},
+            timeout=timeout,
+        )
         resp.raise_for_status()
         nbest = (resp.json().get("NBest") or [{}])[0]
         if not nbest or nbest.get("PronScore") is None:
@@ -68,7 +86,7 @@ def gop_assess_full(wav_path: str, reference_text: str, timeout: float = 30.0):
         return None
 
 
-def gop_transcribe_sync(wav_path: str, reference_text: str, timeout: float = 5.0):
+def gop_transcribe_sync(wav_bytes: bytes, reference_text: str, timeout: float = 5.0):
     """Synchronous GOP scoring call, used as a live second opinion.
 
     The GOP model has no language-model prior, so unlike Azure/audio-LLMs it
@@ -77,13 +95,12 @@ def gop_transcribe_sync(wav_path: str, reference_text: str, timeout: float = 5.0
     gracefully when the ML box is unreachable.
     """
     try:
-        with open(wav_path, "rb") as f:
-            resp = requests.post(
-                SHADOW_ML_URL,
-                files={"audio_file": ("audio.wav", f, "audio/wav")},
-                data={"reference_text": reference_text},
-                timeout=timeout,
-            )
+        resp = requests.post(
+            SHADOW_ML_URL,
+            files={"audio_file": ("audio.wav", wav_bytes, "audio/wav")},
+            data={"reference_text": reference_text},
+            timeout=timeout,
+        )
         resp.raise_for_status()
         nbest = (resp.json().get("NBest") or [{}])[0]
         return nbest.get("Display") or nbest.get("Lexical"), nbest.get("PronScore")
@@ -91,52 +108,89 @@ def gop_transcribe_sync(wav_path: str, reference_text: str, timeout: float = 5.0
         return None, None
 
 
-def submit_shadow(recording_id: int, word_text: str, audio_path: str, assessment: dict):
-    """Send the audio to the shadow model in a background thread."""
-    def run():
-        with _GATE:
-            _run_inner()
+_FLUSH = object()  # rows-queue marker: write the partial batch now
 
-    def _run_inner():
-        started = time.time()
-        ml_pron = ml_acc = None
-        ml_recognized = None
-        error = None
-        wav_path = None
+
+class ShadowPipeline:
+    """Bounded shadow job queue, fixed worker pool and batched row writer."""
+
+    def __init__(self, workers: int = 2, queue_size: int = 200, sample_depth: int = 50,
+                 sample_rate: float = 0.25, batch_size: int = 50, flush_interval: float = 2.0):
+        self.workers = workers
+        self.sample_depth = sample_depth
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.bind = None  # engine the rows are written through; app engine when None
+        self._jobs = queue.Queue(maxsize=queue_size)
+        self._rows = queue.Queue()
+        self._lock = threading.Lock()
+        self._started = False
+        self._peak_depth = 0
+        self._counts = {
+            "accepted": 0, "dropped_sampled": 0, "dropped_full": 0,
+            "model_errors": 0, "written": 0, "write_failures": 0, "batches": 0,
+        }
+
+    def _count(self, name: str, n: int = 1):
+        with self._lock:
+            self._counts[name] += n
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        for i in range(self.workers):
+            threading.Thread(target=self._work_loop, daemon=True, name=f"shadow-score-{i}").start()
+        threading.Thread(target=self._write_loop, daemon=True, name="shadow-writer").start()
+
+    def submit(self, recording_id: int, word_text: str, audio_path: str, assessment: dict) -> bool:
+        """Queue one submission; False when it was shed."""
+        self._ensure_started()
+        row = {
+            "recording_id": recording_id,
+            "word_text": word_text,
+            "azure_score": assessment.get("azure_pronunciation_score"),
+            "azure_accuracy": assessment.get("accuracy_score"),
+            "final_score": assessment.get("pronunciation_score"),
+        }
         # live scoring already asked the GOP model — reuse, don't call twice
         if assessment.get("gop_heard") is not None:
-            try:
-                conn = sqlite3.connect(DB_PATH, timeout=30)
-                conn.execute(
-                    "INSERT INTO shadow_scores (recording_id, word_text, azure_score, azure_accuracy, final_score, ml_pron_score, ml_accuracy, ml_recognized, ml_error, latency_ms) VALUES (?,?,?,?,?,?,?,?,?,?)",
-                    (recording_id, word_text,
-                     assessment.get("azure_pronunciation_score"),
-                     assessment.get("accuracy_score"),
-                     assessment.get("pronunciation_score"),
-                     assessment.get("gop_score"), None,
-                     assessment.get("gop_heard"), None, 0),
-                )
-                conn.commit()
-                conn.close()
-            except Exception as e:
-                print(f"Shadow score logging failed: {e}")
-            return
+            row.update(ml_pron_score=assessment.get("gop_score"), ml_accuracy=None,
+                       ml_recognized=assessment.get("gop_heard"), ml_error=None, latency_ms=0)
+            self._rows.put(row)
+            self._count("accepted")
+            return True
+
+        depth = self._jobs.qsize()
+        if depth >= self.sample_depth and random.random() >= self.sample_rate:
+            self._count("dropped_sampled")
+            return False
+        try:
+            self._jobs.put_nowait((row, audio_path))
+        except queue.Full:
+            self._count("dropped_full")
+            return False
+        with self._lock:
+            self._counts["accepted"] += 1
+            self._peak_depth = max(self._peak_depth, depth + 1)
+        return True
+
+    def _score(self, row: dict, audio_path: str) -> dict:
+        started = time.time()
+        ml_pron = ml_acc = ml_recognized = error = None
         try:
-            # the shadow model needs 16k mono wav; original upload may be webm/44.1k
-            fd, wav_path = tempfile.mkstemp(suffix=".wav")
-            os.close(fd)
-            subprocess.run(
-                ["ffmpeg", "-y", "-loglevel", "error", "-i", audio_path,
-                 "-ar", "16000", "-ac", "1", "-sample_fmt", "s16", wav_path],
-                check=True, timeout=60
+            # the shadow model needs 16k mono wav; callers pass the canonical
+            # PCM written at ingest, so this is a plain read, not a transcode
+            from app.services.audio_preprocess import DecodedAudio
+            wav_bytes = DecodedAudio.from_file(audio_path).wav_bytes()
+            resp = requests.post(
+                SHADOW_ML_URL,
+                files={"audio_file": ("audio.wav", wav_bytes, "audio/wav")},
+                data={"reference_text": row["word_text"]},
+                timeout=120,
             )
-            with open(wav_path, "rb") as f:
-                resp = requests.post(
-                    SHADOW_ML_URL,
-                    files={"audio_file": ("audio.wav", f, "audio/wav")},
-                    data={"reference_text": word_text},
-                    timeout=120,
-                )
             resp.raise_for_status()
             nbest = (resp.json().get("NBest") or [{}])[0]
             ml_pron = nbest.get("PronScore")
@@ -144,32 +198,98 @@ def submit_shadow(recording_id: int, word_text: str, audio_path: str, assessment
             ml_recognized = nbest.get("Display") or nbest.get("Lexical")
         except Exception as e:
             error = str(e)[:300]
-        finally:
-            if wav_path and os.path.exists(wav_path):
-                os.remove(wav_path)
+            self._count("model_errors")
+        return dict(row, ml_pron_score=ml_pron, ml_accuracy=ml_acc, ml_recognized=ml_recognized,
+                    ml_error=error, latency_ms=int((time.time() - started) * 1000))
+
+    def _work_loop(self):
+        while True:
+            row, audio_path = self._jobs.get()
+            try:
+                self._rows.put(self._score(row, audio_path))
+            except Exception as e:
+                print(f"Shadow scoring failed: {e}")
+            finally:
+                self._jobs.task_done()
+
+    def _write_loop(self):
+        while True:
+            batch, taken = [], 0
+            item = self._rows.get()
+            taken += 1
+            deadline = time.monotonic() + self.flush_interval
+            while item is not _FLUSH:
+                batch.append(item)
+                remaining = deadline - time.monotonic()
+                if len(batch) >= self.batch_size or remaining <= 0:
+                    break
+                try:
+                    item = self._rows.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                taken += 1
+            if batch:
+                self._write(batch)
+            for _ in range(taken):
+                self._rows.task_done()
 
+    def _write(self, rows: list):
+        """One multi-row INSERT (executemany) in one transaction."""
         try:
-            conn = sqlite3.connect(DB_PATH, timeout=30)
-            conn.execute(
-                "INSERT INTO shadow_scores (recording_id, word_text, azure_score, azure_accuracy, final_score, ml_pron_score, ml_accuracy, ml_recognized, ml_error, latency_ms) VALUES (?,?,?,?,?,?,?,?,?,?)",
-                (
-                    recording_id,
-                    word_text,
-                    assessment.get("azure_pronunciation_score"),
-                    assessment.get("accuracy_score"),
-                    assessment.get("pronunciation_score"),
-                    ml_pron,
-                    ml_acc,
-                    ml_recognized,
-                    error,
-                    int((time.time() - started) * 1000),
-                ),
-            )
-            conn.commit()
-            conn.close()
+            if self.bind is None:
+                from app.db.session import engine
+                bind = engine
+            else:
+                bind = self.bind
+            with bind.begin() as conn:
+                conn.execute(insert(ShadowScore.__table__), rows)
+            with self._lock:
+                self._counts["written"] += len(rows)
+                self._counts["batches"] += 1
         except Exception as e:
+            self._count("write_failures", len(rows))
             print(f"Shadow score logging failed: {e}")
 
-    if not shutil.which("ffmpeg"):
-        return
-    threading.Thread(target=run, daemon=True, name="shadow-score").start()
+    def drain(self, timeout: float = 10.0) -> bool:
+        """Wait until every queued job is scored and its row written."""
+        deadline = time.monotonic() + timeout
+        while self._jobs.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        if not self._started:
+            return True
+        self._rows.put(_FLUSH)
+        while self._rows.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counts)
+            stats["peak_depth"] = self._peak_depth
+        stats["queue_depth"] = self._jobs.qsize()
+        stats["queue_capacity"] = self._jobs.maxsize
+        stats["pending_rows"] = self._rows.qsize()
+        stats["dropped"] = stats["dropped_sampled"] + stats["dropped_full"]
+        return stats
+
+
+def submit_shadow(recording_id: int, word_text: str, audio_path: str, assessment: dict) -> bool:
+    """Queue the audio for the shadow model; False when skipped or shed."""
+    if assessment.get("_mock"):
+        return False  # no live scorer configured: nothing to compare the model against
+    return shadow_pipeline.submit(recording_id, word_text, audio_path, assessment)
+
+
+# Singleton instance
+shadow_pipeline = ShadowPipeline(
+    workers=settings.SHADOW_WORKERS,
+    queue_size=settings.SHADOW_QUEUE_SIZE,
+    sample_depth=settings.SHADOW_SAMPLE_DEPTH,
+    sample_rate=settings.SHADOW_SAMPLE_RATE,
+    batch_size=settings.SHADOW_BATCH_SIZE,
+    flush_interval=settings.SHADOW_FLUSH_INTERVAL,
+)
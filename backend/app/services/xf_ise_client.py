@@ -0,0 +1,213 @@
+"""讯飞语音评测(ISE) websocket 的 asyncio 客户端。
+
+旧实现每次评测新开两个线程（run_forever + 发送线程），每次重新签名，
+并按 40ms/1280 字节的实时速度上传——20 秒的连读光是上传就要 20 秒。
+学生的录音是完整文件，不是实时麦克风流，没有必要按实时节奏发：
+
+- 所有会话跑在同一个后台事件循环上，同步调用方用 run_coroutine_threadsafe
+  提交，不再每次起线程；
+- 音频帧之间默认不等待（XF_ISE_SEND_INTERVAL=0），只受 websocket 写缓冲的
+  背压约束；设为 0.04 即恢复实时节奏；
+- 鉴权 URL 在 XF_ISE_SIGNATURE_TTL 秒内复用（讯飞允许 300 秒时钟偏差），
+  同一窗口内的会话共用一次 HMAC 签名；
+- 并发会话数受 XF_ISE_MAX_SESSIONS 限制，超出的在本地排队，而不是被讯飞
+  限流或拒绝。
+"""
+
+import asyncio
+import base64
+import concurrent.futures
+import hashlib
+import hmac
+import json
+import ssl
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+from wsgiref.handlers import format_date_time
+
+try:
+    from websockets.asyncio.client import connect as _ws_connect
+    from websockets.exceptions import ConnectionClosed
+    WS_AVAILABLE = True
+except Exception:
+    WS_AVAILABLE = False
+
+from app.core.config import settings
+
+
+def sign_url(endpoint: str, api_key: str, api_secret: str, now: float) -> str:
+    """按讯飞 hmac-sha256 规则签出带鉴权参数的 websocket URL。"""
+    parts = urlsplit(endpoint)
+    date = format_date_time(int(now))
+    origin = f"host: {parts.netloc}\ndate: {date}\nGET {parts.path} HTTP/1.1"
+    sig = base64.b64encode(
+        hmac.new(api_secret.encode(), origin.encode(), hashlib.sha256).digest()
+    ).decode()
+    auth = (f'api_key="{api_key}", algorithm="hmac-sha256", '
+            f'headers="host date request-line", signature="{sig}"')
+    auth_b64 = base64.b64encode(auth.encode()).decode()
+    return f"{endpoint}?" + urlencode(
+        {"authorization": auth_b64, "date": date, "host": parts.netloc}
+    )
+
+
+class URLSigner:
+    """鉴权 URL 缓存：一个时间窗内的所有会话共用一次签名。"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cached = None  # (endpoint, api_key, api_secret), expires_at, url
+        self.signatures = 0
+
+    def url(self, endpoint: str, api_key: str, api_secret: str, now: float = None) -> str:
+        now = time.time() if now is None else now
+        key = (endpoint, api_key, api_secret)
+        with self._lock:
+            if self._cached and self._cached[0] == key and now < self._cached[1]:
+                return self._cached[2]
+            url = sign_url(endpoint, api_key, api_secret, now)
+            self._cached = (key, now + settings.XF_ISE_SIGNATURE_TTL, url)
+            self.signatures += 1
+            return url
+
+
+def session_frames(appid: str, audio: bytes, text: str, category: str, frame_bytes: int):
+    """一次评测要发的全部消息：ssb 参数帧，然后音频帧（aus 1 首帧 / 2 中间 / 4 末帧）。"""
+    marker = "[word]" if category == "read_word" else "[content]"
+    ssb = {
+        "category": category, "rstcd": "utf8", "sub": "ise",
+        "ent": "en_vip", "tte": "utf-8", "cmd": "ssb",
+        "auf": "audio/L16;rate=16000", "aue": "raw",
+        "text": marker + "\n" + text,
+    }
+    yield json.dumps({"common": {"app_id": appid}, "business": ssb,
+                      "data": {"status": 0, "data": ""}})
+    i, first = 0, True
+    while i < len(audio):
+        chunk = audio[i:i + frame_bytes]
+        i += frame_bytes
+        last = i >= len(audio)
+        aus = 1 if first else (4 if last else 2)
+        first = False
+        yield json.dumps({
+            "business": {"cmd": "auw", "aus": aus, "aue": "raw"},
+            "data": {"status": 2 if last else 1,
+                     "data": base64.b64encode(chunk).decode(),
+                     "data_type": 1, "encoding": "raw"},
+        })
+
+
+class ISEClient:
+    """共享事件循环上的 ISE 会话；同步代码通过 evaluate_sync / probe_sync 调用。"""
+
+    def __init__(self):
+        self.signer = URLSigner()
+        self._loop = None
+        self._lock = threading.Lock()
+        self._sessions = None  # asyncio.Semaphore, created on the loop
+        self._ssl = None
+        self.active = 0
+        self.peak = 0
+
+    # ---- 共享事件循环 ----
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="xf-ise-loop", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def run(self, coro, timeout: float):
+        """在共享事件循环上执行协程并阻塞等待结果。"""
+        future = asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise RuntimeError("xfyun timeout")
+
+    # ---- 会话 ----
+
+    def _ssl_context(self, url: str):
+        if not url.startswith("wss:"):
+            return None
+        if self._ssl is None:
+            # 与旧实现一致：不校验证书（CERT_NONE）
+            ctx = ssl.create_default_context()
+            ctx.check_hostname = False
+            ctx.verify_mode = ssl.CERT_NONE
+            self._ssl = ctx
+        return self._ssl
+
+    def _url(self, creds) -> str:
+        _appid, api_key, api_secret = creds
+        return self.signer.url(settings.XF_ISE_URL, api_key, api_secret)
+
+    async def evaluate(self, audio: bytes, text: str, category: str, creds) -> str:
+        """跑一次 ISE 会话，返回结果 XML。"""
+        if not audio:
+            raise RuntimeError("empty audio")
+        if self._sessions is None:
+            self._sessions = asyncio.Semaphore(settings.XF_ISE_MAX_SESSIONS)
+        async with self._sessions:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            try:
+                return await self._session(audio, text, category, creds)
+            finally:
+                self.active -= 1
+
+    async def _session(self, audio, text, category, creds) -> str:
+        url = self._url(creds)
+        frames = session_frames(creds[0], audio, text, category, settings.XF_ISE_FRAME_BYTES)
+        # 出错后服务端不再读取我们已发出的音频帧，关闭握手等不到回应；
+        # close_timeout 默认 10 秒会一直占着会话名额，这里只等 1 秒
+        async with _ws_connect(url, ssl=self._ssl_context(url), open_timeout=10, close_timeout=1,
+                               compression=None, max_size=None) as ws:
+            sender = asyncio.create_task(self._send(ws, frames))
+            try:
+                async for msg in ws:
+                    m = json.loads(msg)
+                    if m.get("code") != 0:
+                        raise RuntimeError("code=" + str(m.get("code")) + " " + str(m.get("message")))
+                    data = m.get("data", {})
+                    if data.get("status") == 2:
+                        return base64.b64decode(data["data"]).decode("gbk", errors="ignore")
+                raise RuntimeError("xfyun closed the session without a result")
+            finally:
+                sender.cancel()
+
+    @staticmethod
+    async def _send(ws, frames):
+        interval = settings.XF_ISE_SEND_INTERVAL
+        try:
+            for frame in frames:
+                await ws.send(frame)
+                if interval:
+                    await asyncio.sleep(interval)
+        except ConnectionClosed:
+            return  # 讯飞返回错误后会关闭连接，停止发送
+
+    async def probe(self, creds) -> bool:
+        url = self._url(creds)
+        async with _ws_connect(url, ssl=self._ssl_context(url), open_timeout=5):
+            return True
+
+    # ---- 同步入口 ----
+
+    def evaluate_sync(self, audio: bytes, text: str, category: str, creds, timeout: float = 120) -> str:
+        return self.run(self.evaluate(audio, text, category, creds), timeout)
+
+    def probe_sync(self, creds, timeout: float = 10) -> bool:
+        return self.run(self.probe(creds), timeout)
+
+    def stats(self) -> dict:
+        return {"active_sessions": self.active, "peak_sessions": self.peak,
+                "signatures": self.signer.signatures}
+
+
+# Singleton instance
+ise_client = ISEClient()
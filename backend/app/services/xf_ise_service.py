@@ -5,28 +5,9 @@
 0-100 + words），供严格校验层和前端直接复用。
 """
 
-import base64
-import hashlib
-import hmac
-import json
-import os
-import ssl
-import threading
-import time
 import xml.etree.ElementTree as ET
-from datetime import datetime
-from time import mktime
-from urllib.parse import urlencode
-from wsgiref.handlers import format_date_time
 
-try:
-    import websocket  # websocket-client
-    _WS_OK = True
-except Exception:
-    _WS_OK = False
-
-HOST = "ise-api.xfyun.cn"
-PATH = "/v2/open-ise"
+from app.services.xf_ise_client import WS_AVAILABLE, ise_client
 
 
 def _creds():
@@ -39,97 +20,12 @@ def _configured():
     return bool(a and k and sec)
 
 
-def _build_url():
-    _appid, api_key, api_secret = _creds()
-    date = format_date_time(mktime(datetime.now().timetuple()))
-    origin = f"host: {HOST}\ndate: {date}\nGET {PATH} HTTP/1.1"
-    sig = base64.b64encode(
-        hmac.new(api_secret.encode(), origin.encode(), hashlib.sha256).digest()
-    ).decode()
-    auth = (f'api_key="{api_key}", algorithm="hmac-sha256", '
-            f'headers="host date request-line", signature="{sig}"')
-    auth_b64 = base64.b64encode(auth.encode()).decode()
-    return f"wss://{HOST}{PATH}?" + urlencode(
-        {"authorization": auth_b64, "date": date, "host": HOST}
-    )
-
-
-def _read_pcm(wav_path):
-    with open(wav_path, "rb") as f:
-        audio = f.read()
-    if audio[:4] == b"RIFF":
-        idx = audio.find(b"data")
-        audio = audio[idx + 8:] if idx != -1 else audio[44:]
-    return audio
-
-
-def _evaluate(wav_path, text, category):
-    audio = _read_pcm(wav_path)
-    appid = _creds()[0]
-    result = {}
-    done = threading.Event()
-
-    def on_open(ws):
-        def send():
-            marker = "[word]" if category == "read_word" else "[content]"
-            ssb = {
-                "category": category, "rstcd": "utf8", "sub": "ise",
-                "ent": "en_vip", "tte": "utf-8", "cmd": "ssb",
-                "auf": "audio/L16;rate=16000", "aue": "raw",
-                "text": marker + "\n" + text,
-            }
-            ws.send(json.dumps({"common": {"app_id": appid}, "business": ssb,
-                                "data": {"status": 0, "data": ""}}))
-            frame = 1280
-            i, first = 0, True
-            while i < len(audio):
-                chunk = audio[i:i + frame]
-                i += frame
-                last = i >= len(audio)
-                aus = 1 if first else (4 if last else 2)
-                first = False
-                try:
-                    ws.send(json.dumps({
-                        "business": {"cmd": "auw", "aus": aus, "aue": "raw"},
-                        "data": {"status": 2 if last else 1,
-                                 "data": base64.b64encode(chunk).decode(),
-                                 "data_type": 1, "encoding": "raw"},
-                    }))
-                except Exception:
-                    return  # ws 已关闭（讯飞返回错误），停止发送
-                time.sleep(0.04)
-        threading.Thread(target=send, daemon=True).start()
-
-    def on_message(ws, msg):
-        m = json.loads(msg)
-        if m.get("code") != 0:
-            result["error"] = "code=" + str(m.get("code")) + " " + str(m.get("message"))
-            ws.close()
-            return
-        data = m.get("data", {})
-        if data.get("status") == 2:
-            result["xml"] = base64.b64decode(data["data"]).decode("gbk", errors="ignore")
-            ws.close()
+def _evaluate(audio, text, category):
+    """Run one ISE session over raw 16 kHz/16-bit mono PCM `audio`.
 
-    def on_error(ws, e):
-        result["error"] = str(e)
-
-    def on_close(ws, *a):
-        done.set()
-
-    ws = websocket.WebSocketApp(_build_url(), on_open=on_open,
-                                on_message=on_message, on_error=on_error,
-                                on_close=on_close)
-    threading.Thread(
-        target=lambda: ws.run_forever(sslopt={"cert_reqs": ssl.CERT_NONE}),
-        daemon=True,
-    ).start()
-    done.wait(timeout=120)
-    if "error" in result:
-        raise RuntimeError(result["error"])
-    if "xml" not in result:
-        raise RuntimeError("xfyun timeout")
-    return result["xml"]
+    会话跑在 xf_ise_client 的共享事件循环上（快速发送、签名复用、并发上限）。
+    """
+    return ise_client.evaluate_sync(audio, text, category, _creds(), timeout=120)
 
 
 def _score100(v):
@@ -178,91 +74,33 @@ def _parse(xml_str):
 
 
 def available():
-    return _WS_OK and _configured()
+    return WS_AVAILABLE and _configured()
 
 
-def assess_word(wav_path, word):
+def probe_direct():
+    """健康探测：建立一次带鉴权的 ISE websocket 连接后立即关闭（不发音频）。"""
+    if not available():
+        return False
+    return ise_client.probe_sync(_creds())
+
+
+def assess_word(pcm, word):
     if not available():
         return None
     try:
-        return _parse(_evaluate(wav_path, word, "read_word"))
+        return _parse(_evaluate(pcm, word, "read_word"))
     except Exception as e:
         print("XF ISE assess_word failed:", e)
         return None
 
 
-def assess_words(wav_path, reference_words):
+def assess_words(pcm, reference_words):
     """连读多词评测：read_word 接受换行分隔的词表，逐词返回分数+漏读。"""
     if not available():
         return None
     try:
         text = "\n".join(reference_words)
-        return _parse(_evaluate(wav_path, text, "read_word"))
+        return _parse(_evaluate(pcm, text, "read_word"))
     except Exception as e:
         print("XF ISE assess_words failed:", e)
         return None
-
-
-# ---- 境内评分节点转发 ----
-import requests as _requests
-
-def _node_url():
-    from app.core.config import settings
-    return getattr(settings, "SCORING_NODE_URL", None) or os.getenv("SCORING_NODE_URL")
-
-
-def _node_token():
-    from app.core.config import settings
-    return getattr(settings, "SCORING_NODE_TOKEN", None) or os.getenv("SCORING_NODE_TOKEN") or "sr-cn-2026-xfyun"
-
-
-def assess_via_node(wav_path, reference_words, poll_timeout=180):
-    """转发到境内评分节点（异步 job + 轮询，避免跨境长连接）。返回 dict 或 None。"""
-    url = _node_url()
-    if not url:
-        return None
-    base = url.rstrip("/")
-    hdr = {"X-Token": _node_token()}
-    # 压成 mp3 再跨境上传(1.5MB->~150KB,避免跨境大文件卡死)
-    import subprocess, tempfile
-    mp3 = None
-    try:
-        fd, mp3 = tempfile.mkstemp(suffix=".mp3"); os.close(fd)
-        subprocess.run(["ffmpeg", "-y", "-loglevel", "error", "-i", wav_path,
-                        "-ac", "1", "-b:a", "24k", mp3], check=True, timeout=60)
-        upload_path = mp3
-    except Exception:
-        upload_path = wav_path
-    try:
-        with open(upload_path, "rb") as f:
-            resp = _requests.post(
-                base + "/score", headers=hdr,
-                files={"audio_file": ("audio.mp3", f, "audio/mpeg")},
-                data={"reference": "\n".join(reference_words)},
-                timeout=30,
-            )
-        resp.raise_for_status()
-        job_id = resp.json().get("job_id")
-        if not job_id:
-            return None
-        deadline = time.time() + poll_timeout
-        while time.time() < deadline:
-            time.sleep(3)
-            pr = _requests.get(base + f"/result/{job_id}", headers=hdr, timeout=15)
-            if pr.status_code != 200:
-                continue
-            j = pr.json()
-            if j.get("status") == "done":
-                return j["result"]
-            if j.get("status") == "error":
-                print(f"scoring node error: {j.get('result')}")
-                return None
-        print("scoring node poll timeout")
-        return None
-    except Exception as e:
-        print(f"scoring node failed, falling back: {e}")
-        return None
-    finally:
-        if mp3:
-            try: os.remove(mp3)
-            except OSError: pass
@@ -19,6 +19,9 @@ from app.models.recording import Recording
 from app.models.word import WordAssignment
 from app.models.progress import StudentProgress
 from app.models.classes import Class, ClassEnrollment
+from app.models.scoring_job import ScoringJob
+from app.models.score_cache import ScoreCacheEntry
+from app.models.shadow_score import ShadowScore
 
 
 # Sample word lists (can be expanded later)
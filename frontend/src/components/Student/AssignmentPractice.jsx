@@ -81,7 +81,12 @@ function AssignmentPractice({ assignment, onBack }) {
           if (jobsRef.current.versions[job.word] === job.version) {
             setWordStatus((prev) => ({
               ...prev,
-              [job.word]: { status: 'error', error: error.response?.data?.detail || '评分失败' },
+              [job.word]: {
+                status: 'error',
+                error: error.code === 'SCORING_TIMEOUT'
+                  ? error.message
+                  : error.response?.data?.detail || '评分失败',
+              },
             }));
           }
         } finally {
@@ -139,7 +139,7 @@ function RecordingInterface({ word, wordData, onRecordingComplete, batchMode = f
       }
     } catch (error) {
       console.error('Error submitting recording:', error);
-      alert('提交录音失败，请重试。');
+      alert(error.code === 'SCORING_TIMEOUT' ? error.message : '提交录音失败，请重试。');
     } finally {
       set提交ting(false);
     }
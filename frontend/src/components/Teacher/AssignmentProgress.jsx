@@ -35,11 +35,10 @@ function AssignmentProgress({ assignment, onBack }) {
       // Get student's assignment progress with all word submissions (using teacher endpoint)
       const progressData = await assignmentService.getStudentProgressForTeacher(assignment.id, studentId);
 
-      // Get all submissions for this student (to get recording details with feedback)
-      const submissions = await teacherService.getSubmissions();
+      // Get this student's submissions (to get recording details with feedback)
+      const submissions = await teacherService.getAllSubmissions(null, null, { studentId });
       const studentSubmissions = submissions.filter(
-        sub => sub.student_id === studentId &&
-        progressData.words.map(w => w.word_text).includes(sub.word_text)
+        sub => progressData.words.map(w => w.word_text).includes(sub.word_text)
       );
 
       setStudentDetails({
@@ -285,6 +284,9 @@ function StudentDetailView({ assignment, studentDetails, onBack, onFeedbackSubmi
   const [grade, setGrade] = useState('');
   const [flagForPractice, setFlagForPractice] = useState(false);
   const [submitting, setSubmitting] = useState(false);
+  // 列表只带主要分数；选中词时再取完整评估（流利度、完整度等）
+  const [wordScores, setWordScores] = useState(null);
+  const wordScoresFor = useRef(null);
 
   const { progress, submissions, studentInfo } = studentDetails;
 
@@ -303,6 +305,15 @@ function StudentDetailView({ assignment, studentDetails, onBack, onFeedbackSubmi
   const handleSelectWord = (word) => {
     const submission = getSubmissionForWord(word.word_text);
     setSelectedWord(word);
+    setWordScores(submission?.automated_scores || null);
+    wordScoresFor.current = submission?.id ?? null;
+    if (submission) {
+      teacherService.getSubmission(submission.id)
+        .then((detail) => {
+          if (wordScoresFor.current === submission.id) setWordScores(detail.automated_scores);
+        })
+        .catch((err) => console.error('Error loading submission detail:', err));
+    }
     if (continuousSummary) {
       // 连读模式：点评是逐词的，从该词已有点评预填
       setFeedbackText(word.teacher_feedback || '');
@@ -625,32 +636,32 @@ function StudentDetailView({ assignment, studentDetails, onBack, onFeedbackSubmi
                     </div>
 
                     {/* Automated Scores */}
-                    {getSubmissionForWord(selectedWord.word_text)?.automated_scores && (
+                    {wordScores && (
                       <div className="p-4 bg-blue-50 rounded-lg">
                         <h3 className="font-semibold mb-2">AI 评估</h3>
                         <div className="grid grid-cols-2 gap-3 text-sm">
                           <div>
                             <span className="text-gray-600">发音：</span>
                             <span className="ml-2 font-semibold">
-                              {getSubmissionForWord(selectedWord.word_text)?.automated_scores?.pronunciation_score || '暂无'}
+                              {wordScores?.pronunciation_score || '暂无'}
                             </span>
                           </div>
                           <div>
                             <span className="text-gray-600">准确度：</span>
                             <span className="ml-2 font-semibold">
-                              {getSubmissionForWord(selectedWord.word_text)?.automated_scores?.accuracy_score || '暂无'}
+                              {wordScores?.accuracy_score || '暂无'}
                             </span>
                           </div>
                           <div>
                             <span className="text-gray-600">流利度：</span>
                             <span className="ml-2 font-semibold">
-                              {getSubmissionForWord(selectedWord.word_text)?.automated_scores?.fluency_score || '暂无'}
+                              {wordScores?.fluency_score || '暂无'}
                             </span>
                           </div>
                           <div>
                             <span className="text-gray-600">完整度：</span>
                             <span className="ml-2 font-semibold">
-                              {getSubmissionForWord(selectedWord.word_text)?.automated_scores?.completeness_score || '暂无'}
+                              {wordScores?.completeness_score || '暂无'}
                             </span>
                           </div>
                         </div>
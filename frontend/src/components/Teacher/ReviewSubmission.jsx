@@ -1,4 +1,4 @@
-import { useState } from 'react';
+import { useEffect, useState } from 'react';
 import { ArrowLeft, Save, Flag, Volume2 } from 'lucide-react';
 import Navbar from '../Common/Navbar';
 import teacherService from '../../services/teacherService';
@@ -8,6 +8,14 @@ function ReviewSubmission({ submission, onBack, onFeedbackSubmitted }) {
   const [grade, setGrade] = useState(submission.teacher_grade || '');
   const [flagForPractice, setFlagForPractice] = useState(submission.flag_for_practice || false);
   const [submitting, setSubmitting] = useState(false);
+  // The feed only carries headline scores; load the phoneme breakdown on demand
+  const [scores, setScores] = useState(submission.automated_scores);
+
+  useEffect(() => {
+    teacherService.getSubmission(submission.id)
+      .then(detail => setScores(detail.automated_scores))
+      .catch(err => console.error('Error loading submission detail:', err));
+  }, [submission.id]);
 
   const playAudio = () => {
     if (submission.audio_file_path) {
@@ -105,35 +113,35 @@ function ReviewSubmission({ submission, onBack, onFeedbackSubmitted }) {
             <div className="text-center p-4 bg-blue-50 rounded-lg">
               <div className="text-sm text-gray-600 mb-1">发音</div>
               <div className="text-3xl font-bold text-primary-600">
-                {submission.automated_scores?.pronunciation_score?.toFixed(0) || 0}%
+                {scores?.pronunciation_score?.toFixed(0) || 0}%
               </div>
             </div>
             <div className="text-center p-4 bg-green-50 rounded-lg">
               <div className="text-sm text-gray-600 mb-1">准确度</div>
               <div className="text-3xl font-bold text-green-600">
-                {submission.automated_scores?.accuracy_score?.toFixed(0) || 0}%
+                {scores?.accuracy_score?.toFixed(0) || 0}%
               </div>
             </div>
             <div className="text-center p-4 bg-yellow-50 rounded-lg">
               <div className="text-sm text-gray-600 mb-1">流利度</div>
               <div className="text-3xl font-bold text-yellow-600">
-                {submission.automated_scores?.fluency_score?.toFixed(0) || 0}%
+                {scores?.fluency_score?.toFixed(0) || 0}%
               </div>
             </div>
             <div className="text-center p-4 bg-purple-50 rounded-lg">
               <div className="text-sm text-gray-600 mb-1">完整度</div>
               <div className="text-3xl font-bold text-purple-600">
-                {submission.automated_scores?.completeness_score?.toFixed(0) || 0}%
+                {scores?.completeness_score?.toFixed(0) || 0}%
               </div>
             </div>
           </div>
 
           {/* Phoneme Breakdown */}
-          {submission.automated_scores?.words?.[0]?.phonemes && (
+          {scores?.words?.[0]?.phonemes && (
             <div className="mt-6">
               <h4 className="font-medium mb-3">音素分析</h4>
               <div className="flex flex-wrap gap-2">
-                {submission.automated_scores.words[0].phonemes.map((phoneme, index) => (
+                {scores.words[0].phonemes.map((phoneme, index) => (
                   <div
                     key={index}
                     className={`px-3 py-2 rounded-lg ${
@@ -1,5 +1,9 @@
 import api from './api';
 
+// give up polling a queued take after this long (a job whose worker died
+// stays "scoring" until the server restarts)
+const SCORING_POLL_LIMIT_MS = 3 * 60 * 1000;
+
 const studentService = {
   async submitRecording(wordText, audioFile) {
     const formData = new FormData();
@@ -12,6 +16,25 @@ const studentService = {
       },
     });
 
+    // busy server: the take is queued for scoring — poll until it is done
+    let data = response.data;
+    let delay = 1000;
+    const deadline = Date.now() + SCORING_POLL_LIMIT_MS;
+    while (data.status === 'scoring') {
+      if (Date.now() >= deadline) {
+        const error = new Error('评分时间过长，请稍后刷新页面查看结果，或重新录音。');
+        error.code = 'SCORING_TIMEOUT';
+        throw error;
+      }
+      await new Promise((resolve) => setTimeout(resolve, delay));
+      delay = Math.min(delay * 1.5, 5000);
+      data = await this.getRecordingResult(data.recording_id);
+    }
+    return data;
+  },
+
+  async getRecordingResult(recordingId) {
+    const response = await api.get(`/api/student/recordings/${recordingId}/result`);
     return response.data;
   },
 
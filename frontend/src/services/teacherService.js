@@ -1,12 +1,35 @@
 import api from './api';
 
 const teacherService = {
-  async getSubmissions(statusFilter = null, classId = null) {
+  // One page of the submissions feed (newest first); pass the returned
+  // nextCursor back to get the following page, null means no more pages.
+  async getSubmissions(statusFilter = null, classId = null, { cursor = null, limit = null, studentId = null } = {}) {
     const params = {};
     if (statusFilter) params.status_filter = statusFilter;
     if (classId) params.class_id = classId;
+    if (studentId) params.student_id = studentId;
+    if (cursor) params.cursor = cursor;
+    if (limit) params.limit = limit;
 
     const response = await api.get('/api/teacher/submissions', { params });
+    return { items: response.data, nextCursor: response.headers['x-next-cursor'] || null };
+  },
+
+  // Every page of the feed for the given filters
+  async getAllSubmissions(statusFilter = null, classId = null, { studentId = null } = {}) {
+    const items = [];
+    let cursor = null;
+    do {
+      const page = await this.getSubmissions(statusFilter, classId, { cursor, limit: 200, studentId });
+      items.push(...page.items);
+      cursor = page.nextCursor;
+    } while (cursor);
+    return items;
+  },
+
+  // Full automated assessment (per-word / phoneme detail) of one submission
+  async getSubmission(recordingId) {
+    const response = await api.get(`/api/teacher/submissions/${recordingId}`);
     return response.data;
   },
 
@@ -0,0 +1,401 @@
+"""
+Local stand-ins for the external scoring services: the xfyun ISE websocket,
+the in-country scoring node and the GOP model box. Each runs in background
+threads, listens on 127.0.0.1 with an ephemeral port and records what it
+saw, so tests and benchmarks can drive the real clients without the network.
+Azure is reached through its native SDK protocol, which cannot be served
+locally; FakeAzureScorer stands in for it at the cascade provider instead.
+
+Every stand-in takes the same fault model: a base latency, uniform jitter
+on top of it and a failure rate, drawn from a seeded RNG so runs repeat.
+"""
+import asyncio
+import base64
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+from websockets.asyncio.server import serve
+
+RESULT_XML = (
+    '<?xml version="1.0" ?><xml_result><read_word lan="en" type="study" version="7,0,0,1024">'
+    '<rec_paper><read_word total_score="{score}" is_rejected="false">'
+    '<sentence content="{text}">{words}</sentence>'
+    '</read_word></rec_paper></read_word></xml_result>'
+)
+
+
+class Faults:
+    """Latency (+ uniform jitter) and failure injection, reproducible per seed"""
+
+    def __init__(self, latency=0.0, jitter=0.0, failure_rate=0.0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.failures = 0
+
+    def delay(self):
+        with self._lock:
+            return self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def fails(self):
+        with self._lock:
+            failed = self.failure_rate > 0 and self._rng.random() < self.failure_rate
+            self.failures += failed
+            return failed
+
+
+def ise_result_xml(words, score=4.2):
+    """A read_word result in xfyun's format (scores are 0-5)"""
+    word_nodes = "".join(
+        f'<word content="{w}" total_score="{score}" dp_message="0"/>' for w in words
+    )
+    return RESULT_XML.format(score=score, text=" ".join(words), words=word_nodes)
+
+
+class FakeISEServer:
+    """xfyun ISE websocket stand-in.
+
+    Accepts the ssb frame and the audio frames, then answers with a result
+    XML once the last frame (status 2) arrives. `latency` (+ `jitter`)
+    delays the answer (the service's own evaluation time); `error_code`
+    makes every session fail the way xfyun reports errors, `failure_rate`
+    only that share of sessions (with error 11200, "engine busy").
+    """
+
+    def __init__(self, latency=0.0, error_code=None, jitter=0.0, failure_rate=0.0, seed=0):
+        self.faults = Faults(latency, jitter, failure_rate, seed)
+        self.error_code = error_code
+        self.sessions = 0
+        self.active = 0
+        self.peak_active = 0
+        self.audio_bytes = []
+        self.frame_gaps = []  # seconds between consecutive audio frames
+        self.auth = []  # (authorization, date, host) of every session
+        self.port = None
+        self._loop = None
+        self._server = None
+        self._started = threading.Event()
+
+    @property
+    def url(self):
+        return f"ws://127.0.0.1:{self.port}/v2/open-ise"
+
+    async def _handler(self, ws):
+        query = parse_qs(urlsplit(ws.request.path).query)
+        self.auth.append(tuple(query.get(k, [None])[0] for k in ("authorization", "date", "host")))
+        self.sessions += 1
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+        error_code = self.error_code or (11200 if self.faults.fails() else None)
+        try:
+            text, received, last_at = "", 0, None
+            async for raw in ws:
+                msg = json.loads(raw)
+                business = msg.get("business", {})
+                if business.get("cmd") == "ssb":
+                    text = business.get("text", "").split("\n", 1)[-1]
+                    continue
+                now = time.monotonic()
+                if last_at is not None:
+                    self.frame_gaps.append(now - last_at)
+                last_at = now
+                received += len(base64.b64decode(msg["data"]["data"]))
+                if error_code:
+                    await ws.send(json.dumps({"code": error_code, "message": "injected failure"}))
+                    return
+                if msg["data"]["status"] == 2:
+                    self.audio_bytes.append(received)
+                    delay = self.faults.delay()
+                    if delay:
+                        await asyncio.sleep(delay)
+                    xml = ise_result_xml(text.split("\n"))
+                    await ws.send(json.dumps({"code": 0, "data": {
+                        "status": 2, "data": base64.b64encode(xml.encode("gbk")).decode()}}))
+                    return
+        finally:
+            self.active -= 1
+
+    async def _serve(self):
+        self._server = await serve(self._handler, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._started.set()
+        await self._server.wait_closed()
+
+    def start(self):
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_until_complete, args=(self._serve(),),
+                         name="fake-ise", daemon=True).start()
+        self._started.wait(5)
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._loop.call_soon_threadsafe(self._server.close)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class _NodeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is observable
+
+    def setup(self):
+        super().setup()
+        self.server.node.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, code, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        node = self.server.node
+        parts = urlsplit(self.path)
+        if parts.path == "/":
+            return self._reply(200, {"status": "ok"})
+        match = re.fullmatch(r"/result/(\w+)", parts.path)
+        if not match:
+            return self._reply(404, {"detail": "not found"})
+        node.polls += 1
+        wait = float(parse_qs(parts.query).get("wait", ["0"])[0])
+        return self._reply(200, node.result(match.group(1), wait if node.long_poll else 0))
+
+    def do_POST(self):
+        node = self.server.node
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path != "/score":
+            return self._reply(404, {"detail": "not found"})
+        match = re.search(rb'name="callback_url"\r\n\r\n(.*?)\r\n', body)
+        callback = match.group(1).decode() if match and node.callbacks else None
+        match = re.search(rb'name="reference"\r\n\r\n(.*?)\r\n--', body, re.S)
+        reference = match.group(1).decode().split("\n") if match else []
+        return self._reply(200, {"job_id": node.submit(callback, reference)})
+
+
+class FakeScoringNode:
+    """In-country scoring node stand-in (async job API over HTTP).
+
+    POST /score queues a job that finishes after `latency` (+ `jitter`)
+    seconds with one word result per reference word; GET /result/{job_id}
+    answers pending/done, holding the request up to ?wait= seconds when
+    `long_poll` is on; with `callbacks` on, finished jobs are POSTed to the
+    callback_url given at submit. `fail` makes every job end in status
+    "error", `failure_rate` only that share. Counts TCP connections and
+    result polls.
+    """
+
+    def __init__(self, latency=0.5, long_poll=False, callbacks=False, fail=False, token="test-token",
+                 jitter=0.0, failure_rate=0.0, seed=0):
+        self.faults = Faults(latency, jitter, 1.0 if fail else failure_rate, seed)
+        self.long_poll = long_poll
+        self.callbacks = callbacks
+        self.token = token
+        self.connections = 0
+        self.polls = 0
+        self._ids = itertools.count(1)
+        self._jobs = {}  # job id -> (done Event, payload)
+        self._httpd = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}"
+
+    def submit(self, callback_url=None, reference=()):
+        job_id = f"job{next(self._ids)}"
+        done = threading.Event()
+        words = [{"word": w, "accuracy_score": 86.0, "error_type": "None"} for w in reference]
+        payload = {"status": "error", "result": "injected failure"} if self.faults.fails() else {
+            "status": "done", "result": {"pronunciation_score": 86.0, "accuracy_score": 86.0,
+                                         "recognized_text": " ".join(reference),
+                                         "words": words, "scorer": "xfyun"}}
+        self._jobs[job_id] = (done, payload)
+
+        def finish():
+            done.set()
+            if callback_url:
+                requests.post(callback_url, json=dict(payload, job_id=job_id),
+                              headers={"X-Token": self.token}, timeout=5)
+        timer = threading.Timer(self.faults.delay(), finish)
+        timer.daemon = True
+        timer.start()
+        return job_id
+
+    def result(self, job_id, wait=0.0):
+        done, payload = self._jobs[job_id]
+        if done.wait(wait) or done.is_set():
+            return payload
+        return {"status": "pending"}
+
+    def start(self):
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), _NodeHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.node = self
+        threading.Thread(target=self._httpd.serve_forever, name="fake-node", daemon=True).start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class _GOPHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, code, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._reply(200, {"status": "ok"})
+
+    def do_POST(self):
+        gop = self.server.gop
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        gop.requests += 1
+        time.sleep(gop.faults.delay())
+        if gop.faults.fails():
+            return self._reply(500, {"detail": "injected failure"})
+        match = re.search(rb'name="reference_text"\r\n\r\n(.*?)\r\n--', body, re.S)
+        reference = match.group(1).decode() if match else ""
+        self._reply(200, {"NBest": [{
+            "Display": reference, "Lexical": reference, "PronScore": 78.0, "AccuracyScore": 80.0,
+            "FluencyScore": 75.0, "CompletenessScore": 100.0,
+            "Words": [{"Word": w, "AccuracyScore": 80.0, "ErrorType": "None", "Phonemes": []}
+                      for w in reference.split()],
+        }]})
+
+
+class FakeGOPServer:
+    """Self-hosted GOP model stand-in (POST a WAV + reference_text, get Azure-style NBest).
+
+    `latency` (+ `jitter`) is the model's inference time; `failure_rate`
+    of the requests answer 500. GET / answers the health probe.
+    """
+
+    def __init__(self, latency=0.3, jitter=0.0, failure_rate=0.0, seed=0):
+        self.faults = Faults(latency, jitter, failure_rate, seed)
+        self.requests = 0
+        self._httpd = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}/pronunciation-assessment/file"
+
+    def start(self):
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), _GOPHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.gop = self
+        threading.Thread(target=self._httpd.serve_forever, name="fake-gop", daemon=True).start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class FakeAzureScorer:
+    """Azure pronunciation assessment stand-in, as cascade provider callables.
+
+    `word` / `continuous` take a ScoringRequest and answer like the real
+    providers after `latency` (+ `jitter`) seconds; a `failure_rate` share
+    raise the way a cancelled (quota / network) recognition does.
+    """
+
+    def __init__(self, latency=1.2, jitter=0.0, failure_rate=0.0, seed=0):
+        self.faults = Faults(latency, jitter, failure_rate, seed)
+        self.calls = 0
+
+    def _call(self):
+        self.calls += 1
+        time.sleep(self.faults.delay())
+        if self.faults.fails():
+            raise RuntimeError("ResultReason.Canceled injected failure")
+
+    def word(self, request):
+        self._call()
+        return {"recognized_text": request.reference, "pronunciation_score": 84.0, "accuracy_score": 85.0,
+                "fluency_score": 80.0, "completeness_score": 100.0, "scorer": "azure",
+                "words": [{"word": request.reference, "accuracy_score": 85.0, "error_type": "None",
+                           "phonemes": []}]}
+
+    def continuous(self, request):
+        self._call()
+        words = list(request.reference)
+        return {"mode": "continuous", "pronunciation_score": 84.0, "accuracy_score": 85.0,
+                "completeness_score": 100.0, "fluency_score": 80.0, "recognized_text": " ".join(words),
+                "words_read": len(words), "words_total": len(words),
+                "per_word": [{"word": w, "score": 85.0, "error": None} for w in words]}
+
+
+class _CallbackHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        self.server.deliver(payload["job_id"], payload)
+        body = b"{}"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class CallbackReceiver:
+    """Minimal stand-in for the backend callback route: hands pushes to `deliver`"""
+
+    def __init__(self, deliver):
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), _CallbackHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.deliver = deliver
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}/api/scoring-node/callback"
+
+    def __enter__(self):
+        threading.Thread(target=self._httpd.serve_forever, name="fake-callback", daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
@@ -0,0 +1,108 @@
+"""
+Micro-benchmark: vectorized stress cues vs the old pure-Python loops
+Run with: pytest benchmarks/test_acoustic_features_bench.py -s
+"""
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.services import acoustic_features
+from .speech_fixtures import FRAMERATE, WORDS, word
+
+
+def legacy_syllable_cues(samples, framerate, spans):
+    """The interpreter-loop implementation the stress check used before"""
+    samples = samples.tolist()
+
+    def seg(start_ticks, dur_ticks):
+        a = int(start_ticks / 1e7 * framerate)
+        b = min(len(samples), int((start_ticks + dur_ticks) / 1e7 * framerate))
+        return samples[a:b]
+
+    def rms(x):
+        return (sum(v * v for v in x) / len(x)) ** 0.5 if x else 0.0
+
+    def f0(x):
+        if len(x) < int(framerate / 60) * 2:
+            return 0.0
+        mid = x[len(x) // 5: -len(x) // 5] or x
+        n = len(mid)
+        energy = sum(v * v for v in mid)
+        if energy == 0:
+            return 0.0
+        best_lag, best_corr = 0, 0.0
+        lo, hi = int(framerate / 400), int(framerate / 60)
+        step = max(1, (hi - lo) // 120)
+        ref = sum(mid[i] * mid[i] for i in range(0, n, 4)) or 1
+        for lag in range(lo, min(hi, n - 1), step):
+            c = 0
+            for i in range(0, n - lag, 4):
+                c += mid[i] * mid[i + lag]
+            if c > best_corr:
+                best_corr, best_lag = c, lag
+        if best_lag == 0 or best_corr < ref * 0.3:
+            return 0.0
+        return framerate / best_lag
+
+    cues = []
+    for i, span in enumerate(spans):
+        x = seg(*span)
+        if len(x) > 40:
+            x = x[len(x) // 5: -len(x) // 5]
+        dur = span[1] / 1e7
+        if i == len(spans) - 1:
+            dur *= 0.6
+        cues.append({"rms": rms(x), "f0": f0(x), "dur": dur})
+    return cues
+
+
+def _best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+@pytest.fixture(scope="module")
+def fixtures():
+    return {name: word(sylls, seed=i) for i, (name, sylls) in enumerate(WORDS.items())}
+
+
+class TestAcousticFeaturesBenchmark:
+    """The NumPy cues match the old ones and are much cheaper to compute"""
+
+    def test_cues_match_legacy(self, fixtures):
+        """Same loudness, same duration, pitch within a couple of percent"""
+        for name, (samples, spans) in fixtures.items():
+            new = acoustic_features.syllable_cues(samples, FRAMERATE, spans)
+            old = legacy_syllable_cues(samples, FRAMERATE, spans)
+            for a, b in zip(new, old):
+                assert a["rms"] == pytest.approx(b["rms"], rel=1e-9), name
+                assert a["dur"] == pytest.approx(b["dur"]), name
+                assert (a["f0"] > 0) == (b["f0"] > 0), name
+                if b["f0"]:
+                    assert a["f0"] == pytest.approx(b["f0"], rel=0.03), name
+
+    def test_speedup(self, fixtures):
+        """Cue extraction for a batch of words is at least 10x faster"""
+        items = list(fixtures.values())
+
+        def run(impl):
+            for samples, spans in items:
+                impl(samples, FRAMERATE, spans)
+
+        legacy = _best_of(lambda: run(legacy_syllable_cues), repeat=3)
+        vectorized = _best_of(lambda: run(acoustic_features.syllable_cues), repeat=20)
+        per_word = lambda s: s / len(items) * 1000
+        print(f"\nstress cues per word: legacy {per_word(legacy):.2f} ms, "
+              f"vectorized {per_word(vectorized):.3f} ms, "
+              f"speed-up {legacy / vectorized:.0f}x")
+        assert legacy / vectorized >= 10
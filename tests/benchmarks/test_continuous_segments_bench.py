@@ -0,0 +1,82 @@
+"""
+Benchmark: 40-word continuous take scored whole vs cut at pauses into word
+groups scored concurrently (wall time with a scorer whose latency grows with
+the audio, and the cost of the VAD + planning itself)
+Run with: pytest benchmarks/test_continuous_segments_bench.py -s
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.services.audio_preprocess import DecodedAudio
+from app.services.continuous_segments import plan_segments, score_segmented
+
+SR = 16000
+WORDS = [f"word{i}" for i in range(40)]
+# scorer latency model: fixed session setup + recognition slower than real time
+# would be (scaled down 20x so the benchmark runs in seconds)
+SETUP_S = 0.15
+PER_AUDIO_S = 0.05
+
+
+def take(n_words, seed=3):
+    """A student reading a word list: 0.3-0.6 s words, 0.3-0.8 s pauses, a few run together"""
+    rng = np.random.default_rng(seed)
+    parts = [rng.normal(0, 40, int(SR * 0.5))]
+    for i in range(n_words):
+        n = int(SR * rng.uniform(0.3, 0.6))
+        t = np.arange(n) / SR
+        envelope = np.minimum(1.0, np.minimum(t, t[::-1]) * 20)
+        parts.append(np.sin(2 * np.pi * rng.uniform(120, 260) * t) * 7000 * envelope)
+        gap = 0.08 if rng.random() < 0.1 else rng.uniform(0.3, 0.8)
+        parts.append(rng.normal(0, 40, int(SR * gap)))
+    return np.concatenate(parts).astype(np.int16)
+
+
+class LatencyCascade:
+    def run(self, audio, reference, budget):
+        time.sleep(SETUP_S + PER_AUDIO_S * audio.duration_ms / 1000)
+        per_word = [{"word": w, "score": 85, "error": None, "offset_ms": 0, "end_ms": 100} for w in reference]
+        return ({"pronunciation_score": 85, "fluency_score": 80, "per_word": per_word, "provider": "fake"},
+                [{"provider": "fake", "outcome": "ok", "ms": 0, "hedged": False}])
+
+
+class TestContinuousSegmentsBenchmark:
+    """Wall time of one 40-word test"""
+
+    def test_segmented_vs_whole(self):
+        samples = take(len(WORDS))
+        audio = DecodedAudio(samples.tobytes())
+        cascade = LatencyCascade()
+
+        start = time.perf_counter()
+        for _ in range(20):
+            segments = plan_segments(samples, SR, WORDS, words_per_segment=8, margin=1)
+        planning = (time.perf_counter() - start) / 20
+
+        start = time.perf_counter()
+        cascade.run(audio, WORDS, 300)
+        whole = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result, _ = score_segmented(cascade, audio, WORDS, 300, 8, 1, workers=6)
+        segmented = time.perf_counter() - start
+
+        chunk_s = [(s.end - s.start) / SR for s in segments]
+        print(f"\n{len(WORDS)}-word take, {audio.duration_ms / 1000:.1f} s of audio:")
+        print(f"  VAD + planning            {planning * 1000:7.2f} ms")
+        print(f"  chunks                    {len(segments)} ({', '.join(f'{c:.1f}s' for c in chunk_s)})")
+        print(f"  scored whole              {whole * 1000:7.0f} ms")
+        print(f"  segmented, concurrent     {segmented * 1000:7.0f} ms ({whole / segmented:.1f}x faster; "
+              f"slowest chunk alone {(SETUP_S + PER_AUDIO_S * max(chunk_s)) * 1000:.0f} ms)")
+
+        assert len(segments) == 5
+        assert result["words_total"] == len(WORDS) and result["words_read"] == len(WORDS)
+        assert planning < 0.05
+        assert segmented * 2 < whole
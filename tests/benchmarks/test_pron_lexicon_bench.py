@@ -0,0 +1,96 @@
+"""
+Benchmark: CMUdict at worker startup — cmudict.dict() at import time vs
+the memory-mapped pron_lexicon index (startup time, private/shared RSS,
+lookup latency)
+Run with: pytest benchmarks/test_pron_lexicon_bench.py -s
+"""
+import json
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.services.pron_lexicon import build_index
+
+WORDS = ["photograph", "beautiful", "record", "comfortable", "the", "vegetable",
+         "necessary", "temperature", "wednesday", "february"] * 20
+
+# runs in a fresh interpreter so each variant pays its own startup
+PROBE = textwrap.dedent("""
+    import json, sys, time
+    sys.path.insert(0, {backend!r})
+
+    def rss():
+        fields = {{}}
+        with open("/proc/self/status") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("RssAnon", "RssFile"):
+                    fields[key] = int(value.split()[0])
+        return fields
+
+    words = {words!r}
+    before = rss()
+    start = time.perf_counter()
+    if {mode!r} == "dict":
+        import cmudict
+        lexicon = cmudict.dict()
+    else:
+        from app.services.pron_lexicon import PronLexicon
+        lexicon = PronLexicon({path!r})
+        lexicon.get("cat")
+    ready = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for word in words:
+        lexicon.get(word)
+    lookup = (time.perf_counter() - start) / len(words)
+    after = rss()
+    print(json.dumps({{
+        "startup_s": ready, "lookup_us": lookup * 1e6,
+        "anon_mb": (after["RssAnon"] - before["RssAnon"]) / 1024,
+        "file_mb": (after["RssFile"] - before["RssFile"]) / 1024,
+    }}))
+""")
+
+
+def _probe(mode, path):
+    script = PROBE.format(backend=str(backend_path), words=WORDS, mode=mode, path=str(path))
+    out = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True,
+                         check=True, timeout=120).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def _median(mode, path, runs=3):
+    samples = [_probe(mode, path) for _ in range(runs)]
+    return {k: sorted(s[k] for s in samples)[runs // 2] for k in samples[0]}
+
+
+class TestPronLexiconBenchmark:
+    """Per-worker cost of having CMUdict available"""
+
+    def test_startup_and_rss(self, tmp_path):
+        pytest.importorskip("cmudict")
+        path = tmp_path / "cmudict.idx"
+        build_index(path)
+
+        legacy = _median("dict", path)
+        mapped = _median("index", path)
+
+        print(f"\nCMUdict per worker ({len(WORDS)} lookups), median of 3 fresh interpreters:")
+        print(f"  {'':20s} {'startup':>10s} {'lookup':>10s} {'private RSS':>12s} {'shared RSS':>11s}")
+        for label, r in (("cmudict.dict()", legacy), ("mmap index", mapped)):
+            print(f"  {label:20s} {r['startup_s'] * 1000:8.1f}ms {r['lookup_us']:8.2f}us "
+                  f"{r['anon_mb']:9.1f} MB {r['file_mb']:8.1f} MB")
+        print(f"  startup {legacy['startup_s'] / mapped['startup_s']:.0f}x faster, "
+              f"{legacy['anon_mb'] - mapped['anon_mb']:.1f} MB less private memory per worker")
+
+        assert mapped["startup_s"] * 10 < legacy["startup_s"]
+        assert mapped["anon_mb"] * 5 < legacy["anon_mb"]
+        assert mapped["lookup_us"] < 100
@@ -0,0 +1,116 @@
+"""
+Benchmark: strict-layer text comparison on 40-word continuous references —
+character/token difflib (previous) vs phoneme alignment (pure-Python DP and
+the vectorized scoring_alignment DP), speed and what each one counts as read
+Run with: pytest benchmarks/test_scoring_alignment_bench.py -s
+"""
+import difflib
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.services import scoring_alignment
+from app.services.scoring_alignment import (
+    INDEL_COST, PHONE_ID, SUB_COST, align, tokenize, word_phonemes,
+)
+
+REFERENCE = (
+    "beautiful weather morning students teacher library pencil notebook window garden "
+    "bicycle kitchen breakfast homework holiday mountain river ocean island village "
+    "hospital doctor medicine vegetable chocolate banana orange elephant giraffe rabbit "
+    "computer telephone umbrella birthday festival dragon lantern dumpling family write"
+).split()
+# what the plain STT heard: 4 homophones / spelling variants, 3 words skipped,
+# 2 near misses (a vowel and a voicing slip), 1 extra word
+HEARD = list(REFERENCE)
+HEARD[HEARD.index("write")] = "right"
+HEARD[HEARD.index("weather")] = "whether"
+HEARD[HEARD.index("doctor")] = "docter"
+HEARD[HEARD.index("notebook")] = "note book"
+for skipped in ("island", "giraffe", "festival"):
+    HEARD.remove(skipped)
+HEARD[HEARD.index("river")] = "reever"
+HEARD[HEARD.index("garden")] = "garten"
+HEARD.insert(5, "um")
+HEARD = " ".join(HEARD).split()
+TRULY_READ = len(REFERENCE) - 3  # only the skipped words were not read
+NEAR_MISSES = ("river", "garden")
+
+
+def legacy_compare(reference_tokens, heard_tokens):
+    """The strict layer before: character ratio + token SequenceMatcher"""
+    similarity = difflib.SequenceMatcher(None, " ".join(heard_tokens), " ".join(reference_tokens)).ratio()
+    sm = difflib.SequenceMatcher(None, reference_tokens, heard_tokens)
+    matched = sum(b.size for b in sm.get_matching_blocks())
+    return similarity, matched
+
+
+def python_dp(ref, hyp):
+    """Same weighted edit distance, one Python loop iteration per cell"""
+    ref = [PHONE_ID[p] for p in ref]
+    hyp = [PHONE_ID[p] for p in hyp]
+    prev = [j * INDEL_COST for j in range(len(hyp) + 1)]
+    for i in range(1, len(ref) + 1):
+        cur = [i * INDEL_COST]
+        for j in range(1, len(hyp) + 1):
+            cur.append(min(prev[j - 1] + SUB_COST[ref[i - 1], hyp[j - 1]],
+                           prev[j] + INDEL_COST, cur[j - 1] + INDEL_COST))
+        prev = cur
+    return prev[-1]
+
+
+def _phones(tokens):
+    return [p for t in tokens for p in (word_phonemes(t) or [()])[0]]
+
+
+def _timed(fn, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n
+
+
+class TestScoringAlignmentBenchmark:
+    """40-word continuous reference, as a test-mode recording produces"""
+
+    def test_alignment_speed_and_counts(self):
+        ref_tokens, heard_tokens = tokenize(REFERENCE), tokenize(HEARD)
+        ref_phones, heard_phones = _phones(ref_tokens), _phones(heard_tokens)
+
+        word_phonemes.cache_clear()
+        cold = _timed(lambda: align(ref_tokens, heard_tokens), 1)  # G2P lookups through the mmap index
+        legacy = _timed(lambda: legacy_compare(ref_tokens, heard_tokens), 50)
+        naive = _timed(lambda: python_dp(ref_phones, heard_phones), 5)
+        vectorized = _timed(lambda: scoring_alignment.edit_distance_matrix(
+            scoring_alignment._ids(ref_phones), scoring_alignment._ids(heard_phones)), 50)
+        full = _timed(lambda: align(ref_tokens, heard_tokens), 50)
+
+        _, legacy_matched = legacy_compare(ref_tokens, heard_tokens)
+        alignment = align(ref_tokens, heard_tokens)
+        cache = word_phonemes.cache_info()
+
+        print(f"\n{len(ref_tokens)}-word reference, {len(ref_phones)} x {len(heard_phones)} phonemes:")
+        print(f"  difflib chars + tokens        {legacy * 1000:7.2f} ms")
+        print(f"  phoneme DP, pure Python        {naive * 1000:7.2f} ms")
+        print(f"  phoneme DP, numpy rows         {vectorized * 1000:7.2f} ms "
+              f"({naive / vectorized:.0f}x faster)")
+        print(f"  align() incl. backtrace, warm  {full * 1000:7.2f} ms (cold G2P: {cold * 1000:.1f} ms; "
+              f"cache {cache.hits} hits / {cache.misses} misses)")
+        print(f"  words counted as read: difflib {legacy_matched}, phoneme {alignment.matched_words}, "
+              f"truth {TRULY_READ}")
+        print("  non-zero distances: " + ", ".join(f"{w.word}->{w.heard or '-'} ({w.distance})"
+                                                    for w in alignment.words if w.distance))
+
+        assert abs(python_dp(ref_phones, heard_phones)
+                   - scoring_alignment.phoneme_distance(ref_phones, heard_phones)) < 1e-9
+        assert vectorized * 5 < naive
+        assert full < 0.02
+        assert alignment.matched_words == TRULY_READ
+        assert legacy_matched < TRULY_READ  # homophones and "note book" counted as misses
+        distances = {w.word: w.distance for w in alignment.words}
+        assert distances["write"] == distances["weather"] == distances["notebook"] == 0.0
+        assert all(0 < distances[w] <= 0.34 for w in NEAR_MISSES)
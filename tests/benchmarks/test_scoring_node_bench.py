@@ -0,0 +1,95 @@
+"""
+Benchmark: scoring node result delivery — fixed 3 s polling on fresh
+connections vs adaptive backoff, long-poll and callback on a pooled session
+Run with: pytest benchmarks/test_scoring_node_bench.py -s
+"""
+import sys
+import time
+from pathlib import Path
+
+import pytest
+import requests
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.core.config import settings
+from app.services import scoring_node
+from .fake_servers import CallbackReceiver, FakeScoringNode
+
+WAV = b"RIFF" + b"\x00" * 32000
+JOB_SECONDS = 0.8  # the node's own scoring time
+
+
+def legacy_assess(base, reference_words, poll_timeout=180):
+    """The previous client: new connection per request, fixed 3 s sleep"""
+    hdr = {"X-Token": "test-token"}
+    resp = requests.post(base + "/score", headers=hdr,
+                         files={"audio_file": ("audio.wav", WAV, "audio/wav")},
+                         data={"reference": "\n".join(reference_words)}, timeout=30)
+    job_id = resp.json()["job_id"]
+    deadline = time.time() + poll_timeout
+    while time.time() < deadline:
+        time.sleep(3)
+        j = requests.get(base + f"/result/{job_id}", headers=hdr, timeout=15).json()
+        if j.get("status") == "done":
+            return j["result"]
+    return None
+
+
+def _p50(fn, n):
+    latencies = []
+    for _ in range(n):
+        start = time.perf_counter()
+        assert fn() is not None
+        latencies.append(time.perf_counter() - start)
+    return sorted(latencies)[n // 2]
+
+
+@pytest.fixture(autouse=True)
+def node_settings(monkeypatch):
+    monkeypatch.setattr(scoring_node, "_session", None)
+    monkeypatch.setattr(settings, "SCORING_NODE_TOKEN", "test-token")
+    monkeypatch.setattr(settings, "SCORING_NODE_CALLBACK_URL", None)
+    monkeypatch.setattr(settings, "SCORING_NODE_LONG_POLL", 20.0)
+
+
+class TestScoringNodeBenchmark:
+    """End-to-end latency of one node job, by delivery mode"""
+
+    def test_delivery_modes(self, monkeypatch):
+        rows = []
+        with FakeScoringNode(latency=JOB_SECONDS) as node:
+            legacy = _p50(lambda: legacy_assess(node.url, ["cat"]), n=2)
+            rows.append(("fixed 3 s poll, new connections", legacy, node.connections))
+
+            monkeypatch.setattr(settings, "SCORING_NODE_URL", node.url)
+            before = node.connections
+            adaptive = _p50(lambda: scoring_node.assess_via_node(WAV, ["cat"], poll_timeout=30), n=5)
+            rows.append(("adaptive backoff, pooled", adaptive, node.connections - before))
+
+        with FakeScoringNode(latency=JOB_SECONDS, long_poll=True) as node:
+            monkeypatch.setattr(settings, "SCORING_NODE_URL", node.url)
+            monkeypatch.setattr(scoring_node, "_session", None)
+            long_poll = _p50(lambda: scoring_node.assess_via_node(WAV, ["cat"], poll_timeout=30), n=5)
+            rows.append(("long-poll, pooled", long_poll, node.connections))
+
+        with FakeScoringNode(latency=JOB_SECONDS, callbacks=True) as node, \
+                CallbackReceiver(scoring_node.waiters.deliver) as receiver:
+            monkeypatch.setattr(settings, "SCORING_NODE_URL", node.url)
+            monkeypatch.setattr(settings, "SCORING_NODE_CALLBACK_URL", receiver.url)
+            monkeypatch.setattr(settings, "SCORING_NODE_LONG_POLL", 0.0)  # node without long-poll
+            monkeypatch.setattr(scoring_node, "_session", None)
+            callback = _p50(lambda: scoring_node.assess_via_node(WAV, ["cat"], poll_timeout=30), n=5)
+            rows.append(("callback + backoff, pooled", callback, node.connections))
+
+        print(f"\nnode job takes {JOB_SECONDS * 1000:.0f} ms; p50 end-to-end latency:")
+        for label, p50, connections in rows:
+            print(f"  {label:34s} {p50 * 1000:7.1f} ms  "
+                  f"(+{(p50 - JOB_SECONDS) * 1000:6.1f} ms waiting, {connections} connection(s))")
+
+        assert legacy >= 3.0
+        assert adaptive < JOB_SECONDS + 0.5
+        assert long_poll < JOB_SECONDS + 0.15
+        assert callback < JOB_SECONDS + 0.15
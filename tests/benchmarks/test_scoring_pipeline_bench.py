@@ -0,0 +1,250 @@
+"""
+Benchmark: the scoring hot path end to end against local provider stand-ins
+(xfyun node, xfyun ISE websocket, GOP box, Azure at the provider) with
+injected latency and failures — the word cascade, the continuous cascade,
+POST /recordings/submit and POST /submit-continuous — reporting throughput,
+p50 and p99 against the stored baselines in scoring_pipeline_baselines.json
+Run with: pytest benchmarks/test_scoring_pipeline_bench.py -s
+Refresh the baselines (same machine, quiet box): BENCH_UPDATE_BASELINES=1
+"""
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.api.routes import student as student_routes
+from app.core.config import settings
+from app.models.assignment import Assignment, AssignmentStudent, AssignmentWord
+from app.models.recording import Recording
+from app.services import scoring_cascade, scoring_node, shadow_service
+from app.services.provider_health import scorer_health
+from app.services.pronunciation_service import pronunciation_service
+from .fake_servers import FakeAzureScorer, FakeGOPServer, FakeISEServer, FakeScoringNode
+from .speech_fixtures import write_fixtures
+
+BASELINES = Path(__file__).parent / "scoring_pipeline_baselines.json"
+UPDATE = os.getenv("BENCH_UPDATE_BASELINES") == "1"
+TOLERANCE = float(os.getenv("BENCH_TOLERANCE", "2.0"))  # allowed p99 slowdown vs baseline
+SLACK = 0.05  # seconds; keeps sub-100 ms baselines from failing on scheduler noise
+
+WORD = "beautiful"
+TEST_WORDS = ["apple", "banana", "cherry", "elephant", "computer", "photograph", "orange", "tiger",
+              "window", "garden", "pencil", "rabbit", "yellow", "doctor", "monkey", "basket"]
+
+# stand-in behaviour per scenario: (latency s, jitter s, failure rate)
+HEALTHY = {"node": (0.30, 0.15, 0.0), "ise": (0.20, 0.10, 0.0), "azure": (0.60, 0.30, 0.0), "gop": (0.25, 0.1, 0.0)}
+SCENARIOS = {
+    "healthy": HEALTHY,
+    "node_failing": dict(HEALTHY, node=(0.30, 0.15, 1.0)),
+    "xfyun_down_azure_flaky": dict(HEALTHY, node=(0.30, 0.15, 1.0), ise=(0.20, 0.1, 1.0),
+                                   azure=(0.60, 0.30, 0.3)),
+}
+
+
+def summarize(latencies, wall, errors):
+    ordered = sorted(latencies)
+    rank = lambda pct: ordered[min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered) + 0.5)) - 1))]
+    return {"n": len(ordered), "errors": errors, "throughput": round(len(ordered) / wall, 2),
+            "p50": round(rank(50), 3), "p99": round(rank(99), 3)}
+
+
+def drive(fn, n, concurrency):
+    """Run fn n times on `concurrency` threads; fn returns True on a scored result"""
+    latencies, errors = [], []
+
+    def one(_):
+        start = time.perf_counter()
+        ok = fn()
+        latencies.append(time.perf_counter() - start)
+        if not ok:
+            errors.append(1)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(n)))
+    return summarize(latencies, time.perf_counter() - start, len(errors))
+
+
+class Report:
+    """Rows of one run, compared against (and optionally written to) the baselines"""
+
+    def __init__(self):
+        self.baselines = json.loads(BASELINES.read_text()) if BASELINES.exists() else {}
+        self.rows = {}
+
+    def add(self, name, row):
+        self.rows[name] = row
+        base = self.baselines.get(name)
+        vs = (f"baseline p50 {base['p50']:.3f} p99 {base['p99']:.3f} ({row['p99'] / base['p99']:.2f}x)"
+              if base else "no baseline")
+        print(f"  {name:44s} n={row['n']:3d} err={row['errors']} {row['throughput']:6.2f}/s "
+              f"p50 {row['p50']:.3f} s  p99 {row['p99']:.3f} s   {vs}")
+        assert row["errors"] == 0, f"{name}: {row['errors']} requests got no score"
+        if base and not UPDATE:
+            assert row["p99"] <= base["p99"] * TOLERANCE + SLACK, f"{name}: p99 regressed"
+
+    def save(self):
+        if UPDATE and self.rows:
+            merged = dict(self.baselines, **self.rows)
+            BASELINES.write_text(json.dumps(merged, indent=2, sort_keys=True) + "\n")
+            print(f"\n  baselines written to {BASELINES.name}")
+
+
+@pytest.fixture(scope="module")
+def report():
+    print("\nscoring pipeline (stand-ins: node / ISE ws / Azure provider / GOP):")
+    r = Report()
+    yield r
+    r.save()
+
+
+@pytest.fixture(scope="module")
+def fixtures(tmp_path_factory):
+    return {
+        "word": write_fixtures(tmp_path_factory.mktemp("word"), [WORD], seed=1),
+        "continuous": write_fixtures(tmp_path_factory.mktemp("continuous"), TEST_WORDS, seed=2),
+    }
+
+
+@pytest.fixture
+def stand_ins(monkeypatch):
+    """Start the stand-ins for a scenario and point every provider at them"""
+    started = []
+
+    def start(scenario):
+        faults = SCENARIOS[scenario]
+        node = FakeScoringNode(*faults["node"][:1], long_poll=True, jitter=faults["node"][1],
+                               failure_rate=faults["node"][2], seed=1).start()
+        ise = FakeISEServer(faults["ise"][0], jitter=faults["ise"][1], failure_rate=faults["ise"][2], seed=2).start()
+        gop = FakeGOPServer(*faults["gop"], seed=3).start()
+        azure = FakeAzureScorer(*faults["azure"], seed=4)
+        started.extend([node, ise, gop])
+
+        monkeypatch.setattr(settings, "SCORING_NODE_URL", node.url)
+        monkeypatch.setattr(settings, "SCORING_NODE_TOKEN", "test-token")
+        monkeypatch.setattr(settings, "SCORING_NODE_CALLBACK_URL", None)
+        monkeypatch.setattr(settings, "SCORING_NODE_LONG_POLL", 20.0)
+        monkeypatch.setattr(scoring_node, "_session", None)
+        monkeypatch.setattr(settings, "XF_APPID", "appid")
+        monkeypatch.setattr(settings, "XF_API_KEY", "key")
+        monkeypatch.setattr(settings, "XF_API_SECRET", "secret")
+        monkeypatch.setattr(settings, "XF_ISE_URL", ise.url)
+        monkeypatch.setattr(settings, "XF_ISE_SEND_INTERVAL", 0.0)
+        monkeypatch.setattr(shadow_service, "SHADOW_ML_URL", gop.url)
+        for cascade, fake in ((pronunciation_service.word_cascade, azure.word),
+                              (pronunciation_service.continuous_cascade, azure.continuous)):
+            for provider in cascade.providers:
+                if provider.name == "azure":
+                    monkeypatch.setattr(provider, "score", fake)
+                    monkeypatch.setattr(provider, "available", lambda: True)
+        # fresh latency history and breakers: scenarios must not leak into each other
+        monkeypatch.setattr(scoring_cascade, "_stats", {})
+        monkeypatch.setattr(scorer_health, "_breakers", {})
+        monkeypatch.setattr(settings, "SCORE_CACHE_ENABLED", False)
+        monkeypatch.setattr(shadow_service, "submit_shadow", lambda *a, **k: None)
+        return {"node": node, "ise": ise, "gop": gop, "azure": azure}
+
+    yield start
+    for server in started:
+        server.stop()
+
+
+def scored(result):
+    return bool(result) and not result.get("error") and result.get("pronunciation_score", 0) > 0
+
+
+class TestCascadeBenchmark:
+    """PronunciationService straight through the provider cascade"""
+
+    @pytest.mark.parametrize("scenario", list(SCENARIOS))
+    def test_word_cascade(self, scenario, stand_ins, fixtures, report):
+        stand_ins(scenario)
+        path = fixtures["word"]["wav16k"][0]
+        row = drive(lambda: scored(pronunciation_service.assess_pronunciation(path, WORD)),
+                    n=48, concurrency=8)
+        report.add(f"cascade/word/{scenario}", row)
+
+    @pytest.mark.parametrize("scenario", ["healthy", "node_failing"])
+    def test_continuous_cascade(self, scenario, stand_ins, fixtures, report):
+        stand_ins(scenario)
+        path = fixtures["continuous"]["wav16k"][0]
+        row = drive(lambda: scored(pronunciation_service.assess_continuous_reading(path, TEST_WORDS)),
+                    n=8, concurrency=4)
+        report.add(f"cascade/continuous/{scenario}", row)
+
+
+class TestEndpointBenchmark:
+    """The HTTP entry points, through the app, its DB and the scoring queue"""
+
+    @pytest.fixture(autouse=True)
+    def uploads(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(student_routes, "UPLOAD_DIR", tmp_path)
+        monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+        monkeypatch.setattr(settings, "SCORING_INLINE_WAIT", 30.0)
+
+    @pytest.mark.parametrize("fmt", ["wav16k", "wav48k_stereo", "webm"])
+    def test_submit(self, fmt, client, auth_headers_student, stand_ins, fixtures, report):
+        if fmt not in fixtures["word"]:
+            pytest.skip("ffmpeg not installed: no webm fixture")
+        stand_ins("healthy")
+        path, content_type = fixtures["word"][fmt]
+        audio = Path(path).read_bytes()
+
+        def submit():
+            resp = client.post("/api/student/recordings/submit", headers=auth_headers_student,
+                               data={"word_text": WORD},
+                               files={"audio_file": (Path(path).name, audio, content_type)})
+            return resp.status_code == 200 and resp.json().get("status") == "done" \
+                and scored(resp.json()["automated_scores"])
+
+        # one shared in-memory SQLite connection: requests go one at a time
+        report.add(f"submit/{fmt}", drive(submit, n=16, concurrency=1))
+
+    def test_submit_continuous(self, client, test_db, test_student, test_teacher, auth_headers_student,
+                               stand_ins, fixtures, report, monkeypatch):
+        from app.db import session as db_session
+        stand_ins("healthy")
+        # the background scorer opens its own session: on the test database
+        monkeypatch.setattr(db_session, "SessionLocal",
+                            sessionmaker(autocommit=False, autoflush=False, bind=test_db.get_bind()))
+        assignment = Assignment(teacher_id=test_teacher.id, title="Bench", mode="continuous")
+        test_db.add(assignment)
+        test_db.flush()
+        for i, word in enumerate(TEST_WORDS):
+            test_db.add(AssignmentWord(assignment_id=assignment.id, word_text=word, order_index=i))
+        test_db.add(AssignmentStudent(assignment_id=assignment.id, student_id=test_student.id))
+        test_db.commit()
+        path, content_type = fixtures["continuous"]["wav16k"]
+        audio = Path(path).read_bytes()
+        lock = threading.Lock()
+
+        def submit_and_wait():
+            with lock:
+                resp = client.post(f"/api/assignments/student/assignments/{assignment.id}/submit-continuous",
+                                   headers=auth_headers_student,
+                                   files={"audio_file": ("take.wav", audio, content_type)})
+            if resp.status_code != 200:
+                return False
+            recording_id = resp.json()["recording_id"]
+            deadline = time.monotonic() + 60
+            while time.monotonic() < deadline:
+                with lock:
+                    test_db.expire_all()
+                    scores = test_db.query(Recording.automated_scores).filter(
+                        Recording.id == recording_id).scalar()
+                if scores is not None:
+                    return scored(scores)
+                time.sleep(0.02)
+            return False
+
+        report.add("submit-continuous/wav16k", drive(submit_and_wait, n=6, concurrency=1))
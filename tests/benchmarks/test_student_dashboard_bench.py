@@ -0,0 +1,145 @@
+"""
+Benchmark: the student's assignment list on a seeded SQLite file — one
+builder call per assignment (previous: teacher, word database,
+AssignmentStudent row, submission COUNT and a lazy word list each) vs the
+batched load_student_assignments, queries and latency per request
+Run with: pytest benchmarks/test_student_dashboard_bench.py -s
+"""
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.api.routes.assignments import load_student_assignments
+from app.db.session import Base
+from app.models.assignment import (
+    Assignment, AssignmentStudent, AssignmentSubmission, AssignmentWord, WordDatabase,
+)
+from app.models.user import User, UserRole
+
+STUDENTS = 200
+ASSIGNMENTS = (60, 30, 5)  # per student, largest first: each case trims the last
+WORDS = 40
+RUNS = 30
+
+
+def legacy_response(assignment, student_id, db):
+    """The per-assignment builder before batching"""
+    teacher = db.query(User).filter(User.id == assignment.teacher_id).first()
+    database = db.query(WordDatabase).filter(WordDatabase.id == assignment.word_database_id).first() \
+        if assignment.word_database_id else None
+    assignment_student = db.query(AssignmentStudent).filter(
+        AssignmentStudent.assignment_id == assignment.id, AssignmentStudent.student_id == student_id).first()
+    total_words = len(assignment.words)
+    completed_words = db.query(AssignmentSubmission).filter(
+        AssignmentSubmission.assignment_id == assignment.id,
+        AssignmentSubmission.student_id == student_id).count()
+    return {
+        "id": assignment.id, "title": assignment.title, "description": assignment.description,
+        "mode": assignment.mode or "practice", "teacher_name": teacher.username if teacher else "Unknown",
+        "word_database_name": database.name if database else None, "due_date": assignment.due_date,
+        "assigned_at": assignment_student.assigned_at, "completed_at": assignment_student.completed_at,
+        "words": [{"id": w.id, "word_text": w.word_text, "order_index": w.order_index}
+                  for w in sorted(assignment.words, key=lambda x: x.order_index)],
+        "total_words": total_words, "completed_words": completed_words,
+        "completion_percentage": round(completed_words / total_words * 100 if total_words else 0, 1),
+        "is_overdue": bool(assignment.due_date) and datetime.utcnow() > assignment.due_date.replace(tzinfo=None),
+    }
+
+
+def legacy_load(db, student_id):
+    rows = db.query(AssignmentStudent).filter(AssignmentStudent.student_id == student_id) \
+        .order_by(AssignmentStudent.id).all()
+    return [legacy_response(r.assignment, student_id, db) for r in rows]
+
+
+@pytest.fixture(scope="module")
+def seeded(tmp_path_factory):
+    """A teacher, a word database, 200 students each assigned every assignment"""
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('dash') / 'dashboard.db'}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    teacher = User(username="teacher", email="t@x", password_hash="x", role=UserRole.TEACHER)
+    db.add(teacher)
+    db.flush()
+    database = WordDatabase(name="Grade 5", created_by=teacher.id)
+    db.add(database)
+    db.flush()
+    students = [User(username=f"s{i}", email=f"s{i}@x", password_hash="x", role=UserRole.STUDENT)
+                for i in range(STUDENTS)]
+    db.add_all(students)
+    db.flush()
+    assignments = []
+    for a in range(max(ASSIGNMENTS)):
+        assignment = Assignment(teacher_id=teacher.id, title=f"Unit {a}", word_database_id=database.id,
+                                due_date=datetime.utcnow() + timedelta(days=a - 10))
+        db.add(assignment)
+        db.flush()
+        db.add_all([AssignmentWord(assignment_id=assignment.id, word_text=f"w{a}_{i}", order_index=i)
+                    for i in range(WORDS)])
+        assignments.append(assignment.id)
+    # everyone gets every assignment, with a third of the words submitted
+    for student in students:
+        db.add_all([AssignmentStudent(assignment_id=a, student_id=student.id) for a in assignments])
+        db.add_all([AssignmentSubmission(assignment_id=a, student_id=student.id, word_text=f"w{j}_{i}")
+                    for j, a in enumerate(assignments) for i in range(WORDS // 3)])
+    student_id = students[0].id
+    db.commit()
+    db.close()
+    yield engine, Session, student_id, assignments
+    engine.dispose()
+
+
+def measure(Session, engine, load, student_id):
+    statements = []
+
+    def listen(conn, cursor, statement, *a):
+        statements.append(statement)
+    timings, queries = [], []
+    event.listen(engine, "before_cursor_execute", listen)
+    try:
+        for _ in range(RUNS):
+            db = Session()
+            statements.clear()
+            start = time.perf_counter()
+            result = load(db, student_id)
+            timings.append(time.perf_counter() - start)
+            queries.append(len(statements))
+            db.close()
+    finally:
+        event.remove(engine, "before_cursor_execute", listen)
+    return result, statistics.median(timings), max(queries)
+
+
+class TestStudentDashboardBenchmark:
+    """GET /student/assignments' loader, per-assignment vs batched"""
+
+    @pytest.mark.parametrize("n_assignments", ASSIGNMENTS)
+    def test_dashboard(self, seeded, n_assignments):
+        engine, Session, student_id, assignments = seeded
+        db = Session()
+        # trim this student's assignments to the size being measured
+        db.query(AssignmentStudent).filter(AssignmentStudent.student_id == student_id,
+                                           AssignmentStudent.assignment_id.notin_(assignments[:n_assignments])
+                                           ).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+
+        before, before_s, before_q = measure(Session, engine, legacy_load, student_id)
+        after, after_s, after_q = measure(Session, engine, load_student_assignments, student_id)
+
+        print(f"\n  {n_assignments:2d} assignments x {WORDS} words:"
+              f" per-assignment {before_q:4d} queries {before_s * 1000:7.2f} ms |"
+              f" batched {after_q} queries {after_s * 1000:6.2f} ms ({before_s / after_s:.1f}x)")
+        assert after == before
+        assert after_q <= 3
@@ -0,0 +1,133 @@
+"""
+Benchmark: asyncio ISE client (fast send, shared loop) vs the old
+thread-per-call websocket-client session paced at real time
+Run with: pytest benchmarks/test_xf_ise_bench.py -s
+"""
+import base64
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.core.config import settings
+from app.services.xf_ise_client import ISEClient, sign_url
+from .fake_servers import FakeISEServer
+
+CREDS = ("appid", "key", "secret")
+CLIP_SECONDS = 2.0
+CLIP = b"\x00\x01" * int(16000 * CLIP_SECONDS)  # 16 kHz / 16-bit mono
+SERVICE_LATENCY = 0.05  # the stand-in's own "evaluation" time
+
+
+def legacy_evaluate(url, audio, text, category):
+    """The previous implementation: new signature, two threads, 40 ms per frame"""
+    websocket = pytest.importorskip("websocket")
+    url = sign_url(url, CREDS[1], CREDS[2], time.time())
+    result = {}
+    done = threading.Event()
+
+    def on_open(ws):
+        def send():
+            ws.send(json.dumps({"common": {"app_id": CREDS[0]}, "business": {
+                "category": category, "cmd": "ssb", "text": "[word]\n" + text},
+                "data": {"status": 0, "data": ""}}))
+            frame, i, first = 1280, 0, True
+            while i < len(audio):
+                chunk = audio[i:i + frame]
+                i += frame
+                last = i >= len(audio)
+                aus = 1 if first else (4 if last else 2)
+                first = False
+                try:
+                    ws.send(json.dumps({
+                        "business": {"cmd": "auw", "aus": aus, "aue": "raw"},
+                        "data": {"status": 2 if last else 1,
+                                 "data": base64.b64encode(chunk).decode(),
+                                 "data_type": 1, "encoding": "raw"},
+                    }))
+                except Exception:
+                    return
+                time.sleep(0.04)
+        threading.Thread(target=send, daemon=True).start()
+
+    def on_message(ws, msg):
+        m = json.loads(msg)
+        if m.get("data", {}).get("status") == 2:
+            result["xml"] = base64.b64decode(m["data"]["data"]).decode("gbk", errors="ignore")
+            ws.close()
+
+    def on_close(ws, *a):
+        done.set()
+
+    ws = websocket.WebSocketApp(url, on_open=on_open, on_message=on_message, on_close=on_close)
+    threading.Thread(target=ws.run_forever, daemon=True).start()
+    done.wait(timeout=60)
+    return result["xml"]
+
+
+def _timed(fn, n, concurrency=1):
+    latencies = []
+
+    def one(_):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(n)))
+    wall = time.perf_counter() - start
+    latencies.sort()
+    return {"p50": latencies[len(latencies) // 2], "max": latencies[-1], "throughput": n / wall}
+
+
+@pytest.fixture
+def fake_ise(monkeypatch):
+    with FakeISEServer(latency=SERVICE_LATENCY) as server:
+        monkeypatch.setattr(settings, "XF_ISE_URL", server.url)
+        yield server
+
+
+class TestISEClientBenchmark:
+    """Latency and throughput against a local ISE stand-in"""
+
+    def test_fast_send_vs_legacy(self, fake_ise, monkeypatch):
+        monkeypatch.setattr(settings, "XF_ISE_SEND_INTERVAL", 0.0)
+        client = ISEClient()
+
+        legacy = _timed(lambda: legacy_evaluate(fake_ise.url, CLIP, "cat", "read_word"), n=3)
+        fast = _timed(lambda: client.evaluate_sync(CLIP, "cat", "read_word", CREDS, timeout=30), n=10)
+
+        print(f"\n{CLIP_SECONDS:.0f} s clip, one session at a time:")
+        print(f"  legacy (paced, thread per call): p50 {legacy['p50'] * 1000:7.1f} ms")
+        print(f"  asyncio client (fast send):      p50 {fast['p50'] * 1000:7.1f} ms"
+              f"  -> {legacy['p50'] / fast['p50']:.1f}x")
+
+        assert legacy["p50"] >= CLIP_SECONDS  # real-time pacing
+        assert fast["p50"] < legacy["p50"] / 5
+
+    def test_concurrent_sessions(self, fake_ise, monkeypatch):
+        monkeypatch.setattr(settings, "XF_ISE_SEND_INTERVAL", 0.0)
+        monkeypatch.setattr(settings, "XF_ISE_MAX_SESSIONS", 8)
+        client = ISEClient()
+        threads_before = threading.active_count()
+
+        stats = _timed(lambda: client.evaluate_sync(CLIP, "cat", "read_word", CREDS, timeout=30),
+                       n=32, concurrency=16)
+
+        print(f"\n32 sessions, 16 callers, cap 8: p50 {stats['p50'] * 1000:.1f} ms, "
+              f"max {stats['max'] * 1000:.1f} ms, {stats['throughput']:.1f} sessions/s, "
+              f"{client.signer.signatures} signature(s), peak {fake_ise.peak_active} open")
+
+        assert fake_ise.sessions == 32
+        assert fake_ise.peak_active <= 8
+        assert client.signer.signatures == 1
+        assert threading.active_count() <= threads_before + 1  # just the shared loop thread
@@ -15,6 +15,7 @@ from sqlalchemy.pool import StaticPool
 backend_path = Path(__file__).parent.parent / "backend"
 sys.path.insert(0, str(backend_path))
 
+from app import main as main_module
 from app.main import app
 from app.db.session import Base, get_db
 from app.models.user import User, UserRole
@@ -53,7 +54,7 @@ def test_db():
 
 
 @pytest.fixture(scope="function")
-def client(test_db):
+def client(test_db, monkeypatch):
     """Create a test client with database override"""
     def override_get_db():
         try:
@@ -62,6 +63,8 @@ def client(test_db):
             pass
 
     app.dependency_overrides[get_db] = override_get_db
+    # startup hooks (scoring job recovery, score cache purge) use the test database too
+    monkeypatch.setattr(main_module, "engine", test_db.get_bind())
 
     with TestClient(app) as test_client:
         yield test_client
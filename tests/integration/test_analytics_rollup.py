@@ -0,0 +1,201 @@
+"""
+Integration tests for the analytics rollup tables
+Covers: rollups following recordings through submit / scoring / review /
+rescoring / delete in the same transaction (and rolling back with it),
+per-class-day totals, rebuild from raw recordings, the teacher analytics
+endpoint answered without scanning recordings, the backfilling migration
+"""
+import pytest
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+from sqlalchemy import create_engine, event, text
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.models.classes import Class, ClassEnrollment
+from app.models.recording import Recording, RecordingStatus
+from app.models.rollup import ClassDayStats, StudentWordStats
+from app.services.analytics_rollup import analytics_rollup
+
+
+def totals(test_db, student_id, word):
+    test_db.expire_all()
+    row = test_db.query(StudentWordStats).filter(
+        StudentWordStats.student_id == student_id, StudentWordStats.word_text == word).first()
+    return (row.recordings, row.pending, row.scored, row.score_sum) if row else None
+
+
+def snapshot(test_db):
+    test_db.expire_all()
+    words = sorted((r.student_id, r.word_text, r.recordings, r.pending, r.scored, round(r.score_sum, 6))
+                   for r in test_db.query(StudentWordStats) if r.recordings)
+    days = sorted((r.class_id, r.day, r.recordings, r.pending, r.scored, round(r.score_sum, 6))
+                  for r in test_db.query(ClassDayStats) if r.recordings)
+    return words, days
+
+
+@pytest.fixture
+def klass(test_db, test_teacher, test_student):
+    klass = Class(teacher_id=test_teacher.id, class_name="Class A", class_code="ROLL01")
+    test_db.add(klass)
+    test_db.flush()
+    test_db.add(ClassEnrollment(class_id=klass.id, student_id=test_student.id))
+    test_db.commit()
+    return klass
+
+
+def submit(test_db, student_id, word="apple", scores=None, created_at=None):
+    recording = Recording(student_id=student_id, word_text=word, audio_file_path=f"uploads/{word}.wav",
+                          automated_scores=scores, created_at=created_at)
+    test_db.add(recording)
+    test_db.commit()
+    return recording
+
+
+class TestIncrementalUpdates:
+    """Every write to a recording moves the rollups with it"""
+
+    def test_submit_then_score(self, test_db, test_student):
+        recording = submit(test_db, test_student.id)
+        assert totals(test_db, test_student.id, "apple") == (1, 1, 0, 0.0)
+
+        # the scoring worker's write, on an object expired by the commit above
+        recording.automated_scores = {"pronunciation_score": 84.0}
+        recording.status = RecordingStatus.REVIEWED
+        test_db.commit()
+        assert totals(test_db, test_student.id, "apple") == (1, 0, 1, 84.0)
+
+    def test_failed_take_stays_pending_and_unscored(self, test_db, test_student):
+        submit(test_db, test_student.id, scores={"error": "评分失败", "pronunciation_score": 0})
+        assert totals(test_db, test_student.id, "apple") == (1, 1, 0, 0.0)
+
+    def test_rescoring_replaces_the_score(self, test_db, test_student):
+        recording = submit(test_db, test_student.id, scores={"pronunciation_score": 50.0})
+        recording.automated_scores = {"pronunciation_score": 70.0}
+        test_db.commit()
+        assert totals(test_db, test_student.id, "apple") == (1, 1, 1, 70.0)
+
+    def test_teacher_review_clears_pending(self, client, test_db, test_student, klass, auth_headers_teacher):
+        recording = submit(test_db, test_student.id, scores={"error": "评分失败", "pronunciation_score": 0})
+
+        response = client.post("/api/teacher/feedback", headers=auth_headers_teacher, json={
+            "recording_id": recording.id, "feedback_text": "Good", "grade": "B"})
+
+        assert response.status_code == 200
+        assert totals(test_db, test_student.id, "apple")[1] == 0
+
+    def test_delete(self, test_db, test_student):
+        recording = submit(test_db, test_student.id, scores={"pronunciation_score": 90.0})
+        test_db.delete(recording)
+        test_db.commit()
+        assert totals(test_db, test_student.id, "apple") == (0, 0, 0, 0.0)
+
+    def test_rollback_takes_the_rollup_change_with_it(self, test_db, test_student):
+        test_db.add(Recording(student_id=test_student.id, word_text="apple", audio_file_path="a.wav"))
+        test_db.flush()
+        test_db.rollback()
+        assert totals(test_db, test_student.id, "apple") is None
+
+    def test_class_day(self, test_db, test_student, klass):
+        submit(test_db, test_student.id, scores={"pronunciation_score": 60.0}, created_at=datetime(2026, 5, 4, 10))
+        submit(test_db, test_student.id, "pear", {"pronunciation_score": 80.0}, datetime(2026, 5, 4, 11))
+        submit(test_db, test_student.id, scores={"pronunciation_score": 90.0}, created_at=datetime(2026, 5, 5, 9))
+
+        test_db.expire_all()
+        rows = {r.day: (r.recordings, r.scored, r.score_sum) for r in test_db.query(ClassDayStats)}
+        assert rows == {date(2026, 5, 4): (2, 2, 140.0), date(2026, 5, 5): (1, 1, 90.0)}
+
+
+class TestRebuild:
+    """The rebuild recomputes what the incremental path maintains"""
+
+    def test_rebuild_matches_incremental(self, test_db, test_student, klass):
+        submit(test_db, test_student.id, scores={"pronunciation_score": 60.0}, created_at=datetime(2026, 5, 4, 10))
+        submit(test_db, test_student.id, "pear", {"error": "评分失败", "pronunciation_score": 0},
+               datetime(2026, 5, 4, 11))
+        submit(test_db, test_student.id, scores={"pronunciation_score": 90.0}, created_at=datetime(2026, 5, 5, 9))
+        incremental = snapshot(test_db)
+
+        # changes made around the ORM are only picked up by a rebuild
+        test_db.execute(text("UPDATE student_word_stats SET recordings = 99"))
+        summary = analytics_rollup.rebuild(test_db)
+        test_db.commit()
+
+        assert snapshot(test_db) == incremental
+        assert summary["student_word_rows"] == 2 and summary["class_day_rows"] == 2
+        assert analytics_rollup.stats()["last_rebuild"] == summary
+
+
+class TestAnalyticsEndpoint:
+    """/analytics is answered from the rollups"""
+
+    def test_no_recordings_scan(self, client, test_db, test_student, klass, auth_headers_teacher):
+        submit(test_db, test_student.id, scores={"pronunciation_score": 60.0})
+        submit(test_db, test_student.id, scores={"pronunciation_score": 80.0})
+        submit(test_db, test_student.id, "pear", {"pronunciation_score": 40.0})
+        statements = []
+        event.listen(test_db.get_bind(), "before_cursor_execute",
+                     lambda conn, cursor, statement, *a: statements.append(statement))
+
+        data = client.get("/api/teacher/analytics", headers=auth_headers_teacher,
+                          params={"class_id": klass.id}).json()
+
+        assert data["total_recordings"] == 3 and data["pending_reviews"] == 3
+        assert data["average_score"] == 60.0
+        assert data["most_practiced_words"][0] == {"word": "apple", "count": 2}
+        assert data["challenging_words"][0] == {"word": "pear", "average_score": 40.0}
+        assert data["daily_activity"][-1]["recordings"] == 3
+        assert not [s for s in statements if "FROM recordings" in s]
+
+    def test_activity_window_is_on_the_rollup_clock(self, client, test_db, test_student, klass,
+                                                    auth_headers_teacher, monkeypatch):
+        from app.api.routes import teacher
+
+        class UTC(datetime):
+            @classmethod
+            def utcnow(cls):
+                return datetime(2026, 5, 20, 23, 30)  # already the 21st east of UTC
+        monkeypatch.setattr(teacher, "datetime", UTC)
+        submit(test_db, test_student.id, scores={"pronunciation_score": 70.0}, created_at=datetime(2026, 5, 6, 23))
+        submit(test_db, test_student.id, scores={"pronunciation_score": 80.0}, created_at=datetime(2026, 5, 7, 1))
+
+        data = client.get("/api/teacher/analytics", headers=auth_headers_teacher,
+                          params={"class_id": klass.id}).json()
+
+        assert [d["date"] for d in data["daily_activity"]] == ["2026-05-07"]
+
+
+class TestMigration:
+    """Upgrading an existing database fills the rollups once"""
+
+    def test_upgrade_fills_rollups(self, tmp_path, monkeypatch):
+        from alembic import command
+        from alembic.config import Config
+        from app.core.config import settings
+        from app.db.session import Base
+
+        url = f"sqlite:///{tmp_path / 'rollup.db'}"
+        monkeypatch.setattr(settings, "DATABASE_URL", url)
+        engine = create_engine(url)
+        Base.metadata.create_all(bind=engine, tables=[
+            Base.metadata.tables[t] for t in ("users", "classes", "class_enrollment", "recordings")])
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO users (id, username, email, password_hash, role) "
+                              "VALUES (1, 's', 's@x', 'x', 'STUDENT')"))
+            conn.execute(text("INSERT INTO recordings (student_id, word_text, audio_file_path, status, "
+                              "pronunciation_score, score_failed, created_at) VALUES "
+                              "(1, 'cat', 'a.wav', 'PENDING', 70, 0, '2026-05-04 10:00:00'), "
+                              "(1, 'cat', 'b.wav', 'REVIEWED', 90, 0, '2026-05-04 11:00:00')"))
+        config = Config(str(backend_path / "alembic.ini"))
+        config.set_main_option("script_location", str(backend_path / "alembic"))
+
+        command.upgrade(config, "head")
+
+        with engine.connect() as conn:
+            row = conn.execute(text("SELECT recordings, pending, scored, score_sum FROM student_word_stats")).one()
+        assert tuple(row) == (2, 1, 2, 160.0)
+        engine.dispose()
@@ -0,0 +1,162 @@
+"""
+Integration tests for the per-student assignment progress views
+Covers: teacher and student variants answered in a fixed number of queries
+whatever the assignment size, per-word scores from the joined recordings,
+continuous-take breakdown served from the per-recording cache and dropped
+when the take is rescored
+"""
+import pytest
+import sys
+from pathlib import Path
+
+from sqlalchemy import event
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.models.assignment import Assignment, AssignmentStudent, AssignmentSubmission, AssignmentWord
+from app.models.recording import Recording
+from app.services.assignment_progress import breakdown_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    breakdown_cache.clear()
+
+
+@pytest.fixture
+def count_queries(test_db):
+    statements = []
+
+    def listen(conn, cursor, statement, *a):
+        statements.append(statement)
+    event.listen(test_db.get_bind(), "before_cursor_execute", listen)
+    yield statements
+    event.remove(test_db.get_bind(), "before_cursor_execute", listen)
+
+
+def make_assignment(test_db, teacher, student, n_words, mode="practice", submitted=0):
+    assignment = Assignment(teacher_id=teacher.id, title=f"{n_words} words", mode=mode)
+    test_db.add(assignment)
+    test_db.flush()
+    words = [f"word{i}" for i in range(n_words)]
+    for i, word in enumerate(words):
+        test_db.add(AssignmentWord(assignment_id=assignment.id, word_text=word, order_index=i))
+    test_db.add(AssignmentStudent(assignment_id=assignment.id, student_id=student.id))
+    for i, word in enumerate(words[:submitted]):
+        scores = {"pronunciation_score": 50 + i} if i % 5 else {"error": "评分失败", "pronunciation_score": 0}
+        recording = Recording(student_id=student.id, word_text=word, audio_file_path=f"uploads/{word}.wav",
+                              automated_scores=scores)
+        test_db.add(recording)
+        test_db.flush()
+        test_db.add(AssignmentSubmission(assignment_id=assignment.id, student_id=student.id,
+                                         word_text=word, recording_id=recording.id))
+    test_db.commit()
+    return assignment
+
+
+def continuous_take(test_db, assignment, student, per_word):
+    recording = Recording(student_id=student.id, word_text="continuous", audio_file_path="uploads/take.wav",
+                          automated_scores={"pronunciation_score": 77, "words_read": 2, "words_total": 3,
+                                            "per_word": per_word})
+    test_db.add(recording)
+    test_db.flush()
+    for w in ("word0", "word1", "word2"):
+        test_db.add(AssignmentSubmission(assignment_id=assignment.id, student_id=student.id,
+                                         word_text=w, recording_id=recording.id))
+    test_db.commit()
+    return recording
+
+
+class TestQueryCount:
+    """The number of queries does not grow with the assignment"""
+
+    @pytest.mark.parametrize("n_words", [5, 40])
+    def test_teacher_view(self, client, test_db, test_teacher, test_student, auth_headers_teacher,
+                          count_queries, n_words):
+        assignment = make_assignment(test_db, test_teacher, test_student, n_words, submitted=n_words - 2)
+        url = f"/api/assignments/teacher/assignments/{assignment.id}/students/{test_student.id}/progress"
+        count_queries.clear()
+
+        response = client.get(url, headers=auth_headers_teacher)
+
+        assert response.status_code == 200
+        assert response.json()["completed_words"] == n_words - 2
+        # current user, assignment, assignment_student, words, submissions+recordings
+        assert len(count_queries) <= 5
+        assert not [s for s in count_queries if "FROM recordings" in s and "assignment_submissions" not in s]
+
+    @pytest.mark.parametrize("n_words", [5, 40])
+    def test_student_view(self, client, test_db, test_teacher, test_student, auth_headers_student,
+                          count_queries, n_words):
+        assignment = make_assignment(test_db, test_teacher, test_student, n_words, submitted=n_words)
+        url = f"/api/assignments/student/assignments/{assignment.id}/progress"
+        count_queries.clear()
+
+        response = client.get(url, headers=auth_headers_student)
+
+        assert response.status_code == 200
+        # current user, assignment_student, assignment, words, submissions+recordings
+        assert len(count_queries) <= 5
+
+    def test_scores_come_from_the_join(self, client, test_db, test_teacher, test_student, auth_headers_student):
+        assignment = make_assignment(test_db, test_teacher, test_student, 6, submitted=6)
+
+        words = client.get(f"/api/assignments/student/assignments/{assignment.id}/progress",
+                           headers=auth_headers_student).json()["words"]
+
+        assert [w["score"] for w in words] == [0, 51, 52, 53, 54, 0]
+
+
+class TestContinuousBreakdown:
+    """The latest take's per_word is parsed once per recording"""
+
+    def test_second_view_is_served_from_the_cache(self, client, test_db, test_teacher, test_student,
+                                                   auth_headers_teacher, count_queries):
+        assignment = make_assignment(test_db, test_teacher, test_student, 3, mode="continuous")
+        continuous_take(test_db, assignment, test_student, [
+            {"word": "word0", "score": 90}, {"word": "word1", "score": 64}, {"word": "word2", "error": "漏读"}])
+        url = f"/api/assignments/teacher/assignments/{assignment.id}/students/{test_student.id}/progress"
+
+        first = client.get(url, headers=auth_headers_teacher).json()
+        count_queries.clear()
+        second = client.get(url, headers=auth_headers_teacher).json()
+
+        assert first == second
+        assert [w.get("score") for w in second["words"]] == [90, 64, None]
+        assert second["words"][2]["error"] == "漏读"
+        assert second["continuous_summary"]["pronunciation_score"] == 77
+        assert second["continuous_summary"]["scoring"] is False
+        assert len(count_queries) <= 5
+        assert breakdown_cache.stats()["hits"] == 1
+
+    def test_rescoring_drops_the_cached_breakdown(self, client, test_db, test_teacher, test_student,
+                                                   auth_headers_teacher):
+        assignment = make_assignment(test_db, test_teacher, test_student, 3, mode="continuous")
+        recording = continuous_take(test_db, assignment, test_student, [{"word": "word0", "score": 40}])
+        url = f"/api/assignments/teacher/assignments/{assignment.id}/students/{test_student.id}/progress"
+        client.get(url, headers=auth_headers_teacher)
+
+        recording.automated_scores = {"pronunciation_score": 88, "per_word": [{"word": "word0", "score": 95}]}
+        test_db.commit()
+
+        data = client.get(url, headers=auth_headers_teacher).json()
+        assert data["words"][0]["score"] == 95
+        assert data["continuous_summary"]["pronunciation_score"] == 88
+
+    def test_take_still_scoring_is_not_cached(self, client, test_db, test_teacher, test_student,
+                                              auth_headers_teacher):
+        assignment = make_assignment(test_db, test_teacher, test_student, 3, mode="continuous")
+        recording = Recording(student_id=test_student.id, word_text="continuous", audio_file_path="t.wav")
+        test_db.add(recording)
+        test_db.flush()
+        test_db.add(AssignmentSubmission(assignment_id=assignment.id, student_id=test_student.id,
+                                         word_text="word0", recording_id=recording.id))
+        test_db.commit()
+        url = f"/api/assignments/teacher/assignments/{assignment.id}/students/{test_student.id}/progress"
+
+        data = client.get(url, headers=auth_headers_teacher).json()
+
+        assert data["continuous_summary"]["scoring"] is True
+        assert breakdown_cache.stats()["entries"] == 0
@@ -0,0 +1,195 @@
+"""
+Integration tests for authenticated-user resolution
+Covers: role / username / password fingerprint in issued tokens, repeat
+requests answered without a users SELECT or a second signature check,
+tokens refused after a role or password change, eviction on commit and
+explicit invalidation, re-read of a stale row before refusing, fills
+raced by an eviction, tokens issued before the claims existed
+"""
+import pytest
+import sys
+from pathlib import Path
+
+from jose import jwt
+from sqlalchemy import event, text
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.core.config import settings
+from app.core.security import create_access_token, get_password_hash, token_claims
+from app.models.user import UserRole
+from app.services import auth_cache as auth_cache_module
+from app.services.auth_cache import AuthCache, auth_cache
+
+ME = "/api/student/progress"
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    auth_cache.clear()
+    yield
+    auth_cache.clear()
+
+
+@pytest.fixture
+def user_selects(test_db):
+    statements = []
+
+    def listen(conn, cursor, statement, *a):
+        if "FROM users" in statement:
+            statements.append(statement)
+    event.listen(test_db.get_bind(), "before_cursor_execute", listen)
+    yield statements
+    event.remove(test_db.get_bind(), "before_cursor_execute", listen)
+
+
+def login(client, email="student@test.com", password="password123"):
+    response = client.post("/api/auth/login", json={"email": email, "password": password})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+class TestClaims:
+    """Issued tokens carry what the auth check needs"""
+
+    def test_login_token(self, client, test_student):
+        token = login(client)["Authorization"].split()[1]
+
+        claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+        assert claims["sub"] == str(test_student.id)
+        assert claims["role"] == "student" and claims["username"] == "test_student"
+        assert test_student.password_hash not in claims.values()
+
+
+class TestCaching:
+    """Repeat requests skip the users SELECT and the signature check"""
+
+    def test_second_request_hits_the_cache(self, client, test_student, user_selects, monkeypatch):
+        headers = login(client)
+        decodes = []
+        real_decode = auth_cache_module.decode_access_token
+        monkeypatch.setattr(auth_cache_module, "decode_access_token",
+                            lambda token: decodes.append(token) or real_decode(token))
+        user_selects.clear()
+
+        for _ in range(3):
+            assert client.get(ME, headers=headers).status_code == 200
+
+        assert len(user_selects) == 1 and len(decodes) == 1
+
+    def test_invalid_token_is_not_kept(self, client, test_student):
+        for _ in range(2):
+            response = client.get(ME, headers={"Authorization": "Bearer not-a-jwt"})
+            assert response.status_code == 401
+        assert auth_cache.stats()["tokens"] == 0
+
+    def test_expired_entries_are_reloaded(self, test_db, test_student, user_selects):
+        cache = AuthCache(ttl=0, max_entries=8)
+
+        cache.user(test_db, test_student.id)
+        cache.user(test_db, test_student.id)
+
+        assert len(user_selects) == 2
+
+    def test_lru_bound(self, test_db, test_student, test_teacher):
+        cache = AuthCache(ttl=60, max_entries=1)
+
+        cache.user(test_db, test_student.id)
+        cache.user(test_db, test_teacher.id)
+
+        assert cache.stats()["users"] == 1
+
+
+class TestInvalidation:
+    """Changes to the user are seen on the next request"""
+
+    def test_role_change_refuses_old_token(self, client, test_db, test_student):
+        headers = login(client)
+        assert client.get(ME, headers=headers).status_code == 200
+
+        test_student.role = UserRole.TEACHER
+        test_db.commit()
+
+        assert client.get(ME, headers=headers).status_code == 401
+
+    def test_password_change_refuses_old_token(self, client, test_db, test_student):
+        headers = login(client)
+        assert client.get(ME, headers=headers).status_code == 200
+
+        test_student.password_hash = get_password_hash("new-password")
+        test_db.commit()
+
+        assert client.get(ME, headers=headers).status_code == 401
+        assert client.get(ME, headers=login(client, password="new-password")).status_code == 200
+
+    def test_rollback_keeps_the_cached_row(self, client, test_db, test_student):
+        headers = login(client)
+        client.get(ME, headers=headers)
+
+        test_student.role = UserRole.TEACHER
+        test_db.flush()
+        test_db.rollback()
+
+        assert client.get(ME, headers=headers).status_code == 200
+
+    def test_explicit_invalidation(self, client, test_db, test_student, user_selects):
+        headers = login(client)
+        client.get(ME, headers=headers)
+        user_selects.clear()
+        before = auth_cache.stats()["invalidations"]
+
+        auth_cache.invalidate_user(test_student.id)
+        client.get(ME, headers=headers)
+
+        assert len(user_selects) == 1
+        assert auth_cache.stats()["invalidations"] == before + 1
+
+    def test_stale_row_is_reread_before_refusing(self, client, test_db, test_student):
+        client.get(ME, headers=login(client))
+        new_hash = get_password_hash("new-password")
+        # raw SQL, as another process would: no ORM eviction in this one
+        test_db.execute(text("UPDATE users SET password_hash = :h WHERE id = :id"),
+                        {"h": new_hash, "id": test_student.id})
+        test_db.commit()
+        before = auth_cache.stats()["invalidations"]
+
+        assert client.get(ME, headers=login(client, password="new-password")).status_code == 200
+        assert auth_cache.stats()["invalidations"] == before + 1
+
+    def test_fill_raced_by_eviction_is_dropped(self, test_db, test_student):
+        cache = AuthCache(ttl=60, max_entries=8)
+
+        def evict(conn, cursor, statement, *a):
+            if "FROM users" in statement:
+                cache.invalidate_user(test_student.id)
+        event.listen(test_db.get_bind(), "before_cursor_execute", evict)
+        try:
+            assert cache.user(test_db, test_student.id) is not None
+        finally:
+            event.remove(test_db.get_bind(), "before_cursor_execute", evict)
+
+        assert cache.stats()["users"] == 0
+
+    def test_username_in_claims_does_not_gate(self, client, test_db, test_student):
+        headers = login(client)
+        test_student.username = "renamed"
+        test_db.commit()
+
+        # the cached row follows the rename; the old token still authenticates
+        assert client.get(ME, headers=headers).status_code == 200
+
+
+class TestLegacyTokens:
+    """Tokens carrying only `sub` keep working"""
+
+    def test_sub_only(self, client, test_student):
+        token = create_access_token(data={"sub": str(test_student.id)})
+        assert client.get(ME, headers={"Authorization": f"Bearer {token}"}).status_code == 200
+
+    def test_role_still_enforced(self, client, test_student):
+        token = create_access_token(data=token_claims(test_student))
+        response = client.get("/api/teacher/students", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 403
@@ -0,0 +1,160 @@
+"""
+Integration tests for daily progress accounting
+Covers: the per-take upsert (running sum / count, failed takes counted but
+not averaged), no lost updates when takes of one student are scored
+concurrently, the streak maintained across days and reset by a gap, the
+progress endpoint reading totals and streak from the maintained columns
+"""
+import pytest
+import sys
+import threading
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.db.session import Base
+from app.models.progress import StudentProgress
+from app.models.user import User, UserRole
+from app.services.daily_progress import current_streak, record_attempt
+
+TODAY = date(2026, 5, 6)
+
+
+def row(test_db, student_id, day=TODAY):
+    test_db.expire_all()
+    return test_db.query(StudentProgress).filter(
+        StudentProgress.student_id == student_id, StudentProgress.date == day).one()
+
+
+class TestRecordAttempt:
+    """One statement per take adds to the day's running totals"""
+
+    def test_first_take_creates_the_row(self, test_db, test_student):
+        record_attempt(test_db, test_student.id, TODAY, 80.0)
+        test_db.commit()
+
+        progress = row(test_db, test_student.id)
+        assert (progress.words_practiced, progress.total_attempts) == (1, 1)
+        assert (progress.score_sum, progress.scored_attempts) == (80.0, 1)
+        assert progress.average_score == Decimal("80.00")
+        assert progress.streak_count == 1
+
+    def test_running_average(self, test_db, test_student):
+        for score in (80.0, 91.0, 70.0):
+            record_attempt(test_db, test_student.id, TODAY, score)
+        test_db.commit()
+
+        progress = row(test_db, test_student.id)
+        assert (progress.total_attempts, progress.scored_attempts, progress.score_sum) == (3, 3, 241.0)
+        assert progress.average_score == Decimal("80.33")
+
+    def test_failed_take_counts_but_is_not_averaged(self, test_db, test_student):
+        record_attempt(test_db, test_student.id, TODAY, None)
+        test_db.commit()
+        assert row(test_db, test_student.id).average_score is None
+
+        record_attempt(test_db, test_student.id, TODAY, 60.0)
+        record_attempt(test_db, test_student.id, TODAY, None)
+        test_db.commit()
+
+        progress = row(test_db, test_student.id)
+        assert (progress.total_attempts, progress.scored_attempts) == (3, 1)
+        assert progress.average_score == Decimal("60.00")
+
+    def test_one_row_per_day(self, test_db, test_student):
+        for _ in range(4):
+            record_attempt(test_db, test_student.id, TODAY, 50.0)
+        test_db.commit()
+        assert test_db.query(StudentProgress).count() == 1
+
+
+class TestConcurrentTakes:
+    """Takes scored at the same time on separate connections all count"""
+
+    def test_no_lost_updates(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'progress.db'}",
+                               connect_args={"check_same_thread": False, "timeout": 30})
+        Base.metadata.create_all(bind=engine, tables=[
+            Base.metadata.tables["users"], Base.metadata.tables["student_progress"]])
+        Session = sessionmaker(bind=engine)
+        with Session() as db:
+            student = User(username="s", email="s@x", password_hash="x", role=UserRole.STUDENT)
+            db.add(student)
+            db.commit()
+            student_id = student.id
+
+        takes, barrier, errors = 16, threading.Barrier(16), []
+
+        def take(score):
+            try:
+                barrier.wait()
+                with Session() as db:
+                    record_attempt(db, student_id, TODAY, score)
+                    db.commit()
+            except Exception as e:  # surfaced below
+                errors.append(e)
+
+        threads = [threading.Thread(target=take, args=(float(50 + i),)) for i in range(takes)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert errors == []
+        with Session() as db:
+            progress = db.query(StudentProgress).one()
+            assert (progress.total_attempts, progress.scored_attempts) == (takes, takes)
+            assert progress.score_sum == sum(50 + i for i in range(takes))
+        engine.dispose()
+
+
+class TestStreak:
+    """The streak is carried forward by each day's first take"""
+
+    def test_consecutive_days(self, test_db, test_student):
+        for offset in (2, 1, 0):
+            record_attempt(test_db, test_student.id, TODAY - timedelta(days=offset), 70.0)
+            record_attempt(test_db, test_student.id, TODAY - timedelta(days=offset), 70.0)
+        test_db.commit()
+
+        assert current_streak(test_db, test_student.id, TODAY) == 3
+
+    def test_gap_resets(self, test_db, test_student):
+        record_attempt(test_db, test_student.id, TODAY - timedelta(days=3), 70.0)
+        record_attempt(test_db, test_student.id, TODAY - timedelta(days=1), 70.0)
+        record_attempt(test_db, test_student.id, TODAY, 70.0)
+        test_db.commit()
+
+        assert current_streak(test_db, test_student.id, TODAY) == 2
+
+    def test_no_practice_today(self, test_db, test_student):
+        record_attempt(test_db, test_student.id, TODAY - timedelta(days=1), 70.0)
+        test_db.commit()
+
+        assert current_streak(test_db, test_student.id, TODAY) == 0
+
+
+class TestProgressEndpoint:
+    """GET /student/progress reads the maintained totals"""
+
+    def test_weighted_average_and_streak(self, client, test_db, test_student, auth_headers_student):
+        today = date.today()
+        record_attempt(test_db, test_student.id, today - timedelta(days=1), 90.0)
+        for score in (60.0, 60.0, 60.0, None):
+            record_attempt(test_db, test_student.id, today, score)
+        test_db.commit()
+
+        data = client.get("/api/student/progress", headers=auth_headers_student,
+                          params={"period": "week"}).json()
+
+        assert data["total_attempts"] == 5
+        # four scored takes, not the mean of the two daily averages (75)
+        assert data["average_score"] == 67.5
+        assert data["streak_count"] == 2
@@ -0,0 +1,194 @@
+"""
+Integration tests for the Alembic migrations
+Covers: upgrade of a pre-existing schema, no-op on a fresh create_all schema, downgrade,
+backfills (score columns, daily progress totals), hot query indexes
+"""
+import pytest
+import sys
+from pathlib import Path
+
+from sqlalchemy import create_engine, inspect, text
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from alembic import command
+from alembic.config import Config
+
+from app.core.config import settings
+from app.db.session import Base
+
+
+@pytest.fixture
+def migrate(tmp_path, monkeypatch):
+    """Run alembic against a throwaway SQLite file; yields (run, engine)"""
+    url = f"sqlite:///{tmp_path / 'migrate.db'}"
+    monkeypatch.setattr(settings, "DATABASE_URL", url)
+    config = Config(str(backend_path / "alembic.ini"))
+    config.set_main_option("script_location", str(backend_path / "alembic"))
+    engine = create_engine(url)
+
+    def run(action, revision):
+        getattr(command, action)(config, revision)
+
+    yield run, engine
+    engine.dispose()
+
+
+def _columns(engine, table):
+    return {c["name"] for c in inspect(engine).get_columns(table)}
+
+
+class TestMigrations:
+    """Migrations bring old databases up to the models without touching data"""
+
+    def test_upgrade_adds_derived_audio_columns(self, migrate):
+        run, engine = migrate
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE recordings (id INTEGER PRIMARY KEY, student_id INTEGER, "
+                "word_text VARCHAR(100), audio_file_path VARCHAR(500))"
+            ))
+            conn.execute(text("INSERT INTO recordings VALUES (1, 1, 'cat', '/uploads/1/cat.wav')"))
+
+        run("upgrade", "head")
+
+        assert {"pcm_path", "mp3_path"} <= _columns(engine, "recordings")
+        with engine.connect() as conn:
+            row = conn.execute(text("SELECT word_text, pcm_path FROM recordings")).one()
+        assert row == ("cat", None)
+
+    def test_upgrade_is_noop_on_fresh_schema(self, migrate):
+        run, engine = migrate
+        from app.models import recording, user  # noqa: F401
+        Base.metadata.create_all(bind=engine, tables=[
+            Base.metadata.tables["users"], Base.metadata.tables["recordings"]
+        ])
+
+        run("upgrade", "head")
+        run("upgrade", "head")  # and idempotent
+
+        assert {"pcm_path", "mp3_path"} <= _columns(engine, "recordings")
+
+    def test_upgrade_brings_hand_made_shadow_scores_up_to_model(self, migrate):
+        run, engine = migrate
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE recordings (id INTEGER PRIMARY KEY, audio_file_path VARCHAR(500))"))
+            conn.execute(text(
+                "CREATE TABLE shadow_scores (id INTEGER PRIMARY KEY, recording_id INTEGER, word_text TEXT, "
+                "azure_score REAL, azure_accuracy REAL, final_score REAL, ml_pron_score REAL, "
+                "ml_accuracy REAL, ml_recognized TEXT, ml_error TEXT, latency_ms INTEGER)"
+            ))
+            conn.execute(text("INSERT INTO shadow_scores (recording_id, word_text) VALUES (1, 'cat')"))
+
+        run("upgrade", "head")
+
+        assert "created_at" in _columns(engine, "shadow_scores")
+        assert "ix_shadow_scores_recording_id" in {i["name"] for i in inspect(engine).get_indexes("shadow_scores")}
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT word_text FROM shadow_scores")).scalar() == "cat"
+
+    def test_upgrade_creates_missing_shadow_scores(self, migrate):
+        run, engine = migrate
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE recordings (id INTEGER PRIMARY KEY, audio_file_path VARCHAR(500))"))
+
+        run("upgrade", "head")
+
+        from app.models.shadow_score import ShadowScore
+        assert _columns(engine, "shadow_scores") == set(ShadowScore.__table__.columns.keys())
+
+    def test_downgrade(self, migrate):
+        run, engine = migrate
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE recordings (id INTEGER PRIMARY KEY, audio_file_path VARCHAR(500))"
+            ))
+
+        run("upgrade", "head")
+        run("downgrade", "base")
+
+        assert _columns(engine, "recordings") == {"id", "audio_file_path"}
+
+    def test_upgrade_backfills_score_columns(self, migrate):
+        run, engine = migrate
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE recordings (id INTEGER PRIMARY KEY, student_id INTEGER, "
+                "word_text VARCHAR(100), audio_file_path VARCHAR(500), automated_scores JSON)"
+            ))
+            conn.execute(text(
+                "INSERT INTO recordings VALUES "
+                "(1, 1, 'cat', 'a.wav', '{\"pronunciation_score\": 81.5, \"accuracy_score\": 70, "
+                "\"provider\": \"xfyun_node\"}'), "
+                "(2, 1, 'dog', 'b.wav', '{\"error\": \"录音太安静\", \"pronunciation_score\": 0, "
+                "\"preflight\": \"silent\"}'), "
+                "(3, 1, 'cow', 'c.wav', NULL), "
+                "(4, 1, 'pig', 'd.wav', '{\"pronunciation_score\": 64, \"scorer\": \"gop\"}')"
+            ))
+
+        run("upgrade", "head")
+
+        with engine.connect() as conn:
+            rows = conn.execute(text(
+                "SELECT pronunciation_score, accuracy_score, scorer, score_failed, preflight_reason "
+                "FROM recordings ORDER BY id"
+            )).all()
+        assert rows == [(81.5, 70.0, "xfyun_node", 0, None), (None, None, None, 1, "silent"),
+                        (None, None, None, 0, None), (64.0, None, "gop", 0, None)]
+        assert "ix_recordings_pronunciation_score" in {i["name"] for i in inspect(engine).get_indexes("recordings")}
+
+    def test_upgrade_merges_daily_progress_and_fills_totals(self, migrate):
+        run, engine = migrate
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE recordings (id INTEGER PRIMARY KEY, audio_file_path VARCHAR(500))"))
+            conn.execute(text(
+                "CREATE TABLE student_progress (id INTEGER PRIMARY KEY, student_id INTEGER NOT NULL, "
+                "date DATE NOT NULL, words_practiced INTEGER, average_score NUMERIC(5, 2), "
+                "total_attempts INTEGER, streak_count INTEGER)"
+            ))
+            # the 5th raced: two rows for one day
+            conn.execute(text(
+                "INSERT INTO student_progress VALUES "
+                "(1, 1, '2026-05-03', 1, 50, 1, 0), "
+                "(2, 1, '2026-05-05', 2, 80, 2, 0), "
+                "(3, 1, '2026-05-05', 1, 50, 1, 0), "
+                "(4, 1, '2026-05-06', 1, 90, 1, 0)"
+            ))
+
+        run("upgrade", "head")
+
+        with engine.connect() as conn:
+            rows = conn.execute(text(
+                "SELECT date, words_practiced, total_attempts, score_sum, scored_attempts, average_score, "
+                "streak_count FROM student_progress ORDER BY date"
+            )).all()
+        assert [tuple(r) for r in rows] == [
+            ("2026-05-03", 1, 1, 50.0, 1, 50, 1),
+            ("2026-05-05", 3, 3, 210.0, 3, 70, 1),
+            ("2026-05-06", 1, 1, 90.0, 1, 90, 2),
+        ]
+        assert "uq_student_progress_student_date" in {
+            i["name"] for i in inspect(engine).get_indexes("student_progress") if i["unique"]}
+
+    def test_upgrade_adds_hot_query_indexes_and_drops_duplicate_pairs(self, migrate):
+        run, engine = migrate
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE recordings (id INTEGER PRIMARY KEY, student_id INTEGER, "
+                              "audio_file_path VARCHAR(500), created_at DATETIME)"))
+            conn.execute(text("CREATE TABLE class_enrollment (id INTEGER PRIMARY KEY, class_id INTEGER, "
+                              "student_id INTEGER)"))
+            conn.execute(text("INSERT INTO class_enrollment VALUES (1, 1, 7), (2, 1, 7), (3, 2, 7)"))
+
+        run("upgrade", "head")
+
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT id FROM class_enrollment ORDER BY id")).scalars().all() == [1, 3]
+        indexes = {i["name"]: i["unique"] for i in inspect(engine).get_indexes("class_enrollment")}
+        assert indexes["uq_class_enrollment_class_student"] and "ix_class_enrollment_student_id" in indexes
+        assert "ix_recordings_student_created" in {i["name"] for i in inspect(engine).get_indexes("recordings")}
+
+        run("downgrade", "0005")
+        assert "uq_class_enrollment_class_student" not in {
+            i["name"] for i in inspect(engine).get_indexes("class_enrollment")}
@@ -0,0 +1,180 @@
+"""
+Query-plan regression tests for the hot endpoints
+Covers: every SELECT the dashboards / progress views / feeds issue is
+EXPLAINed on SQLite and must not scan a hot table; the same hot query shapes
+EXPLAINed on Postgres (TEST_POSTGRES_URL, a scratch database) must not fall
+back to a sequential scan; the unique keys behind enrollments and assignment
+rosters
+"""
+import os
+import re
+import pytest
+import sys
+from pathlib import Path
+
+from sqlalchemy import create_engine, event, func, select, text
+from sqlalchemy.exc import IntegrityError
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.db.session import Base
+from app.models.assignment import Assignment, AssignmentStudent, AssignmentSubmission, AssignmentWord
+from app.models.classes import Class, ClassEnrollment
+from app.models.recording import Recording
+
+HOT_TABLES = ("assignment_submissions", "assignment_students", "class_enrollment", "recordings",
+              "assignment_words")
+SQLITE_SCAN = re.compile(r"^SCAN (?:TABLE )?(%s)\b" % "|".join(HOT_TABLES))
+POSTGRES_SCAN = re.compile(r"Seq Scan on (%s)\b" % "|".join(HOT_TABLES))
+
+
+def hot_queries(student_id=2, class_id=1, assignment_id=1):
+    """The filters behind the hot endpoints, as the ORM builds them"""
+    return {
+        "assignment progress: submissions": select(AssignmentSubmission.id).where(
+            AssignmentSubmission.assignment_id == assignment_id, AssignmentSubmission.student_id == student_id),
+        "dashboard: submission counts": select(AssignmentSubmission.assignment_id, func.count()).where(
+            AssignmentSubmission.student_id == student_id,
+            AssignmentSubmission.assignment_id.in_([assignment_id, assignment_id + 1])
+        ).group_by(AssignmentSubmission.assignment_id),
+        "access check: assigned": select(AssignmentStudent.id).where(
+            AssignmentStudent.assignment_id == assignment_id, AssignmentStudent.student_id == student_id),
+        "dashboard: assignments": select(AssignmentStudent.assignment_id).where(
+            AssignmentStudent.student_id == student_id),
+        "roster": select(ClassEnrollment.student_id).where(ClassEnrollment.class_id == class_id),
+        "enrollment check": select(ClassEnrollment.id).where(
+            ClassEnrollment.class_id == class_id, ClassEnrollment.student_id == student_id),
+        "student's classes": select(ClassEnrollment.class_id).where(ClassEnrollment.student_id == student_id),
+        "recent recordings": select(Recording.id).where(Recording.student_id == student_id)
+        .order_by(Recording.created_at.desc()).limit(10),
+        "word list": select(AssignmentWord.word_text).where(AssignmentWord.assignment_id == assignment_id)
+        .order_by(AssignmentWord.order_index),
+    }
+
+
+def sqlite_scans(conn, statement, parameters=()):
+    plan = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+    return [row[-1] for row in plan if SQLITE_SCAN.match(row[-1])]
+
+
+@pytest.fixture
+def seeded(test_db, test_teacher, test_student):
+    klass = Class(teacher_id=test_teacher.id, class_name="Class A", class_code="PLAN01")
+    test_db.add(klass)
+    test_db.flush()
+    test_db.add(ClassEnrollment(class_id=klass.id, student_id=test_student.id))
+    assignment = Assignment(teacher_id=test_teacher.id, title="Unit 1")
+    test_db.add(assignment)
+    test_db.flush()
+    test_db.add_all([AssignmentWord(assignment_id=assignment.id, word_text=w, order_index=i)
+                     for i, w in enumerate(("cat", "dog"))])
+    test_db.add(AssignmentStudent(assignment_id=assignment.id, student_id=test_student.id))
+    recording = Recording(student_id=test_student.id, word_text="cat", audio_file_path="uploads/cat.wav",
+                          automated_scores={"pronunciation_score": 80})
+    test_db.add(recording)
+    test_db.flush()
+    test_db.add(AssignmentSubmission(assignment_id=assignment.id, student_id=test_student.id,
+                                     word_text="cat", recording_id=recording.id))
+    test_db.commit()
+    return {"class_id": klass.id, "assignment_id": assignment.id, "student_id": test_student.id}
+
+
+@pytest.fixture
+def captured(test_db):
+    statements = []
+
+    def listen(conn, cursor, statement, parameters, *a):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+    event.listen(test_db.get_bind(), "before_cursor_execute", listen)
+    yield statements
+    event.remove(test_db.get_bind(), "before_cursor_execute", listen)
+
+
+STUDENT_ENDPOINTS = (
+    "/api/student/recordings",
+    "/api/student/progress",
+    "/api/student/classes",
+    "/api/assignments/student/assignments",
+    "/api/assignments/student/assignments/{assignment_id}",
+    "/api/assignments/student/assignments/{assignment_id}/progress",
+)
+TEACHER_ENDPOINTS = (
+    "/api/teacher/submissions",
+    "/api/teacher/students",
+    "/api/teacher/analytics",
+    "/api/assignments/teacher/assignments/{assignment_id}/progress",
+    "/api/assignments/teacher/assignments/{assignment_id}/students/{student_id}/progress",
+)
+
+
+class TestSQLitePlans:
+    """No hot endpoint scans a hot table on SQLite"""
+
+    @pytest.mark.parametrize("path", STUDENT_ENDPOINTS + TEACHER_ENDPOINTS)
+    def test_endpoint(self, client, test_db, seeded, captured, auth_headers_student, auth_headers_teacher, path):
+        headers = auth_headers_student if path in STUDENT_ENDPOINTS else auth_headers_teacher
+        captured.clear()
+
+        response = client.get(path.format(**seeded), headers=headers)
+
+        assert response.status_code == 200, response.text
+        assert captured
+        with test_db.get_bind().connect() as conn:
+            scans = {statement: found for statement, parameters in captured
+                     if (found := sqlite_scans(conn, statement, parameters))}
+        assert scans == {}
+
+    @pytest.mark.parametrize("name", list(hot_queries()))
+    def test_hot_query(self, test_db, name):
+        statement = hot_queries()[name]
+        compiled = statement.compile(test_db.get_bind(), compile_kwargs={"literal_binds": True})
+        with test_db.get_bind().connect() as conn:
+            assert sqlite_scans(conn, str(compiled)) == []
+
+
+@pytest.mark.skipif(not os.environ.get("TEST_POSTGRES_URL"), reason="TEST_POSTGRES_URL not set")
+class TestPostgresPlans:
+    """The same query shapes use an index on Postgres"""
+
+    @pytest.fixture(scope="class")
+    def pg(self):
+        engine = create_engine(os.environ["TEST_POSTGRES_URL"])
+        Base.metadata.create_all(bind=engine)
+        yield engine
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+    @pytest.mark.parametrize("name", list(hot_queries()))
+    def test_hot_query(self, pg, name):
+        compiled = hot_queries()[name].compile(pg, compile_kwargs={"literal_binds": True})
+        with pg.connect() as conn:
+            # the tables are empty: make the planner say whether an index is usable at all
+            conn.execute(text("SET enable_seqscan = off"))
+            plan = "\n".join(r[0] for r in conn.exec_driver_sql(f"EXPLAIN {compiled}"))
+        assert not POSTGRES_SCAN.search(plan), plan
+
+
+class TestUniqueKeys:
+    """Rosters cannot hold the same pair twice"""
+
+    def test_enrollment(self, test_db, seeded):
+        test_db.add(ClassEnrollment(class_id=seeded["class_id"], student_id=seeded["student_id"]))
+        with pytest.raises(IntegrityError):
+            test_db.commit()
+        test_db.rollback()
+
+    def test_assignment_student(self, test_db, seeded):
+        test_db.add(AssignmentStudent(assignment_id=seeded["assignment_id"], student_id=seeded["student_id"]))
+        with pytest.raises(IntegrityError):
+            test_db.commit()
+        test_db.rollback()
+
+    def test_join_twice(self, client, test_db, seeded, auth_headers_student):
+        response = client.post("/api/student/classes/join", headers=auth_headers_student,
+                               params={"class_code": "PLAN01"})
+
+        assert response.status_code == 400
+        assert test_db.query(ClassEnrollment).count() == 1
@@ -0,0 +1,93 @@
+"""
+Integration tests for the typed score columns on recordings
+Covers: columns derived whenever automated_scores is assigned (scores,
+failures, pre-flight rejections, provider), and the teacher / assignment
+aggregates reading them instead of parsing the JSON
+"""
+import pytest
+import sys
+from pathlib import Path
+
+from sqlalchemy import event
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.models.classes import Class, ClassEnrollment
+from app.models.recording import Recording
+
+
+def recording(student_id, word, scores):
+    return Recording(student_id=student_id, word_text=word, audio_file_path=f"uploads/{word}.wav",
+                     automated_scores=scores)
+
+
+class TestDerivedColumns:
+    """The columns follow automated_scores"""
+
+    def test_scored_take(self):
+        rec = recording(1, "cat", {"pronunciation_score": 88, "accuracy_score": 91.5, "provider": "azure"})
+        assert (rec.pronunciation_score, rec.accuracy_score, rec.scorer) == (88.0, 91.5, "azure")
+        assert rec.score_failed is False and rec.preflight_reason is None
+
+    def test_scorer_key_of_older_results(self):
+        assert recording(1, "cat", {"pronunciation_score": 70, "scorer": "xfyun"}).scorer == "xfyun"
+        both = recording(1, "cat", {"pronunciation_score": 70, "scorer": "xfyun", "provider": "xfyun_node"})
+        assert both.scorer == "xfyun_node"
+
+    def test_failed_take_has_no_score(self):
+        rec = recording(1, "cat", {"error": "录音太安静", "pronunciation_score": 0, "preflight": "silent"})
+        assert rec.pronunciation_score is None and rec.accuracy_score is None
+        assert rec.score_failed is True and rec.preflight_reason == "silent"
+
+    def test_rescoring_replaces_the_columns(self):
+        rec = recording(1, "cat", {"error": "评分超时", "pronunciation_score": 0})
+        rec.automated_scores = {"pronunciation_score": 75, "provider": "xfyun_node"}
+        assert rec.pronunciation_score == 75.0 and rec.score_failed is False and rec.scorer == "xfyun_node"
+
+    def test_unscored(self):
+        rec = recording(1, "cat", None)
+        assert rec.pronunciation_score is None and rec.score_failed is False
+
+    def test_persisted(self, test_db, test_student):
+        test_db.add(recording(test_student.id, "cat", {"pronunciation_score": 64.5, "provider": "gop"}))
+        test_db.commit()
+        test_db.expire_all()
+        row = test_db.query(Recording.pronunciation_score, Recording.scorer).one()
+        assert tuple(row) == (64.5, "gop")
+
+
+class TestAggregates:
+    """Analytics average the column; failed takes do not drag the average"""
+
+    @pytest.fixture
+    def scored(self, test_db, test_teacher, test_student):
+        klass = Class(teacher_id=test_teacher.id, class_name="Class A", class_code="SCORE1")
+        test_db.add(klass)
+        test_db.flush()
+        test_db.add(ClassEnrollment(class_id=klass.id, student_id=test_student.id))
+        test_db.add_all([
+            recording(test_student.id, "cat", {"pronunciation_score": 90}),
+            recording(test_student.id, "cat", {"pronunciation_score": 70}),
+            recording(test_student.id, "dog", {"pronunciation_score": 40}),
+            recording(test_student.id, "dog", {"error": "评分失败", "pronunciation_score": 0}),
+        ])
+        test_db.commit()
+
+    def test_analytics_use_the_column(self, client, test_db, auth_headers_teacher, scored):
+        statements = []
+        event.listen(test_db.get_bind(), "before_cursor_execute",
+                     lambda conn, cursor, statement, *a: statements.append(statement))
+
+        data = client.get("/api/teacher/analytics", headers=auth_headers_teacher).json()
+
+        assert data["total_recordings"] == 4
+        assert data["average_score"] == pytest.approx(66.67)
+        assert data["challenging_words"][0] == {"word": "dog", "average_score": 40.0}
+        assert not [s for s in statements if "json_extract" in s.lower()]
+
+    def test_students_average(self, client, auth_headers_teacher, scored):
+        students = client.get("/api/teacher/students", headers=auth_headers_teacher).json()
+        assert students[0]["total_recordings"] == 4
+        assert students[0]["average_score"] == pytest.approx(66.67)
@@ -0,0 +1,41 @@
+"""
+Integration tests for the scorer health endpoint
+Covers: /health/scorers exposes per-provider circuit-breaker state and
+score cache hit rates and shadow pipeline depth/drops
+"""
+import pytest
+import sys
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.services.provider_health import scorer_health
+
+
+class TestScorerHealthEndpoint:
+    """Breaker states are exposed for monitoring"""
+
+    def test_lists_registered_providers(self, client):
+        response = client.get("/health/scorers")
+
+        assert response.status_code == 200
+        data = response.json()
+        for name in ("xfyun_node", "xfyun_direct", "azure", "gop"):
+            assert data["providers"][name]["state"] in ("closed", "open", "half_open")
+        assert 0.0 <= data["score_cache"]["hit_rate"] <= 1.0
+        assert data["shadow"]["queue_depth"] >= 0
+        assert data["shadow"]["dropped"] == data["shadow"]["dropped_sampled"] + data["shadow"]["dropped_full"]
+
+    def test_open_circuit_reports_degraded(self, client, monkeypatch):
+        monkeypatch.setattr(scorer_health, "_breakers", {})
+        for _ in range(10):
+            scorer_health.get("gop").record(False, 2.0, "connection refused")
+
+        data = client.get("/health/scorers").json()
+
+        assert data["status"] == "degraded"
+        assert data["providers"]["gop"]["state"] == "open"
+        assert data["providers"]["gop"]["error_rate"] == 1.0
+        assert data["providers"]["gop"]["last_error"] == "connection refused"
@@ -0,0 +1,73 @@
+"""
+Integration tests for the scoring node callback endpoint
+Covers: the node pushes a finished job, the waiting scorer is woken; token check,
+no built-in default token, endpoint off unless callbacks are configured
+"""
+import pytest
+import sys
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.core.config import settings
+from app.services import scoring_node
+
+
+class TestScoringNodeCallback:
+    """POST /api/scoring-node/callback hands results to waiting scorers"""
+
+    @pytest.fixture(autouse=True)
+    def node_token(self, monkeypatch):
+        monkeypatch.setattr(settings, "SCORING_NODE_TOKEN", "node-secret")
+        monkeypatch.setattr(settings, "SCORING_NODE_CALLBACK_URL", "https://api.example.com/api/scoring-node/callback")
+
+    def test_callback_wakes_waiter(self, client):
+        event = scoring_node.waiters.register("job-42")
+        try:
+            response = client.post(
+                "/api/scoring-node/callback",
+                headers={"X-Token": "node-secret"},
+                json={"job_id": "job-42", "status": "done", "result": {"pronunciation_score": 91}}
+            )
+
+            assert response.status_code == 200
+            assert response.json() == {"accepted": True, "waiting": True}
+            assert event.is_set()
+            assert scoring_node.waiters.take("job-42")["result"] == {"pronunciation_score": 91}
+        finally:
+            scoring_node.waiters.discard("job-42")
+
+    def test_rejects_wrong_token(self, client):
+        response = client.post(
+            "/api/scoring-node/callback",
+            headers={"X-Token": "guess"},
+            json={"job_id": "job-43", "status": "done", "result": {}}
+        )
+
+        assert response.status_code == 403
+        assert scoring_node.waiters.take("job-43") is None
+
+    def test_off_without_callback_url(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "SCORING_NODE_CALLBACK_URL", None)
+        response = client.post(
+            "/api/scoring-node/callback",
+            headers={"X-Token": "node-secret"},
+            json={"job_id": "job-44", "status": "done", "result": {}}
+        )
+
+        assert response.status_code == 404
+        assert scoring_node.waiters.take("job-44") is None
+
+    def test_default_token_is_never_accepted(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "SCORING_NODE_TOKEN", None)
+        monkeypatch.delenv("SCORING_NODE_TOKEN", raising=False)
+        response = client.post(
+            "/api/scoring-node/callback",
+            headers={"X-Token": scoring_node.node_token()},
+            json={"job_id": "job-45", "status": "done", "result": {}}
+        )
+
+        assert response.status_code == 404
+        assert scoring_node.waiters.take("job-45") is None
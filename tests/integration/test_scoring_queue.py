@@ -0,0 +1,254 @@
+"""
+Integration tests for the durable scoring job queue
+Covers: submit -> scoring_jobs row -> worker pool -> recording/progress updated;
+failed takes counted in daily progress, recovery of jobs that lost their worker, crashed workers, lost claims
+"""
+import pytest
+import sys
+import time
+from pathlib import Path
+from io import BytesIO
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.core.config import settings
+from app.models.progress import StudentProgress
+from app.models.recording import Recording, RecordingStatus
+from app.models.scoring_job import ScoringJob, ScoringJobStatus
+from app.services.scoring_queue import scoring_queue
+from app.services.pronunciation_service import pronunciation_service
+
+
+def _wait_for_job(test_db, job_id, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        test_db.expire_all()
+        job = test_db.query(ScoringJob).filter(ScoringJob.id == job_id).first()
+        if job.status in (ScoringJobStatus.DONE, ScoringJobStatus.FAILED):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+class _NoTimer:
+    daemon = False
+
+    def start(self):
+        pass
+
+
+class TestScoringQueueIntegration:
+    """Submissions are persisted as jobs and scored by the worker pool"""
+
+    def test_submit_creates_done_job(self, client, auth_headers_student, sample_audio_file, test_db):
+        """A fast take is scored within the inline wait and its job is marked done"""
+        response = client.post(
+            "/api/student/recordings/submit",
+            headers=auth_headers_student,
+            data={"word_text": "queued"},
+            files={"audio_file": ("test.wav", sample_audio_file, "audio/wav")}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "done"
+
+        job = test_db.query(ScoringJob).filter(ScoringJob.id == data["job_id"]).first()
+        assert job.status == ScoringJobStatus.DONE
+        assert job.attempts == 1
+        assert job.recording_id == data["recording_id"]
+
+    def test_slow_scoring_returns_scoring_then_poll(self, client, auth_headers_student, sample_audio_file, test_db, monkeypatch):
+        """When scoring outlasts the inline wait the client gets a job to poll"""
+        monkeypatch.setattr(settings, "SCORING_INLINE_WAIT", 0.0)
+        original = pronunciation_service.assess_pronunciation
+
+        def slow_assess(path, text):
+            time.sleep(0.3)
+            return original(path, text)
+
+        monkeypatch.setattr(pronunciation_service, "assess_pronunciation", slow_assess)
+
+        response = client.post(
+            "/api/student/recordings/submit",
+            headers=auth_headers_student,
+            data={"word_text": "slow"},
+            files={"audio_file": ("test.wav", sample_audio_file, "audio/wav")}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "scoring"
+
+        _wait_for_job(test_db, data["job_id"])
+        result = client.get(
+            f"/api/student/recordings/{data['recording_id']}/result",
+            headers=auth_headers_student
+        ).json()
+        assert result["status"] == "done"
+        assert 0 <= result["automated_scores"]["pronunciation_score"] <= 100
+
+    def test_worker_scores_the_ingested_pcm(self, client, auth_headers_student, sample_audio_file, test_db, monkeypatch):
+        """The upload is decoded once; scorers get the canonical PCM registered on the recording"""
+        original = pronunciation_service.assess_pronunciation
+        scored_paths = []
+
+        def recording_assess(path, text):
+            scored_paths.append(path)
+            return original(path, text)
+
+        monkeypatch.setattr(pronunciation_service, "assess_pronunciation", recording_assess)
+
+        response = client.post(
+            "/api/student/recordings/submit",
+            headers=auth_headers_student,
+            data={"word_text": "ingested"},
+            files={"audio_file": ("test.wav", sample_audio_file, "audio/wav")}
+        )
+        data = response.json()
+        assert data["status"] == "done"
+
+        recording = test_db.query(Recording).get(data["recording_id"])
+        assert recording.pcm_path == recording.audio_file_path + ".16k.wav"
+        assert scored_paths == [recording.pcm_path]
+
+    def test_failed_job_keeps_error_metadata(self, client, auth_headers_student, sample_audio_file, test_db, monkeypatch):
+        """A job that exhausts its attempts is failed and the recording left for the teacher"""
+        monkeypatch.setattr(settings, "SCORING_MAX_ATTEMPTS", 1)
+
+        def broken_assess(path, text):
+            raise RuntimeError("provider exploded")
+
+        monkeypatch.setattr(pronunciation_service, "assess_pronunciation", broken_assess)
+
+        response = client.post(
+            "/api/student/recordings/submit",
+            headers=auth_headers_student,
+            data={"word_text": "broken"},
+            files={"audio_file": ("test.wav", sample_audio_file, "audio/wav")}
+        )
+        data = response.json()
+        assert data["status"] == "failed"
+
+        job = test_db.query(ScoringJob).filter(ScoringJob.id == data["job_id"]).first()
+        assert job.status == ScoringJobStatus.FAILED
+        assert job.attempts == 1
+        assert "provider exploded" in job.last_error
+
+        recording = test_db.query(Recording).get(data["recording_id"])
+        assert recording.status == RecordingStatus.PENDING
+
+    def test_failed_job_counts_the_attempt(self, client, auth_headers_student, sample_audio_file,
+                                           test_db, test_student, monkeypatch):
+        """A take that never got a score still counts towards the day, without touching the average"""
+        monkeypatch.setattr(settings, "SCORING_MAX_ATTEMPTS", 1)
+
+        def broken_assess(path, text):
+            raise RuntimeError("provider exploded")
+
+        monkeypatch.setattr(pronunciation_service, "assess_pronunciation", broken_assess)
+
+        response = client.post(
+            "/api/student/recordings/submit",
+            headers=auth_headers_student,
+            data={"word_text": "broken"},
+            files={"audio_file": ("test.wav", sample_audio_file, "audio/wav")}
+        )
+        assert response.json()["status"] == "failed"
+
+        test_db.expire_all()
+        progress = test_db.query(StudentProgress).filter(StudentProgress.student_id == test_student.id).one()
+        assert progress.total_attempts == 1
+        assert progress.scored_attempts == 0 and progress.average_score is None
+
+    def test_recover_redispatches_interrupted_jobs(self, test_db, test_student):
+        """Jobs left running by a dead process are scored again on startup"""
+        recording = Recording(
+            student_id=test_student.id,
+            word_text="restart",
+            audio_file_path="/nonexistent/restart.wav",
+            status=RecordingStatus.PENDING
+        )
+        test_db.add(recording)
+        test_db.flush()
+        job = ScoringJob(
+            recording_id=recording.id,
+            word_text="restart",
+            audio_file_path=recording.audio_file_path,
+            status=ScoringJobStatus.RUNNING,
+            attempts=1,
+            max_attempts=3
+        )
+        test_db.add(job)
+        test_db.commit()
+        job_id = job.id
+
+        assert scoring_queue.recover(test_db.get_bind()) == 1
+
+        job = _wait_for_job(test_db, job_id)
+        assert job.status == ScoringJobStatus.DONE
+        assert job.attempts == 2
+
+    def test_recover_leaves_recently_started_jobs(self, test_db, test_student, monkeypatch):
+        """A running job younger than the scoring budget may still have a live worker"""
+        from datetime import datetime, timedelta
+        from app.services import scoring_queue as queue_module
+        rescans = []
+        monkeypatch.setattr(queue_module.threading, "Timer",
+                            lambda delay, fn, args=(): rescans.append(delay) or _NoTimer())
+        recording = Recording(student_id=test_student.id, word_text="busy",
+                              audio_file_path="/nonexistent/busy.wav", status=RecordingStatus.PENDING)
+        test_db.add(recording)
+        test_db.flush()
+        job = ScoringJob(recording_id=recording.id, word_text="busy", audio_file_path=recording.audio_file_path,
+                         status=ScoringJobStatus.RUNNING, attempts=1, max_attempts=3,
+                         started_at=datetime.utcnow() - timedelta(seconds=5))
+        test_db.add(job)
+        test_db.commit()
+
+        assert scoring_queue.recover(test_db.get_bind()) == 0
+
+        test_db.expire_all()
+        assert job.status == ScoringJobStatus.RUNNING and job.attempts == 1
+        assert len(rescans) == 1 and rescans[0] > queue_module.RUNNING_TIMEOUT - 10
+
+    @pytest.mark.parametrize("attempts,settled", [(1, ScoringJobStatus.QUEUED), (3, ScoringJobStatus.FAILED)])
+    def test_crashed_worker_does_not_leave_the_job_running(self, test_db, test_student, monkeypatch,
+                                                           attempts, settled):
+        """A crash outside the scoring try requeues the job, or fails it when out of attempts"""
+        retries = []
+        monkeypatch.setattr(scoring_queue, "_retry_later", lambda job_id, bind, n: retries.append(job_id))
+        recording = Recording(student_id=test_student.id, word_text="crash",
+                              audio_file_path="/nonexistent/crash.wav", status=RecordingStatus.PENDING)
+        test_db.add(recording)
+        test_db.flush()
+        job = ScoringJob(recording_id=recording.id, word_text="crash", audio_file_path=recording.audio_file_path,
+                         status=ScoringJobStatus.RUNNING, attempts=attempts, max_attempts=3)
+        test_db.add(job)
+        test_db.commit()
+
+        final = scoring_queue._settle_crashed(job.id, test_db.get_bind(), "worker died")
+
+        test_db.expire_all()
+        assert job.status == settled and job.last_error == "worker died"
+        assert final is (settled == ScoringJobStatus.FAILED)
+        assert retries == ([] if final else [job.id])
+
+    def test_lost_claim_leaves_the_waiter_to_the_owner(self, test_db, test_student):
+        """A worker that loses the claim does not answer the submitter early"""
+        recording = Recording(student_id=test_student.id, word_text="owned",
+                              audio_file_path="/nonexistent/owned.wav", status=RecordingStatus.PENDING)
+        test_db.add(recording)
+        test_db.flush()
+        job = ScoringJob(recording_id=recording.id, word_text="owned", audio_file_path=recording.audio_file_path,
+                         status=ScoringJobStatus.RUNNING, attempts=1, max_attempts=3)
+        test_db.add(job)
+        test_db.commit()
+
+        waiter = scoring_queue.dispatch(job.id, test_db.get_bind())
+        time.sleep(0.3)
+
+        assert not waiter.done()
+        waiter.cancel()  # the submit endpoint giving up on its inline wait
+        assert job.id not in scoring_queue._waiters
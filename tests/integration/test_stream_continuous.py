@@ -0,0 +1,236 @@
+"""
+Integration tests for the streamed continuous test (WebSocket)
+Covers: token auth over the query string, assignment checks (off the
+event loop, request session released before the take), streaming PCM
+then stop -> result on the same socket, the take persisted as a canonical
+WAV with its recording and per-word submissions, scoring continuing in
+the background when the socket drops without stop
+"""
+import asyncio
+import sys
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.api.routes import assignments as assignments_routes
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.models.assignment import Assignment, AssignmentStudent, AssignmentSubmission, AssignmentWord
+from app.models.recording import Recording, RecordingStatus
+from app.services import pronunciation_service as ps_module
+
+WORDS = ["apple", "banana", "cherry"]
+
+
+def tone(seconds):
+    t = np.arange(int(16000 * seconds)) / 16000.0
+    return (np.sin(2 * np.pi * 440.0 * t) * 8000).astype(np.int16).tobytes()
+
+
+class FakeLive:
+    """Stands in for the Azure push-stream session"""
+
+    def __init__(self):
+        self.received = b""
+
+    def write(self, pcm):
+        self.received += pcm
+
+    def finish(self, timeout):
+        return {
+            "mode": "continuous", "pronunciation_score": 90.0, "words_read": 3, "words_total": 3,
+            "completeness_score": 100.0, "fluency_score": 85.0, "streamed": True, "provider": "azure",
+            "per_word": [{"word": w, "score": 90, "error": None} for w in WORDS],
+        }
+
+    def cancel(self):
+        pass
+
+
+@pytest.fixture
+def assignment(test_db, test_student, test_teacher):
+    assignment = Assignment(teacher_id=test_teacher.id, title="Fruit", mode="continuous")
+    test_db.add(assignment)
+    test_db.flush()
+    for i, word in enumerate(WORDS):
+        test_db.add(AssignmentWord(assignment_id=assignment.id, word_text=word, order_index=i))
+    test_db.add(AssignmentStudent(assignment_id=assignment.id, student_id=test_student.id))
+    test_db.commit()
+    return assignment
+
+
+@pytest.fixture
+def stream_env(tmp_path, monkeypatch):
+    """Uploads in tmp; post-take work (MP3, shadow, background scoring) recorded, not run"""
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    finished = []
+    monkeypatch.setattr(assignments_routes, "_finish_streamed_take",
+                        lambda recording_id, words, stream, score: finished.append((recording_id, score)))
+    return finished
+
+
+def url(assignment, token):
+    assignment_id = assignment if isinstance(assignment, int) else assignment.id
+    return f"/api/assignments/student/assignments/{assignment_id}/stream-continuous?token={token}"
+
+
+class TestStreamAuth:
+    """Rejected sockets get an error frame and an application close code"""
+
+    def _rejected(self, client, path):
+        with client.websocket_connect(path) as ws:
+            error = ws.receive_json()
+            with pytest.raises(WebSocketDisconnect) as closed:
+                ws.receive_json()
+        return error, closed.value.code
+
+    def test_bad_token(self, client, assignment, stream_env):
+        error, code = self._rejected(client, url(assignment, "not-a-jwt"))
+        assert error["type"] == "error"
+        assert code == 4401
+
+    def test_teacher_cannot_stream(self, client, assignment, test_teacher, stream_env):
+        token = create_access_token(data={"sub": str(test_teacher.id)})
+        _, code = self._rejected(client, url(assignment, token))
+        assert code == 4403
+
+    def test_unassigned_assignment(self, client, assignment, student_token, stream_env):
+        _, code = self._rejected(client, url(assignment.id + 100, student_token))
+        assert code == 4404
+
+    def test_access_checks_run_off_the_event_loop(self, client, assignment, student_token, stream_env,
+                                                  monkeypatch):
+        from app.api import deps
+        loops = []
+        real = deps.get_student_from_token
+
+        def checked(db, token):
+            try:
+                loops.append(asyncio.get_running_loop())
+            except RuntimeError:
+                loops.append(None)
+            return real(db, token)
+        monkeypatch.setattr(deps, "get_student_from_token", checked)
+
+        with client.websocket_connect(url(assignment, student_token)) as ws:
+            assert ws.receive_json()["type"] == "ready"
+            ws.send_json({"type": "stop"})
+
+        assert loops == [None]
+
+
+class TestStreamTake:
+    """Audio in while reading, result out right after stop"""
+
+    def test_live_result_on_stop(self, client, test_db, assignment, student_token, stream_env, monkeypatch):
+        live = FakeLive()
+        monkeypatch.setattr(ps_module.pronunciation_service, "start_live_continuous", lambda words: live)
+        audio = tone(2.0)
+
+        with client.websocket_connect(url(assignment, student_token)) as ws:
+            ready = ws.receive_json()
+            for i in range(0, len(audio), 3201):  # odd-sized frames
+                ws.send_bytes(audio[i:i + 3201])
+            ws.send_json({"type": "stop"})
+            result = ws.receive_json()
+
+        assert ready["type"] == "ready" and ready["live"] is True and ready["sample_rate"] == 16000
+        assert result["type"] == "result" and result["status"] == "done"
+        assert result["pronunciation_score"] == 90.0 and result["streamed"] is True
+        assert live.received == audio
+
+        recording = test_db.query(Recording).filter(Recording.id == result["recording_id"]).one()
+        assert recording.status == RecordingStatus.REVIEWED
+        assert recording.automated_scores["streamed"] is True
+        assert recording.audio_file_path.endswith(".16k.wav")
+        with wave.open(recording.audio_file_path, "rb") as w:
+            assert w.getframerate() == 16000 and w.readframes(w.getnframes()) == audio
+        submissions = test_db.query(AssignmentSubmission).filter(
+            AssignmentSubmission.recording_id == recording.id).all()
+        assert sorted(s.word_text for s in submissions) == sorted(WORDS)
+        assert stream_env == [(recording.id, False)]  # MP3 + shadow only
+
+    def test_scores_persisted_take_without_live_session(self, client, test_db, assignment,
+                                                        student_token, stream_env, monkeypatch):
+        monkeypatch.setattr(ps_module.pronunciation_service, "start_live_continuous", lambda words: None)
+        scored = []
+
+        def fake_assess(path, words):
+            scored.append((path, words))
+            return {"pronunciation_score": 75.0, "words_read": 2, "words_total": 3,
+                    "per_word": [{"word": "apple", "score": 0, "error": "漏读"}]}
+        monkeypatch.setattr(ps_module.pronunciation_service, "assess_continuous_reading", fake_assess)
+
+        with client.websocket_connect(url(assignment, student_token)) as ws:
+            assert ws.receive_json()["live"] is False
+            ws.send_bytes(tone(2.0))
+            ws.send_text('{"type": "stop"}')
+            result = ws.receive_json()
+
+        assert result["status"] == "done" and result["pronunciation_score"] == 75.0
+        assert "漏读" in result["feedback"]
+        assert scored and scored[0][1] == WORDS and Path(scored[0][0]).exists()
+
+    def test_stop_without_audio(self, client, test_db, assignment, student_token, stream_env):
+        with client.websocket_connect(url(assignment, student_token)) as ws:
+            ws.receive_json()
+            ws.send_json({"type": "stop"})
+            error = ws.receive_json()
+
+        assert error["type"] == "error"
+        assert test_db.query(Recording).count() == 0
+        assert list(Path(settings.UPLOAD_DIR).rglob("*.wav")) == []
+
+    def test_disconnect_scores_in_background(self, client, test_db, assignment, student_token,
+                                             stream_env, monkeypatch):
+        monkeypatch.setattr(ps_module.pronunciation_service, "start_live_continuous", lambda words: None)
+
+        with client.websocket_connect(url(assignment, student_token)) as ws:
+            ws.receive_json()
+            ws.send_bytes(tone(2.0))
+        # the handler finishes after the client has gone
+        for _ in range(100):
+            if stream_env:
+                break
+            time.sleep(0.02)
+
+        recording = test_db.query(Recording).one()
+        assert recording.status == RecordingStatus.PENDING
+        assert stream_env == [(recording.id, True)]
+
+    def test_take_is_stopped_at_the_length_limit(self, client, assignment, student_token,
+                                                 stream_env, monkeypatch):
+        monkeypatch.setattr(ps_module.pronunciation_service, "start_live_continuous", lambda words: FakeLive())
+        monkeypatch.setattr(settings, "CONTINUOUS_STREAM_MAX_SECONDS", 0.5)
+
+        with client.websocket_connect(url(assignment, student_token)) as ws:
+            ws.receive_json()
+            ws.send_bytes(tone(0.6))
+            result = ws.receive_json()
+
+        assert result["type"] == "result"
+
+    def test_request_session_is_released_for_the_take(self, client, test_db, assignment, student_token,
+                                                      stream_env, monkeypatch):
+        live = FakeLive()
+        monkeypatch.setattr(ps_module.pronunciation_service, "start_live_continuous", lambda words: live)
+
+        with client.websocket_connect(url(assignment, student_token)) as ws:
+            assert ws.receive_json()["type"] == "ready"
+            # no transaction (and so no pooled connection) held while the student reads
+            assert not test_db.in_transaction()
+            ws.send_bytes(tone(2.0))
+            ws.send_json({"type": "stop"})
+            result = ws.receive_json()
+
+        assert result["status"] == "done" and result["grade"]
+        assert test_db.query(Recording).filter(Recording.id == result["recording_id"]).one().status \
+            == RecordingStatus.REVIEWED
@@ -0,0 +1,108 @@
+"""
+Integration tests for the student's assignment list
+Covers: a fixed number of queries however many assignments the student has,
+teacher / word database names, word lists in order, per-assignment
+submission counts, the single-assignment route on the same loader
+"""
+import pytest
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import event
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.models.assignment import (
+    Assignment, AssignmentStudent, AssignmentSubmission, AssignmentWord, WordDatabase,
+)
+
+
+def seed(test_db, teacher, student, n_assignments, n_words=10):
+    database = WordDatabase(name="Grade 3", created_by=teacher.id)
+    test_db.add(database)
+    test_db.flush()
+    ids = []
+    for a in range(n_assignments):
+        assignment = Assignment(teacher_id=teacher.id, title=f"Unit {a}", word_database_id=database.id,
+                                due_date=datetime.utcnow() + timedelta(days=1 if a % 2 else -1))
+        test_db.add(assignment)
+        test_db.flush()
+        # inserted out of order: the response sorts by order_index
+        for i in reversed(range(n_words)):
+            test_db.add(AssignmentWord(assignment_id=assignment.id, word_text=f"w{a}_{i}", order_index=i))
+        test_db.add(AssignmentStudent(assignment_id=assignment.id, student_id=student.id))
+        for i in range(a % n_words):
+            test_db.add(AssignmentSubmission(assignment_id=assignment.id, student_id=student.id,
+                                             word_text=f"w{a}_{i}"))
+        ids.append(assignment.id)
+    test_db.commit()
+    return ids
+
+
+@pytest.fixture
+def statements(test_db):
+    seen = []
+
+    def listen(conn, cursor, statement, *a):
+        seen.append(statement)
+    event.listen(test_db.get_bind(), "before_cursor_execute", listen)
+    yield seen
+    event.remove(test_db.get_bind(), "before_cursor_execute", listen)
+
+
+class TestStudentAssignments:
+    """GET /student/assignments in a handful of grouped queries"""
+
+    @pytest.mark.parametrize("n_assignments", [3, 30])
+    def test_query_count_is_fixed(self, client, test_db, test_teacher, test_student, auth_headers_student,
+                                  statements, n_assignments):
+        seed(test_db, test_teacher, test_student, n_assignments)
+        statements.clear()
+
+        response = client.get("/api/assignments/student/assignments", headers=auth_headers_student)
+
+        assert response.status_code == 200
+        assert len(response.json()) == n_assignments
+        # current user, assignments + names, word lists, submission counts
+        assert len(statements) <= 4
+
+    def test_content(self, client, test_db, test_teacher, test_student, auth_headers_student):
+        seed(test_db, test_teacher, test_student, 3, n_words=4)
+
+        data = client.get("/api/assignments/student/assignments", headers=auth_headers_student).json()
+
+        assert [a["title"] for a in data] == ["Unit 0", "Unit 1", "Unit 2"]
+        assert {a["teacher_name"] for a in data} == {"test_teacher"}
+        assert {a["word_database_name"] for a in data} == {"Grade 3"}
+        assert [w["order_index"] for w in data[2]["words"]] == [0, 1, 2, 3]
+        assert [a["completed_words"] for a in data] == [0, 1, 2]
+        assert data[2]["completion_percentage"] == 50.0
+        assert [a["is_overdue"] for a in data] == [True, False, True]
+        assert data[0]["assigned_at"] is not None
+
+    def test_no_assignments(self, client, auth_headers_student):
+        response = client.get("/api/assignments/student/assignments", headers=auth_headers_student)
+        assert response.status_code == 200 and response.json() == []
+
+
+class TestStudentAssignment:
+    """The single-assignment route uses the same loader"""
+
+    def test_one(self, client, test_db, test_teacher, test_student, auth_headers_student):
+        ids = seed(test_db, test_teacher, test_student, 3, n_words=4)
+
+        data = client.get(f"/api/assignments/student/assignments/{ids[1]}", headers=auth_headers_student).json()
+
+        assert data["id"] == ids[1] and data["completed_words"] == 1 and data["total_words"] == 4
+
+    def test_not_assigned(self, client, test_db, test_teacher, test_student, auth_headers_student):
+        assignment = Assignment(teacher_id=test_teacher.id, title="Other class")
+        test_db.add(assignment)
+        test_db.commit()
+
+        response = client.get(f"/api/assignments/student/assignments/{assignment.id}",
+                              headers=auth_headers_student)
+        assert response.status_code == 404
@@ -0,0 +1,181 @@
+"""
+Integration tests for the teacher submissions feed
+Covers: keyset pagination over (created_at, id) without gaps or duplicates
+(also across tied timestamps), one query per page with usernames joined,
+summary projection from the typed score columns (no assessment JSON), the
+per-recording detail route and its ownership check
+"""
+import pytest
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import event
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.core.security import get_password_hash
+from app.models.classes import Class, ClassEnrollment
+from app.models.recording import Recording
+from app.models.user import User, UserRole
+
+FULL_SCORES = {
+    "pronunciation_score": 82.5, "accuracy_score": 80.0, "fluency_score": 90.0, "completeness_score": 100.0,
+    "words": [{"word": "apple", "phonemes": [{"phoneme": "ae", "accuracy_score": 78}]}],
+}
+
+
+@pytest.fixture
+def roster(test_db, test_teacher, test_student):
+    """Two students in the teacher's class, 7 recordings with tied timestamps"""
+    other = User(username="second_student", email="second@test.com",
+                 password_hash=get_password_hash("password123"), role=UserRole.STUDENT)
+    test_db.add(other)
+    klass = Class(teacher_id=test_teacher.id, class_name="Class A", class_code="FEED01")
+    test_db.add(klass)
+    test_db.flush()
+    test_db.add_all([ClassEnrollment(class_id=klass.id, student_id=test_student.id),
+                     ClassEnrollment(class_id=klass.id, student_id=other.id)])
+
+    base = datetime(2026, 3, 1, 9, 0, 0)
+    stamps = [base, base, base + timedelta(minutes=1), base + timedelta(minutes=1),
+              base + timedelta(minutes=1), base + timedelta(minutes=2), base + timedelta(minutes=3)]
+    recordings = []
+    for i, stamp in enumerate(stamps):
+        recording = Recording(student_id=(test_student.id if i % 2 else other.id), word_text=f"word{i}",
+                              audio_file_path=f"uploads/{i}.wav", automated_scores=FULL_SCORES,
+                              created_at=stamp)
+        test_db.add(recording)
+        recordings.append(recording)
+    test_db.commit()
+    return {"class": klass, "other": other, "recordings": recordings}
+
+
+def count_queries(test_db):
+    statements = []
+    event.listen(test_db.get_bind(), "before_cursor_execute",
+                 lambda conn, cursor, statement, *a: statements.append(statement))
+    return statements
+
+
+class TestKeysetPagination:
+    """Pages follow (created_at, id) descending"""
+
+    def test_pages_cover_the_feed_once(self, client, auth_headers_teacher, roster):
+        seen, cursor, pages = [], None, 0
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = client.get("/api/teacher/submissions", headers=auth_headers_teacher, params=params)
+            assert response.status_code == 200
+            seen.extend(item["id"] for item in response.json())
+            pages += 1
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        expected = sorted(roster["recordings"], key=lambda r: (r.created_at, r.id), reverse=True)
+        assert seen == [r.id for r in expected]
+        assert pages == 4
+
+    def test_last_page_has_no_cursor(self, client, auth_headers_teacher, roster):
+        response = client.get("/api/teacher/submissions", headers=auth_headers_teacher, params={"limit": 7})
+        assert len(response.json()) == 7
+        assert "X-Next-Cursor" not in response.headers
+
+    def test_filters_apply_to_every_page(self, client, auth_headers_teacher, roster):
+        response = client.get("/api/teacher/submissions", headers=auth_headers_teacher,
+                              params={"limit": 2, "student_id": roster["other"].id})
+        first = response.json()
+        second = client.get("/api/teacher/submissions", headers=auth_headers_teacher,
+                            params={"limit": 2, "student_id": roster["other"].id,
+                                    "cursor": response.headers["X-Next-Cursor"]}).json()
+
+        assert {item["student_name"] for item in first + second} == {"second_student"}
+        assert len(first + second) == 4
+
+    def test_bad_cursor_is_rejected(self, client, auth_headers_teacher, roster):
+        response = client.get("/api/teacher/submissions", headers=auth_headers_teacher,
+                              params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+
+    def test_limit_is_capped(self, client, auth_headers_teacher, roster):
+        response = client.get("/api/teacher/submissions", headers=auth_headers_teacher, params={"limit": 1000})
+        assert response.status_code == 422
+
+
+class TestProjection:
+    """A page is one query and carries headline scores only"""
+
+    def test_one_query_per_page(self, client, test_db, auth_headers_teacher, roster):
+        statements = count_queries(test_db)
+        client.get("/api/teacher/submissions", headers=auth_headers_teacher, params={"limit": 7})
+
+        feed = [s for s in statements if "FROM recordings" in s]
+        assert len(feed) == 1
+        # no per-row user lookups
+        assert len([s for s in statements if s.lstrip().startswith("SELECT") and "FROM users" in s
+                    and "recordings" not in s]) <= 2  # the current user, the teacher's roster
+
+    def test_summary_has_no_breakdown(self, client, auth_headers_teacher, roster):
+        item = client.get("/api/teacher/submissions", headers=auth_headers_teacher).json()[0]
+
+        assert item["automated_scores"] == {"pronunciation_score": 82.5, "accuracy_score": 80.0}
+        assert item["student_name"] in ("test_student", "second_student")
+        assert item["status"] == "pending"
+
+    def test_reads_typed_columns_not_the_json(self, client, test_db, auth_headers_teacher, roster):
+        statements = count_queries(test_db)
+        client.get("/api/teacher/submissions", headers=auth_headers_teacher)
+
+        feed = next(s for s in statements if "FROM recordings" in s)
+        assert "automated_scores" not in feed and "json" not in feed.lower()
+
+    def test_failed_take_is_flagged(self, client, test_db, auth_headers_teacher, test_student, roster):
+        test_db.add(Recording(student_id=test_student.id, word_text="quiet", audio_file_path="uploads/q.wav",
+                              automated_scores={"error": "silent", "preflight": "silent", "pronunciation_score": 0},
+                              created_at=datetime(2026, 3, 2)))
+        test_db.commit()
+
+        item = client.get("/api/teacher/submissions", headers=auth_headers_teacher).json()[0]
+        assert item["automated_scores"] == {"score_failed": True, "preflight_reason": "silent"}
+
+    def test_unscored_recording_has_no_scores(self, client, test_db, auth_headers_teacher, test_student, roster):
+        test_db.add(Recording(student_id=test_student.id, word_text="later", audio_file_path="uploads/x.wav",
+                              created_at=datetime(2026, 3, 2)))
+        test_db.commit()
+
+        item = client.get("/api/teacher/submissions", headers=auth_headers_teacher).json()[0]
+        assert item["word_text"] == "later" and item["automated_scores"] is None
+
+
+class TestSubmissionDetail:
+    """The full assessment, per recording, for the teacher's own students"""
+
+    def test_detail_has_the_full_assessment(self, client, auth_headers_teacher, roster):
+        recording = roster["recordings"][0]
+        response = client.get(f"/api/teacher/submissions/{recording.id}", headers=auth_headers_teacher)
+
+        assert response.status_code == 200
+        assert response.json()["automated_scores"] == FULL_SCORES
+        assert response.json()["student_name"] == "second_student"
+
+    def test_other_teachers_student_is_not_found(self, client, test_db, auth_headers_teacher, roster):
+        stranger = User(username="stranger", email="stranger@test.com",
+                        password_hash=get_password_hash("password123"), role=UserRole.STUDENT)
+        test_db.add(stranger)
+        test_db.flush()
+        recording = Recording(student_id=stranger.id, word_text="apple", audio_file_path="uploads/s.wav")
+        test_db.add(recording)
+        test_db.commit()
+
+        response = client.get(f"/api/teacher/submissions/{recording.id}", headers=auth_headers_teacher)
+        assert response.status_code == 404
+
+    def test_students_cannot_read_it(self, client, auth_headers_student, roster):
+        recording = roster["recordings"][1]
+        response = client.get(f"/api/teacher/submissions/{recording.id}", headers=auth_headers_student)
+        assert response.status_code == 403
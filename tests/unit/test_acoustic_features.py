@@ -0,0 +1,97 @@
+"""
+Unit tests for the vectorized acoustic features used by the stress check
+Covers: framing, RMS, FFT autocorrelation, F0 estimate, syllable cues
+"""
+import pytest
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.services import acoustic_features
+
+FRAMERATE = 16000
+
+
+def _tone(f0, seconds=0.2, amplitude=8000):
+    t = np.arange(int(seconds * FRAMERATE)) / FRAMERATE
+    x = sum(np.sin(2 * np.pi * k * f0 * t) / k for k in range(1, 6))
+    return (x * amplitude / 2).astype(np.int16)
+
+
+class TestEnergy:
+    """Framing and loudness"""
+
+    def test_rms_matches_definition(self):
+        x = np.array([3, -4, 3, -4], dtype=np.int16)
+        assert acoustic_features.rms(x) == pytest.approx(np.sqrt(12.5))
+
+    def test_rms_empty_is_zero(self):
+        assert acoustic_features.rms(np.array([], dtype=np.int16)) == 0.0
+
+    def test_rms_does_not_overflow_int16(self):
+        x = np.full(1000, 32767, dtype=np.int16)
+        assert acoustic_features.rms(x) == pytest.approx(32767)
+
+    def test_frame_signal_shape(self):
+        frames = acoustic_features.frame_signal(np.arange(1000), 400, 160)
+        assert frames.shape == (4, 400)
+        assert frames[1][0] == 160
+
+    def test_frame_signal_short_input(self):
+        assert acoustic_features.frame_signal(np.arange(10), 400, 160).shape == (0, 400)
+
+    def test_frame_rms(self):
+        x = np.concatenate([np.zeros(400), np.full(400, 1000)]).astype(np.int16)
+        energy = acoustic_features.frame_rms(x, 400, 400)
+        assert energy.tolist() == [0.0, 1000.0]
+
+
+class TestPitch:
+    """Autocorrelation F0"""
+
+    def test_autocorrelation_matches_direct_sum(self):
+        rng = np.random.default_rng(1)
+        x = rng.normal(size=300)
+        r = acoustic_features.autocorrelation(x)
+        for lag in (0, 1, 17, 299):
+            assert r[lag] == pytest.approx(np.dot(x[:len(x) - lag], x[lag:]))
+
+    @pytest.mark.parametrize("f0", [90, 150, 220, 320])
+    def test_voiced_tone(self, f0):
+        assert acoustic_features.estimate_f0(_tone(f0), FRAMERATE) == pytest.approx(f0, rel=0.03)
+
+    def test_silence_is_unvoiced(self):
+        assert acoustic_features.estimate_f0(np.zeros(3200, dtype=np.int16), FRAMERATE) == 0.0
+
+    def test_noise_is_unvoiced(self):
+        rng = np.random.default_rng(0)
+        noise = rng.normal(0, 3000, 3200).astype(np.int16)
+        assert acoustic_features.estimate_f0(noise, FRAMERATE) == 0.0
+
+    def test_too_short_is_unvoiced(self):
+        assert acoustic_features.estimate_f0(_tone(200, seconds=0.02), FRAMERATE) == 0.0
+
+
+class TestSyllableCues:
+    """Cue dicts consumed by PronunciationService._check_word_stress"""
+
+    def test_one_cue_per_span(self):
+        samples = np.concatenate([_tone(200, 0.2, 9000), _tone(180, 0.1, 3000)])
+        spans = [(0, 2_000_000), (2_000_000, 1_000_000)]
+        cues = acoustic_features.syllable_cues(samples, FRAMERATE, spans)
+
+        assert [set(c) for c in cues] == [{"rms", "f0", "dur"}] * 2
+        assert cues[0]["rms"] > cues[1]["rms"]
+        assert cues[0]["f0"] == pytest.approx(200, rel=0.03)
+        assert cues[0]["dur"] == pytest.approx(0.2)
+        assert cues[1]["dur"] == pytest.approx(0.1 * 0.6)  # final lengthening discount
+
+    def test_span_past_end_of_audio(self):
+        cues = acoustic_features.syllable_cues(_tone(200, 0.1), FRAMERATE, [(5_000_000, 1_000_000)])
+        assert cues[0]["rms"] == 0.0
+        assert cues[0]["f0"] == 0.0
@@ -0,0 +1,133 @@
+"""
+Unit tests for the one-pass audio ingest
+Covers: single ffmpeg run with two outputs, in-process fallback, derived paths, reuse
+"""
+import pytest
+import sys
+import os
+import wave
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.services import audio_ingest
+from app.services.audio_ingest import derived_paths, ingest, ingest_recording, mp3_for
+from app.services.audio_preprocess import DecodedAudio, SAMPLE_RATE
+
+
+@pytest.fixture
+def upload(tmp_path):
+    """A 44.1 kHz stereo WAV upload, i.e. not yet canonical"""
+    t = np.arange(22050) / 44100
+    tone = (np.sin(2 * np.pi * 440 * t) * 8000).astype(np.int16)
+    path = tmp_path / "cat_20261017_120000.wav"
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(2)
+        w.setsampwidth(2)
+        w.setframerate(44100)
+        w.writeframes(np.repeat(tone, 2).tobytes())
+    return str(path)
+
+
+@pytest.fixture
+def no_ffmpeg(monkeypatch):
+    monkeypatch.setattr(audio_ingest.shutil, "which", lambda name: None)
+
+
+class TestIngest:
+    """One decode per upload, every derived format registered"""
+
+    def test_derived_paths_keep_player_naming(self):
+        pcm, mp3 = derived_paths("/uploads/3/cat.webm")
+        assert pcm == "/uploads/3/cat.webm.16k.wav"
+        assert mp3 == "/uploads/3/cat.webm.mp3"  # what the frontend player requests
+
+    def test_single_ffmpeg_process_writes_both_outputs(self, upload, monkeypatch):
+        calls = []
+
+        def fake_run(cmd, **kwargs):
+            calls.append(cmd)
+            for arg in cmd:
+                if arg.endswith(".part"):
+                    Path(arg).write_bytes(b"x")
+            return SimpleNamespace(returncode=0)
+
+        monkeypatch.setattr(audio_ingest.shutil, "which", lambda name: "/usr/bin/ffmpeg")
+        monkeypatch.setattr(audio_ingest.subprocess, "run", fake_run)
+
+        result = ingest(upload)
+
+        assert len(calls) == 1
+        assert calls[0].count("-i") == 1  # decoded once
+        assert result.pcm_path == upload + ".16k.wav"
+        assert result.mp3_path == upload + ".mp3"
+        assert os.path.exists(result.pcm_path) and os.path.exists(result.mp3_path)
+        assert not [p for p in os.listdir(os.path.dirname(upload)) if p.endswith(".part")]
+
+    def test_in_process_fallback_writes_canonical_pcm(self, upload, no_ffmpeg):
+        result = ingest(upload)
+
+        assert result.mp3_path is None
+        with wave.open(result.pcm_path, "rb") as w:
+            assert w.getframerate() == SAMPLE_RATE
+            assert w.getnchannels() == 1
+            assert w.getsampwidth() == 2
+        assert DecodedAudio.from_file(result.pcm_path).duration_ms == pytest.approx(500, abs=20)
+
+    def test_ffmpeg_failure_falls_back(self, upload, monkeypatch):
+        def failing_run(cmd, **kwargs):
+            raise OSError("ffmpeg crashed")
+
+        monkeypatch.setattr(audio_ingest.shutil, "which", lambda name: "/usr/bin/ffmpeg")
+        monkeypatch.setattr(audio_ingest.subprocess, "run", failing_run)
+
+        result = ingest(upload)
+        assert result.pcm_path == upload + ".16k.wav"
+        assert result.mp3_path is None
+
+    def test_undecodable_upload(self, tmp_path, no_ffmpeg):
+        path = tmp_path / "broken.wav"
+        path.write_bytes(b"not audio at all")
+
+        result = ingest(str(path))
+        assert result.pcm_path is None and result.mp3_path is None
+
+    def test_mp3_for_canonical_pcm(self, upload):
+        pcm, mp3 = derived_paths(upload)
+        assert mp3_for(pcm) is None  # not written yet
+        Path(mp3).write_bytes(b"x")
+        assert mp3_for(pcm) == mp3
+        assert mp3_for(upload) is None  # only canonical PCM has a registered sibling
+        assert mp3_for(None) is None
+
+
+class TestIngestRecording:
+    """Recordings keep their derived paths; retries do not transcode again"""
+
+    def test_registers_paths(self, upload, no_ffmpeg):
+        recording = SimpleNamespace(audio_file_path=upload, pcm_path=None, mp3_path=None)
+
+        path = ingest_recording(recording)
+
+        assert path == recording.pcm_path == upload + ".16k.wav"
+        assert recording.mp3_path is None
+
+    def test_reuses_existing_pcm(self, upload, no_ffmpeg, monkeypatch):
+        recording = SimpleNamespace(audio_file_path=upload, pcm_path=None, mp3_path=None)
+        ingest_recording(recording)
+
+        monkeypatch.setattr(audio_ingest, "ingest", lambda path: pytest.fail("transcoded twice"))
+        assert ingest_recording(recording) == recording.pcm_path
+
+    def test_undecodable_upload_scores_original(self, tmp_path, no_ffmpeg):
+        path = tmp_path / "broken.webm"
+        path.write_bytes(b"garbage")
+        recording = SimpleNamespace(audio_file_path=str(path), pcm_path=None, mp3_path=None)
+
+        assert ingest_recording(recording) == str(path)
+        assert recording.pcm_path is None
@@ -0,0 +1,216 @@
+"""
+Unit tests for the pre-flight audio check
+Covers: rejection of too-short / silent / speechless / clipped takes with
+specific retry messages, silence trimming and offset rebasing, counters of
+avoided provider calls, that rejected takes never reach a provider, and that
+trimmed takes still reach the scoring node with their ingested MP3
+"""
+import os
+import sys
+import tempfile
+import wave
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.services.audio_preflight import MESSAGES, SOURCE_CLOCK, AudioPreflight, shift_offsets
+from app.services import scoring_node
+from app.services.audio_ingest import MP3_SUFFIX, PCM_SUFFIX
+from app.services.audio_preprocess import DecodedAudio
+from app.services.feedback_service import FeedbackService
+from app.services.pronunciation_service import PronunciationService
+from app.services.scoring_cascade import ScoringCascade, ScoringProvider
+
+SR = 16000
+
+
+def pcm(*parts):
+    """Concatenate ("silence" | "noise" | "tone" | "clipped", seconds) parts into DecodedAudio"""
+    rng = np.random.default_rng(1)
+    out = []
+    for kind, seconds in parts:
+        n = int(SR * seconds)
+        t = np.arange(n) / SR
+        if kind == "silence":
+            out.append(np.zeros(n))
+        elif kind == "noise":
+            out.append(rng.normal(0, 40, n))
+        elif kind == "tone":
+            out.append(np.sin(2 * np.pi * 220 * t) * 8000)
+        elif kind == "clipped":
+            out.append(np.clip(np.sin(2 * np.pi * 220 * t) * 90000, -32768, 32767))
+    return DecodedAudio(np.concatenate(out).astype(np.int16).tobytes())
+
+
+@pytest.fixture
+def preflight():
+    return AudioPreflight()
+
+
+class TestRejections:
+    """Hopeless takes are named, not scored"""
+
+    def test_too_short(self, preflight):
+        result = preflight.check(pcm(("tone", 0.2)), "word")
+        assert not result.ok and result.reason == "too_short"
+
+    def test_digital_silence(self, preflight):
+        result = preflight.check(pcm(("silence", 1.0)), "word")
+        assert result.reason == "silent"
+
+    def test_room_noise_without_speech(self, preflight):
+        result = preflight.check(pcm(("noise", 2.0)), "word")
+        assert result.reason in ("silent", "no_speech")
+
+    def test_barely_any_speech_for_a_continuous_test(self, preflight):
+        result = preflight.check(pcm(("noise", 2.0), ("tone", 0.3), ("noise", 2.0)), "continuous")
+        assert result.reason == "no_speech"
+        assert preflight.check(pcm(("noise", 2.0), ("tone", 0.3), ("noise", 2.0)), "word").ok
+
+    def test_clipped(self, preflight):
+        result = preflight.check(pcm(("noise", 0.3), ("clipped", 0.6), ("noise", 0.3)), "word")
+        assert result.reason == "clipped"
+        assert result.measures["clipped_ratio"] > 0.02
+
+    def test_rejection_carries_the_retry_message(self, preflight):
+        rejection = preflight.check(pcm(("silence", 2.0)), "continuous").rejection()
+        assert rejection["error"] == MESSAGES["silent"]
+        assert rejection["preflight"] == "silent"
+        assert rejection["pronunciation_score"] == 0 and rejection["per_word"] == []
+
+
+class TestTrimming:
+    """Accepted takes lose their long leading / trailing silence"""
+
+    def test_trims_to_speech_plus_padding(self, preflight):
+        result = preflight.check(pcm(("noise", 2.0), ("tone", 0.6), ("noise", 1.5)), "word")
+
+        assert result.ok
+        assert 1000 <= result.audio.duration_ms <= 1200  # 0.6 s + ~250 ms either side
+        assert 1700 <= result.lead_ms <= 1800
+        assert result.trimmed_ms == 4100 - result.audio.duration_ms
+
+    def test_take_that_is_all_speech_is_kept_as_is(self, preflight):
+        audio = pcm(("tone", 1.0))
+        result = preflight.check(audio, "word")
+        assert result.ok and result.audio is audio and result.lead_ms == 0
+
+    def test_shift_offsets(self):
+        result = {"per_word": [{"offset_ms": 0, "end_ms": 300}, {"score": 0, "error": "漏读"}],
+                  "segments": [{"start_ms": 0, "end_ms": 900}]}
+        shift_offsets(result, 1750)
+        assert result["per_word"][0] == {"offset_ms": 1750, "end_ms": 2050}
+        assert "offset_ms" not in result["per_word"][1]
+        assert result["segments"][0] == {"start_ms": 1750, "end_ms": 2650}
+
+    def test_results_on_the_source_clock_are_not_shifted(self):
+        result = {"per_word": [{"offset_ms": 1800, "end_ms": 2100}], SOURCE_CLOCK: True}
+        shift_offsets(result, 1750)
+        assert result == {"per_word": [{"offset_ms": 1800, "end_ms": 2100}]}
+
+    def test_trimmed_audio_keeps_the_source_path(self, preflight):
+        audio = pcm(("noise", 2.0), ("tone", 0.6), ("noise", 1.5))
+        audio.path = "uploads/take.webm.16k.wav"
+        assert preflight.check(audio, "word").audio.path == audio.path
+
+
+class TestCounters:
+    """What the check saved, for /health/scorers"""
+
+    def test_counts_rejections_and_avoided_calls(self, preflight):
+        preflight.check(pcm(("silence", 1.0)), "word", providers=3)
+        preflight.check(pcm(("tone", 0.1)), "word", providers=3)
+        preflight.check(pcm(("noise", 1.0), ("tone", 0.6), ("noise", 1.0)), "word", providers=3)
+
+        stats = preflight.stats()
+        assert stats["checked"] == 3 and stats["passed"] == 1
+        assert stats["rejected"]["silent"] == 1 and stats["rejected"]["too_short"] == 1
+        assert stats["provider_calls_avoided"] == 6
+        assert stats["trimmed_ms"] > 0
+
+
+class TestServiceIntegration:
+    """Rejected takes never reach a provider; accepted ones arrive trimmed"""
+
+    @pytest.fixture(autouse=True)
+    def no_score_cache(self, monkeypatch):
+        from app.core.config import settings
+        monkeypatch.setattr(settings, "SCORE_CACHE_ENABLED", False)
+
+    @pytest.fixture
+    def write_wav(self):
+        paths = []
+
+        def write(audio, suffix=".wav"):
+            fd, path = tempfile.mkstemp(suffix=suffix)
+            os.close(fd)
+            with wave.open(path, "wb") as w:
+                w.setnchannels(1)
+                w.setsampwidth(2)
+                w.setframerate(SR)
+                w.writeframes(audio.pcm)
+            paths.append(path)
+            return path
+        yield write
+        for path in paths:
+            os.remove(path)
+
+    def _service(self, seen):
+        def provider(request):
+            seen.append(request.audio.duration_ms)
+            return {"pronunciation_score": 90}
+        service = PronunciationService()
+        service.word_cascade = ScoringCascade("word", [
+            ScoringProvider("azure", provider, lambda: True, hedge_after=5.0),
+        ])
+        return service
+
+    def test_silent_take_is_not_scored(self, write_wav):
+        seen = []
+        result = self._service(seen).assess_pronunciation(write_wav(pcm(("silence", 2.0))), "beautiful")
+
+        assert seen == []
+        assert result["preflight"] == "silent" and result["error"] == MESSAGES["silent"]
+
+    def test_provider_gets_trimmed_audio(self, write_wav):
+        seen = []
+        path = write_wav(pcm(("noise", 3.0), ("tone", 0.6), ("noise", 3.0)))
+
+        result = self._service(seen).assess_pronunciation(path, "beautiful")
+
+        assert result["pronunciation_score"] == 90
+        assert seen and seen[0] < 1300
+
+    def test_trimmed_take_reaches_the_node_with_its_mp3(self, write_wav, monkeypatch):
+        path = write_wav(pcm(("noise", 3.0), ("tone", 0.6), ("noise", 3.0)), suffix=PCM_SUFFIX)
+        mp3_path = path[:-len(PCM_SUFFIX)] + MP3_SUFFIX
+        Path(mp3_path).write_bytes(b"ID3")
+        uploads = []
+
+        def assess_via_node(wav_bytes, reference_words, poll_timeout=180, mp3_path=None):
+            uploads.append((len(wav_bytes), mp3_path))
+            return {"pronunciation_score": 88}
+        monkeypatch.setattr(scoring_node, "assess_via_node", assess_via_node)
+        service = PronunciationService()
+        service.word_cascade = ScoringCascade("word", [
+            ScoringProvider("xfyun_node", service._xfyun_node_word, lambda: True, hedge_after=5.0),
+        ])
+
+        try:
+            result = service.assess_pronunciation(path, "beautiful")
+        finally:
+            os.remove(mp3_path)
+
+        assert result["pronunciation_score"] == 88
+        assert uploads and uploads[0][1] == mp3_path
+        assert uploads[0][0] < SR * 2 * 1.3  # the WAV fallback would still be the trimmed take
+
+    def test_feedback_names_the_problem(self):
+        feedback = FeedbackService.generate_feedback(
+            {"error": MESSAGES["clipped"], "preflight": "clipped", "pronunciation_score": 0}, "beautiful")
+        assert feedback["feedback_text"] == MESSAGES["clipped"]
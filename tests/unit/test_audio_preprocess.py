@@ -0,0 +1,103 @@
+"""
+Unit tests for the single in-memory audio decode
+Covers: DecodedAudio.from_file, samples, wav_bytes, write_temp_wav
+"""
+import pytest
+import sys
+import io
+import os
+import tempfile
+import wave
+from pathlib import Path
+
+import numpy as np
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.services.audio_preprocess import DecodedAudio, SAMPLE_RATE
+
+
+def _write_wav(sample_rate, channels=1, seconds=0.5):
+    """Write a 440 Hz tone WAV and return its path"""
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    tone = (np.sin(2 * np.pi * 440 * t) * 8000).astype(np.int16)
+    frames = np.repeat(tone, channels)
+    fd, path = tempfile.mkstemp(suffix=".wav")
+    os.close(fd)
+    with wave.open(path, "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(frames.tobytes())
+    return path
+
+
+class TestDecodedAudio:
+    """Every scorer reads the same canonical 16 kHz mono PCM"""
+
+    @pytest.fixture
+    def canonical_wav(self):
+        path = _write_wav(SAMPLE_RATE)
+        yield path
+        os.remove(path)
+
+    def test_canonical_wav_read_as_is(self, canonical_wav):
+        """A 16 kHz mono 16-bit WAV is decoded without resampling"""
+        audio = DecodedAudio.from_file(canonical_wav)
+
+        assert audio.sample_rate == SAMPLE_RATE
+        assert len(audio.pcm) == SAMPLE_RATE // 2 * 2
+        assert audio.duration_ms == 500
+
+    def test_resamples_and_downmixes(self):
+        """A 44.1 kHz stereo WAV comes out as 16 kHz mono"""
+        path = _write_wav(44100, channels=2)
+        try:
+            audio = DecodedAudio.from_file(path)
+        finally:
+            os.remove(path)
+
+        assert abs(audio.duration_ms - 500) <= 10
+        assert abs(len(audio.samples()) - SAMPLE_RATE // 2) <= 160
+
+    def test_samples_is_int16_view(self, canonical_wav):
+        """samples() exposes the PCM as int16 without copying"""
+        audio = DecodedAudio.from_file(canonical_wav)
+        samples = audio.samples()
+
+        assert samples.dtype == np.int16
+        assert samples.tobytes() == audio.pcm
+        assert audio.samples() is samples
+
+    def test_wav_bytes_round_trip(self, canonical_wav):
+        """wav_bytes() wraps the PCM in a readable WAV container"""
+        audio = DecodedAudio.from_file(canonical_wav)
+
+        with wave.open(io.BytesIO(audio.wav_bytes()), "rb") as w:
+            assert w.getframerate() == SAMPLE_RATE
+            assert w.getnchannels() == 1
+            assert w.getsampwidth() == 2
+            assert w.readframes(w.getnframes()) == audio.pcm
+
+    def test_write_temp_wav(self, canonical_wav):
+        """The path fallback writes a canonical WAV the caller removes"""
+        audio = DecodedAudio.from_file(canonical_wav)
+        path = audio.write_temp_wav()
+        try:
+            assert path.endswith(".wav")
+            assert DecodedAudio.from_file(path).pcm == audio.pcm
+        finally:
+            os.remove(path)
+
+    def test_undecodable_file_raises(self):
+        """Garbage input raises so the caller can report a decode error"""
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.write(fd, b"not audio at all")
+        os.close(fd)
+        try:
+            with pytest.raises(Exception):
+                DecodedAudio.from_file(path)
+        finally:
+            os.remove(path)
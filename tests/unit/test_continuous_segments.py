@@ -0,0 +1,272 @@
+"""
+Unit tests for VAD-segmented continuous scoring
+Covers: speech islands from frame energy, cutting a take into word groups
+at pauses (one island per word, and the proportional fallback), merging
+chunk results (offset rebasing, margin rescue, recomputed totals),
+concurrent chunk scoring and the whole-take fallback in
+assess_continuous_reading
+"""
+import threading
+import time
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.services import pronunciation_service as ps_module
+from app.services.audio_preprocess import DecodedAudio
+from app.services.continuous_segments import (
+    Segment, merge_results, plan_segments, score_segmented, speech_islands,
+)
+
+SR = 16000
+WORDS = [f"w{i}" for i in range(24)]
+
+
+def word_list_take(n_words, word_s=0.35, gap_s=0.35, joined=(), seed=0):
+    """Tone bursts for words separated by pauses; words in `joined` run into the next one"""
+    rng = np.random.default_rng(seed)
+    parts, spans, pos = [rng.normal(0, 30, int(SR * gap_s))], [], int(SR * gap_s)
+    for i in range(n_words):
+        n = int(SR * word_s)
+        t = np.arange(n) / SR
+        parts.append(np.sin(2 * np.pi * (200 + 10 * i) * t) * 6000)
+        spans.append((pos, pos + n))
+        pos += n
+        gap = int(SR * (0.05 if i in joined else gap_s))
+        parts.append(rng.normal(0, 30, gap))
+        pos += gap
+    return np.concatenate(parts).astype(np.int16), spans
+
+
+def answer(words, provider="fake", **extra):
+    per_word = [{"word": w, "score": 80, "error": None, "offset_ms": 100 * i, "end_ms": 100 * i + 80}
+                for i, w in enumerate(words)]
+    return dict({"mode": "continuous", "pronunciation_score": 80, "fluency_score": 90,
+                 "per_word": per_word, "provider": provider, "recognized_text": " ".join(words)}, **extra)
+
+
+class FakeCascade:
+    """Scores a chunk after a delay proportional to its length"""
+
+    def __init__(self, seconds_per_audio_second=0.0, fail_from=None):
+        self.rate = seconds_per_audio_second
+        self.fail_from = fail_from  # no answer for the chunk starting at this word
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def available_providers(self):
+        return ["fake"]
+
+    def run(self, audio, reference, budget):
+        with self._lock:
+            self.calls.append((audio.duration_ms, list(reference)))
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.rate * audio.duration_ms / 1000)
+        with self._lock:
+            self.active -= 1
+        if reference[0] == self.fail_from:
+            return None, [{"provider": "fake", "outcome": "error", "ms": 1, "hedged": False, "error": "down"}]
+        return answer(reference), [{"provider": "fake", "outcome": "ok", "ms": 1, "hedged": False}]
+
+
+class TestSpeechIslands:
+    """Energy VAD over the canonical PCM"""
+
+    def test_one_island_per_word(self):
+        samples, spans = word_list_take(10)
+        islands = speech_islands(samples, SR)
+        assert len(islands) == 10
+        for (start, end), (ws, we) in zip(islands, spans):
+            assert abs(start - ws) < SR * 0.03 and abs(end - we) < SR * 0.03
+
+    def test_short_gaps_are_inside_a_word(self):
+        samples, _ = word_list_take(10, joined={3, 6})
+        assert len(speech_islands(samples, SR)) == 8
+
+    def test_clicks_are_dropped(self):
+        samples, _ = word_list_take(4)
+        samples = samples.copy()
+        samples[200:400] = 8000  # 12 ms click in the leading pause
+        assert len(speech_islands(samples, SR)) == 4
+
+    def test_silence_has_no_speech(self):
+        assert speech_islands(np.zeros(SR * 2, dtype=np.int16), SR) == []
+        assert speech_islands(np.zeros(10, dtype=np.int16), SR) == []
+
+
+class TestPlanSegments:
+    """Word groups cut at pauses, mapped to reference slices"""
+
+    def test_exact_mapping_cuts_between_groups(self):
+        samples, spans = word_list_take(24)
+        segments = plan_segments(samples, SR, WORDS, words_per_segment=8, margin=1)
+
+        assert [s.core for s in segments] == [(0, 8), (8, 16), (16, 24)]
+        assert [s.scored for s in segments] == [s.core for s in segments]  # no margin needed
+        assert segments[0].start == 0 and segments[-1].end == len(samples)
+        for left, right in zip(segments, segments[1:]):
+            assert left.end == right.start
+            last_word = spans[left.core[1] - 1]
+            first_word = spans[right.core[0]]
+            assert last_word[1] <= left.end <= first_word[0]
+
+    def test_approximate_mapping_adds_margin(self):
+        samples, spans = word_list_take(24, joined={2, 12})  # 22 islands for 24 words
+        segments = plan_segments(samples, SR, WORDS, words_per_segment=8, margin=1)
+
+        assert [s.core for s in segments] == [(0, 8), (8, 16), (16, 24)]
+        assert [s.scored for s in segments] == [(0, 9), (7, 17), (15, 24)]
+        for seg in segments[1:]:
+            # every cut sits in a pause, never inside a word
+            assert not any(ws < seg.start < we for ws, we in spans)
+
+    def test_uneven_groups_are_balanced(self):
+        samples, _ = word_list_take(20)
+        segments = plan_segments(samples, SR, WORDS[:20], words_per_segment=8)
+        assert [s.core for s in segments] == [(0, 10), (10, 20)]
+
+    def test_short_take_is_not_cut(self):
+        samples, _ = word_list_take(12)
+        assert plan_segments(samples, SR, WORDS[:12], words_per_segment=8) == []
+        assert plan_segments(samples, SR, WORDS[:12], words_per_segment=0) == []
+
+    def test_take_without_pauses_is_not_cut(self):
+        t = np.arange(SR * 8) / SR
+        samples = (np.sin(2 * np.pi * 220 * t) * 6000).astype(np.int16)
+        assert plan_segments(samples, SR, WORDS, words_per_segment=8) == []
+
+
+class TestMergeResults:
+    """Chunk answers folded back into one continuous result"""
+
+    def test_offsets_are_rebased(self):
+        segments = [Segment(0, SR * 2, (0, 2), (0, 2)), Segment(SR * 2, SR * 4, (2, 4), (2, 4))]
+        words = ["a", "b", "c", "d"]
+        merged = merge_results(words, segments, [answer(["a", "b"]), answer(["c", "d"])], SR)
+
+        assert [w["word"] for w in merged["per_word"]] == words
+        assert [w["offset_ms"] for w in merged["per_word"]] == [0, 100, 2000, 2100]
+        assert merged["per_word"][3]["end_ms"] == 2180
+        assert merged["segments"][1]["start_ms"] == 2000
+
+    def test_margin_rescues_a_word_cut_into_the_neighbour(self):
+        words = ["a", "b", "c", "d"]
+        segments = [Segment(0, 100, (0, 2), (0, 3)), Segment(100, 200, (2, 4), (1, 4))]
+        first = answer(["a", "b", "c"])  # "c" landed in the first chunk
+        second = answer(["b", "c", "d"])
+        second["per_word"][0] = {"word": "b", "score": 0, "error": "漏读"}
+        second["per_word"][1] = {"word": "c", "score": 0, "error": "漏读"}
+        second["per_word"][2] = {"word": "d", "score": 0, "error": "漏读"}
+
+        merged = merge_results(words, segments, [first, second], SR)
+
+        assert [w["error"] for w in merged["per_word"]] == [None, None, None, "漏读"]
+        assert merged["per_word"][2]["offset_ms"] == 200  # first chunk's clock
+        assert merged["words_read"] == 3 and merged["words_total"] == 4
+
+    def test_totals_are_recomputed(self):
+        words = ["a", "b", "c", "d"]
+        segments = [Segment(0, 100, (0, 2), (0, 2)), Segment(100, 200, (2, 4), (2, 4))]
+        second = answer(["c", "d"], fluency_score=70)
+        second["per_word"][1] = {"word": "d", "score": 0, "error": "漏读"}
+
+        merged = merge_results(words, segments, [answer(["a", "b"]), second], SR)
+
+        assert merged["accuracy_score"] == 60.0  # (80 + 80 + 80 + 0) / 4
+        assert merged["completeness_score"] == 75.0
+        assert merged["fluency_score"] == 80.0
+        assert merged["pronunciation_score"] == round(60 * 0.7 + 75 * 0.15 + 80 * 0.15, 1)
+
+    def test_chunk_without_speech_counts_as_omitted(self):
+        words = ["a", "b", "c", "d"]
+        segments = [Segment(0, 100, (0, 2), (0, 2)), Segment(100, 200, (2, 4), (2, 4))]
+        silent = {"error": "未识别到语音，请重新录音", "pronunciation_score": 0, "per_word": []}
+
+        merged = merge_results(words, segments, [answer(["a", "b"]), silent], SR)
+
+        assert [w["error"] for w in merged["per_word"]] == [None, None, "漏读", "漏读"]
+
+    def test_transcript_cross_check_caps_the_score(self):
+        words = ["a", "b", "c", "d"]
+        segments = [Segment(0, 100, (0, 2), (0, 2)), Segment(100, 200, (2, 4), (2, 4))]
+        results = [answer(["a", "b"], token_match_ratio=0.2), answer(["c", "d"], token_match_ratio=0.3)]
+        assert merge_results(words, segments, results, SR)["pronunciation_score"] == 55.0
+
+
+class TestScoreSegmented:
+    """Chunks go through the cascade at the same time"""
+
+    def test_chunks_scored_concurrently(self):
+        samples, _ = word_list_take(24)
+        audio = DecodedAudio(samples.tobytes())
+        cascade = FakeCascade(seconds_per_audio_second=0.02)
+
+        result, timings = score_segmented(cascade, audio, WORDS, 60, 8, 1, workers=4)
+
+        assert cascade.peak == 3
+        assert sorted(ref for _, ref in cascade.calls) == sorted([WORDS[0:8], WORDS[8:16], WORDS[16:24]])
+        assert sum(ms for ms, _ in cascade.calls) == pytest.approx(audio.duration_ms, abs=5)
+        assert [w["word"] for w in result["per_word"]] == WORDS
+        assert [t["segment"] for t in timings] == [0, 1, 2]
+        assert [s["provider"] for s in result["segments"]] == ["fake"] * 3
+
+    def test_failed_chunk_gives_up(self):
+        samples, _ = word_list_take(24)
+        result, timings = score_segmented(FakeCascade(fail_from="w8"), DecodedAudio(samples.tobytes()),
+                                          WORDS, 60, 8, 1, workers=4)
+        assert result is None
+        assert any(t["outcome"] == "error" for t in timings)
+
+    def test_short_take_is_not_segmented(self):
+        samples, _ = word_list_take(10)
+        cascade = FakeCascade()
+        assert score_segmented(cascade, DecodedAudio(samples.tobytes()), WORDS[:10], 60, 8, 1, 4) == (None, [])
+        assert cascade.calls == []
+
+
+class TestAssessContinuousReading:
+    """The service cuts long takes and falls back to scoring them whole"""
+
+    @pytest.fixture
+    def take(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(ps_module.settings, "SCORE_CACHE_ENABLED", False)
+        samples, _ = word_list_take(24, seed=7)
+        path = tmp_path / "take.16k.wav"
+        DecodedAudio(samples.tobytes()).write_wav(str(path))
+        return str(path)
+
+    def test_long_take_is_segmented(self, take, monkeypatch):
+        cascade = FakeCascade()
+        monkeypatch.setattr(ps_module.pronunciation_service, "continuous_cascade", cascade)
+
+        result = ps_module.pronunciation_service.assess_continuous_reading(take, WORDS)
+
+        assert len(cascade.calls) == 3
+        assert result["words_read"] == 24 and len(result["segments"]) == 3
+
+    def test_failed_chunk_falls_back_to_whole_take(self, take, monkeypatch):
+        cascade = FakeCascade(fail_from="w16")
+        monkeypatch.setattr(ps_module.pronunciation_service, "continuous_cascade", cascade)
+
+        result = ps_module.pronunciation_service.assess_continuous_reading(take, WORDS)
+
+        assert cascade.calls[-1][1] == WORDS
+        assert result.get("error") is None and "segments" not in result
+
+    def test_segmentation_can_be_disabled(self, take, monkeypatch):
+        cascade = FakeCascade()
+        monkeypatch.setattr(ps_module.pronunciation_service, "continuous_cascade", cascade)
+        monkeypatch.setattr(ps_module.settings, "CONTINUOUS_SEGMENT_WORDS", 0)
+
+        ps_module.pronunciation_service.assess_continuous_reading(take, WORDS)
+
+        assert [ref for _, ref in cascade.calls] == [WORDS]
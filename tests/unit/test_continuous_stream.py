@@ -0,0 +1,199 @@
+"""
+Unit tests for streamed continuous-test takes
+Covers: incremental WAV persistence (valid at every point), odd-sized
+chunks, forwarding to the live recognizer, falling back to the persisted
+take when live scoring fails or is unavailable, pre-flight rejection of
+silent takes
+"""
+import wave
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.services import pronunciation_service as ps_module
+from app.services.continuous_stream import ContinuousStream, open_stream
+
+WORDS = ["apple", "banana", "cherry"]
+
+
+def tone(seconds, freq=440.0):
+    t = np.arange(int(16000 * seconds)) / 16000.0
+    return (np.sin(2 * np.pi * freq * t) * 8000).astype(np.int16).tobytes()
+
+
+def read_wav(path):
+    with wave.open(str(path), "rb") as w:
+        return w.getframerate(), w.getnchannels(), w.getsampwidth(), w.readframes(w.getnframes())
+
+
+class FakeLive:
+    def __init__(self, result=None, error=None):
+        self.chunks = []
+        self.result = result
+        self.error = error
+        self.cancelled = False
+        self.finished_with = None
+
+    def write(self, pcm):
+        self.chunks.append(pcm)
+
+    def finish(self, timeout):
+        self.finished_with = timeout
+        if self.error:
+            raise self.error
+        return self.result
+
+    def cancel(self):
+        self.cancelled = True
+
+
+@pytest.fixture
+def rescoring(monkeypatch):
+    """Record fallbacks to the regular continuous cascade"""
+    calls = []
+
+    def fake_assess(path, words):
+        calls.append((path, list(words), read_wav(path)[3]))
+        return {"pronunciation_score": 70, "per_word": [], "provider": "cascade"}
+    monkeypatch.setattr(ps_module.pronunciation_service, "assess_continuous_reading", fake_assess)
+    return calls
+
+
+class TestIncrementalWav:
+    """Chunks land on disk as they arrive"""
+
+    def test_file_is_valid_after_every_chunk(self, tmp_path):
+        path = tmp_path / "take.16k.wav"
+        stream = ContinuousStream(str(path), WORDS)
+        audio = tone(0.5)
+
+        stream.write(audio[:3200])
+        assert read_wav(path) == (16000, 1, 2, audio[:3200])
+        stream.write(audio[3200:])
+        assert read_wav(path)[3] == audio
+        stream.close()
+        assert read_wav(path)[3] == audio
+        assert stream.duration_seconds == pytest.approx(0.5)
+
+    def test_odd_sized_chunks_keep_samples_aligned(self, tmp_path):
+        path = tmp_path / "take.16k.wav"
+        stream = ContinuousStream(str(path), WORDS)
+        audio = tone(0.1)
+
+        for i in range(0, len(audio), 333):
+            stream.write(audio[i:i + 333])
+        stream.close()
+        assert read_wav(path)[3] == audio
+
+    def test_writes_after_close_are_ignored(self, tmp_path):
+        path = tmp_path / "take.16k.wav"
+        stream = ContinuousStream(str(path), WORDS)
+        stream.write(tone(0.1))
+        stream.close()
+        stream.write(tone(0.1))
+        assert len(read_wav(path)[3]) == 3200
+
+
+class TestLiveScoring:
+    """The live recognizer gets the same samples; the file is the fallback"""
+
+    def test_chunks_are_forwarded(self, tmp_path):
+        live = FakeLive(result={"pronunciation_score": 88, "per_word": [], "streamed": True})
+        stream = ContinuousStream(str(tmp_path / "take.16k.wav"), WORDS, live=live)
+        audio = tone(0.2)
+        for i in range(0, len(audio), 1001):
+            stream.write(audio[i:i + 1001])
+
+        assert b"".join(live.chunks) == audio
+        assert all(len(c) % 2 == 0 for c in live.chunks)
+
+    def test_live_result_is_used(self, tmp_path, rescoring):
+        live = FakeLive(result={"pronunciation_score": 88, "per_word": [], "streamed": True})
+        stream = ContinuousStream(str(tmp_path / "take.16k.wav"), WORDS, live=live)
+        stream.write(tone(2.0))
+
+        result = stream.finish(timeout=5)
+
+        assert result["pronunciation_score"] == 88
+        assert live.finished_with == 5
+        assert rescoring == []
+
+    @pytest.mark.parametrize("live", [
+        FakeLive(error=RuntimeError("语音服务错误：network")),
+        FakeLive(result={"error": "未识别到语音，请重新录音", "pronunciation_score": 0, "per_word": []}),
+        FakeLive(result=None),
+    ])
+    def test_failed_live_scoring_rescores_the_file(self, tmp_path, rescoring, live):
+        path = tmp_path / "take.16k.wav"
+        stream = ContinuousStream(str(path), WORDS, live=live)
+        audio = tone(2.0)
+        stream.write(audio)
+
+        result = stream.finish(timeout=5)
+
+        assert result["provider"] == "cascade"
+        assert rescoring == [(str(path), WORDS, audio)]
+
+    def test_broken_live_write_drops_the_session(self, tmp_path, rescoring):
+        live = FakeLive()
+        live.write = lambda pcm: (_ for _ in ()).throw(RuntimeError("stream closed"))
+        stream = ContinuousStream(str(tmp_path / "take.16k.wav"), WORDS, live=live)
+        stream.write(tone(0.1))
+        stream.write(tone(0.1))
+
+        assert stream.live is None and live.cancelled
+        assert stream.finish(timeout=5)["provider"] == "cascade"
+        assert stream.bytes_received == 6400
+
+    def test_empty_take_is_not_scored(self, tmp_path, rescoring):
+        live = FakeLive()
+        stream = ContinuousStream(str(tmp_path / "take.16k.wav"), WORDS, live=live)
+
+        result = stream.finish(timeout=5)
+
+        assert result["error"]
+        assert live.cancelled
+        assert rescoring == []
+
+    def test_silent_take_is_rejected_without_waiting_for_live(self, tmp_path, rescoring):
+        live = FakeLive(result={"pronunciation_score": 88, "per_word": []})
+        stream = ContinuousStream(str(tmp_path / "take.16k.wav"), WORDS, live=live)
+        stream.write(b"\x00\x00" * 16000 * 3)
+
+        result = stream.finish(timeout=5)
+
+        assert result["preflight"] == "silent"
+        assert live.finished_with is None and live.cancelled
+        assert rescoring == []
+
+    def test_discard_removes_the_file(self, tmp_path):
+        path = tmp_path / "take.16k.wav"
+        live = FakeLive()
+        stream = ContinuousStream(str(path), WORDS, live=live)
+        stream.discard()
+        assert not path.exists()
+        assert live.cancelled
+
+
+class TestOpenStream:
+    """A live session only when Azure can take one"""
+
+    def test_without_azure_scores_from_file(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(ps_module.pronunciation_service, "enabled", False)
+        stream = open_stream(str(tmp_path / "take.16k.wav"), WORDS)
+        assert stream.live is None
+        stream.close()
+
+    def test_live_start_failure_is_not_fatal(self, tmp_path, monkeypatch):
+        def broken(words):
+            raise RuntimeError("SPXERR_INVALID_ARG")
+        monkeypatch.setattr(ps_module.pronunciation_service, "start_live_continuous", broken)
+        stream = open_stream(str(tmp_path / "take.16k.wav"), WORDS)
+        assert stream.live is None
+        stream.close()
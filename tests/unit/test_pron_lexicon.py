@@ -0,0 +1,147 @@
+"""
+Unit tests for the memory-mapped CMUdict pronunciation index
+Covers: build + lookup, variant order, agreement with cmudict.dict(),
+lazy open, rebuild of missing / corrupt / outdated indexes
+"""
+import pytest
+import sys
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.services import pron_lexicon
+from app.services.pron_lexicon import PronIndex, PronLexicon, build_index
+
+ENTRIES = [
+    ("cat", ["K", "AE1", "T"]),
+    ("read", ["R", "IY1", "D"]),
+    ("read", ["R", "EH1", "D"]),
+    ("photograph", ["F", "OW1", "T", "AH0", "G", "R", "AE2", "F"]),
+    ("a", ["AH0"]),
+    ("a", ["EY1"]),
+    ("zebra", ["Z", "IY1", "B", "R", "AH0"]),
+    ("café", ["K", "AE0", "F", "EY1"]),
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    path = tmp_path / "cmudict.idx"
+    build_index(path, ENTRIES, source_version="test")
+    index = PronIndex(path)
+    yield index
+    index.close()
+
+
+class TestPronIndex:
+    """Binary search over the mapped key table"""
+
+    def test_lookup(self, index):
+        assert index.get("cat") == [["K", "AE1", "T"]]
+        assert index.get("photograph") == [["F", "OW1", "T", "AH0", "G", "R", "AE2", "F"]]
+        assert len(index) == 6
+
+    def test_variants_keep_source_order(self, index):
+        assert index.get("read") == [["R", "IY1", "D"], ["R", "EH1", "D"]]
+        assert index.get("a") == [["AH0"], ["EY1"]]
+
+    def test_lookup_is_case_and_space_insensitive(self, index):
+        assert index.get(" Cat ") == [["K", "AE1", "T"]]
+
+    def test_non_ascii_key(self, index):
+        assert index.get("café") == [["K", "AE0", "F", "EY1"]]
+
+    def test_missing_word(self, index):
+        assert index.get("dog") is None
+        assert index.get("dog", []) == []
+        assert "dog" not in index
+        assert "zebra" in index
+        assert index.get("") is None
+
+    def test_codes_index_symbols(self, index):
+        (codes,) = index.codes("cat")
+        assert [index.symbols[c] for c in codes] == ["K", "AE1", "T"]
+
+    def test_records_source_version(self, index):
+        assert index.source_version == "test"
+
+    def test_rejects_non_index_file(self, tmp_path):
+        path = tmp_path / "bogus.idx"
+        path.write_bytes(b"not an index at all, just some bytes" * 4)
+        with pytest.raises(ValueError):
+            PronIndex(path)
+
+    def test_rejects_truncated_file(self, tmp_path):
+        path = tmp_path / "cmudict.idx"
+        build_index(path, ENTRIES, source_version="test")
+        path.write_bytes(path.read_bytes()[:-3])
+        with pytest.raises(ValueError):
+            PronIndex(path)
+
+
+class TestAgainstCmudict:
+    """The compiled index answers exactly like cmudict.dict()"""
+
+    def test_full_dictionary_round_trip(self, tmp_path):
+        cmudict = pytest.importorskip("cmudict")
+        path = tmp_path / "cmudict.idx"
+        words = build_index(path)
+        expected = cmudict.dict()
+        index = PronIndex(path)
+        try:
+            assert words == len(expected) == len(index)
+            for word in list(expected)[::97] + ["photograph", "record", "the"]:
+                assert index.get(word) == expected[word]
+        finally:
+            index.close()
+
+
+class TestPronLexicon:
+    """Process-wide lexicon: lazy, self-healing, never fatal"""
+
+    def test_opens_lazily(self, tmp_path):
+        path = tmp_path / "cmudict.idx"
+        build_index(path, ENTRIES, source_version=pron_lexicon._source_version())
+        lexicon = PronLexicon(path)
+
+        assert lexicon._loaded is False
+        assert lexicon.get("cat") == [["K", "AE1", "T"]]
+        assert "read" in lexicon
+        assert lexicon._loaded is True
+
+    def test_builds_missing_index(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(pron_lexicon, "_cmudict_entries", lambda: ENTRIES)
+        path = tmp_path / "data" / "cmudict.idx"
+        lexicon = PronLexicon(path)
+
+        assert lexicon.get("zebra") == [["Z", "IY1", "B", "R", "AH0"]]
+        assert path.exists()
+
+    def test_rebuilds_corrupt_index(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(pron_lexicon, "_cmudict_entries", lambda: ENTRIES)
+        path = tmp_path / "cmudict.idx"
+        path.write_bytes(b"garbage")
+
+        assert PronLexicon(path).get("cat") == [["K", "AE1", "T"]]
+
+    def test_rebuilds_index_from_other_cmudict_release(self, tmp_path, monkeypatch):
+        path = tmp_path / "cmudict.idx"
+        build_index(path, [("cat", ["K", "AE1", "T"])], source_version="0.0.1")
+        monkeypatch.setattr(pron_lexicon, "_source_version", lambda: "9.9.9")
+        monkeypatch.setattr(pron_lexicon, "_cmudict_entries", lambda: ENTRIES)
+
+        lexicon = PronLexicon(path)
+
+        assert "zebra" in lexicon
+        assert lexicon.index().source_version == "9.9.9"
+
+    def test_unavailable_lexicon_is_empty(self, tmp_path, monkeypatch):
+        def no_cmudict():
+            raise ImportError("cmudict not installed")
+        monkeypatch.setattr(pron_lexicon, "_cmudict_entries", no_cmudict)
+        lexicon = PronLexicon(tmp_path / "cmudict.idx")
+
+        assert lexicon.get("cat") is None
+        assert "cat" not in lexicon
@@ -403,3 +403,105 @@ class TestConvertToAzureFormat:
                 os.remove(input_path)
             if converted_path and converted_path != input_path and os.path.exists(converted_path):
                 os.remove(converted_path)
+
+
+class TestProviderCascade:
+    """
+    assess_pronunciation runs the registered providers under one budget
+    and reports how long each one took
+    """
+
+    @pytest.fixture(autouse=True)
+    def no_score_cache(self, monkeypatch):
+        """Every call here must reach the providers"""
+        from app.core.config import settings
+        monkeypatch.setattr(settings, "SCORE_CACHE_ENABLED", False)
+
+    @pytest.fixture
+    def wav_path(self):
+        """A voiced half second between short pauses (silence never reaches providers)"""
+        import wave
+        import numpy as np
+        t = np.arange(8000) / 16000
+        voiced = (np.sin(2 * np.pi * 220 * t) * 8000).astype(np.int16)
+        pause = np.zeros(1600, dtype=np.int16)
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        with wave.open(path, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(16000)
+            w.writeframes(np.concatenate([pause, voiced, pause]).tobytes())
+        yield path
+        os.remove(path)
+
+    def test_records_provider_timings(self, wav_path):
+        """The winning provider and every attempt are recorded on the result"""
+        from app.services.scoring_cascade import ScoringCascade, ScoringProvider
+
+        service = PronunciationService()
+        service.word_cascade = ScoringCascade("word", [
+            ScoringProvider("xfyun_node", lambda r: None, lambda: True, hedge_after=5.0),
+            ScoringProvider("azure", lambda r: {"pronunciation_score": 88, "reference": r.reference},
+                            lambda: True, hedge_after=5.0),
+        ])
+
+        result = service.assess_pronunciation(wav_path, "beautiful")
+
+        assert result["pronunciation_score"] == 88
+        assert result["reference"] == "beautiful"
+        assert result["provider"] == "azure"
+        assert [t["provider"] for t in result["provider_timings"]] == ["xfyun_node", "azure"]
+
+    def test_all_providers_failing_returns_error(self, wav_path):
+        """When nothing answers, the last provider error is surfaced"""
+        from app.services.scoring_cascade import ScoringCascade, ScoringProvider
+
+        def quota(request):
+            raise RuntimeError("quota exceeded")
+
+        service = PronunciationService()
+        service.enabled = True
+        service.word_cascade = ScoringCascade("word", [
+            ScoringProvider("azure", quota, lambda: True, hedge_after=5.0),
+        ])
+
+        result = service.assess_pronunciation(wav_path, "beautiful")
+
+        assert result["pronunciation_score"] == 0
+        assert "quota exceeded" in result["error"]
+        assert result["provider_timings"][0]["outcome"] == "error"
+
+
+class TestStrictScoringPhonemes:
+    """The strict layer compares heard and reference text by sound, per word"""
+
+    @pytest.fixture
+    def service(self):
+        return PronunciationService()
+
+    @staticmethod
+    def _azure(reference, independent, score=90.0):
+        return {"pronunciation_score": score, "accuracy_score": score, "recognized_text": reference,
+                "independent_transcript": independent, "words": []}
+
+    def test_homophone_is_not_a_miss(self, service):
+        result = service._apply_strict_scoring(self._azure("write", "right"), "write")
+
+        assert result["recognized_similarity"] == 1.0
+        assert result["phoneme_distances"] == [{"word": "write", "heard": "right", "distance": 0.0}]
+        assert result["pronunciation_score"] == 81.0  # homophone discount only
+
+    def test_different_word_is_capped(self, service):
+        result = service._apply_strict_scoring(self._azure("cat", "dog", score=80.0), "cat")
+
+        assert result["recognized_similarity"] < 0.5
+        assert result["pronunciation_score"] <= 60.0
+
+    def test_phrase_counts_words_heard(self, service):
+        result = service._apply_strict_scoring(
+            self._azure("the quick brown fox", "the quick fox"), "the quick brown fox")
+
+        assert result["token_match_ratio"] == 0.75
+        assert [d["word"] for d in result["phoneme_distances"] if d["distance"] == 1.0] == ["brown"]
+        assert result["pronunciation_score"] == pytest.approx(90 * (0.35 + 0.65 * 0.75 ** 2), abs=0.1)
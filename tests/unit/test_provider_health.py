@@ -0,0 +1,169 @@
+"""
+Unit tests for scorer circuit breakers and the health registry
+Covers: tripping, probing, half-open recovery, cascade routing
+"""
+import pytest
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.core.config import settings
+from app.services import scoring_cascade
+from app.services.provider_health import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, scorer_health
+from app.services.scoring_cascade import ScoringCascade, ScoringProvider
+
+
+@pytest.fixture(autouse=True)
+def breaker_settings(monkeypatch):
+    monkeypatch.setattr(settings, "SCORER_BREAKER_WINDOW", 60.0)
+    monkeypatch.setattr(settings, "SCORER_BREAKER_MIN_CALLS", 4)
+    monkeypatch.setattr(settings, "SCORER_BREAKER_ERROR_RATE", 0.5)
+    monkeypatch.setattr(settings, "SCORER_BREAKER_CONSECUTIVE_FAILURES", 3)
+    monkeypatch.setattr(settings, "SCORER_PROBE_INTERVAL", 60.0)
+    monkeypatch.setattr(scorer_health, "_breakers", {})
+    monkeypatch.setattr(scoring_cascade, "_stats", {})
+
+
+class TestCircuitBreaker:
+    """Rolling error rate, consecutive failures and recovery"""
+
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker("azure")
+        breaker.record(False, 1.0, "timeout")
+        breaker.record(False, 1.0, "timeout")
+        assert breaker.allow()
+
+        breaker.record(False, 1.0, "timeout")
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+        assert breaker.snapshot()["last_error"] == "timeout"
+
+    def test_opens_on_error_rate(self):
+        breaker = CircuitBreaker("gop")
+        for ok in (True, False, True, False):
+            breaker.record(ok, 0.5)
+        assert breaker.state == OPEN
+
+    def test_stays_closed_below_error_rate(self):
+        breaker = CircuitBreaker("gop")
+        for ok in (True, True, False, True, True, False):
+            breaker.record(ok, 0.5)
+        assert breaker.state == CLOSED
+
+    def test_probe_half_opens_then_success_closes(self):
+        healthy = {"ok": False}
+        breaker = CircuitBreaker("xfyun_node", probe=lambda: healthy["ok"])
+        for _ in range(3):
+            breaker.record(False, 1.0)
+
+        assert breaker.run_probe() is False
+        assert breaker.state == OPEN
+
+        healthy["ok"] = True
+        assert breaker.run_probe() is True
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow()
+
+        breaker.record(True, 0.3)
+        assert breaker.state == CLOSED
+        assert breaker.snapshot()["calls"] == 0
+
+    def test_half_open_failure_reopens(self):
+        breaker = CircuitBreaker("xfyun_node", probe=lambda: True)
+        for _ in range(3):
+            breaker.record(False, 1.0)
+        breaker.run_probe()
+
+        breaker.record(False, 1.0, "still down")
+        assert breaker.state == OPEN
+
+    def test_probe_exception_counts_as_unhealthy(self):
+        def boom():
+            raise ConnectionError("refused")
+        breaker = CircuitBreaker("gop", probe=boom)
+        for _ in range(3):
+            breaker.record(False, 1.0)
+        assert breaker.run_probe() is False
+        assert breaker.state == OPEN
+
+    def test_without_probe_half_opens_after_interval(self, monkeypatch):
+        breaker = CircuitBreaker("azure")
+        for _ in range(3):
+            breaker.record(False, 1.0)
+        assert not breaker.allow()
+
+        monkeypatch.setattr(settings, "SCORER_PROBE_INTERVAL", 0.0)
+        assert breaker.allow()
+        assert breaker.state == HALF_OPEN
+
+    def test_snapshot_latency(self):
+        breaker = CircuitBreaker("azure")
+        for ms in (100, 200, 300, 400):
+            breaker.record(True, ms / 1000)
+        snap = breaker.snapshot()
+        assert snap["state"] == CLOSED
+        assert snap["error_rate"] == 0.0
+        assert snap["latency_p50_ms"] == 200
+        assert snap["latency_p95_ms"] == 300
+
+
+class TestHealthAwareCascade:
+    """The cascade skips open providers and reports every outcome"""
+
+    def test_open_provider_is_skipped(self):
+        calls = []
+
+        def primary(request):
+            calls.append("primary")
+            return {"pronunciation_score": 90}
+
+        for _ in range(3):
+            scorer_health.record("primary", False, 1.0, "down")
+
+        cascade = ScoringCascade("word", [
+            ScoringProvider("primary", primary, lambda: True, hedge_after=5.0),
+            ScoringProvider("backup", lambda r: {"pronunciation_score": 70}, lambda: True, hedge_after=5.0),
+        ])
+        result, timings = cascade.run(None, "cat", budget=5)
+
+        assert calls == []
+        assert result["provider"] == "backup"
+        assert timings[0] == {"provider": "primary", "outcome": "circuit_open", "ms": 0,
+                              "hedged": False, "error": "circuit open"}
+
+    def test_failures_trip_the_breaker(self):
+        def down(request):
+            raise ConnectionError("connection refused")
+
+        cascade = ScoringCascade("word", [
+            ScoringProvider("flaky", down, lambda: True, hedge_after=5.0),
+        ])
+        for _ in range(3):
+            cascade.run(None, "cat", budget=5)
+            time.sleep(0.01)  # done-callbacks run on the worker thread
+
+        assert scorer_health.get("flaky").state == OPEN
+        _, timings = cascade.run(None, "cat", budget=5)
+        assert timings[0]["outcome"] == "circuit_open"
+
+    def test_abandoned_call_still_reported(self):
+        def slow_fail(request):
+            time.sleep(0.3)
+            raise TimeoutError("upstream timeout")
+
+        cascade = ScoringCascade("word", [
+            ScoringProvider("slow", slow_fail, lambda: True, hedge_after=0.05),
+            ScoringProvider("fast", lambda r: {"pronunciation_score": 70}, lambda: True, hedge_after=5.0),
+        ])
+        result, _ = cascade.run(None, "cat", budget=5)
+        assert result["provider"] == "fast"
+
+        time.sleep(0.5)
+        snap = scorer_health.snapshot()
+        assert snap["slow"]["calls"] == 1
+        assert snap["slow"]["error_rate"] == 1.0
+        assert snap["fast"]["error_rate"] == 0.0
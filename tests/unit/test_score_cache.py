@@ -0,0 +1,176 @@
+"""
+Unit tests for the content-addressed scoring result cache
+Covers: keying, LRU + DB layers, version invalidation, hit-rate stats,
+and the cache in front of PronunciationService
+"""
+import pytest
+import sys
+import os
+import tempfile
+import wave
+from pathlib import Path
+
+import numpy as np
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.db.session import Base
+from app.models.score_cache import ScoreCacheEntry
+from app.services.score_cache import ScoreCache
+from app.services.scoring_cascade import ScoringCascade, ScoringProvider
+
+PCM = b"\x01\x00" * 800
+# a voiced take (0.5 s tone between pauses) that gets past the audio pre-flight
+TAKE = (np.sin(2 * np.pi * 220 * np.arange(8000) / 16000) * 8000).astype(np.int16).tobytes()
+TAKE = b"\x00\x00" * 4000 + TAKE + b"\x00\x00" * 4000
+RESULT = {"pronunciation_score": 84.0, "words": [{"word": "cat", "accuracy_score": 80}]}
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False},
+                           poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine, tables=[ScoreCacheEntry.__table__])
+    return engine
+
+
+@pytest.fixture
+def cache(engine):
+    cache = ScoreCache(max_entries=2)
+    cache.bind = engine
+    return cache
+
+
+class TestScoreCacheKey:
+    """Results are addressed by audio, reference, mode and scorer version"""
+
+    def test_same_inputs_same_key(self):
+        a = ScoreCache.key_for(PCM, "cat", "word", "v1")
+        b = ScoreCache.key_for(PCM, " cat ", "word", "v1")
+        assert a == b
+        assert len(a.key) == 64
+
+    @pytest.mark.parametrize("pcm,ref,mode,version", [
+        (PCM + b"\x00\x00", "cat", "word", "v1"),
+        (PCM, "cap", "word", "v1"),
+        (PCM, "cat", "continuous", "v1"),
+        (PCM, "cat", "word", "v2"),
+    ])
+    def test_any_change_is_a_different_key(self, pcm, ref, mode, version):
+        assert ScoreCache.key_for(pcm, ref, mode, version).key != \
+            ScoreCache.key_for(PCM, "cat", "word", "v1").key
+
+
+class TestScoreCacheLayers:
+    """In-process LRU over the persistent table"""
+
+    def test_miss_then_memory_hit(self, cache):
+        key = ScoreCache.key_for(PCM, "cat", "word", "v1")
+        assert cache.get(key) is None
+
+        cache.put(key, dict(RESULT))
+        hit = cache.get(key)
+        assert hit["pronunciation_score"] == 84.0
+        assert hit["cache_hit"] is True
+        assert cache.stats()["memory_hits"] == 1
+
+    def test_hits_are_private_copies(self, cache):
+        key = ScoreCache.key_for(PCM, "cat", "word", "v1")
+        cache.put(key, dict(RESULT))
+        cache.get(key)["words"][0]["word"] = "mutated"
+        assert cache.get(key)["words"][0]["word"] == "cat"
+
+    def test_db_layer_survives_memory_loss(self, cache, engine):
+        key = ScoreCache.key_for(PCM, "cat", "word", "v1")
+        cache.put(key, dict(RESULT))
+        cache.clear_memory()
+
+        assert cache.get(key)["pronunciation_score"] == 84.0
+        assert cache.stats()["db_hits"] == 1
+        from sqlalchemy.orm import Session
+        with Session(bind=engine) as session:
+            assert session.get(ScoreCacheEntry, key.key).hits == 1
+
+    def test_lru_is_bounded(self, cache):
+        keys = [ScoreCache.key_for(PCM, w, "word", "v1") for w in ("a", "b", "c")]
+        for k in keys:
+            cache.put(k, dict(RESULT))
+        assert cache.stats()["memory_entries"] == 2
+
+    @pytest.mark.parametrize("result", [
+        {"error": "未能识别到语音", "pronunciation_score": 0},
+        {"pronunciation_score": 80, "_mock": True},
+        {"pronunciation_score": 60, "fallback": True},
+    ])
+    def test_errors_mocks_and_fallbacks_not_cached(self, cache, result):
+        key = ScoreCache.key_for(PCM, "cat", "word", "v1")
+        cache.put(key, result)
+        assert cache.get(key) is None
+
+    def test_purge_stale_versions(self, cache):
+        old = ScoreCache.key_for(PCM, "cat", "word", "v1")
+        new = ScoreCache.key_for(PCM, "cat", "word", "v2")
+        cache.put(old, dict(RESULT))
+        cache.put(new, dict(RESULT))
+
+        assert cache.purge_stale("v2") == 1
+        assert cache.get(old) is None
+        assert cache.get(new) is not None
+
+    def test_hit_rate(self, cache):
+        key = ScoreCache.key_for(PCM, "cat", "word", "v1")
+        cache.get(key)
+        cache.put(key, dict(RESULT))
+        cache.get(key)
+        cache.get(key)
+        stats = cache.stats()
+        assert stats["lookups"] == 3
+        assert stats["hit_rate"] == pytest.approx(0.667, abs=0.001)
+
+
+class TestCachedAssessment:
+    """A resubmitted take does not call the providers again"""
+
+    @pytest.fixture
+    def wav_path(self):
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        with wave.open(path, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(16000)
+            w.writeframes(TAKE)
+        yield path
+        os.remove(path)
+
+    def test_second_submission_is_served_from_cache(self, wav_path, cache, monkeypatch):
+        from app.services import pronunciation_service as ps
+
+        monkeypatch.setattr(ps, "score_cache", cache)
+        calls = []
+
+        def azure(request):
+            calls.append(request.reference)
+            return dict(RESULT)
+
+        service = ps.PronunciationService()
+        service.word_cascade = ScoringCascade("word", [
+            ScoringProvider("azure", azure, lambda: True, hedge_after=5.0),
+        ])
+
+        first = service.assess_pronunciation(wav_path, "cat")
+        second = service.assess_pronunciation(wav_path, "cat")
+
+        assert calls == ["cat"]
+        assert "cache_hit" not in first
+        assert second["cache_hit"] is True
+        assert second["pronunciation_score"] == first["pronunciation_score"]
+
+        monkeypatch.setattr(ps, "SCORING_RULES_VERSION", "strict-next")
+        service.assess_pronunciation(wav_path, "cat")
+        assert calls == ["cat", "cat"]  # new rules: rescored
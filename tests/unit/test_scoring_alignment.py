@@ -0,0 +1,126 @@
+"""
+Unit tests for phoneme-level scoring alignment
+Covers: cached G2P with letter-to-sound fallback, the vectorized weighted
+edit distance, per-word distances (homophones, variants, skipped and extra
+words) and overall similarity
+"""
+import pytest
+import sys
+from pathlib import Path
+
+from hypothesis import given, settings as hypothesis_settings, strategies as st
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.services.scoring_alignment import (
+    INDEL_COST, PHONES, SUB_COST, align, phoneme_distance, tokenize, word_phonemes,
+)
+
+
+def reference_dp(ref, hyp):
+    """Textbook cell-by-cell DP the vectorized one must agree with"""
+    ids = {p: i for i, p in enumerate(PHONES)}
+    prev = [j * INDEL_COST for j in range(len(hyp) + 1)]
+    for i in range(1, len(ref) + 1):
+        cur = [i * INDEL_COST]
+        for j in range(1, len(hyp) + 1):
+            cur.append(min(prev[j - 1] + SUB_COST[ids[ref[i - 1]], ids[hyp[j - 1]]],
+                           prev[j] + INDEL_COST, cur[j - 1] + INDEL_COST))
+        prev = cur
+    return prev[-1]
+
+
+class TestWordPhonemes:
+    """G2P through CMUdict, cached, with a fallback for unknown words"""
+
+    def test_cmudict_word_without_stress(self):
+        assert word_phonemes("cat") == (("K", "AE", "T"),)
+
+    def test_all_variants(self):
+        assert ("R", "IY", "D") in word_phonemes("read")
+        assert ("R", "EH", "D") in word_phonemes("read")
+
+    def test_unknown_word_falls_back_to_letters(self):
+        assert word_phonemes("shmeep") == (("SH", "M", "IY", "P"),)
+
+    def test_cached(self):
+        word_phonemes("elephant")
+        hits = word_phonemes.cache_info().hits
+        word_phonemes("elephant")
+        assert word_phonemes.cache_info().hits == hits + 1
+
+    def test_tokenize_accepts_phrase_lists(self):
+        assert tokenize(["well done", "Apple!"]) == ["well", "done", "apple"]
+
+
+class TestEditDistance:
+    """Weighted edit distance: similar sounds cost less than unrelated ones"""
+
+    def test_identical(self):
+        assert phoneme_distance(("K", "AE", "T"), ("K", "AE", "T")) == 0.0
+
+    def test_voicing_slip_is_cheaper_than_class_slip(self):
+        voicing = phoneme_distance(("P",), ("B",))
+        same_class = phoneme_distance(("P",), ("K",))
+        unrelated = phoneme_distance(("P",), ("IY",))
+        assert 0 < voicing < same_class < unrelated == 1.0
+
+    def test_insertions_and_deletions(self):
+        assert phoneme_distance(("K", "AE", "T"), ()) == 3 * INDEL_COST
+        assert phoneme_distance((), ("K",)) == INDEL_COST
+
+    @hypothesis_settings(max_examples=200, deadline=None)
+    @given(st.lists(st.sampled_from(PHONES), max_size=12), st.lists(st.sampled_from(PHONES), max_size=12))
+    def test_matches_cell_by_cell_dp(self, ref, hyp):
+        assert phoneme_distance(ref, hyp) == pytest.approx(reference_dp(ref, hyp))
+
+
+class TestAlign:
+    """Per-word distances the strict layer reads"""
+
+    def test_homophone_is_exact(self):
+        alignment = align("write", "right")
+        assert alignment.similarity == 1.0
+        assert alignment.words[0].distance == 0.0
+
+    def test_alternative_pronunciation_is_exact(self):
+        assert align("read", "red").words[0].distance == 0.0
+
+    def test_near_miss_is_graded(self):
+        word = align("ship", "sheep").words[0]
+        assert 0 < word.distance < 0.34
+        assert word.matched
+
+    def test_different_word_is_not_matched(self):
+        alignment = align("cat", "dog")
+        assert not alignment.words[0].matched
+        assert alignment.similarity < 0.5
+
+    def test_skipped_word(self):
+        alignment = align("the quick brown fox", "the quick fox")
+        distances = {w.word: w.distance for w in alignment.words}
+        assert distances == {"the": 0.0, "quick": 0.0, "brown": 1.0, "fox": 0.0}
+        assert alignment.matched_words == 3
+
+    def test_extra_word_is_not_charged_to_neighbours(self):
+        alignment = align("teacher library", "teacher um library")
+        assert [w.distance for w in alignment.words] == [0.0, 0.0]
+        assert alignment.similarity < 1.0
+
+    def test_split_compound(self):
+        word = align("notebook", "note book").words[0]
+        assert word.distance == 0.0
+        assert word.heard == "note book"
+
+    def test_skipped_word_does_not_steal_from_neighbour(self):
+        words = {w.word: w for w in align("river ocean island village", "river ocean village").words}
+        assert words["ocean"].distance == 0.0
+        assert not words["island"].matched
+
+    def test_empty_inputs(self):
+        assert align("cat", "").similarity == 0.0
+        assert align("cat", "").words[0].distance == 1.0
+        assert align("", "cat").words == []
+        assert align("", "").similarity == 0.0
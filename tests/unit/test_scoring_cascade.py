@@ -0,0 +1,144 @@
+"""
+Unit tests for the scoring provider cascade
+Covers: priority order, hand-over on failure, hedging, budget, timings
+"""
+import pytest
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.services import scoring_cascade
+from app.services.provider_health import scorer_health
+from app.services.scoring_cascade import ScoringCascade, ScoringProvider, last_error
+
+
+def _provider(name, delay=0.0, answer=None, error=None, hedge_after=5.0, fallback=False, calls=None):
+    def score(request):
+        if calls is not None:
+            calls.append(name)
+        time.sleep(delay)
+        if error:
+            raise RuntimeError(error)
+        return dict(answer) if answer is not None else None
+    return ScoringProvider(name, score, lambda: True, hedge_after=hedge_after, fallback=fallback)
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats(monkeypatch):
+    """Latency history and breakers are process-wide; isolate each test"""
+    monkeypatch.setattr(scoring_cascade, "_stats", {})
+    monkeypatch.setattr(scorer_health, "_breakers", {})
+
+
+class TestScoringCascade:
+    """One budget, hedged providers, first answer wins"""
+
+    def test_first_provider_answers(self):
+        calls = []
+        cascade = ScoringCascade("word", [
+            _provider("a", answer={"pronunciation_score": 80}, calls=calls),
+            _provider("b", answer={"pronunciation_score": 50}, calls=calls),
+        ])
+        result, timings = cascade.run(None, "cat", budget=5)
+
+        assert result["pronunciation_score"] == 80
+        assert result["provider"] == "a"
+        assert calls == ["a"]
+        assert [t["provider"] for t in timings] == ["a"]
+        assert timings[0]["outcome"] == "ok"
+        assert result["provider_timings"] == timings
+
+    def test_hands_over_immediately_on_no_result(self):
+        cascade = ScoringCascade("word", [
+            _provider("a", answer=None),
+            _provider("b", answer={"pronunciation_score": 70}),
+        ])
+        start = time.monotonic()
+        result, timings = cascade.run(None, "cat", budget=5)
+
+        assert result["provider"] == "b"
+        assert time.monotonic() - start < 1.0  # did not wait for a hedge deadline
+        assert [(t["provider"], t["outcome"], t["hedged"]) for t in timings] == [
+            ("a", "no_result", False), ("b", "ok", False)
+        ]
+
+    def test_error_is_recorded_and_skipped(self):
+        cascade = ScoringCascade("word", [
+            _provider("a", error="quota exceeded"),
+            _provider("b", answer={"pronunciation_score": 70}),
+        ])
+        result, timings = cascade.run(None, "cat", budget=5)
+
+        assert result["provider"] == "b"
+        assert timings[0]["outcome"] == "error"
+        assert last_error(timings) == "quota exceeded"
+
+    def test_hedges_slow_provider(self):
+        cascade = ScoringCascade("word", [
+            _provider("slow", delay=1.0, answer={"pronunciation_score": 90}, hedge_after=0.1),
+            _provider("fast", answer={"pronunciation_score": 60}),
+        ])
+        start = time.monotonic()
+        result, timings = cascade.run(None, "cat", budget=5)
+
+        assert result["provider"] == "fast"
+        assert time.monotonic() - start < 0.8
+        outcomes = {t["provider"]: (t["outcome"], t["hedged"]) for t in timings}
+        assert outcomes == {"fast": ("ok", True), "slow": ("abandoned", False)}
+
+    def test_slow_provider_can_still_win_after_hedge(self):
+        cascade = ScoringCascade("word", [
+            _provider("a", delay=0.2, answer={"pronunciation_score": 90}, hedge_after=0.05),
+            _provider("b", delay=2.0, answer={"pronunciation_score": 60}),
+        ])
+        result, _ = cascade.run(None, "cat", budget=5)
+        assert result["provider"] == "a"
+
+    def test_budget_exhausted(self):
+        cascade = ScoringCascade("word", [
+            _provider("a", delay=1.0, answer={"pronunciation_score": 90}, hedge_after=5.0),
+        ])
+        start = time.monotonic()
+        result, timings = cascade.run(None, "cat", budget=0.2)
+
+        assert result is None
+        assert time.monotonic() - start < 0.6
+        assert timings[0]["outcome"] == "abandoned"
+
+    def test_error_dict_is_an_answer(self):
+        """A no-speech answer ends the cascade; later providers must not rescore silence"""
+        calls = []
+        cascade = ScoringCascade("word", [
+            _provider("a", answer={"error": "未能识别到语音", "pronunciation_score": 0}, calls=calls),
+            _provider("b", answer={"pronunciation_score": 60}, calls=calls),
+        ])
+        result, _ = cascade.run(None, "cat", budget=5)
+        assert result["error"] == "未能识别到语音"
+        assert calls == ["a"]
+
+    def test_fallback_alone_is_not_available(self):
+        cascade = ScoringCascade("word", [
+            ScoringProvider("primary", lambda r: None, lambda: False, hedge_after=1.0),
+            _provider("gop", answer={"pronunciation_score": 60}, fallback=True),
+        ])
+        assert cascade.available_providers() == []
+        assert cascade.run(None, "cat", budget=1) == (None, [])
+
+    def test_hedge_delay_follows_latency_percentile(self, monkeypatch):
+        monkeypatch.setattr(scoring_cascade.settings, "SCORING_HEDGE_PERCENTILE", 90.0)
+        monkeypatch.setattr(scoring_cascade.settings, "SCORING_HEDGE_MIN", 0.5)
+        provider = _provider("a", hedge_after=8.0)
+
+        assert provider.hedge_delay("word") == 8.0  # no history yet
+        stats = scoring_cascade.provider_stats("word", "a")
+        for i in range(100):
+            stats.record(1.0 + i / 100)
+        assert provider.hedge_delay("word") == pytest.approx(1.89, abs=0.02)
+
+        for _ in range(200):
+            stats.record(0.1)
+        assert provider.hedge_delay("word") == 0.5  # floor
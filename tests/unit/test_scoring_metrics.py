@@ -0,0 +1,192 @@
+"""
+Unit tests for scoring spans, histograms and the /metrics export
+Covers: Prometheus text rendering, spans feeding histograms and the request
+timeline (also across pool threads), slow-request timelines on the result,
+provider outcome / selection counters from the cascade
+"""
+import pytest
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.core.config import settings
+from app.services import scoring_cascade
+from app.services.provider_health import scorer_health
+from app.services.scoring_cascade import ScoringCascade, ScoringProvider
+from app.services.scoring_metrics import (
+    PROVIDER_OUTCOMES, PROVIDER_SELECTED, STAGE_SECONDS,
+    Counter, Histogram, MetricsRegistry, carry, current_trace, span, traced,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats(monkeypatch):
+    """Latency history and breakers are process-wide; isolate each test"""
+    monkeypatch.setattr(scoring_cascade, "_stats", {})
+    monkeypatch.setattr(scorer_health, "_breakers", {})
+
+
+class TestExposition:
+    """Text format Prometheus scrapes"""
+
+    def test_histogram_buckets_are_cumulative(self):
+        h = Histogram("t_seconds", "test", ("stage",), buckets=(0.1, 1.0))
+        h.observe(0.05, stage="decode")
+        h.observe(0.5, stage="decode")
+        h.observe(3.0, stage="decode")
+
+        lines = h.render()
+        assert 't_seconds_bucket{stage="decode",le="0.1"} 1' in lines
+        assert 't_seconds_bucket{stage="decode",le="1"} 2' in lines
+        assert 't_seconds_bucket{stage="decode",le="+Inf"} 3' in lines
+        assert 't_seconds_sum{stage="decode"} 3.550000' in lines
+        assert 't_seconds_count{stage="decode"} 3' in lines
+
+    def test_registry_renders_help_and_type(self):
+        registry = MetricsRegistry()
+        c = registry.counter("t_total", "things", ("provider",))
+        c.inc(provider='az"ure')
+        assert registry.counter("t_total", "things", ("provider",)) is c
+
+        text = registry.render()
+        assert "# HELP t_total things\n# TYPE t_total counter\n" in text
+        assert 't_total{provider="az\\"ure"} 1' in text
+
+    def test_wrong_labels_are_rejected(self):
+        with pytest.raises(ValueError):
+            Counter("t_total", "things", ("provider",)).inc(mode="word")
+
+
+class TestSpans:
+    """Stages land in the histogram and on the request's timeline"""
+
+    def test_span_without_trace_still_observes(self):
+        before = STAGE_SECONDS.count(mode="word", stage="db_commit")
+        with span("db_commit", mode="word"):
+            pass
+        assert STAGE_SECONDS.count(mode="word", stage="db_commit") == before + 1
+
+    def test_spans_from_pool_threads_join_the_timeline(self, monkeypatch):
+        monkeypatch.setattr(settings, "SCORING_TRACE_SLOW_MS", 0)
+
+        @traced("word")
+        def score():
+            with span("decode"):
+                time.sleep(0.01)
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                pool.submit(carry(_stage), "azure.plain_stt").result()
+                pool.submit(_stage, "lost").result()  # not carried: no trace in that thread
+            return {"pronunciation_score": 80}
+
+        result = score()
+
+        names = [s["name"] for s in result["trace"]["spans"]]
+        assert names == ["decode", "azure.plain_stt"]
+        assert result["trace"]["spans"][0]["ms"] >= 10
+        assert result["trace"]["total_ms"] >= 10
+
+    def test_failed_stage_is_marked_and_raised(self, monkeypatch):
+        monkeypatch.setattr(settings, "SCORING_TRACE_SLOW_MS", 0)
+
+        @traced("word")
+        def score():
+            try:
+                with span("azure.pa"):
+                    raise RuntimeError("quota")
+            except RuntimeError:
+                pass
+            return {"error": "语音识别失败", "pronunciation_score": 0}
+
+        spans = score()["trace"]["spans"]
+        assert spans == [{"name": "azure.pa", "start_ms": 0, "ms": 0, "error": "RuntimeError: quota"}]
+
+    def test_fast_requests_keep_no_timeline(self, monkeypatch):
+        monkeypatch.setattr(settings, "SCORING_TRACE_SLOW_MS", 60000)
+        answer = {"pronunciation_score": 80}
+
+        result = traced("word")(lambda: answer)()
+
+        assert result is answer and "trace" not in result
+        assert current_trace() is None
+
+    def test_timeline_does_not_touch_the_returned_object(self, monkeypatch):
+        monkeypatch.setattr(settings, "SCORING_TRACE_SLOW_MS", 0)
+        cached = {"pronunciation_score": 80}
+
+        result = traced("word")(lambda: cached)()
+
+        assert "trace" in result and "trace" not in cached
+
+    def test_nested_request_joins_the_outer_one(self, monkeypatch):
+        monkeypatch.setattr(settings, "SCORING_TRACE_SLOW_MS", 0)
+
+        @traced("continuous")
+        def inner():
+            with span("segmented"):
+                pass
+            return {"pronunciation_score": 70}
+
+        @traced("stream")
+        def outer():
+            with span("live"):
+                pass
+            return inner()
+
+        result = outer()
+        assert [s["name"] for s in result["trace"]["spans"]] == ["live", "segmented"]
+
+
+class TestCascadeMetrics:
+    """Provider outcomes, selection and per-provider spans"""
+
+    def test_outcomes_and_selection_are_counted(self, monkeypatch):
+        monkeypatch.setattr(settings, "SCORING_TRACE_SLOW_MS", 0)
+
+        def broken(request):
+            raise RuntimeError("down")
+
+        cascade = ScoringCascade("metrics-test", [
+            ScoringProvider("first", broken, lambda: True, hedge_after=5.0),
+            ScoringProvider("second", lambda r: {"pronunciation_score": 90}, lambda: True, hedge_after=5.0),
+        ])
+
+        result = traced("word")(lambda: cascade.run(b"", "cat", 5.0)[0])()
+
+        assert PROVIDER_OUTCOMES.value(mode="metrics-test", provider="first", outcome="error") == 1
+        assert PROVIDER_OUTCOMES.value(mode="metrics-test", provider="second", outcome="ok") == 1
+        assert PROVIDER_SELECTED.value(mode="metrics-test", provider="second") == 1
+        spans = {s["name"]: s for s in result["trace"]["spans"]}
+        assert "RuntimeError: down" in spans["provider.first"]["error"]
+        assert "error" not in spans["provider.second"]
+
+    def test_no_answer_is_counted_as_none(self):
+        cascade = ScoringCascade("metrics-none", [
+            ScoringProvider("only", lambda r: None, lambda: True, hedge_after=5.0),
+        ])
+        cascade.run(b"", "cat", 5.0)
+        assert PROVIDER_SELECTED.value(mode="metrics-none", provider="none") == 1
+
+
+class TestMetricsEndpoint:
+    """/metrics serves the registry"""
+
+    def test_metrics_endpoint(self, client):
+        with span("decode", mode="word"):
+            pass
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "# TYPE scoring_stage_seconds histogram" in response.text
+        assert 'scoring_stage_seconds_count{mode="word",stage="decode"}' in response.text
+
+
+def _stage(name):
+    with span(name):
+        pass
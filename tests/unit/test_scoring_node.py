@@ -0,0 +1,127 @@
+"""
+Unit tests for the in-country scoring node client
+Covers: callback delivery, long-poll, adaptive backoff, pooled connections, errors
+"""
+import pytest
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.core.config import settings
+from app.services import scoring_node
+from app.services.scoring_node import ResultWaiters
+from ..benchmarks.fake_servers import CallbackReceiver, FakeScoringNode
+
+WAV = b"RIFF" + b"\x00" * 100
+
+
+@pytest.fixture(autouse=True)
+def node_settings(monkeypatch):
+    """Fresh pooled session per test, polling defaults, no callback"""
+    monkeypatch.setattr(scoring_node, "_session", None)
+    monkeypatch.setattr(settings, "SCORING_NODE_TOKEN", "test-token")
+    monkeypatch.setattr(settings, "SCORING_NODE_CALLBACK_URL", None)
+    monkeypatch.setattr(settings, "SCORING_NODE_LONG_POLL", 5.0)
+    monkeypatch.setattr(settings, "SCORING_NODE_POLL_MIN", 0.2)
+    monkeypatch.setattr(settings, "SCORING_NODE_POLL_MAX", 3.0)
+
+
+def _use(node, monkeypatch):
+    monkeypatch.setattr(settings, "SCORING_NODE_URL", node.url)
+
+
+class TestResultWaiters:
+    """Callback results reach waiters, even when they arrive first"""
+
+    def test_delivery_wakes_waiter(self):
+        waiters = ResultWaiters()
+        event = waiters.register("j1")
+        assert waiters.deliver("j1", {"status": "done"}) is True
+        assert event.is_set()
+        assert waiters.take("j1") == {"status": "done"}
+
+    def test_early_delivery_is_kept(self):
+        waiters = ResultWaiters()
+        assert waiters.deliver("j1", {"status": "done"}) is False
+        assert waiters.register("j1").is_set()
+
+    def test_unclaimed_results_are_capped(self, monkeypatch):
+        monkeypatch.setattr(scoring_node, "MAX_EARLY_RESULTS", 2)
+        waiters = ResultWaiters()
+        waiters.register("mine")
+        for job_id in ("a", "b", "mine", "c"):
+            waiters.deliver(job_id, {"status": "done"})
+
+        assert waiters.take("a") is None
+        assert waiters.take("mine") and waiters.take("b") and waiters.take("c")
+
+    def test_discard(self):
+        waiters = ResultWaiters()
+        waiters.register("j1")
+        waiters.deliver("j1", {"status": "done"})
+        waiters.discard("j1")
+        assert waiters.take("j1") is None
+
+
+class TestNodeClient:
+    """Results arrive as soon as the node has them"""
+
+    def test_adaptive_backoff_when_node_does_not_long_poll(self, monkeypatch):
+        with FakeScoringNode(latency=0.6) as node:
+            _use(node, monkeypatch)
+            start = time.monotonic()
+            result = scoring_node.assess_via_node(WAV, ["cat"], poll_timeout=10)
+            elapsed = time.monotonic() - start
+
+        assert result["pronunciation_score"] == 86.0
+        assert elapsed < 1.5  # a fixed 3 s sleep would answer at 3 s
+        assert 3 <= node.polls <= 6  # 0.2, 0.3, 0.45 ... s apart
+        assert node.connections == 1  # upload and every poll on one keep-alive connection
+
+    def test_long_poll_answers_on_completion(self, monkeypatch):
+        with FakeScoringNode(latency=0.5, long_poll=True) as node:
+            _use(node, monkeypatch)
+            start = time.monotonic()
+            result = scoring_node.assess_via_node(WAV, ["cat"], poll_timeout=10)
+            elapsed = time.monotonic() - start
+
+        assert result["pronunciation_score"] == 86.0
+        assert elapsed < 0.9
+        assert node.polls == 1
+
+    def test_callback_wakes_waiter(self, monkeypatch):
+        with FakeScoringNode(latency=0.5, callbacks=True) as node, \
+                CallbackReceiver(scoring_node.waiters.deliver) as receiver:
+            _use(node, monkeypatch)
+            monkeypatch.setattr(settings, "SCORING_NODE_CALLBACK_URL", receiver.url)
+            monkeypatch.setattr(settings, "SCORING_NODE_POLL_MIN", 2.0)  # polling alone would be late
+            start = time.monotonic()
+            result = scoring_node.assess_via_node(WAV, ["cat"], poll_timeout=10)
+            elapsed = time.monotonic() - start
+
+        assert result["pronunciation_score"] == 86.0
+        assert elapsed < 1.2
+        assert node.polls == 1  # woken by the push, not by a second poll
+
+    def test_node_error_returns_none(self, monkeypatch):
+        with FakeScoringNode(latency=0.1, fail=True) as node:
+            _use(node, monkeypatch)
+            assert scoring_node.assess_via_node(WAV, ["cat"], poll_timeout=5) is None
+
+    def test_timeout_returns_none(self, monkeypatch):
+        with FakeScoringNode(latency=5.0) as node:
+            _use(node, monkeypatch)
+            start = time.monotonic()
+            assert scoring_node.assess_via_node(WAV, ["cat"], poll_timeout=0.8) is None
+            assert time.monotonic() - start < 1.5
+
+    def test_not_configured(self, monkeypatch):
+        monkeypatch.setattr(settings, "SCORING_NODE_URL", None)
+        monkeypatch.delenv("SCORING_NODE_URL", raising=False)
+        assert scoring_node.assess_via_node(WAV, ["cat"]) is None
+        assert scoring_node.node_available() is False
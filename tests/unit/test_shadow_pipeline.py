@@ -0,0 +1,221 @@
+"""
+Unit tests for the shadow scoring pipeline
+Covers: fixed worker pool, load shedding (sampling, full queue), micro-batched
+inserts through the configured engine, reuse of live GOP results, metrics
+"""
+import pytest
+import sys
+import threading
+import wave
+from pathlib import Path
+
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.pool import StaticPool
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.db.session import Base
+from app.models.shadow_score import ShadowScore
+from app.services import shadow_service
+from app.services.shadow_service import ShadowPipeline, submit_shadow
+
+ASSESSMENT = {"azure_pronunciation_score": 80.0, "accuracy_score": 75.0, "pronunciation_score": 78.0}
+
+
+class FakeResponse:
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"NBest": [{"PronScore": 71.0, "AccuracyScore": 69.0, "Display": "cat"}]}
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False},
+                           poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine, tables=[ShadowScore.__table__])
+    return engine
+
+
+@pytest.fixture
+def wav_path(tmp_path):
+    path = tmp_path / "take.16k.wav"
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(16000)
+        w.writeframes(b"\x00\x00" * 1600)
+    return str(path)
+
+
+@pytest.fixture
+def model(monkeypatch):
+    """Shadow model stand-in; set `gate` to hold every call until released"""
+    state = {"calls": 0, "gate": None}
+
+    def post(url, files=None, data=None, timeout=None):
+        state["calls"] += 1
+        if state["gate"] is not None:
+            state["gate"].wait(5)
+        return FakeResponse()
+
+    monkeypatch.setattr(shadow_service.requests, "post", post)
+    return state
+
+
+def _pipeline(engine, **kwargs):
+    options = dict(workers=2, queue_size=20, sample_depth=10, sample_rate=0.0,
+                   batch_size=50, flush_interval=0.2)
+    options.update(kwargs)
+    pipeline = ShadowPipeline(**options)
+    pipeline.bind = engine
+    return pipeline
+
+
+def _rows(engine):
+    with engine.connect() as conn:
+        return conn.execute(select(ShadowScore.__table__).order_by(ShadowScore.id)).mappings().all()
+
+
+class TestShadowPipeline:
+    """Jobs are scored by a fixed pool and written in batches"""
+
+    def test_scores_and_writes_rows(self, engine, wav_path, model):
+        pipeline = _pipeline(engine)
+
+        assert pipeline.submit(7, "cat", wav_path, ASSESSMENT) is True
+        assert pipeline.drain(timeout=5)
+
+        rows = _rows(engine)
+        assert len(rows) == 1
+        assert rows[0]["recording_id"] == 7
+        assert rows[0]["azure_score"] == 80.0
+        assert rows[0]["final_score"] == 78.0
+        assert rows[0]["ml_pron_score"] == 71.0
+        assert rows[0]["ml_recognized"] == "cat"
+        assert rows[0]["ml_error"] is None
+
+    def test_rows_are_inserted_in_batches(self, engine, wav_path, model):
+        statements = []
+        event.listen(engine, "before_cursor_execute",
+                     lambda conn, cursor, stmt, params, ctx, many: statements.append((stmt, many)))
+        pipeline = _pipeline(engine, batch_size=5, flush_interval=1.0)
+
+        for i in range(10):
+            pipeline.submit(i, "cat", wav_path, ASSESSMENT)
+        assert pipeline.drain(timeout=5)
+
+        inserts = [many for stmt, many in statements if stmt.startswith("INSERT INTO shadow_scores")]
+        assert len(_rows(engine)) == 10
+        assert len(inserts) == pipeline.stats()["batches"] <= 4
+        assert all(inserts)  # executemany, not one statement per row
+
+    def test_fixed_worker_pool(self, engine, wav_path, model):
+        def pool_threads():
+            return sum(1 for t in threading.enumerate() if t.name.startswith("shadow-score-"))
+
+        model["gate"] = threading.Event()
+        pipeline = _pipeline(engine, workers=2, sample_depth=100, queue_size=100)
+        before = pool_threads()
+
+        for i in range(30):
+            pipeline.submit(i, "cat", wav_path, ASSESSMENT)
+        started = pool_threads() - before
+        model["gate"].set()
+        assert pipeline.drain(timeout=5)
+
+        assert started == 2  # not one thread per submission
+        assert model["calls"] == 30
+
+    def test_reuses_live_gop_result(self, engine, model):
+        pipeline = _pipeline(engine)
+        assessment = dict(ASSESSMENT, gop_heard="cap", gop_score=55.0)
+
+        assert pipeline.submit(3, "cat", "/missing.wav", assessment) is True
+        assert pipeline.drain(timeout=5)
+
+        assert model["calls"] == 0
+        row = _rows(engine)[0]
+        assert (row["ml_recognized"], row["ml_pron_score"], row["latency_ms"]) == ("cap", 55.0, 0)
+
+    def test_model_failure_is_logged_as_error(self, engine, model):
+        pipeline = _pipeline(engine)
+
+        pipeline.submit(1, "cat", "/missing.wav", ASSESSMENT)
+        assert pipeline.drain(timeout=5)
+
+        row = _rows(engine)[0]
+        assert row["ml_pron_score"] is None
+        assert row["ml_error"]
+        assert pipeline.stats()["model_errors"] == 1
+
+    def test_write_failure_is_counted(self, model):
+        broken = create_engine("sqlite:///:memory:")  # no shadow_scores table
+        pipeline = _pipeline(broken)
+
+        pipeline.submit(1, "cat", "/missing.wav", dict(ASSESSMENT, gop_heard="cat", gop_score=90.0))
+        assert pipeline.drain(timeout=5)
+
+        assert pipeline.stats()["write_failures"] == 1
+        assert pipeline.stats()["written"] == 0
+
+
+class TestLoadShedding:
+    """A deep queue is sampled and a full one drops, instead of piling up threads"""
+
+    def test_deep_queue_is_sampled(self, engine, wav_path, model):
+        model["gate"] = threading.Event()
+        pipeline = _pipeline(engine, workers=1, queue_size=50, sample_depth=5, sample_rate=0.0)
+
+        accepted = sum(pipeline.submit(i, "cat", wav_path, ASSESSMENT) for i in range(20))
+        stats = pipeline.stats()
+        model["gate"].set()
+        assert pipeline.drain(timeout=5)
+
+        assert accepted <= 6  # one in the worker, the rest up to the sampling depth
+        assert stats["dropped_sampled"] == 20 - accepted
+        assert stats["dropped_full"] == 0
+        assert stats["peak_depth"] <= 5
+
+    def test_sample_rate_keeps_a_fraction(self, engine, wav_path, model, monkeypatch):
+        model["gate"] = threading.Event()
+        pipeline = _pipeline(engine, workers=1, queue_size=500, sample_depth=0, sample_rate=0.5)
+        draws = iter([0.1, 0.9] * 100)
+        monkeypatch.setattr(shadow_service.random, "random", lambda: next(draws))
+
+        accepted = sum(pipeline.submit(i, "cat", wav_path, ASSESSMENT) for i in range(100))
+        model["gate"].set()
+        assert pipeline.drain(timeout=5)
+
+        assert accepted == 50
+        assert pipeline.stats()["dropped_sampled"] == 50
+
+    def test_full_queue_drops(self, engine, wav_path, model):
+        model["gate"] = threading.Event()
+        pipeline = _pipeline(engine, workers=1, queue_size=3, sample_depth=100)
+
+        results = [pipeline.submit(i, "cat", wav_path, ASSESSMENT) for i in range(10)]
+        stats = pipeline.stats()
+        model["gate"].set()
+        assert pipeline.drain(timeout=5)
+
+        assert results.count(True) <= 4  # queue capacity + the job in the worker
+        assert stats["dropped_full"] == results.count(False)
+        assert stats["queue_capacity"] == 3
+        assert stats["dropped"] == stats["dropped_full"]
+
+
+class TestSubmitShadow:
+    """Module entry point used by the scoring paths"""
+
+    def test_mock_results_are_skipped(self, monkeypatch):
+        submitted = []
+        monkeypatch.setattr(shadow_service.shadow_pipeline, "submit",
+                            lambda *args: submitted.append(args) or True)
+
+        assert submit_shadow(1, "cat", "/a.wav", {"pronunciation_score": 80, "_mock": True}) is False
+        assert submit_shadow(1, "cat", "/a.wav", ASSESSMENT) is True
+        assert len(submitted) == 1
@@ -0,0 +1,140 @@
+"""
+Unit tests for the asyncio xfyun ISE client
+Covers: signed-URL reuse, frame layout, fast send, error codes, session cap
+"""
+import pytest
+import sys
+import json
+import base64
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.core.config import settings
+from app.services.xf_ise_client import ISEClient, URLSigner, session_frames, sign_url
+from app.services.xf_ise_service import _parse
+from ..benchmarks.fake_servers import FakeISEServer
+
+CREDS = ("appid", "key", "secret")
+
+
+@pytest.fixture
+def fake_ise(monkeypatch):
+    with FakeISEServer() as server:
+        monkeypatch.setattr(settings, "XF_ISE_URL", server.url)
+        yield server
+
+
+class TestURLSigner:
+    """HMAC signing happens once per window, not once per session"""
+
+    def test_url_reused_within_ttl(self, monkeypatch):
+        monkeypatch.setattr(settings, "XF_ISE_SIGNATURE_TTL", 60.0)
+        signer = URLSigner()
+        endpoint = "wss://ise-api.xfyun.cn/v2/open-ise"
+
+        first = signer.url(endpoint, "key", "secret", now=1000.0)
+        assert signer.url(endpoint, "key", "secret", now=1059.0) == first
+        assert signer.signatures == 1
+
+        assert signer.url(endpoint, "key", "secret", now=1060.0) != first
+        assert signer.signatures == 2
+
+    def test_new_credentials_resign(self):
+        signer = URLSigner()
+        endpoint = "wss://ise-api.xfyun.cn/v2/open-ise"
+        signer.url(endpoint, "key", "secret", now=1000.0)
+        signer.url(endpoint, "key2", "secret2", now=1000.0)
+        assert signer.signatures == 2
+
+    def test_signature_covers_host_and_path(self):
+        url = sign_url("wss://ise-api.xfyun.cn/v2/open-ise", "key", "secret", now=0)
+        assert url.startswith("wss://ise-api.xfyun.cn/v2/open-ise?authorization=")
+        assert "host=ise-api.xfyun.cn" in url
+        assert "date=Thu%2C+01+Jan+1970" in url
+
+
+class TestSessionFrames:
+    """ssb first, then audio frames flagged first / middle / last"""
+
+    def test_frame_layout(self):
+        frames = [json.loads(f) for f in session_frames("appid", b"\x01" * 3000, "cat", "read_word", 1280)]
+
+        assert frames[0]["business"]["cmd"] == "ssb"
+        assert frames[0]["business"]["text"] == "[word]\ncat"
+        assert [f["business"]["aus"] for f in frames[1:]] == [1, 2, 4]
+        assert [f["data"]["status"] for f in frames[1:]] == [1, 1, 2]
+        assert sum(len(base64.b64decode(f["data"]["data"])) for f in frames[1:]) == 3000
+
+    def test_sentence_marker(self):
+        ssb = json.loads(next(session_frames("appid", b"\x00" * 10, "hello world", "read_sentence", 1280)))
+        assert ssb["business"]["text"] == "[content]\nhello world"
+
+
+class TestISEClient:
+    """Sessions against a local ISE stand-in"""
+
+    def test_evaluate_returns_result_xml(self, fake_ise):
+        client = ISEClient()
+        xml = client.evaluate_sync(b"\x00\x01" * 16000, "cat", "read_word", CREDS, timeout=10)
+
+        result = _parse(xml)
+        assert result["pronunciation_score"] == 84.0
+        assert [w["word"] for w in result["words"]] == ["cat"]
+        assert fake_ise.audio_bytes == [32000]
+
+    def test_fast_send_does_not_pace_frames(self, fake_ise, monkeypatch):
+        monkeypatch.setattr(settings, "XF_ISE_SEND_INTERVAL", 0.0)
+        client = ISEClient()
+        client.evaluate_sync(b"\x00" * 64000, "cat", "read_word", CREDS, timeout=10)  # 2 s of audio
+
+        assert len(fake_ise.frame_gaps) == 49
+        assert sum(fake_ise.frame_gaps) < 1.0  # real-time pacing would take ~2 s
+
+    def test_error_code_raises(self, monkeypatch):
+        with FakeISEServer(error_code=11201) as server:
+            monkeypatch.setattr(settings, "XF_ISE_URL", server.url)
+            client = ISEClient()
+            with pytest.raises(RuntimeError, match="code=11201"):
+                client.evaluate_sync(b"\x00" * 6400, "cat", "read_word", CREDS, timeout=10)
+
+    def test_failed_session_is_not_held_open(self, monkeypatch):
+        """The server stops reading after an error: the close handshake must not stall the session"""
+        monkeypatch.setattr(settings, "XF_ISE_SEND_INTERVAL", 0.0)
+        with FakeISEServer(error_code=11200) as server:
+            monkeypatch.setattr(settings, "XF_ISE_URL", server.url)
+            client = ISEClient()
+            for _ in range(3):
+                start = time.monotonic()
+                with pytest.raises(RuntimeError, match="code=11200"):
+                    client.evaluate_sync(b"\x00" * 64000, "cat", "read_word", CREDS, timeout=10)
+                assert time.monotonic() - start < 2.0
+
+    def test_empty_audio_rejected(self, fake_ise):
+        with pytest.raises(RuntimeError, match="empty audio"):
+            ISEClient().evaluate_sync(b"", "cat", "read_word", CREDS, timeout=10)
+        assert fake_ise.sessions == 0
+
+    def test_concurrent_sessions_are_capped(self, monkeypatch):
+        monkeypatch.setattr(settings, "XF_ISE_MAX_SESSIONS", 2)
+        with FakeISEServer(latency=0.1) as server:
+            monkeypatch.setattr(settings, "XF_ISE_URL", server.url)
+            client = ISEClient()
+            with ThreadPoolExecutor(max_workers=6) as pool:
+                results = list(pool.map(
+                    lambda i: client.evaluate_sync(b"\x00" * 3200, "cat", "read_word", CREDS, timeout=10),
+                    range(6)
+                ))
+
+        assert len(results) == 6
+        assert server.sessions == 6
+        assert server.peak_active <= 2
+        assert client.peak <= 2
+        assert client.signer.signatures == 1  # one signature shared by all six
+
+    def test_probe(self, fake_ise):
+        assert ISEClient().probe_sync(CREDS) is True